@@ -1,340 +1,828 @@
-from datetime import date
-from typing import List, Literal
-from collections import defaultdict
-from pydantic import RootModel
-from pydantic import BaseModel, ValidationInfo, field_validator, model_validator
-
-"""
-# add new states here as needed. only states present in this dictionary
-# will have their geo_name validated; all others are unchecked.
-"""
-sub_state_jurisdictions: dict[str, list[str]] = {
-    "ID": [
-        "Public Health District 1", "Public Health District 2", "Public Health District 3", "Public Health District 4",
-        "Public Health District 5", "Public Health District 6", "Public Health District 7"
-    ],
-    "MA": [
-        "Berkshire", "Bristol", "Essex", "Franklin", "Hampden", "Hampshire", "Middlesex", "Norfolk", "Plymouth", "Suffolk",
-        "Worcester", "Dukes/Nantucket/Barnstable" 
-    ],
-    "MI": [
-        "1", "2 North", "2 South", "3", "5", "6", "7", "8"
-    ],
-    "MN": [
-        "Aitkin County", "Anoka County", "Becker County", "Beltrami County", "Benton County", "Big Stone County", "Blue Earth County", "Brown County",
-        "Carlton County", "Carver County", "Cass County", "Chippewa County", "Chisago County", "Clay County", "Clearwater County", "Cook County", "Cottonwood County",
-        "Crow Wing County", "Dakota County", "Dodge County", "Douglas County", "Faribault County", "Fillmore County", "Freeborn County", "Goodhue County", "Grant County",
-        "Hennepin County", "Houston County", "Hubbard County", "Isanti County", "Itasca County", "Jackson County", "Kanabec County", "Kandiyohi County", "Kittson County",
-        "Koochiching County", "Lake County", "Lake of the Woods County", "Lac qui Parle County", "Le Sueur County", "Lincoln County", "Lyon County", "Mahnomen County",
-        "Marshall County", "Martin County", "McLeod County", "Meeker County", "Mille Lacs County", "Morrison County", "Mower County", "Murray County", "Nicollet County",
-        "Nobles County", "Norman County", "Olmsted County", "Otter Tail County", "Pennington County", "Pine County", "Pipestone County", "Polk County", "Pope County",
-        "Ramsey County", "Red Lake County", "Redwood County", "Renville County", "Rice County", "Rock County", "Roseau County", "Scott County", "Sherburne County", "Sibley County",
-        "St. Louis County", "Stearns County", "Steele County", "Stevens County", "Swift County", "Todd County", "Traverse County", "Wabasha County", "Wadena County", "Waseca County",
-        "Washington County", "Watonwan County", "Wilkin County", "Winona County", "Wright County", "Yellow Medicine County"
-    ],
-}
-# add "unspecified" as a valid sub-state jurisdiction for each state to handle suppression rules.
-sub_state_jurisdictions = {k: v + ["unspecified"] for k, v in sub_state_jurisdictions.items()}
-
-class DiseaseReport(BaseModel):
-    disease_name: Literal["measles", "pertussis", "meningococcus"]
-    report_period_start: date
-    report_period_end: date
-    date_type: Literal["cccd", "jurisdiction date hierarchy"]
-    time_unit: Literal["week"]
-    disease_subtype: str
-    reporting_jurisdiction: str
-    state: Literal[
-        "AL", "AK", "AZ", "AR", "AS",
-        "CA", "CO", "CT", "DE", "DC",
-        "FL", "GA", "GU", "HI", "ID",
-        "IL", "IN", "IA", "KS", "KY",
-        "LA", "ME", "MD", "MA", "MI",
-        "MN", "MS", "MO", "MT", "NE",
-        "NV", "NH", "NJ", "NM", "NY",
-        "NC", "ND", "MP", "OH", "OK",
-        "OR", "PA", "PR", "RI", "SC",
-        "SD", "TN", "TX", "TT", "UT",
-        "VT", "VA", "VI", "WA", "WV",
-        "WI", "WY"
-    ]
-    geo_unit: Literal["county", "state", "region", "planning area", "hsa", "NA"]
-    geo_name: str
-    age_group: Literal[
-        "<1 y", "1-4 y", "5-11 y", "12-18 y",
-        "19-22 y", "23-44 y", "45-64 y", ">=65 y",
-        "total", "unknown", "unspecified"
-    ]
-    confirmation_status: Literal["confirmed", "confirmed and probable"]
-    outcome: Literal["cases", "hospitalizations", "deaths"]
-    count: int
-    
-    class Config:
-        """
-        forbid extra data columns
-        """
-        extra = "forbid"
-    
-    @field_validator('count')
-    @classmethod
-    def count_must_be_non_negative(cls, v):
-        if v <= 0:
-            raise ValueError('count must be > 0')
-        return v
-    
-    @field_validator('disease_subtype')
-    @classmethod
-    def validate_disease_subtype(cls, v, info: ValidationInfo):
-        """
-        validate disease_subtype based on disease_name
-        """
-        disease_name = info.data.get('disease_name')
-        
-        if disease_name == "meningococcus":
-            if v not in ["A", "B", "C", "W", "X", "Y", "Z", "unknown", "unspecified", "total"]:
-                raise ValueError(
-                    f"for meningococcus, disease_subtype must be one of: A, B, C, W, X, Y, Z, unknown, unspecified, total. got: {v}"
-                )
-        elif disease_name in ["measles", "pertussis"]:
-            if v not in ["total"]:
-                raise ValueError(
-                    f"for {disease_name}, disease_subtype must be 'total'. got: {v}"
-                )
-        
-        return v
-    
-    @model_validator(mode = 'after')
-    def validate_reporting_jurisdiction(self):
-        """
-        validate reporting_jurisdiction to match either the state or the geo_name column. for 'international resident' rows, reporting_jurisdiction must
-        match the state only.
-        """
-        if self.geo_name == 'international resident':
-            if self.reporting_jurisdiction != self.state:
-                raise ValueError(
-                    f"for 'international resident' rows, reporting_jurisdiction must match the state."
-                    f"\ngot reporting_jurisdiction = '{self.reporting_jurisdiction}' but state = '{self.state}'"
-                )
-            
-            return self
-        
-        if self.reporting_jurisdiction not in (self.state, self.geo_name):
-            raise ValueError(
-                f"reporting_jurisdiction must match either state or geo_name."
-                f"\ngot reporting_jurisdiction = '{self.reporting_jurisdiction}', "
-                f"state = '{self.state}', geo_name = '{self.geo_name}'"
-            )
-        
-        return self
-    
-    @model_validator(mode = 'after')
-    def validate_breakdown_rules(self):
-        """
-        enforces age_group and disease_subtype breakdown rules based on geo_unit and disease_name.
-
-        sub-state level (geo_unit != 'state'):
-            - disease_subtype must be 'total'
-            - age_group must be 'total'
-
-        state level (geo_unit == 'state') — disease_name == 'measles' or 'pertussis':
-            - disease_subtype must be 'total' (already enforced by field validator)
-            - age_group must be anything except 'total'
-
-        state level (geo_unit == 'state') — disease_name == 'meningococcus':
-            - age breakdown:  disease_subtype == 'total', and age_group != 'total'
-            - subtype breakdown:  age_group == 'total', and disease_subtype != 'total'
-        """
-        disease_name = self.disease_name
-        disease_subtype = self.disease_subtype
-        geo_unit = self.geo_unit
-        age_group = self.age_group
-
-        # sub-state level: both must be 'total'.
-        if geo_unit != "state":
-            if age_group != "total":
-                raise ValueError(
-                    f"at sub-state level, age_group must be 'total'."
-                    f"\ngot geo_unit = '{geo_unit}' and age_group = '{age_group}'"
-                )
-            
-            if disease_subtype != "total":
-                raise ValueError(
-                    f"at sub-state level, disease_subtype must be 'total'."
-                    f"\ngot geo_unit = '{geo_unit}' and disease_subtype = '{disease_subtype}'"
-                )
-            
-            return self
-
-        # state level.
-        if disease_name in ["measles", "pertussis"]:
-            if age_group == "total":
-                raise ValueError(
-                    f"at state level, age_group must not be 'total' for {disease_name}."
-                    f"\ngot age_group = '{age_group}'"
-                )
-        elif disease_name == "meningococcus":
-            age_is_total = age_group == "total"
-            subtype_is_total = disease_subtype == "total"
-
-            if age_is_total and subtype_is_total:
-                raise ValueError(
-                    "for meningococcus at state level, age_group and disease_subtype cannot both be 'total'."
-                    "\nuse age_group = 'total' for subtype breakdowns, or disease_subtype = 'total' for age breakdowns."
-                )
-            if not age_is_total and not subtype_is_total:
-                raise ValueError(
-                    "for meningococcus at state level, exactly one of age_group or disease_subtype must be 'total'."
-                    f"\ngot age_group = '{age_group}' and disease_subtype = '{disease_subtype}'"
-                )
-
-        return self
-    
-    @field_validator('geo_name')
-    @classmethod
-    def validate_geo_name(cls, v, info: ValidationInfo):
-        """
-        validate geo_name for sub-state jurisdictions of the states that are participating in the USDT project.
-        """
-        state = info.data.get('state')
-        geo_unit = info.data.get('geo_unit')
-        
-        if v == 'international resident':
-            # handles 'international resident' case.
-            if geo_unit != 'NA':
-                raise ValueError(
-                    f"when geo_name is 'international resident', geo_unit must be 'NA'."
-                    f"\ngot geo_name = '{v}' but geo_unit = '{geo_unit}'"
-                )
-            
-            return v
-        elif geo_unit == 'NA':
-            raise ValueError(
-                f"geo_unit must not be 'NA', unless geo_name is 'international resident'."
-                f"\ngot geo_unit = '{geo_unit}' but geo_name = '{v}'"
-            )
-
-        if geo_unit == "state":
-            if v != state:
-                raise ValueError(
-                    f"when geo_unit is 'state', geo_name must match state."
-                    f"\ngot geo_name = '{v}' but state = '{state}'"
-                )
-            
-            return v
-        else:
-            known_jurisdictions = sub_state_jurisdictions.get(state)
-            if known_jurisdictions is None:
-                # state not yet registered in the schema, so accept any jurisdiction name.
-                return v
-
-            if v not in known_jurisdictions:
-                raise ValueError(
-                    f"'{v}' is not a recognized sub-state jurisdiction for {state}."
-                    f"\nexpected one of: {known_jurisdictions}"
-                )
-            
-            return v
-        
-    @field_validator('confirmation_status')
-    @classmethod
-    def validate_confirmation_status(cls, v, info: ValidationInfo):
-        """
-        validate confirmation_status based on disease_name:
-            - measles: 'confirmed' only
-            - pertussis, meningococcus: 'confirmed and probable' only
-        """
-        disease_name = info.data.get('disease_name')
-        
-        if disease_name == 'measles' and v != 'confirmed':
-            raise ValueError(
-                f"for measles, confirmation_status must be 'confirmed'."
-                f"\ngot: '{v}'"
-            )
-        elif disease_name in ['pertussis', 'meningococcus'] and v != 'confirmed and probable':
-            raise ValueError(
-                f"for {disease_name}, confirmation_status must be 'confirmed and probable'."
-                f"\ngot: '{v}'"
-            )
-        
-        return v
-
-class DiseaseReportDataset(RootModel[List[DiseaseReport]]):
-    @model_validator(mode = 'after')
-    def validate_single_state(self):
-        """
-        check that the submitted file only contains data for a single state.
-        """
-        states = {row.state for row in self.root}
-        if len(states) > 1:
-            raise ValueError(
-                f"dataset must contain data for a single state only."
-                f"\nfound multiple states: {sorted(states)}"
-            )
-        
-        return self
-
-    @model_validator(mode = 'after')
-    def validate_count_totals(self):
-        """
-        for each (report_period_start, report_period_end, disease_name, outcome) grouping,
-        verify that counts match across levels:
-
-        measles/pertussis:
-            - sum of state-level rows (age breakdown) == sum of sub-state rows
-
-        meningococcus:
-            -    sum of state-level age breakdown rows (disease_subtype == 'total')
-              == sum of state-level disease subtype breakdown rows (age_group == 'total')
-              == sum of sub-state rows
-
-        international resident rows (geo_unit == 'NA') are excluded from all sums.
-        """
-        # filter out international resident rows.
-        rows = [r for r in self.root if r.geo_name != 'international resident']
-
-        # group rows by (report_period_start, report_period_end, disease_name, outcome).
-        groups = defaultdict(list)
-        for row in rows:
-            key = (row.report_period_start, row.report_period_end, row.disease_name, row.outcome)
-            groups[key].append(row)
-
-        errors = []
-        for (start, end, disease_name, outcome), group_rows in groups.items():
-            period_str = f"{start} to {end}"
-
-            state_rows = [r for r in group_rows if r.geo_unit == 'state']
-            substate_rows = [r for r in group_rows if r.geo_unit != 'state']
-
-            substate_sum = sum(r.count for r in substate_rows)
-
-            if disease_name in ["measles", "pertussis"]:
-                state_sum = sum(r.count for r in state_rows)
-
-                if state_sum != substate_sum:
-                    errors.append(
-                        f"count mismatch for [{period_str} | {disease_name} | {outcome}]:"
-                        f"\nstate-level sum ({state_sum}) != sub-state sum ({substate_sum})"
-                    )
-            elif disease_name == "meningococcus":
-                age_breakdown_sum = sum(
-                    r.count for r in state_rows if r.disease_subtype == 'total'
-                )
-                subtype_breakdown_sum = sum(
-                    r.count for r in state_rows if r.age_group == 'total'
-                )
-
-                if not (age_breakdown_sum == subtype_breakdown_sum == substate_sum):
-                    errors.append(
-                        f"count mismatch for [{period_str} | {disease_name} | {outcome}]:"
-                        f"\nstate-level age breakdown sum = {age_breakdown_sum}"
-                        f"\nstate-level disease subtype breakdown sum = {subtype_breakdown_sum}"
-                        f"\nsub-state sum = {substate_sum}"
-                    )
-
-        if errors:
-            raise ValueError(
-                f"count mismatch(es) found:"
-                + "".join(f"\n - {e}" for e in errors)
-            )
-
-        return self
\ No newline at end of file
+import itertools
+import sys
+import threading
+from datetime import date
+from typing import List, Literal, NamedTuple
+
+from geography_registry import GeographyRegistry
+from mmwr_calendar import is_valid_mmwr_week, mmwr_week_of
+
+"""
+# sub-state geographies are registered per state in jurisdiction-metadata/disease-tracking-metadata-{jurisdiction}.yaml.
+# only states with a metadata file will have their geo_name validated; all others are unchecked.
+"""
+geography = GeographyRegistry.load()
+
+# plain {state: [geo_name, ...]} view of the registry, including "unspecified".
+sub_state_jurisdictions: dict[str, list[str]] = geography.as_dict()
+
+"""
+# value vocabularies of the enum fields. the DiseaseReport Literal types are built
+# from these tuples, and each value gets a small integer code (its position) so
+# rows can be stored and compared as tuples of ints.
+"""
+DISEASE_NAMES = ("measles", "pertussis", "meningococcus")
+DATE_TYPES = ("cccd", "jurisdiction date hierarchy")
+TIME_UNITS = ("week",)
+STATES = (
+    "AL", "AK", "AZ", "AR", "AS",
+    "CA", "CO", "CT", "DE", "DC",
+    "FL", "GA", "GU", "HI", "ID",
+    "IL", "IN", "IA", "KS", "KY",
+    "LA", "ME", "MD", "MA", "MI",
+    "MN", "MS", "MO", "MT", "NE",
+    "NV", "NH", "NJ", "NM", "NY",
+    "NC", "ND", "MP", "OH", "OK",
+    "OR", "PA", "PR", "RI", "SC",
+    "SD", "TN", "TX", "TT", "UT",
+    "VT", "VA", "VI", "WA", "WV",
+    "WI", "WY"
+)
+GEO_UNITS = ("county", "state", "region", "planning area", "hsa", "NA")
+AGE_GROUPS = (
+    "<1 y", "1-4 y", "5-11 y", "12-18 y",
+    "19-22 y", "23-44 y", "45-64 y", ">=65 y",
+    "total", "unknown", "unspecified"
+)
+CONFIRMATION_STATUSES = ("confirmed", "confirmed and probable")
+OUTCOMES = ("cases", "hospitalizations", "deaths")
+
+# DiseaseReport columns, in model order (asserted when the models are built).
+FIELD_NAMES = (
+    "disease_name", "report_period_start", "report_period_end", "date_type", "time_unit",
+    "disease_subtype", "reporting_jurisdiction", "state", "geo_unit", "geo_name",
+    "age_group", "confirmation_status", "outcome", "count",
+)
+
+# DiseaseReport field descriptions, also written to data_reporting_schema.yaml.
+FIELD_DESCRIPTIONS: dict[str, str] = {
+    "disease_name": "Name of the disease",
+    "report_period_start": (
+        "Date of report period start (YYYY-MM-DD). When time_unit='week', the Sunday that starts an MMWR week."
+    ),
+    "report_period_end": (
+        "Date of report period end (YYYY-MM-DD). When time_unit='week', the Saturday that ends the same MMWR week."
+    ),
+    "date_type": (
+        "Calculated Case Counting Date (cccd) or jurisdiction-defined date hierarchy. "
+        "Details of jurisdiction date hierarchy should be provided in metadata."
+    ),
+    "time_unit": "Time aggregation unit",
+    "disease_subtype": (
+        "Disease subtype (meningococcal serogroup). Use 'total' for non-subtype-stratified aggregations or diseases "
+        "without subtype reporting (measles, pertussis). Use 'unknown' when subtyping was not performed. "
+        "Use 'unspecified' when subtype is known but suppressed."
+    ),
+    "reporting_jurisdiction": "Abbreviation for the reporting state, city, or territory",
+    "state": "2-letter abbreviation for the state of the jurisdiction",
+    "geo_unit": "Geographic unit",
+    "geo_name": (
+        "Name of the geographic unit. Sub-state names must be registered in "
+        "jurisdiction-metadata/disease-tracking-metadata-{state}.yaml."
+    ),
+    "age_group": "Standardized age group",
+    "confirmation_status": "Case classification status",
+    "outcome": "Reported outcome type",
+    "count": "Count of specified outcome for the specified group for this time period",
+}
+
+ENUM_CODES: dict[str, dict[str, int]] = {
+    field_name: {sys.intern(value): code for code, value in enumerate(values)}
+    for field_name, values in {
+        "disease_name": DISEASE_NAMES,
+        "date_type": DATE_TYPES,
+        "time_unit": TIME_UNITS,
+        "state": STATES,
+        "geo_unit": GEO_UNITS,
+        "age_group": AGE_GROUPS,
+        "confirmation_status": CONFIRMATION_STATUSES,
+        "outcome": OUTCOMES,
+    }.items()
+}
+
+"""
+# cross-field rules. each rule has an id and the error message raised by DiseaseReport
+# when it is violated; the check_* functions below return the violated rule id (or None)
+# and are the single implementation used by both the pydantic validators and batch
+# validation code.
+"""
+RULE_MESSAGES: dict[str, str] = {
+    "count_positive": "count must be > 0",
+    "meningococcus_subtype": (
+        "for meningococcus, disease_subtype must be one of: A, B, C, W, X, Y, Z, unknown, unspecified, total. got: {disease_subtype}"
+    ),
+    "subtype_total_only": "for {disease_name}, disease_subtype must be 'total'. got: {disease_subtype}",
+    "measles_confirmed": "for measles, confirmation_status must be 'confirmed'.\ngot: '{confirmation_status}'",
+    "confirmed_and_probable": (
+        "for {disease_name}, confirmation_status must be 'confirmed and probable'.\ngot: '{confirmation_status}'"
+    ),
+    "international_resident_geo_unit": (
+        "when geo_name is 'international resident', geo_unit must be 'NA'."
+        "\ngot geo_name = '{geo_name}' but geo_unit = '{geo_unit}'"
+    ),
+    "geo_unit_na": (
+        "geo_unit must not be 'NA', unless geo_name is 'international resident'."
+        "\ngot geo_unit = '{geo_unit}' but geo_name = '{geo_name}'"
+    ),
+    "state_geo_name": (
+        "when geo_unit is 'state', geo_name must match state."
+        "\ngot geo_name = '{geo_name}' but state = '{state}'"
+    ),
+    "sub_state_geo_name": (
+        "'{geo_name}' is not a recognized sub-state jurisdiction for {state}."
+        "{hint}"
+    ),
+    "international_resident_reporting_jurisdiction": (
+        "for 'international resident' rows, reporting_jurisdiction must match the state."
+        "\ngot reporting_jurisdiction = '{reporting_jurisdiction}' but state = '{state}'"
+    ),
+    "reporting_jurisdiction": (
+        "reporting_jurisdiction must match either state or geo_name."
+        "\ngot reporting_jurisdiction = '{reporting_jurisdiction}', "
+        "state = '{state}', geo_name = '{geo_name}'"
+    ),
+    "sub_state_age_group_total": (
+        "at sub-state level, age_group must be 'total'."
+        "\ngot geo_unit = '{geo_unit}' and age_group = '{age_group}'"
+    ),
+    "sub_state_subtype_total": (
+        "at sub-state level, disease_subtype must be 'total'."
+        "\ngot geo_unit = '{geo_unit}' and disease_subtype = '{disease_subtype}'"
+    ),
+    "state_age_group_not_total": (
+        "at state level, age_group must not be 'total' for {disease_name}."
+        "\ngot age_group = '{age_group}'"
+    ),
+    "meningococcus_both_total": (
+        "for meningococcus at state level, age_group and disease_subtype cannot both be 'total'."
+        "\nuse age_group = 'total' for subtype breakdowns, or disease_subtype = 'total' for age breakdowns."
+    ),
+    "meningococcus_neither_total": (
+        "for meningococcus at state level, exactly one of age_group or disease_subtype must be 'total'."
+        "\ngot age_group = '{age_group}' and disease_subtype = '{disease_subtype}'"
+    ),
+    "report_period_order": (
+        "report_period_end must be after report_period_start."
+        "\ngot report_period_start = '{report_period_start}' and report_period_end = '{report_period_end}'"
+    ),
+    "mmwr_week": (
+        "when time_unit is 'week', report_period_start and report_period_end must be the sunday and saturday of one MMWR week."
+        "\ngot report_period_start = '{report_period_start}' and report_period_end = '{report_period_end}'{hint}"
+    ),
+    # file-level rules (the CSV header, checked before any row is read).
+    "header": "the header must list every DiseaseReport column exactly once, in any order.{details}",
+    # dataset-level rules (DiseaseReportDataset).
+    "single_state": (
+        "dataset must contain data for a single state only."
+        "\nfound multiple states: {states}"
+    ),
+    "count_totals": "count mismatch(es) found:{mismatches}",
+}
+
+MENINGOCOCCUS_SUBTYPES = ("A", "B", "C", "W", "X", "Y", "Z", "unknown", "unspecified", "total")
+SUB_STATE_GEO_UNITS = tuple(geo_unit for geo_unit in GEO_UNITS if geo_unit != "state")
+# geo_unit values whose geo_name is checked against the geography registry.
+REGISTRY_GEO_UNITS = tuple(geo_unit for geo_unit in SUB_STATE_GEO_UNITS if geo_unit != "NA")
+
+
+def _except_total(values: tuple[str, ...]) -> tuple[str, ...]:
+    return tuple(value for value in values if value != "total")
+
+
+class ValueRule(NamedTuple):
+    """
+    a declarative cross-field rule: rows whose `when` fields each hold one of the listed
+    values must have `field` set to one of `values` or, with `equals`, to the value of
+    one of the `equals` fields.
+    """
+    rule_id: str
+    # the check_* function (and DiseaseReport validator) that enforces the rule.
+    check: str
+    when: dict[str, tuple[str, ...]]
+    field: str
+    values: tuple[str, ...] = ()
+    equals: tuple[str, ...] = ()
+
+    def violated_by(self, row) -> bool:
+        """whether a row (a mapping of field name to value) breaks the rule."""
+        for name, allowed in self.when.items():
+            if row[name] not in allowed:
+                return False
+        if self.equals:
+            value = row[self.field]
+            return all(value != row[name] for name in self.equals)
+        return row[self.field] not in self.values
+
+
+def _rule(rule_id: str, check: str, when: dict, field: str, values = (), equals = ()) -> ValueRule:
+    return ValueRule(rule_id, check, {name: tuple(allowed) for name, allowed in when.items()}, field, tuple(values), tuple(equals))
+
+
+"""
+# the cross-field row rules, in the order each check_* function applies them. these
+# are the single definition of the rules: the check_* functions (and so DiseaseReport
+# and batch validation) evaluate them, and scripts/generate_yaml_schema.py writes them
+# to data_reporting_schema.yaml as JSON Schema if/then conditionals.
+#
+# breakdown rules, by geo_unit and disease_name:
+#     sub-state level (geo_unit != 'state'): age_group and disease_subtype must be 'total'
+#     state level, measles and pertussis: age_group must not be 'total'
+#     state level, meningococcus: exactly one of age_group and disease_subtype is 'total'
+#         (age breakdown: disease_subtype == 'total'; subtype breakdown: age_group == 'total')
+"""
+ROW_RULES: tuple[ValueRule, ...] = (
+    _rule("meningococcus_subtype", "disease_subtype", {"disease_name": ["meningococcus"]}, "disease_subtype", MENINGOCOCCUS_SUBTYPES),
+    _rule("subtype_total_only", "disease_subtype", {"disease_name": ["measles", "pertussis"]}, "disease_subtype", ["total"]),
+    _rule("international_resident_geo_unit", "geo_name", {"geo_name": ["international resident"]}, "geo_unit", ["NA"]),
+    _rule("geo_unit_na", "geo_name", {"geo_unit": ["NA"]}, "geo_name", ["international resident"]),
+    _rule("state_geo_name", "geo_name", {"geo_unit": ["state"]}, "geo_name", equals = ["state"]),
+    _rule("measles_confirmed", "confirmation_status", {"disease_name": ["measles"]}, "confirmation_status", ["confirmed"]),
+    _rule(
+        "confirmed_and_probable", "confirmation_status", {"disease_name": ["pertussis", "meningococcus"]},
+        "confirmation_status", ["confirmed and probable"]
+    ),
+    _rule(
+        "international_resident_reporting_jurisdiction", "reporting_jurisdiction", {"geo_name": ["international resident"]},
+        "reporting_jurisdiction", equals = ["state"]
+    ),
+    _rule("reporting_jurisdiction", "reporting_jurisdiction", {}, "reporting_jurisdiction", equals = ["state", "geo_name"]),
+    _rule("sub_state_age_group_total", "breakdown", {"geo_unit": SUB_STATE_GEO_UNITS}, "age_group", ["total"]),
+    _rule("sub_state_subtype_total", "breakdown", {"geo_unit": SUB_STATE_GEO_UNITS}, "disease_subtype", ["total"]),
+    _rule(
+        "state_age_group_not_total", "breakdown", {"geo_unit": ["state"], "disease_name": ["measles", "pertussis"]},
+        "age_group", _except_total(AGE_GROUPS)
+    ),
+    _rule(
+        "meningococcus_both_total", "breakdown",
+        {"geo_unit": ["state"], "disease_name": ["meningococcus"], "age_group": ["total"]},
+        "disease_subtype", _except_total(MENINGOCOCCUS_SUBTYPES)
+    ),
+    _rule(
+        "meningococcus_neither_total", "breakdown",
+        {"geo_unit": ["state"], "disease_name": ["meningococcus"], "age_group": _except_total(AGE_GROUPS)},
+        "disease_subtype", ["total"]
+    ),
+)
+
+
+def registry_rules() -> tuple[ValueRule, ...]:
+    """
+    the geography registry as sub_state_geo_name rules, one per registered state, for
+    scripts/generate_yaml_schema.py. check_geo_name reads the registry itself; the rules
+    allow 'international resident' because check_geo_name leaves those rows to the
+    geo_name rules of ROW_RULES.
+    """
+    return tuple(
+        _rule(
+            "sub_state_geo_name", "geo_name", {"state": [state], "geo_unit": REGISTRY_GEO_UNITS},
+            "geo_name", (*geography.names(state), "international resident")
+        )
+        for state in geography.states()
+    )
+
+
+# numeric fields: (exclusive minimum, rule violated otherwise).
+EXCLUSIVE_MINIMUMS: dict[str, tuple[int, str]] = {
+    "count": (0, "count_positive"),
+}
+
+
+def rules_of(check: str) -> tuple[ValueRule, ...]:
+    return tuple(rule for rule in ROW_RULES if rule.check == check)
+
+
+_UNLISTED = object()
+
+
+class RuleTable:
+    """
+    ValueRules compiled into a lookup table. rules only test whether a value is one of
+    the values they list, so each listed value of a field gets a small integer code
+    (codes[i]) and every other value shares the code -1; each `equals` comparison
+    (comparisons, pairs of field positions) adds a bool. violations maps the key of
+    every row that breaks a rule, the codes followed by the comparison results, to the
+    first rule it breaks, so a check is one dict lookup whatever the number of rules.
+    """
+    __slots__ = ("fields", "codes", "comparisons", "violations")
+
+    def __init__(self, rules: tuple[ValueRule, ...], fields: tuple[str, ...]):
+        self.fields = fields
+        listed = {name: [] for name in fields}
+        for rule in rules:
+            for name, allowed in rule.when.items():
+                listed[name].extend(allowed)
+            listed[rule.field].extend(rule.values)
+        self.codes = tuple(
+            {sys.intern(value): code for code, value in enumerate(dict.fromkeys(listed[name]))} for name in fields
+        )
+        self.comparisons = tuple(dict.fromkeys(
+            (fields.index(rule.field), fields.index(name)) for rule in rules for name in rule.equals
+        ))
+
+        # decoded values of each code; a value no rule lists is never in an allowed tuple.
+        values = [(*codes, _UNLISTED) for codes in self.codes]
+        violations = {}
+        for rule in rules:
+            # the codes of each field, and the comparison results, of the rows that break the rule.
+            choices = []
+            for i, name in enumerate(fields):
+                codes = [*self.codes[i].values(), -1]
+                if name in rule.when:
+                    codes = [code for code in codes if values[i][code] in rule.when[name]]
+                if name == rule.field and not rule.equals:
+                    codes = [code for code in codes if values[i][code] not in rule.values]
+                choices.append(codes)
+            for i, j in self.comparisons:
+                breaks = fields[i] == rule.field and fields[j] in rule.equals
+                choices.append((False,) if breaks else (False, True))
+
+            for key in itertools.product(*choices):
+                if self.comparisons and not self._possible(key, values):
+                    continue
+                violations.setdefault(key, rule.rule_id)
+        self.violations = violations
+
+    def _possible(self, key: tuple, values: list) -> bool:
+        """whether a key can occur: two listed values either are equal or are not."""
+        for (i, j), same in zip(self.comparisons, key[len(self.fields):]):
+            if key[i] >= 0 and key[j] >= 0 and (values[i][key[i]] == values[j][key[j]]) != same:
+                return False
+        return True
+
+
+# disease_name -> (allowed disease_subtype values, rule violated otherwise).
+SUBTYPE_RULES: dict[str, tuple[frozenset[str], str]] = {
+    disease_name: (frozenset(rule.values), rule.rule_id)
+    for rule in rules_of("disease_subtype") for disease_name in rule.when["disease_name"]
+}
+
+# disease_name -> (allowed confirmation_status values, rule violated otherwise).
+CONFIRMATION_STATUS_RULES: dict[str, tuple[frozenset[str], str]] = {
+    disease_name: (frozenset(rule.values), rule.rule_id)
+    for rule in rules_of("confirmation_status") for disease_name in rule.when["disease_name"]
+}
+
+GEO_NAME_RULES = rules_of("geo_name")
+REPORTING_JURISDICTION_RULES = rules_of("reporting_jurisdiction")
+BREAKDOWN_RULES = rules_of("breakdown")
+
+# the rules of each check_* function compiled at import, in its argument order. the
+# check_* functions build the keys by hand, so the key layout is asserted here: no rule
+# lists a state or reporting_jurisdiction value, and the comparisons are those of the
+# `equals` rules.
+GEO_NAME_TABLE = RuleTable(GEO_NAME_RULES, ("state", "geo_unit", "geo_name"))
+REPORTING_JURISDICTION_TABLE = RuleTable(REPORTING_JURISDICTION_RULES, ("state", "geo_name", "reporting_jurisdiction"))
+BREAKDOWN_TABLE = RuleTable(BREAKDOWN_RULES, ("disease_name", "geo_unit", "age_group", "disease_subtype"))
+assert not GEO_NAME_TABLE.codes[0] and GEO_NAME_TABLE.comparisons == ((2, 0),)
+assert not REPORTING_JURISDICTION_TABLE.codes[0] and not REPORTING_JURISDICTION_TABLE.codes[2]
+assert REPORTING_JURISDICTION_TABLE.comparisons == ((2, 0), (2, 1))
+assert not BREAKDOWN_TABLE.comparisons
+
+
+class RuleViolation(ValueError):
+    """ValueError raised by the DiseaseReport validators, tagged with the id of the violated rule."""
+
+    def __init__(self, rule_id: str, message: str):
+        self.rule_id = rule_id
+        super().__init__(message)
+
+
+def rule_message(rule_id: str, **values) -> str:
+    """format the error message of a rule with the offending row values."""
+    if rule_id == "sub_state_geo_name":
+        # suggestions are only computed once a name has failed.
+        suggestions = geography.suggest(values.get("state"), values.get("geo_name"))
+        if suggestions:
+            values.setdefault("hint", "\ndid you mean: " + ", ".join(f"'{name}'" for name in suggestions) + "?")
+        else:
+            values.setdefault(
+                "hint", f"\nregistered names are listed in jurisdiction-metadata/disease-tracking-metadata-{values.get('state')}.yaml"
+            )
+    elif rule_id == "mmwr_week":
+        week = mmwr_week_of(values["report_period_start"])
+        values.setdefault("hint", f"\nMMWR week {week.week} of {week.year} is {week.start} to {week.end}")
+    return RULE_MESSAGES[rule_id].format(**values)
+
+
+def check_disease_subtype(disease_name, disease_subtype) -> str | None:
+    rule = SUBTYPE_RULES.get(disease_name)
+    if rule is not None and disease_subtype not in rule[0]:
+        return rule[1]
+    return None
+
+
+def check_confirmation_status(disease_name, confirmation_status) -> str | None:
+    rule = CONFIRMATION_STATUS_RULES.get(disease_name)
+    if rule is not None and confirmation_status not in rule[0]:
+        return rule[1]
+    return None
+
+
+def check_geo_name(state, geo_unit, geo_name) -> str | None:
+    _, geo_units, geo_names = GEO_NAME_TABLE.codes
+    rule_id = GEO_NAME_TABLE.violations.get((-1, geo_units.get(geo_unit, -1), geo_names.get(geo_name, -1), geo_name == state))
+    if rule_id is not None or geo_name == "international resident" or geo_unit not in REGISTRY_GEO_UNITS:
+        return rule_id
+
+    # sub-state names are checked against the geography registry rather than a rule table.
+    return None if geography.contains(state, geo_name) else "sub_state_geo_name"
+
+
+def check_reporting_jurisdiction(state, geo_name, reporting_jurisdiction) -> str | None:
+    _, geo_names, _ = REPORTING_JURISDICTION_TABLE.codes
+    return REPORTING_JURISDICTION_TABLE.violations.get((
+        -1, geo_names.get(geo_name, -1), -1, reporting_jurisdiction == state, reporting_jurisdiction == geo_name
+    ))
+
+
+def check_breakdown(disease_name, geo_unit, age_group, disease_subtype) -> str | None:
+    disease_names, geo_units, age_groups, disease_subtypes = BREAKDOWN_TABLE.codes
+    return BREAKDOWN_TABLE.violations.get((
+        disease_names.get(disease_name, -1), geo_units.get(geo_unit, -1),
+        age_groups.get(age_group, -1), disease_subtypes.get(disease_subtype, -1)
+    ))
+
+
+def check_minimum(field_name, value) -> str | None:
+    minimum, rule_id = EXCLUSIVE_MINIMUMS[field_name]
+    return None if value > minimum else rule_id
+
+
+def check_report_period(time_unit, report_period_start, report_period_end) -> str | None:
+    if report_period_end <= report_period_start:
+        return "report_period_order"
+    if time_unit == "week" and not is_valid_mmwr_week(report_period_start, report_period_end):
+        return "mmwr_week"
+    return None
+
+
+def check_row(
+    disease_name, disease_subtype, state, geo_unit, geo_name, reporting_jurisdiction,
+    age_group, confirmation_status, count=1, **_
+) -> str | None:
+    """
+    return the id of the first cross-field rule violated by a row whose enum fields are
+    already valid, in the order DiseaseReport runs its validators, or None if the row
+    passes every rule. extra keyword arguments (e.g. the remaining columns of a row
+    dict) are ignored so check_row(**row) works. the report period rules depend on the
+    dates rather than these columns and are checked by check_report_period.
+    """
+    return (
+        check_disease_subtype(disease_name, disease_subtype)
+        or check_geo_name(state, geo_unit, geo_name)
+        or check_confirmation_status(disease_name, confirmation_status)
+        or check_minimum("count", count)
+        or check_reporting_jurisdiction(state, geo_name, reporting_jurisdiction)
+        or check_breakdown(disease_name, geo_unit, age_group, disease_subtype)
+    )
+
+
+class CountMismatch(NamedTuple):
+    """
+    one row of the count-totals reconciliation table: the sums of a
+    (report_period_start, report_period_end, disease_name, outcome) group that do not agree.
+    """
+    report_period_start: date
+    report_period_end: date
+    disease_name: str
+    outcome: str
+    state_sum: int
+    age_breakdown_sum: int
+    subtype_breakdown_sum: int
+    substate_sum: int
+
+    @property
+    def state_diff(self) -> int:
+        """state-level sum minus sub-state sum (measles/pertussis)."""
+        return self.state_sum - self.substate_sum
+
+    @property
+    def age_breakdown_diff(self) -> int:
+        """state-level age breakdown sum minus sub-state sum (meningococcus)."""
+        return self.age_breakdown_sum - self.substate_sum
+
+    @property
+    def subtype_breakdown_diff(self) -> int:
+        """state-level disease subtype breakdown sum minus sub-state sum (meningococcus)."""
+        return self.subtype_breakdown_sum - self.substate_sum
+
+    def as_dict(self) -> dict:
+        return {
+            **self._asdict(),
+            "state_diff": self.state_diff,
+            "age_breakdown_diff": self.age_breakdown_diff,
+            "subtype_breakdown_diff": self.subtype_breakdown_diff,
+        }
+
+    def message(self) -> str:
+        period_str = f"{self.report_period_start} to {self.report_period_end}"
+        if self.disease_name == "meningococcus":
+            return (
+                f"count mismatch for [{period_str} | {self.disease_name} | {self.outcome}]:"
+                f"\nstate-level age breakdown sum = {self.age_breakdown_sum}"
+                f"\nstate-level disease subtype breakdown sum = {self.subtype_breakdown_sum}"
+                f"\nsub-state sum = {self.substate_sum}"
+            )
+
+        return (
+            f"count mismatch for [{period_str} | {self.disease_name} | {self.outcome}]:"
+            f"\nstate-level sum ({self.state_sum}) != sub-state sum ({self.substate_sum})"
+        )
+
+
+class CountTotalsError(RuleViolation):
+    """
+    raised by DiseaseReportDataset.validate_count_totals; carries the structured mismatch
+    table. the message is only built when the error is printed, from the first `limit`
+    mismatches (all of them if limit is None).
+    """
+
+    def __init__(self, mismatches: list[CountMismatch], limit: int | None = None):
+        self.rule_id = "count_totals"
+        self.mismatches = mismatches
+        self.limit = limit
+        ValueError.__init__(self, mismatches, limit)
+
+    def __str__(self) -> str:
+        shown = self.mismatches if self.limit is None else self.mismatches[:self.limit]
+        lines = "".join(f"\n - {m.message()}" for m in shown)
+        if len(shown) < len(self.mismatches):
+            lines += f"\n ... and {len(self.mismatches) - len(shown)} more"
+        return rule_message("count_totals", mismatches = lines)
+
+
+class CountTotals:
+    """
+    single-pass count-totals reconciliation.
+
+    for each (report_period_start, report_period_end, disease_name, outcome) group, keeps
+    four integer accumulators: state-level sum, state-level age breakdown sum
+    (disease_subtype == 'total'), state-level disease subtype breakdown sum
+    (age_group == 'total') and sub-state sum. rows can be added one at a time, from
+    DiseaseReport objects or from typed columns, across any number of chunks.
+    international resident rows are excluded from all sums.
+    """
+    __slots__ = ("groups",)
+
+    def __init__(self):
+        self.groups: dict[tuple, list[int]] = {}
+
+    def add(self, report_period_start, report_period_end, disease_name, outcome, geo_unit, geo_name, age_group, disease_subtype, count):
+        if geo_name == "international resident":
+            return
+        key = (report_period_start, report_period_end, disease_name, outcome)
+        sums = self.groups.get(key)
+        if sums is None:
+            sums = self.groups[key] = [0, 0, 0, 0]
+        if geo_unit == "state":
+            sums[0] += count
+            if disease_subtype == "total":
+                sums[1] += count
+            if age_group == "total":
+                sums[2] += count
+        else:
+            sums[3] += count
+
+    def add_reports(self, reports) -> None:
+        add = self.add
+        for r in reports:
+            add(r.report_period_start, r.report_period_end, r.disease_name, r.outcome,
+                r.geo_unit, r.geo_name, r.age_group, r.disease_subtype, r.count)
+
+    def add_columns(self, columns: dict[str, list]) -> None:
+        add = self.add
+        for values in zip(
+            columns["report_period_start"], columns["report_period_end"], columns["disease_name"], columns["outcome"],
+            columns["geo_unit"], columns["geo_name"], columns["age_group"], columns["disease_subtype"], columns["count"],
+        ):
+            add(*values)
+
+    def mismatches(self, keys = None) -> list[CountMismatch]:
+        """
+        reconcile the groups (all of them, or only keys) and return the ones whose sums disagree:
+
+        measles/pertussis:
+            - sum of state-level rows (age breakdown) == sum of sub-state rows
+
+        meningococcus:
+            -    sum of state-level age breakdown rows (disease_subtype == 'total')
+              == sum of state-level disease subtype breakdown rows (age_group == 'total')
+              == sum of sub-state rows
+        """
+        groups = self.groups
+        mismatches = []
+        for key in (groups if keys is None else keys):
+            sums = groups.get(key)
+            if sums is None:
+                continue
+            state_sum, age_breakdown_sum, subtype_breakdown_sum, substate_sum = sums
+            disease_name = key[2]
+            if disease_name in ("measles", "pertussis"):
+                ok = state_sum == substate_sum
+            elif disease_name == "meningococcus":
+                ok = age_breakdown_sum == subtype_breakdown_sum == substate_sum
+            else:
+                ok = True
+            if not ok:
+                mismatches.append(CountMismatch(*key, *sums))
+
+        return mismatches
+
+    def check(self, keys = None, limit = None) -> None:
+        """raise CountTotalsError if any group does not reconcile; its message lists the first `limit` mismatches."""
+        mismatches = self.mismatches(keys)
+        if mismatches:
+            raise CountTotalsError(mismatches, limit)
+
+
+_MODELS = ("DiseaseReport", "DiseaseReportDataset")
+_models_lock = threading.Lock()
+
+
+def _build_models():
+    """
+    define DiseaseReport and DiseaseReportDataset. importing pydantic and building the
+    models is most of the cost of importing this module, so it is deferred until one of
+    them is first used (see __getattr__); the vocabularies, rule tables, check_* functions
+    and CountTotals above work without them.
+    """
+    from pydantic import BaseModel, Field, RootModel, ValidationInfo, field_validator, model_validator
+
+    class DiseaseReport(BaseModel):
+        disease_name: Literal[DISEASE_NAMES] = Field(description = FIELD_DESCRIPTIONS["disease_name"])
+        report_period_start: date = Field(description = FIELD_DESCRIPTIONS["report_period_start"])
+        report_period_end: date = Field(description = FIELD_DESCRIPTIONS["report_period_end"])
+        date_type: Literal[DATE_TYPES] = Field(description = FIELD_DESCRIPTIONS["date_type"])
+        time_unit: Literal[TIME_UNITS] = Field(description = FIELD_DESCRIPTIONS["time_unit"])
+        disease_subtype: str = Field(description = FIELD_DESCRIPTIONS["disease_subtype"])
+        reporting_jurisdiction: str = Field(description = FIELD_DESCRIPTIONS["reporting_jurisdiction"])
+        state: Literal[STATES] = Field(description = FIELD_DESCRIPTIONS["state"])
+        geo_unit: Literal[GEO_UNITS] = Field(description = FIELD_DESCRIPTIONS["geo_unit"])
+        geo_name: str = Field(description = FIELD_DESCRIPTIONS["geo_name"])
+        age_group: Literal[AGE_GROUPS] = Field(description = FIELD_DESCRIPTIONS["age_group"])
+        confirmation_status: Literal[CONFIRMATION_STATUSES] = Field(description = FIELD_DESCRIPTIONS["confirmation_status"])
+        outcome: Literal[OUTCOMES] = Field(description = FIELD_DESCRIPTIONS["outcome"])
+        count: int = Field(description = FIELD_DESCRIPTIONS["count"])
+
+        class Config:
+            """
+            forbid extra data columns
+            """
+            extra = "forbid"
+
+        @field_validator('count')
+        @classmethod
+        def count_must_be_non_negative(cls, v):
+            rule_id = check_minimum("count", v)
+            if rule_id is not None:
+                raise RuleViolation(rule_id, rule_message(rule_id))
+            return v
+
+        @field_validator('disease_subtype')
+        @classmethod
+        def validate_disease_subtype(cls, v, info: ValidationInfo):
+            """
+            validate disease_subtype based on disease_name (see SUBTYPE_RULES).
+            """
+            disease_name = info.data.get('disease_name')
+
+            rule_id = check_disease_subtype(disease_name, v)
+            if rule_id is not None:
+                raise RuleViolation(rule_id, rule_message(rule_id, disease_name = disease_name, disease_subtype = v))
+
+            return v
+
+        @model_validator(mode = 'after')
+        def validate_reporting_jurisdiction(self):
+            """
+            validate reporting_jurisdiction to match either the state or the geo_name column. for 'international resident' rows, reporting_jurisdiction must
+            match the state only.
+            """
+            rule_id = check_reporting_jurisdiction(self.state, self.geo_name, self.reporting_jurisdiction)
+            if rule_id is not None:
+                raise RuleViolation(rule_id, rule_message(
+                    rule_id, state = self.state, geo_name = self.geo_name, reporting_jurisdiction = self.reporting_jurisdiction
+                ))
+
+            return self
+
+        @model_validator(mode = 'after')
+        def validate_breakdown_rules(self):
+            """
+            enforces age_group and disease_subtype breakdown rules based on geo_unit and disease_name
+            (see BREAKDOWN_RULES).
+            """
+            rule_id = check_breakdown(self.disease_name, self.geo_unit, self.age_group, self.disease_subtype)
+            if rule_id is not None:
+                raise RuleViolation(rule_id, rule_message(
+                    rule_id, disease_name = self.disease_name, geo_unit = self.geo_unit,
+                    age_group = self.age_group, disease_subtype = self.disease_subtype
+                ))
+
+            return self
+
+        @model_validator(mode = 'after')
+        def validate_report_period(self):
+            """
+            report_period_end must be after report_period_start, and weekly periods must be
+            exactly one MMWR week (sunday to saturday, see mmwr_calendar).
+            """
+            rule_id = check_report_period(self.time_unit, self.report_period_start, self.report_period_end)
+            if rule_id is not None:
+                raise RuleViolation(rule_id, rule_message(
+                    rule_id, report_period_start = self.report_period_start, report_period_end = self.report_period_end
+                ))
+
+            return self
+
+        @field_validator('geo_name')
+        @classmethod
+        def validate_geo_name(cls, v, info: ValidationInfo):
+            """
+            validate geo_name for sub-state jurisdictions of the states that are participating in the USDT project.
+            """
+            state = info.data.get('state')
+            geo_unit = info.data.get('geo_unit')
+
+            rule_id = check_geo_name(state, geo_unit, v)
+            if rule_id is not None:
+                raise RuleViolation(rule_id, rule_message(rule_id, state = state, geo_unit = geo_unit, geo_name = v))
+
+            return v
+
+        @field_validator('confirmation_status')
+        @classmethod
+        def validate_confirmation_status(cls, v, info: ValidationInfo):
+            """
+            validate confirmation_status based on disease_name:
+                - measles: 'confirmed' only
+                - pertussis, meningococcus: 'confirmed and probable' only
+            """
+            disease_name = info.data.get('disease_name')
+
+            rule_id = check_confirmation_status(disease_name, v)
+            if rule_id is not None:
+                raise RuleViolation(rule_id, rule_message(rule_id, disease_name = disease_name, confirmation_status = v))
+
+            return v
+
+
+    class DiseaseReportDataset(RootModel[List[DiseaseReport]]):
+        @model_validator(mode = 'after')
+        def validate_single_state(self):
+            """
+            check that the submitted file only contains data for a single state.
+            """
+            states = {row.state for row in self.root}
+            if len(states) > 1:
+                raise RuleViolation("single_state", rule_message("single_state", states = sorted(states)))
+
+            return self
+
+        @model_validator(mode = 'after')
+        def validate_count_totals(self):
+            """
+            for each (report_period_start, report_period_end, disease_name, outcome) grouping,
+            verify that counts match across levels:
+
+            measles/pertussis:
+                - sum of state-level rows (age breakdown) == sum of sub-state rows
+
+            meningococcus:
+                -    sum of state-level age breakdown rows (disease_subtype == 'total')
+                  == sum of state-level disease subtype breakdown rows (age_group == 'total')
+                  == sum of sub-state rows
+
+            international resident rows (geo_unit == 'NA') are excluded from all sums.
+            """
+            count_totals = CountTotals()
+            count_totals.add_reports(self.root)
+            count_totals.check()
+
+            return self
+
+
+    # the columnar engines, the header checks and the generated schema all go by FIELD_NAMES.
+    assert tuple(DiseaseReport.model_fields) == FIELD_NAMES, (
+        f"FIELD_NAMES {FIELD_NAMES} do not match the DiseaseReport fields {tuple(DiseaseReport.model_fields)}"
+    )
+
+    for model in (DiseaseReport, DiseaseReportDataset):
+        # picklable and printed as module-level classes.
+        model.__qualname__ = model.__name__
+
+    return DiseaseReport, DiseaseReportDataset
+
+
+def __getattr__(name):
+    """build the models on first access (PEP 562), e.g. `from data_reporting_schema import DiseaseReport`."""
+    if name not in _MODELS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _models_lock:
+        if name not in globals():
+            globals().update(zip(_MODELS, _build_models()))
+    return globals()[name]
+
+
+def __dir__():
+    return sorted([*globals(), *_MODELS])
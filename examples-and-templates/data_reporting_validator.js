@@ -0,0 +1,1009 @@
+/*
+ * DiseaseReport row validator, compiled from data_reporting_schema.yaml by
+ * scripts/compile_schema_validator.py (schema sha256 62546d0e5257).
+ *
+ * Generated file: edit scripts/schema_validator_template.js or the schema
+ * (data_reporting_schema.py) and run scripts/update_data_standards.py.
+ *
+ * The schema's enums are precompiled into Sets and its if/then conditionals
+ * into straight-line tests grouped by condition, so a row is validated with a
+ * few Set lookups and no schema interpretation. CSV cells are coerced the way
+ * DiseaseReport coerces them (see parseInteger and parseDate), and errors are
+ * named like the Python error reports: the x-rule id of the violated rule, or
+ * the pydantic error type for a type, enum, required or extra field error.
+ * The report period rules, which the schema cannot express, are a port of
+ * check_report_period and the MMWR calendar (see checkReportPeriod).
+ *
+ * Runs in node (require() it, or `node data_reporting_validator.js FILE.csv`)
+ * and in the browser, where it defines the DataReportingValidator global; in a
+ * Web Worker, serveWorker() validates dropped files off the page's thread.
+ */
+(function (root, factory) {
+    if (typeof module === 'object' && module.exports) {
+        module.exports = factory();
+        if (typeof require === 'function' && require.main === module) {
+            module.exports.main(process.argv.slice(2));
+        }
+    } else {
+        root.DataReportingValidator = factory();
+    }
+}(typeof self !== 'undefined' ? self : this, function () {
+    'use strict';
+
+    // error messages of the pydantic error types the compiled checks report.
+    const TYPE_MESSAGES = {
+        missing: 'Field required',
+        extra_forbidden: 'Extra inputs are not permitted',
+        string_type: 'Input should be a valid string',
+        literal_error: 'Input should be {expected}',
+        int_parsing: 'Input should be a valid integer, unable to parse string as an integer',
+        date_from_datetime_parsing: 'Input should be a valid date in the format YYYY-MM-DD'
+    };
+
+    // separator of the values of a row in the tuple sets of multi-field conditionals.
+    const SEP = '\u001f';
+
+    const SCHEMA_SHA256 = "62546d0e52573193540e147adfdc26b165dd2e427e0a469d3c58cdab37a95dae";
+    // the schema properties: a row's values are read in this order (see checkRow).
+    const FIELDS = ["disease_name", "report_period_start", "report_period_end", "date_type", "time_unit", "disease_subtype", "reporting_jurisdiction", "state", "geo_unit", "geo_name", "age_group", "confirmation_status", "outcome", "count"];
+    const ADDITIONAL_PROPERTIES = false;
+    // x-rules: the message of each rule, with {field} placeholders.
+    const RULE_MESSAGES = {
+        "count_positive": "count must be > 0",
+        "meningococcus_subtype": "for meningococcus, disease_subtype must be one of: A, B, C, W, X, Y, Z, unknown, unspecified, total. got: {disease_subtype}",
+        "subtype_total_only": "for {disease_name}, disease_subtype must be 'total'. got: {disease_subtype}",
+        "measles_confirmed": "for measles, confirmation_status must be 'confirmed'.\ngot: '{confirmation_status}'",
+        "confirmed_and_probable": "for {disease_name}, confirmation_status must be 'confirmed and probable'.\ngot: '{confirmation_status}'",
+        "international_resident_geo_unit": "when geo_name is 'international resident', geo_unit must be 'NA'.\ngot geo_name = '{geo_name}' but geo_unit = '{geo_unit}'",
+        "geo_unit_na": "geo_unit must not be 'NA', unless geo_name is 'international resident'.\ngot geo_unit = '{geo_unit}' but geo_name = '{geo_name}'",
+        "state_geo_name": "when geo_unit is 'state', geo_name must match state.\ngot geo_name = '{geo_name}' but state = '{state}'",
+        "sub_state_geo_name": "'{geo_name}' is not a recognized sub-state jurisdiction for {state}.{hint}",
+        "international_resident_reporting_jurisdiction": "for 'international resident' rows, reporting_jurisdiction must match the state.\ngot reporting_jurisdiction = '{reporting_jurisdiction}' but state = '{state}'",
+        "reporting_jurisdiction": "reporting_jurisdiction must match either state or geo_name.\ngot reporting_jurisdiction = '{reporting_jurisdiction}', state = '{state}', geo_name = '{geo_name}'",
+        "sub_state_age_group_total": "at sub-state level, age_group must be 'total'.\ngot geo_unit = '{geo_unit}' and age_group = '{age_group}'",
+        "sub_state_subtype_total": "at sub-state level, disease_subtype must be 'total'.\ngot geo_unit = '{geo_unit}' and disease_subtype = '{disease_subtype}'",
+        "state_age_group_not_total": "at state level, age_group must not be 'total' for {disease_name}.\ngot age_group = '{age_group}'",
+        "meningococcus_both_total": "for meningococcus at state level, age_group and disease_subtype cannot both be 'total'.\nuse age_group = 'total' for subtype breakdowns, or disease_subtype = 'total' for age breakdowns.",
+        "meningococcus_neither_total": "for meningococcus at state level, exactly one of age_group or disease_subtype must be 'total'.\ngot age_group = '{age_group}' and disease_subtype = '{disease_subtype}'",
+        "report_period_order": "report_period_end must be after report_period_start.\ngot report_period_start = '{report_period_start}' and report_period_end = '{report_period_end}'",
+        "mmwr_week": "when time_unit is 'week', report_period_start and report_period_end must be the sunday and saturday of one MMWR week.\ngot report_period_start = '{report_period_start}' and report_period_end = '{report_period_end}'{hint}",
+        "header": "the header must list every DiseaseReport column exactly once, in any order.{details}",
+        "single_state": "dataset must contain data for a single state only.\nfound multiple states: {states}",
+        "count_totals": "count mismatch(es) found:{mismatches}"
+    };
+    // the allowed values of each enum field, as literal_error messages list them.
+    const EXPECTED = {
+        "disease_name": "'measles', 'pertussis' or 'meningococcus'",
+        "date_type": "'cccd' or 'jurisdiction date hierarchy'",
+        "time_unit": "'week'",
+        "state": "'AL', 'AK', 'AZ', 'AR', 'AS', 'CA', 'CO', 'CT', 'DE', 'DC', 'FL', 'GA', 'GU', 'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM', 'NY', 'NC', 'ND', 'MP', 'OH', 'OK', 'OR', 'PA', 'PR', 'RI', 'SC', 'SD', 'TN', 'TX', 'TT', 'UT', 'VT', 'VA', 'VI', 'WA', 'WV', 'WI' or 'WY'",
+        "geo_unit": "'county', 'state', 'region', 'planning area', 'hsa' or 'NA'",
+        "age_group": "'<1 y', '1-4 y', '5-11 y', '12-18 y', '19-22 y', '23-44 y', '45-64 y', '>=65 y', 'total', 'unknown' or 'unspecified'",
+        "confirmation_status": "'confirmed' or 'confirmed and probable'",
+        "outcome": "'cases', 'hospitalizations' or 'deaths'"
+    };
+
+    // precompiled value sets, one per distinct list of values.
+    const V0 = new Set(["measles", "pertussis", "meningococcus"]);
+    const V1 = new Set(["cccd", "jurisdiction date hierarchy"]);
+    const V2 = new Set(["week"]);
+    const V3 = new Set(["AL", "AK", "AZ", "AR", "AS", "CA", "CO", "CT", "DE", "DC", "FL", "GA", "GU", "HI", "ID", "IL", "IN", "IA", "KS", "KY", "LA", "ME", "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ", "NM", "NY", "NC", "ND", "MP", "OH", "OK", "OR", "PA", "PR", "RI", "SC", "SD", "TN", "TX", "TT", "UT", "VT", "VA", "VI", "WA", "WV", "WI", "WY"]);
+    const V4 = new Set(["county", "state", "region", "planning area", "hsa", "NA"]);
+    const V5 = new Set(["<1 y", "1-4 y", "5-11 y", "12-18 y", "19-22 y", "23-44 y", "45-64 y", ">=65 y", "total", "unknown", "unspecified"]);
+    const V6 = new Set(["confirmed", "confirmed and probable"]);
+    const V7 = new Set(["cases", "hospitalizations", "deaths"]);
+    const V8 = new Set(["A", "B", "C", "W", "X", "Y", "Z", "unknown", "unspecified", "total"]);
+    const V9 = new Set(["measles", "pertussis"]);
+    // international_resident_reporting_jurisdiction: the allowed combinations, joined with SEP, and as branches.
+    const T0 = new Set(["AL\u001fAL", "AK\u001fAK", "AZ\u001fAZ", "AR\u001fAR", "AS\u001fAS", "CA\u001fCA", "CO\u001fCO", "CT\u001fCT", "DE\u001fDE", "DC\u001fDC", "FL\u001fFL", "GA\u001fGA", "GU\u001fGU", "HI\u001fHI", "ID\u001fID", "IL\u001fIL", "IN\u001fIN", "IA\u001fIA", "KS\u001fKS", "KY\u001fKY", "LA\u001fLA", "ME\u001fME", "MD\u001fMD", "MA\u001fMA", "MI\u001fMI", "MN\u001fMN", "MS\u001fMS", "MO\u001fMO", "MT\u001fMT", "NE\u001fNE", "NV\u001fNV", "NH\u001fNH", "NJ\u001fNJ", "NM\u001fNM", "NY\u001fNY", "NC\u001fNC", "ND\u001fND", "MP\u001fMP", "OH\u001fOH", "OK\u001fOK", "OR\u001fOR", "PA\u001fPA", "PR\u001fPR", "RI\u001fRI", "SC\u001fSC", "SD\u001fSD", "TN\u001fTN", "TX\u001fTX", "TT\u001fTT", "UT\u001fUT", "VT\u001fVT", "VA\u001fVA", "VI\u001fVI", "WA\u001fWA", "WV\u001fWV", "WI\u001fWI", "WY\u001fWY"]);
+    const B0 = [["AL", "AL"], ["AK", "AK"], ["AZ", "AZ"], ["AR", "AR"], ["AS", "AS"], ["CA", "CA"], ["CO", "CO"], ["CT", "CT"], ["DE", "DE"], ["DC", "DC"], ["FL", "FL"], ["GA", "GA"], ["GU", "GU"], ["HI", "HI"], ["ID", "ID"], ["IL", "IL"], ["IN", "IN"], ["IA", "IA"], ["KS", "KS"], ["KY", "KY"], ["LA", "LA"], ["ME", "ME"], ["MD", "MD"], ["MA", "MA"], ["MI", "MI"], ["MN", "MN"], ["MS", "MS"], ["MO", "MO"], ["MT", "MT"], ["NE", "NE"], ["NV", "NV"], ["NH", "NH"], ["NJ", "NJ"], ["NM", "NM"], ["NY", "NY"], ["NC", "NC"], ["ND", "ND"], ["MP", "MP"], ["OH", "OH"], ["OK", "OK"], ["OR", "OR"], ["PA", "PA"], ["PR", "PR"], ["RI", "RI"], ["SC", "SC"], ["SD", "SD"], ["TN", "TN"], ["TX", "TX"], ["TT", "TT"], ["UT", "UT"], ["VT", "VT"], ["VA", "VA"], ["VI", "VI"], ["WA", "WA"], ["WV", "WV"], ["WI", "WI"], ["WY", "WY"]];
+    // state_geo_name: the allowed combinations, joined with SEP, and as branches.
+    const T1 = new Set(["AL\u001fAL", "AK\u001fAK", "AZ\u001fAZ", "AR\u001fAR", "AS\u001fAS", "CA\u001fCA", "CO\u001fCO", "CT\u001fCT", "DE\u001fDE", "DC\u001fDC", "FL\u001fFL", "GA\u001fGA", "GU\u001fGU", "HI\u001fHI", "ID\u001fID", "IL\u001fIL", "IN\u001fIN", "IA\u001fIA", "KS\u001fKS", "KY\u001fKY", "LA\u001fLA", "ME\u001fME", "MD\u001fMD", "MA\u001fMA", "MI\u001fMI", "MN\u001fMN", "MS\u001fMS", "MO\u001fMO", "MT\u001fMT", "NE\u001fNE", "NV\u001fNV", "NH\u001fNH", "NJ\u001fNJ", "NM\u001fNM", "NY\u001fNY", "NC\u001fNC", "ND\u001fND", "MP\u001fMP", "OH\u001fOH", "OK\u001fOK", "OR\u001fOR", "PA\u001fPA", "PR\u001fPR", "RI\u001fRI", "SC\u001fSC", "SD\u001fSD", "TN\u001fTN", "TX\u001fTX", "TT\u001fTT", "UT\u001fUT", "VT\u001fVT", "VA\u001fVA", "VI\u001fVI", "WA\u001fWA", "WV\u001fWV", "WI\u001fWI", "WY\u001fWY"]);
+    const B1 = [["AL", "AL"], ["AK", "AK"], ["AZ", "AZ"], ["AR", "AR"], ["AS", "AS"], ["CA", "CA"], ["CO", "CO"], ["CT", "CT"], ["DE", "DE"], ["DC", "DC"], ["FL", "FL"], ["GA", "GA"], ["GU", "GU"], ["HI", "HI"], ["ID", "ID"], ["IL", "IL"], ["IN", "IN"], ["IA", "IA"], ["KS", "KS"], ["KY", "KY"], ["LA", "LA"], ["ME", "ME"], ["MD", "MD"], ["MA", "MA"], ["MI", "MI"], ["MN", "MN"], ["MS", "MS"], ["MO", "MO"], ["MT", "MT"], ["NE", "NE"], ["NV", "NV"], ["NH", "NH"], ["NJ", "NJ"], ["NM", "NM"], ["NY", "NY"], ["NC", "NC"], ["ND", "ND"], ["MP", "MP"], ["OH", "OH"], ["OK", "OK"], ["OR", "OR"], ["PA", "PA"], ["PR", "PR"], ["RI", "RI"], ["SC", "SC"], ["SD", "SD"], ["TN", "TN"], ["TX", "TX"], ["TT", "TT"], ["UT", "UT"], ["VT", "VT"], ["VA", "VA"], ["VI", "VI"], ["WA", "WA"], ["WV", "WV"], ["WI", "WI"], ["WY", "WY"]];
+    const V10 = new Set(["pertussis", "meningococcus"]);
+    const V11 = new Set(["county", "region", "planning area", "hsa", "NA"]);
+    const V12 = new Set(["<1 y", "1-4 y", "5-11 y", "12-18 y", "19-22 y", "23-44 y", "45-64 y", ">=65 y", "unknown", "unspecified"]);
+    const V13 = new Set(["A", "B", "C", "W", "X", "Y", "Z", "unknown", "unspecified"]);
+    const V14 = new Set(["Public Health District 1", "Public Health District 2", "Public Health District 3", "Public Health District 4", "Public Health District 5", "Public Health District 6", "Public Health District 7", "unspecified", "international resident"]);
+    const V15 = new Set(["county", "region", "planning area", "hsa"]);
+    const V16 = new Set(["Berkshire", "Bristol", "Essex", "Franklin", "Hampden", "Hampshire", "Middlesex", "Norfolk", "Plymouth", "Suffolk", "Worcester", "Dukes/Nantucket/Barnstable", "unspecified", "international resident"]);
+    const V17 = new Set(["1", "2 North", "2 South", "3", "5", "6", "7", "8", "unspecified", "international resident"]);
+    const V18 = new Set(["Aitkin County", "Anoka County", "Becker County", "Beltrami County", "Benton County", "Big Stone County", "Blue Earth County", "Brown County", "Carlton County", "Carver County", "Cass County", "Chippewa County", "Chisago County", "Clay County", "Clearwater County", "Cook County", "Cottonwood County", "Crow Wing County", "Dakota County", "Dodge County", "Douglas County", "Faribault County", "Fillmore County", "Freeborn County", "Goodhue County", "Grant County", "Hennepin County", "Houston County", "Hubbard County", "Isanti County", "Itasca County", "Jackson County", "Kanabec County", "Kandiyohi County", "Kittson County", "Koochiching County", "Lake County", "Lake of the Woods County", "Lac qui Parle County", "Le Sueur County", "Lincoln County", "Lyon County", "Mahnomen County", "Marshall County", "Martin County", "McLeod County", "Meeker County", "Mille Lacs County", "Morrison County", "Mower County", "Murray County", "Nicollet County", "Nobles County", "Norman County", "Olmsted County", "Otter Tail County", "Pennington County", "Pine County", "Pipestone County", "Polk County", "Pope County", "Ramsey County", "Red Lake County", "Redwood County", "Renville County", "Rice County", "Rock County", "Roseau County", "Scott County", "Sherburne County", "Sibley County", "St. Louis County", "Stearns County", "Steele County", "Stevens County", "Swift County", "Todd County", "Traverse County", "Wabasha County", "Wadena County", "Waseca County", "Washington County", "Watonwan County", "Wilkin County", "Winona County", "Wright County", "Yellow Medicine County", "unspecified", "international resident"]);
+
+    /**
+     * Append the errors of one row to errors. row is an array of cells and c the column
+     * of each schema property in it, in FIELDS order (-1 or beyond the row: absent).
+     */
+    function checkRow(row, c, errors, line) {
+        const disease_name = row[c[0]];
+        const report_period_start = row[c[1]];
+        const report_period_end = row[c[2]];
+        const date_type = row[c[3]];
+        const time_unit = row[c[4]];
+        const disease_subtype = row[c[5]];
+        const reporting_jurisdiction = row[c[6]];
+        const state = row[c[7]];
+        const geo_unit = row[c[8]];
+        const geo_name = row[c[9]];
+        const age_group = row[c[10]];
+        const confirmation_status = row[c[11]];
+        const outcome = row[c[12]];
+        const count = row[c[13]];
+
+        // properties: type, enum, format and bounds.
+        if (disease_name === undefined) fail(errors, line, "missing", "disease_name", disease_name);
+        else if (!V0.has(disease_name)) fail(errors, line, "literal_error", "disease_name", disease_name);
+        if (report_period_start === undefined) fail(errors, line, "missing", "report_period_start", report_period_start);
+        else if (parseDate(report_period_start) === null) fail(errors, line, "date_from_datetime_parsing", "report_period_start", report_period_start);
+        if (report_period_end === undefined) fail(errors, line, "missing", "report_period_end", report_period_end);
+        else if (parseDate(report_period_end) === null) fail(errors, line, "date_from_datetime_parsing", "report_period_end", report_period_end);
+        if (date_type === undefined) fail(errors, line, "missing", "date_type", date_type);
+        else if (!V1.has(date_type)) fail(errors, line, "literal_error", "date_type", date_type);
+        if (time_unit === undefined) fail(errors, line, "missing", "time_unit", time_unit);
+        else if (!V2.has(time_unit)) fail(errors, line, "literal_error", "time_unit", time_unit);
+        if (disease_subtype === undefined) fail(errors, line, "missing", "disease_subtype", disease_subtype);
+        else if (typeof disease_subtype !== 'string') fail(errors, line, "string_type", "disease_subtype", disease_subtype);
+        if (reporting_jurisdiction === undefined) fail(errors, line, "missing", "reporting_jurisdiction", reporting_jurisdiction);
+        else if (typeof reporting_jurisdiction !== 'string') fail(errors, line, "string_type", "reporting_jurisdiction", reporting_jurisdiction);
+        if (state === undefined) fail(errors, line, "missing", "state", state);
+        else if (!V3.has(state)) fail(errors, line, "literal_error", "state", state);
+        if (geo_unit === undefined) fail(errors, line, "missing", "geo_unit", geo_unit);
+        else if (!V4.has(geo_unit)) fail(errors, line, "literal_error", "geo_unit", geo_unit);
+        if (geo_name === undefined) fail(errors, line, "missing", "geo_name", geo_name);
+        else if (typeof geo_name !== 'string') fail(errors, line, "string_type", "geo_name", geo_name);
+        if (age_group === undefined) fail(errors, line, "missing", "age_group", age_group);
+        else if (!V5.has(age_group)) fail(errors, line, "literal_error", "age_group", age_group);
+        if (confirmation_status === undefined) fail(errors, line, "missing", "confirmation_status", confirmation_status);
+        else if (!V6.has(confirmation_status)) fail(errors, line, "literal_error", "confirmation_status", confirmation_status);
+        if (outcome === undefined) fail(errors, line, "missing", "outcome", outcome);
+        else if (!V7.has(outcome)) fail(errors, line, "literal_error", "outcome", outcome);
+        if (count === undefined) fail(errors, line, "missing", "count", count);
+        else {
+            const count_number = parseInteger(count);
+            if (count_number === null) fail(errors, line, "int_parsing", "count", count);
+            else if (!(count_number > 0)) fail(errors, line, "count_positive", "count", count);
+        }
+
+        // conditionals (allOf), grouped by condition.
+        if (disease_name === undefined || disease_name === "meningococcus") {
+            if (!(disease_subtype === undefined || V8.has(disease_subtype))) fail(errors, line, "meningococcus_subtype", "disease_subtype", disease_subtype);
+        }
+        if (disease_name === undefined || V9.has(disease_name)) {
+            if (!(disease_subtype === undefined || disease_subtype === "total")) fail(errors, line, "subtype_total_only", "disease_subtype", disease_subtype);
+        }
+        if (geo_name === undefined || geo_name === "international resident") {
+            if (!(geo_unit === undefined || geo_unit === "NA")) fail(errors, line, "international_resident_geo_unit", "geo_unit", geo_unit);
+            if (!(typeof state === 'string' && typeof reporting_jurisdiction === 'string' ? T0.has(state + SEP + reporting_jurisdiction) : matchesBranch(B0, [state, reporting_jurisdiction]))) fail(errors, line, "international_resident_reporting_jurisdiction", "state, reporting_jurisdiction", [state, reporting_jurisdiction].join(', '));
+        }
+        if (geo_unit === undefined || geo_unit === "NA") {
+            if (!(geo_name === undefined || geo_name === "international resident")) fail(errors, line, "geo_unit_na", "geo_name", geo_name);
+        }
+        if (geo_unit === undefined || geo_unit === "state") {
+            if (!(typeof state === 'string' && typeof geo_name === 'string' ? T1.has(state + SEP + geo_name) : matchesBranch(B1, [state, geo_name]))) fail(errors, line, "state_geo_name", "state, geo_name", [state, geo_name].join(', '));
+        }
+        if (disease_name === undefined || disease_name === "measles") {
+            if (!(confirmation_status === undefined || confirmation_status === "confirmed")) fail(errors, line, "measles_confirmed", "confirmation_status", confirmation_status);
+        }
+        if (disease_name === undefined || V10.has(disease_name)) {
+            if (!(confirmation_status === undefined || confirmation_status === "confirmed and probable")) fail(errors, line, "confirmed_and_probable", "confirmation_status", confirmation_status);
+        }
+        if (!(reporting_jurisdiction === undefined || state === undefined || reporting_jurisdiction === state || geo_name === undefined || reporting_jurisdiction === geo_name)) fail(errors, line, "reporting_jurisdiction", "reporting_jurisdiction", reporting_jurisdiction);
+        if (geo_unit === undefined || V11.has(geo_unit)) {
+            if (!(age_group === undefined || age_group === "total")) fail(errors, line, "sub_state_age_group_total", "age_group", age_group);
+            if (!(disease_subtype === undefined || disease_subtype === "total")) fail(errors, line, "sub_state_subtype_total", "disease_subtype", disease_subtype);
+        }
+        if ((geo_unit === undefined || geo_unit === "state") && (disease_name === undefined || V9.has(disease_name))) {
+            if (!(age_group === undefined || V12.has(age_group))) fail(errors, line, "state_age_group_not_total", "age_group", age_group);
+        }
+        if ((geo_unit === undefined || geo_unit === "state") && (disease_name === undefined || disease_name === "meningococcus") && (age_group === undefined || age_group === "total")) {
+            if (!(disease_subtype === undefined || V13.has(disease_subtype))) fail(errors, line, "meningococcus_both_total", "disease_subtype", disease_subtype);
+        }
+        if ((geo_unit === undefined || geo_unit === "state") && (disease_name === undefined || disease_name === "meningococcus") && (age_group === undefined || V12.has(age_group))) {
+            if (!(disease_subtype === undefined || disease_subtype === "total")) fail(errors, line, "meningococcus_neither_total", "disease_subtype", disease_subtype);
+        }
+        if ((state === undefined || state === "ID") && (geo_unit === undefined || V15.has(geo_unit))) {
+            if (!(geo_name === undefined || V14.has(geo_name))) fail(errors, line, "sub_state_geo_name", "geo_name", geo_name);
+        }
+        if ((state === undefined || state === "MA") && (geo_unit === undefined || V15.has(geo_unit))) {
+            if (!(geo_name === undefined || V16.has(geo_name))) fail(errors, line, "sub_state_geo_name", "geo_name", geo_name);
+        }
+        if ((state === undefined || state === "MI") && (geo_unit === undefined || V15.has(geo_unit))) {
+            if (!(geo_name === undefined || V17.has(geo_name))) fail(errors, line, "sub_state_geo_name", "geo_name", geo_name);
+        }
+        if ((state === undefined || state === "MN") && (geo_unit === undefined || V15.has(geo_unit))) {
+            if (!(geo_name === undefined || V18.has(geo_name))) fail(errors, line, "sub_state_geo_name", "geo_name", geo_name);
+        }
+    }
+
+    const FIELD_INDEX = {};
+    FIELDS.forEach(function (field, i) { FIELD_INDEX[field] = i; });
+    const IDENTITY = FIELDS.map(function (field, i) { return i; });
+
+    // ---- coercions: the CSV cell spellings DiseaseReport (pydantic, lax mode) accepts ----
+
+    // the characters pydantic strips around a number (Unicode White_Space).
+    const SPACE = '[\\t\\n\\u000b\\f\\r \\u0085\\u00a0\\u1680\\u2000-\\u200a\\u2028\\u2029\\u202f\\u205f\\u3000]*';
+    const INTEGER_PATTERN = new RegExp('^' + SPACE + '([+-]?)(\\d(?:_?\\d)*)(?:\\.0+)?' + SPACE + '$');
+    // YYYY-MM-DD, optionally followed by midnight as a datetime (any UTC offset).
+    const DATE_PATTERN = /^(\d{4})-(\d{2})-(\d{2})(?:[Tt _]00:00(?::00(?:[.,](?:0{6}\d*|0{1,5}))?)?(?:[Zz]|[+-](?:[01]\d|2[0-3]):?[0-5]\d)?)?$/;
+    // a Unix timestamp (seconds, or milliseconds above 2e10) at midnight UTC.
+    const TIMESTAMP_PATTERN = /^[+-]?\d+(?:\.\d*)?$/;
+    const DAY_SECONDS = 86400;
+    const DATE_CACHE_SIZE = 4096;
+    const dateCache = new Map();
+
+    /**
+     * The integer value of a cell (a number, or a string such as ' +5 ', '1_000' or '5.0'),
+     * or null if DiseaseReport would not parse it. Values beyond 2^53 lose precision.
+     */
+    function parseInteger(value) {
+        if (typeof value === 'number') {
+            return Number.isInteger(value) ? value : null;
+        }
+        if (typeof value !== 'string') {
+            return null;
+        }
+        const match = INTEGER_PATTERN.exec(value);
+        if (match === null) {
+            return null;
+        }
+        const magnitude = Number(match[2].replace(/_/g, ''));
+        return match[1] === '-' ? -magnitude : magnitude;
+    }
+
+    function isoDate(year, month, day) {
+        return String(year).padStart(4, '0') + '-' + String(month).padStart(2, '0') + '-' + String(day).padStart(2, '0');
+    }
+
+    function parseDateUncached(value) {
+        const match = DATE_PATTERN.exec(value);
+        if (match !== null) {
+            const year = +match[1], month = +match[2], day = +match[3];
+            const date = new Date(Date.UTC(2000, month - 1, day));
+            date.setUTCFullYear(year);
+            if (year < 1 || date.getUTCFullYear() !== year || date.getUTCMonth() !== month - 1 || date.getUTCDate() !== day) {
+                return null;
+            }
+            return isoDate(year, month, day);
+        }
+        if (!TIMESTAMP_PATTERN.test(value)) {
+            return null;
+        }
+        let seconds = Number(value);
+        if (Math.abs(seconds) > 2e10) {
+            seconds /= 1000;
+        }
+        // pydantic keeps microseconds: anything finer is dropped.
+        seconds = Math.trunc(seconds * 1e6) / 1e6;
+        if (seconds % DAY_SECONDS !== 0) {
+            return null;
+        }
+        const date = new Date(seconds * 1000);
+        const year = date.getUTCFullYear();
+        if (isNaN(year) || year < 1 || year > 9999) {
+            return null;
+        }
+        return isoDate(year, date.getUTCMonth() + 1, date.getUTCDate());
+    }
+
+    /**
+     * The date of a cell as 'YYYY-MM-DD', or null if DiseaseReport would not parse it.
+     * Submissions repeat a handful of dates, so parsed values are cached.
+     */
+    function parseDate(value) {
+        if (typeof value === 'number') {
+            return parseDateUncached(String(value));
+        }
+        if (typeof value !== 'string') {
+            return null;
+        }
+        let parsed = dateCache.get(value);
+        if (parsed === undefined) {
+            if (dateCache.size >= DATE_CACHE_SIZE) {
+                dateCache.clear();
+            }
+            parsed = parseDateUncached(value);
+            dateCache.set(value, parsed);
+        }
+        return parsed;
+    }
+
+    // ---- compiled checks ----
+
+    function fail(errors, line, rule, field, value) {
+        errors.push({ line: line, rule: rule, field: field, value: value });
+    }
+
+    function matchesBranch(branches, values) {
+        // slow path of a multi-field conditional with absent fields, which are unconstrained.
+        return branches.some(function (branch) {
+            return branch.every(function (expected, k) { return values[k] === undefined || values[k] === expected; });
+        });
+    }
+
+    // ---- report period: check_report_period, with the MMWR arithmetic of mmwr_calendar.py ----
+
+    const DAY_MS = DAY_SECONDS * 1000;
+    const PERIOD_COLUMNS = ['time_unit', 'report_period_start', 'report_period_end'].map(function (field) { return FIELD_INDEX[field]; });
+
+    // days since 1970-01-01 (a thursday) of a 'YYYY-MM-DD' date, for any year from 1 to 9999.
+    function dayNumber(year, month, day) {
+        const date = new Date(0);
+        date.setUTCFullYear(year, month - 1, day);
+        return Math.round(date.getTime() / DAY_MS);
+    }
+
+    function dayOfDate(iso) {
+        return dayNumber(+iso.slice(0, 4), +iso.slice(5, 7), +iso.slice(8, 10));
+    }
+
+    function dateOfDay(day) {
+        const date = new Date(day * DAY_MS);
+        return isoDate(date.getUTCFullYear(), date.getUTCMonth() + 1, date.getUTCDate());
+    }
+
+    // 0 for sunday through 6 for saturday.
+    function weekday(day) {
+        return ((day + 4) % 7 + 7) % 7;
+    }
+
+    // first day (a sunday) of MMWR week 1 of year: the sunday on or before january 4.
+    function mmwrYearStart(year) {
+        const jan4 = dayNumber(year, 1, 4);
+        return jan4 - weekday(jan4);
+    }
+
+    // { year, week, start } of the MMWR week that contains day; start is the day of its sunday.
+    function mmwrWeekOf(day) {
+        let year = +dateOfDay(day).slice(0, 4);
+        let start = mmwrYearStart(year + 1);
+        if (day >= start) {
+            year++;
+        } else {
+            start = mmwrYearStart(year);
+            if (day < start) {
+                year--;
+                start = mmwrYearStart(year);
+            }
+        }
+        const week = Math.floor((day - start) / 7) + 1;
+        return { year: year, week: week, start: start + (week - 1) * 7 };
+    }
+
+    /**
+     * Append the report period error of one row (c and line as for checkRow): the
+     * period must end after it starts and, for weekly rows, be one MMWR week (a sunday
+     * through the following saturday). Rows whose dates do not parse are left to the
+     * date format errors.
+     */
+    function checkReportPeriod(row, c, errors, line) {
+        const start = parseDate(row[c[PERIOD_COLUMNS[1]]]);
+        const end = parseDate(row[c[PERIOD_COLUMNS[2]]]);
+        if (start === null || end === null) {
+            return;
+        }
+        const params = { report_period_start: start, report_period_end: end };
+        const value = start + ', ' + end;
+        if (end <= start) {
+            errors.push({ line: line, rule: 'report_period_order', field: 'report_period_start, report_period_end', value: value, params: params });
+            return;
+        }
+        const first = dayOfDate(start);
+        if (row[c[PERIOD_COLUMNS[0]]] === 'week' && !(weekday(first) === 0 && dayOfDate(end) - first === 6)) {
+            const week = mmwrWeekOf(first);
+            params.hint = '\nMMWR week ' + week.week + ' of ' + week.year + ' is ' + dateOfDay(week.start) + ' to ' + dateOfDay(week.start + 6);
+            errors.push({ line: line, rule: 'mmwr_week', field: 'report_period_start, report_period_end', value: value, params: params });
+        }
+    }
+
+    /**
+     * The message of an error, formatted with its params (the placeholders of file and
+     * dataset rules, e.g. {details}) and the values of its row (an object of field ->
+     * value) where the rule's message names them.
+     */
+    function formatMessage(error, row) {
+        let template = RULE_MESSAGES[error.rule] || TYPE_MESSAGES[error.rule] || error.rule;
+        if (error.rule === 'literal_error') {
+            template = template.replace('{expected}', EXPECTED[error.field]);
+        }
+        return template.replace(/\{(\w+)\}/g, function (placeholder, name) {
+            if (error.params !== undefined && error.params[name] !== undefined) {
+                return error.params[name];
+            }
+            return row && row[name] !== undefined ? String(row[name]) : '';
+        });
+    }
+
+    /**
+     * The errors of one row given as an object of field -> value (a JSON record, or
+     * the values of the data standards tool form). line is copied into each error.
+     */
+    function validateRow(row, line) {
+        const errors = [];
+        const values = new Array(FIELDS.length);
+        for (let i = 0; i < FIELDS.length; i++) {
+            values[i] = Object.prototype.hasOwnProperty.call(row, FIELDS[i]) ? row[FIELDS[i]] : undefined;
+        }
+        for (const key in row) {
+            if (!ADDITIONAL_PROPERTIES && Object.prototype.hasOwnProperty.call(row, key) && FIELD_INDEX[key] === undefined) {
+                fail(errors, line, 'extra_forbidden', key, row[key]);
+            }
+        }
+        checkRow(values, IDENTITY, errors, line);
+        checkReportPeriod(values, IDENTITY, errors, line);
+        return errors;
+    }
+
+    // ---- CSV ----
+
+    /**
+     * Compare a CSV header with the schema fields, ignoring column order (as
+     * submission_ingest.check_header does). Returns { index, error }: index maps each
+     * field, in FIELDS order, to its column; error is a 'header' error listing the
+     * missing, unexpected and repeated columns, or null.
+     */
+    function checkHeader(header) {
+        const missing = FIELDS.filter(function (field) { return header.indexOf(field) === -1; });
+        const distinct = header.filter(function (name, i) { return header.indexOf(name) === i; });
+        const unexpected = distinct.filter(function (name) { return FIELD_INDEX[name] === undefined; });
+        const repeated = distinct.filter(function (name) { return header.indexOf(name) !== header.lastIndexOf(name); });
+        const index = FIELDS.map(function (field) { return header.indexOf(field); });
+        if (!missing.length && !unexpected.length && !repeated.length) {
+            return { index: index, error: null };
+        }
+
+        const quote = function (name) { return "'" + name + "'"; };
+        let details = '';
+        if (missing.length) {
+            details += '\nmissing: ' + missing.map(quote).join(', ');
+        }
+        if (unexpected.length) {
+            // a stray space or capital letter is the usual reason a column is not recognized.
+            details += '\nunexpected: ' + unexpected.map(function (name) {
+                const match = missing.find(function (field) { return field.toLowerCase() === name.trim().toLowerCase(); });
+                return quote(name) + (match ? " (did you mean '" + match + "'?)" : '');
+            }).join(', ');
+        }
+        if (repeated.length) {
+            details += '\nrepeated: ' + repeated.map(quote).join(', ');
+        }
+        return { index: index, error: { line: 1, rule: 'header', field: null, value: header.join(','), params: { details: details } } };
+    }
+
+    /**
+     * Incremental CSV parser (RFC 4180, as Python's csv module reads it): call
+     * feed() with successive chunks of text and end() after the last one. Each
+     * record is passed to onRow as an array of strings; blank lines are skipped
+     * and a leading byte order mark is dropped.
+     */
+    function CsvParser(onRow) {
+        this.onRow = onRow;
+        this.buffer = '';
+        this.started = false;
+    }
+
+    CsvParser.prototype.feed = function (chunk) {
+        let text = this.buffer + chunk;
+        if (!this.started && text.length) {
+            this.started = true;
+            if (text.charCodeAt(0) === 0xfeff) {
+                text = text.slice(1);
+            }
+        }
+        this.buffer = text.slice(this.parse(text, false));
+    };
+
+    CsvParser.prototype.end = function () {
+        if (this.buffer.length) {
+            this.parse(this.buffer, true);
+        }
+        this.buffer = '';
+    };
+
+    // parse the complete records of text (all of it if final); returns where parsing stopped.
+    CsvParser.prototype.parse = function (text, final) {
+        const n = text.length;
+        let pos = 0;
+        // the next quote at or after pos (n if there is none), searched again only once pos has passed it.
+        let quote = -1;
+        while (pos < n) {
+            let eol = text.indexOf('\n', pos);
+            if (quote < pos) {
+                quote = text.indexOf('"', pos);
+                if (quote === -1) {
+                    quote = n;
+                }
+            }
+            if (quote === n || (eol !== -1 && quote > eol)) {
+                // fast path: a record without quoted fields.
+                if (eol === -1) {
+                    if (!final) {
+                        return pos;
+                    }
+                    eol = n;
+                }
+                const end = eol > pos && text.charCodeAt(eol - 1) === 13 ? eol - 1 : eol;
+                if (end > pos) {
+                    this.onRow(text.slice(pos, end).split(','));
+                }
+                pos = eol + 1;
+                continue;
+            }
+
+            const next = this.parseQuoted(text, pos, final);
+            if (next === -1) {
+                return pos;
+            }
+            pos = next;
+        }
+        return n;
+    };
+
+    // parse one record with quoted fields starting at pos; returns the position after it, or -1 if it is incomplete.
+    CsvParser.prototype.parseQuoted = function (text, pos, final) {
+        const n = text.length;
+        const fields = [];
+        let field = '';
+        let fieldStart = true;
+        let i = pos;
+        while (i < n) {
+            const c = text.charCodeAt(i);
+            if (c === 34 && fieldStart) {
+                // a quoted field: up to the next quote that is not doubled.
+                let j = i + 1;
+                for (;;) {
+                    const close = text.indexOf('"', j);
+                    if (close === -1 || (close === n - 1 && !final)) {
+                        if (!final) {
+                            return -1;
+                        }
+                        field += text.slice(j);
+                        j = n;
+                        break;
+                    }
+                    field += text.slice(j, close);
+                    if (text.charCodeAt(close + 1) === 34) {
+                        field += '"';
+                        j = close + 2;
+                    } else {
+                        j = close + 1;
+                        break;
+                    }
+                }
+                i = j;
+                fieldStart = false;
+            } else if (c === 44) {
+                fields.push(field);
+                field = '';
+                fieldStart = true;
+                i++;
+            } else if (c === 10 || c === 13) {
+                fields.push(field);
+                this.onRow(fields);
+                return c === 13 && text.charCodeAt(i + 1) === 10 ? i + 2 : i + 1;
+            } else {
+                field += text[i];
+                fieldStart = false;
+                i++;
+            }
+        }
+        if (!final) {
+            return -1;
+        }
+        fields.push(field);
+        this.onRow(fields);
+        return n;
+    };
+
+    /**
+     * Errors grouped by rule and field, most frequent first, with the count of each
+     * group and its first maxSamples errors ({line, value, message}): the shape of
+     * the groups of error_report.py.
+     */
+    function ErrorSummary(maxSamples) {
+        this.maxSamples = maxSamples === undefined ? 10 : maxSamples;
+        this.groups = new Map();
+        this.errorCount = 0;
+    }
+
+    ErrorSummary.prototype.add = function (error, row) {
+        const key = error.rule + SEP + error.field;
+        let group = this.groups.get(key);
+        if (group === undefined) {
+            group = { rule: error.rule, field: error.field, count: 0, samples: [] };
+            this.groups.set(key, group);
+        }
+        group.count++;
+        this.errorCount++;
+        if (group.samples.length < this.maxSamples) {
+            group.samples.push({ line: error.line, value: error.value === undefined ? null : error.value, message: formatMessage(error, row) });
+        }
+    };
+
+    ErrorSummary.prototype.sortedGroups = function () {
+        return Array.from(this.groups.values()).sort(function (a, b) { return b.count - a.count; });
+    };
+
+    // ---- dataset-level rules ----
+
+    /**
+     * Single-pass count-totals reconciliation, a port of CountTotals in
+     * data_reporting_schema.py: for each (report_period_start, report_period_end,
+     * disease_name, outcome) group, the state-level sum, the state-level age breakdown
+     * sum (disease_subtype 'total'), the state-level disease subtype breakdown sum
+     * (age_group 'total') and the sub-state sum. International resident rows are
+     * excluded from all sums.
+     */
+    function CountTotals() {
+        this.groups = new Map();
+    }
+
+    CountTotals.prototype.add = function (start, end, diseaseName, outcome, geoUnit, geoName, ageGroup, diseaseSubtype, count) {
+        if (geoName === 'international resident') {
+            return;
+        }
+        const key = start + SEP + end + SEP + diseaseName + SEP + outcome;
+        let sums = this.groups.get(key);
+        if (sums === undefined) {
+            sums = [0, 0, 0, 0];
+            this.groups.set(key, sums);
+        }
+        if (geoUnit === 'state') {
+            sums[0] += count;
+            if (diseaseSubtype === 'total') {
+                sums[1] += count;
+            }
+            if (ageGroup === 'total') {
+                sums[2] += count;
+            }
+        } else {
+            sums[3] += count;
+        }
+    };
+
+    /**
+     * The groups whose sums disagree, as the rows of the reconciliation table
+     * (CountMismatch.as_dict): measles and pertussis state-level sums must equal the
+     * sub-state sum; meningococcus age and subtype breakdown sums must both equal it.
+     */
+    CountTotals.prototype.mismatches = function () {
+        const mismatches = [];
+        this.groups.forEach(function (sums, key) {
+            const parts = key.split(SEP);
+            const diseaseName = parts[2];
+            let ok = true;
+            if (diseaseName === 'measles' || diseaseName === 'pertussis') {
+                ok = sums[0] === sums[3];
+            } else if (diseaseName === 'meningococcus') {
+                ok = sums[1] === sums[2] && sums[2] === sums[3];
+            }
+            if (!ok) {
+                mismatches.push({
+                    report_period_start: parts[0], report_period_end: parts[1], disease_name: diseaseName, outcome: parts[3],
+                    state_sum: sums[0], age_breakdown_sum: sums[1], subtype_breakdown_sum: sums[2], substate_sum: sums[3],
+                    state_diff: sums[0] - sums[3], age_breakdown_diff: sums[1] - sums[3], subtype_breakdown_diff: sums[2] - sums[3]
+                });
+            }
+        });
+        return mismatches;
+    };
+
+    // the message of one mismatch, as CountMismatch.message() words it.
+    function mismatchMessage(m) {
+        const group = 'count mismatch for [' + m.report_period_start + ' to ' + m.report_period_end + ' | ' +
+            m.disease_name + ' | ' + m.outcome + ']:';
+        if (m.disease_name === 'meningococcus') {
+            return group + '\nstate-level age breakdown sum = ' + m.age_breakdown_sum +
+                '\nstate-level disease subtype breakdown sum = ' + m.subtype_breakdown_sum +
+                '\nsub-state sum = ' + m.substate_sum;
+        }
+        return group + '\nstate-level sum (' + m.state_sum + ') != sub-state sum (' + m.substate_sum + ')';
+    }
+
+    const TOTALS_COLUMNS = [
+        'report_period_start', 'report_period_end', 'disease_name', 'outcome', 'geo_unit', 'geo_name', 'age_group', 'disease_subtype', 'count'
+    ].map(function (field) { return FIELD_INDEX[field]; });
+    const STATE_COLUMN = FIELD_INDEX.state;
+
+    function hasFieldError(errors, field) {
+        for (let k = 0; k < errors.length; k++) {
+            if (errors[k].field === field) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    /**
+     * Validate a submission CSV streamed in chunks: feed() each chunk of text, then
+     * end() returns { rows, errorCount, errors, countTotals } where errors are the
+     * ErrorSummary groups and countTotals the count-totals mismatches. A header error
+     * stops validation, as the Python validators do.
+     *
+     * The dataset-level rules (single_state, count_totals) are checked after the last
+     * row. The Python validators only check them once every row is valid; here they
+     * read every row whose state, dates and count parse, so a file's row errors and
+     * its count mismatches are reported together.
+     */
+    function CsvValidator(options) {
+        options = options || {};
+        this.summary = new ErrorSummary(options.maxSamples);
+        this.rows = 0;
+        this.index = null;
+        this.headerError = false;
+        this.header = null;
+        this.states = new Set();
+        this.totals = new CountTotals();
+        const self = this;
+        const errors = [];
+        this.parser = new CsvParser(function (record) {
+            if (self.header === null) {
+                self.header = record;
+                const checked = checkHeader(record);
+                self.index = checked.index;
+                if (checked.error !== null) {
+                    self.headerError = true;
+                    self.summary.add(checked.error, null);
+                }
+                return;
+            }
+            if (self.headerError) {
+                return;
+            }
+            const line = self.rows + 2;
+            self.rows++;
+            checkRow(record, self.index, errors, line);
+            checkReportPeriod(record, self.index, errors, line);
+            if (record.length > self.header.length) {
+                fail(errors, line, 'extra_forbidden', null, record.slice(self.header.length).join(','));
+            }
+            self.addDatasetRow(record, errors);
+            if (errors.length) {
+                const row = self.rowObject(record);
+                for (let k = 0; k < errors.length; k++) {
+                    self.summary.add(errors[k], row);
+                }
+                errors.length = 0;
+            }
+        });
+    }
+
+    CsvValidator.prototype.rowObject = function (record) {
+        const row = {};
+        for (let i = 0; i < FIELDS.length; i++) {
+            row[FIELDS[i]] = record[this.index[i]];
+        }
+        return row;
+    };
+
+    CsvValidator.prototype.addDatasetRow = function (record, errors) {
+        const c = this.index;
+        if (!hasFieldError(errors, 'state')) {
+            this.states.add(record[c[STATE_COLUMN]]);
+        }
+        const t = TOTALS_COLUMNS;
+        const start = parseDate(record[c[t[0]]]);
+        const end = parseDate(record[c[t[1]]]);
+        const count = parseInteger(record[c[t[8]]]);
+        if (start !== null && end !== null && count !== null) {
+            this.totals.add(
+                start, end, record[c[t[2]]], record[c[t[3]]], record[c[t[4]]], record[c[t[5]]], record[c[t[6]]], record[c[t[7]]], count
+            );
+        }
+    };
+
+    CsvValidator.prototype.feed = function (chunk) {
+        this.parser.feed(chunk);
+    };
+
+    CsvValidator.prototype.end = function () {
+        this.parser.end();
+        let mismatches = [];
+        if (this.header === null) {
+            this.summary.add(checkHeader([]).error, null);
+        } else if (!this.headerError) {
+            if (this.states.size > 1) {
+                const states = Array.from(this.states).sort();
+                this.summary.add({
+                    line: null, rule: 'single_state', field: null, value: states.join(', '),
+                    params: { states: '[' + states.map(function (state) { return "'" + state + "'"; }).join(', ') + ']' }
+                }, null);
+            }
+            mismatches = this.totals.mismatches();
+            for (let k = 0; k < mismatches.length; k++) {
+                const m = mismatches[k];
+                this.summary.add({
+                    line: null, rule: 'count_totals', field: null,
+                    value: m.report_period_start + ' to ' + m.report_period_end + ' | ' + m.disease_name + ' | ' + m.outcome,
+                    params: { mismatches: '\n - ' + mismatchMessage(m) }
+                }, null);
+            }
+        }
+        return { rows: this.rows, errorCount: this.summary.errorCount, errors: this.summary.sortedGroups(), countTotals: mismatches };
+    };
+
+    function validateCsvText(text, options) {
+        const validator = new CsvValidator(options);
+        validator.feed(text);
+        return validator.end();
+    }
+
+    // ---- browser ----
+
+    /**
+     * Validate a File or Blob without reading it into memory at once: it is read in
+     * slices of options.chunkBytes (1 MiB) and decoded as a UTF-8 stream, and
+     * onProgress({ bytes, total, rows }) is called after each slice. Returns a
+     * Promise of the CsvValidator result.
+     */
+    function validateBlob(blob, options, onProgress) {
+        options = options || {};
+        const chunkBytes = options.chunkBytes || 1 << 20;
+        const validator = new CsvValidator(options);
+        const decoder = new TextDecoder('utf-8');
+        const start = Date.now();
+        let offset = 0;
+
+        function next() {
+            if (offset >= blob.size) {
+                validator.feed(decoder.decode());
+                const result = validator.end();
+                result.seconds = (Date.now() - start) / 1000;
+                return Promise.resolve(result);
+            }
+            const slice = blob.slice(offset, offset + chunkBytes);
+            offset += chunkBytes;
+            return slice.arrayBuffer().then(function (buffer) {
+                validator.feed(decoder.decode(buffer, { stream: true }));
+                if (onProgress) {
+                    onProgress({ bytes: Math.min(offset, blob.size), total: blob.size, rows: validator.rows });
+                }
+                return next();
+            });
+        }
+
+        return next();
+    }
+
+    /**
+     * Answer validation requests in a Web Worker (scope is the worker's global
+     * scope): each message { file, options } is answered with progress messages
+     * { type: 'progress', bytes, total, rows } and one { type: 'result', result }
+     * or { type: 'error', message }.
+     */
+    function serveWorker(scope) {
+        scope.onmessage = function (event) {
+            validateBlob(event.data.file, event.data.options, function (progress) {
+                scope.postMessage({ type: 'progress', bytes: progress.bytes, total: progress.total, rows: progress.rows });
+            }).then(function (result) {
+                scope.postMessage({ type: 'result', result: result });
+            }, function (error) {
+                scope.postMessage({ type: 'error', message: String(error && error.message || error) });
+            });
+        };
+    }
+
+    // ---- node command line ----
+
+    const USAGE = [
+        'usage: node data_reporting_validator.js [--json] [--max-samples N] [--chunk-bytes N] FILE.csv [FILE.csv ...]',
+        '       node data_reporting_validator.js --ndjson < rows.ndjson',
+        '',
+        'Validate submission CSV files against data_reporting_schema.yaml (exit 1 if any row fails),',
+        'or, with --ndjson, write the errors of each JSON row read from stdin as one JSON line.'
+    ].join('\n');
+
+    function validateFile(path, options) {
+        const fs = require('fs');
+        return new Promise(function (resolve, reject) {
+            const validator = new CsvValidator(options);
+            const start = process.hrtime.bigint();
+            fs.createReadStream(path, { encoding: 'utf8', highWaterMark: options.chunkBytes || 1 << 20 })
+                .on('data', function (chunk) { validator.feed(chunk); })
+                .on('error', reject)
+                .on('end', function () {
+                    const result = validator.end();
+                    result.file = path;
+                    result.status = result.errorCount ? 'fail' : 'pass';
+                    result.seconds = Number(process.hrtime.bigint() - start) / 1e9;
+                    resolve(result);
+                });
+        });
+    }
+
+    function validateNdjson() {
+        const readline = require('readline');
+        const lines = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+        const out = [];
+        lines.on('line', function (text) {
+            if (text.trim()) {
+                out.push(JSON.stringify(validateRow(JSON.parse(text), null)));
+                if (out.length >= 1000) {
+                    process.stdout.write(out.join('\n') + '\n');
+                    out.length = 0;
+                }
+            }
+        });
+        lines.on('close', function () {
+            if (out.length) {
+                process.stdout.write(out.join('\n') + '\n');
+            }
+        });
+    }
+
+    function main(argv) {
+        const options = { maxSamples: 10 };
+        const files = [];
+        let json = false;
+        for (let i = 0; i < argv.length; i++) {
+            if (argv[i] === '--ndjson') {
+                return validateNdjson();
+            } else if (argv[i] === '--json') {
+                json = true;
+            } else if (argv[i] === '--max-samples') {
+                options.maxSamples = parseInt(argv[++i], 10);
+            } else if (argv[i] === '--chunk-bytes') {
+                options.chunkBytes = parseInt(argv[++i], 10);
+            } else if (argv[i] === '-h' || argv[i] === '--help') {
+                console.log(USAGE);
+                return;
+            } else {
+                files.push(argv[i]);
+            }
+        }
+        if (!files.length) {
+            console.error(USAGE);
+            process.exitCode = 2;
+            return;
+        }
+
+        files.reduce(function (previous, path) {
+            return previous.then(function (results) {
+                return validateFile(path, options).then(function (result) { return results.concat([result]); });
+            });
+        }, Promise.resolve([])).then(function (results) {
+            if (json) {
+                console.log(JSON.stringify({ schema_sha256: SCHEMA_SHA256, files: results }, null, 2));
+            } else {
+                results.forEach(function (result) {
+                    const rate = result.seconds > 0 ? Math.round(result.rows / result.seconds) : 0;
+                    console.log((result.errorCount ? '✗ ' : '✓ ') + result.file + ': ' + result.rows + ' rows, ' +
+                        result.errorCount + ' errors (' + (result.seconds * 1000).toFixed(1) + ' ms, ' + rate + ' rows/s)');
+                    result.errors.forEach(function (group) {
+                        console.log('    ' + group.rule + (group.field ? ' [' + group.field + ']' : '') + ': ' + group.count);
+                        group.samples.slice(0, 3).forEach(function (sample) {
+                            const where = sample.line === null ? sample.value : 'line ' + sample.line;
+                            console.log('        ' + where + ': ' + sample.message.split('\n').slice(0, 2).join(' '));
+                        });
+                    });
+                });
+            }
+            process.exitCode = results.some(function (result) { return result.errorCount; }) ? 1 : 0;
+        }).catch(function (error) {
+            console.error('✗ ' + error.message);
+            process.exitCode = 2;
+        });
+    }
+
+    return {
+        SCHEMA_SHA256: SCHEMA_SHA256,
+        FIELDS: FIELDS,
+        RULE_MESSAGES: RULE_MESSAGES,
+        parseInteger: parseInteger,
+        parseDate: parseDate,
+        checkHeader: checkHeader,
+        checkRow: checkRow,
+        checkReportPeriod: checkReportPeriod,
+        validateRow: validateRow,
+        formatMessage: formatMessage,
+        CsvParser: CsvParser,
+        ErrorSummary: ErrorSummary,
+        CountTotals: CountTotals,
+        CsvValidator: CsvValidator,
+        validateCsvText: validateCsvText,
+        validateBlob: validateBlob,
+        serveWorker: serveWorker,
+        validateFile: validateFile,
+        main: main
+    };
+}));
@@ -0,0 +1,237 @@
+"""
+registry of the sub-state geographies (geo_name values) accepted for each state.
+
+geographies are loaded from the per-jurisdiction metadata files
+(jurisdiction-metadata/disease-tracking-metadata-{jurisdiction}.yaml, following the
+disease-tracking-metadata-{jurisdiction}.yaml template). to register a new state,
+add its metadata file with every sub-state geo_name listed under
+geographic_units.units. only registered states have their geo_name validated; all
+others are unchecked.
+
+parsing the metadata needs PyYAML, which is slow to import and to run, so
+GeographyRegistry.load() reads the parsed registry from a JSON snapshot, like a
+bytecode cache: the snapshot is used while its fingerprint (a hash of the
+metadata files) matches, and the metadata is parsed otherwise. loading never
+writes the snapshot; build_snapshot() does, and is run by
+scripts/update_data_standards.py (or once while building a worker image). with
+a current snapshot, a fresh process does not import PyYAML at all.
+"""
+import difflib
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Iterable
+
+JURISDICTION_METADATA_DIR = Path(__file__).parent / "jurisdiction-metadata"
+METADATA_FILE_PATTERN = "disease-tracking-metadata-*.yaml"
+
+# where the snapshot of JURISDICTION_METADATA_DIR is kept, in the user's cache directory;
+# the environment variable overrides it, and an empty value turns the snapshot off.
+SNAPSHOT_PATH = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "usdt-disease-tracker" / "geography_registry.json"
+SNAPSHOT_ENV_VAR = "USDT_GEOGRAPHY_SNAPSHOT"
+
+# accepted for every registered state to handle suppression rules.
+ALWAYS_VALID_GEO_NAMES = ("unspecified",)
+
+
+def normalize_geo_name(geo_name: str) -> str:
+    """case-fold and collapse whitespace, used only to suggest the intended name."""
+    return " ".join(geo_name.split()).casefold()
+
+
+class GeographyRegistry:
+    """
+    frozenset-backed geo_name membership per state.
+
+    membership checks are exact (geo_name values are case-sensitive); the
+    normalized index and "did you mean" suggestions are only consulted once a
+    name has already failed.
+    """
+
+    def __init__(self, jurisdictions: dict[str, Iterable[str]]):
+        self._names: dict[str, tuple[str, ...]] = {}
+        self._sets: dict[str, frozenset[str]] = {}
+        self._normalized: dict[str, dict[str, str]] = {}
+        for state, names in jurisdictions.items():
+            names = tuple(dict.fromkeys([*names, *ALWAYS_VALID_GEO_NAMES]))
+            self._names[state] = names
+            self._sets[state] = frozenset(names)
+
+    @classmethod
+    def from_metadata_dir(cls, metadata_dir: Path = JURISDICTION_METADATA_DIR) -> "GeographyRegistry":
+        """build the registry from every jurisdiction metadata file in metadata_dir."""
+        jurisdictions = {}
+        for path in sorted(Path(metadata_dir).glob(METADATA_FILE_PATTERN)):
+            state, names = load_metadata_geographies(path)
+            if names:
+                jurisdictions.setdefault(state, []).extend(names)
+
+        return cls(jurisdictions)
+
+    @classmethod
+    def load(cls, metadata_dir: Path = JURISDICTION_METADATA_DIR, snapshot_path: Path | None = None) -> "GeographyRegistry":
+        """
+        the registry of metadata_dir, from its snapshot if the snapshot matches the
+        metadata files, and otherwise parsed from them. the snapshot is only read
+        (see build_snapshot). snapshot_path defaults to snapshot_path_of(metadata_dir).
+        """
+        if snapshot_path is None:
+            snapshot_path = snapshot_path_of(metadata_dir)
+        if not snapshot_path:
+            return cls.from_metadata_dir(metadata_dir)
+
+        snapshot = read_snapshot(Path(snapshot_path))
+        if snapshot is not None and snapshot["fingerprint"] == metadata_fingerprint(metadata_dir):
+            return cls(snapshot["jurisdictions"])
+
+        return cls.from_metadata_dir(metadata_dir)
+
+    def write_snapshot(self, path: Path, fingerprint: str) -> None:
+        """write the registry as a JSON snapshot of the metadata files with this fingerprint."""
+        import tempfile
+
+        path.parent.mkdir(parents = True, exist_ok = True)
+        fd, tmp = tempfile.mkstemp(dir = path.parent, suffix = ".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding = "utf-8") as f:
+                json.dump({"fingerprint": fingerprint, "jurisdictions": self.as_dict()}, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def states(self) -> tuple[str, ...]:
+        return tuple(self._names)
+
+    def is_registered(self, state) -> bool:
+        return state in self._sets
+
+    def names(self, state) -> tuple[str, ...] | None:
+        """registered geo_name values for a state, in metadata order, or None if unregistered."""
+        return self._names.get(state)
+
+    def members(self, state) -> frozenset[str] | None:
+        """frozenset of registered geo_name values for a state, or None if unregistered."""
+        return self._sets.get(state)
+
+    def contains(self, state, geo_name) -> bool:
+        """True if geo_name is accepted for state. unregistered states accept any name."""
+        members = self._sets.get(state)
+        return members is None or geo_name in members
+
+    def lookup(self, state, geo_name: str) -> str | None:
+        """return the registered spelling of geo_name, ignoring case and extra whitespace."""
+        members = self._sets.get(state)
+        if members is None:
+            return None
+        if geo_name in members:
+            return geo_name
+
+        normalized = self._normalized.get(state)
+        if normalized is None:
+            normalized = self._normalized[state] = {normalize_geo_name(name): name for name in self._names[state]}
+
+        return normalized.get(normalize_geo_name(geo_name))
+
+    def suggest(self, state, geo_name: str, n: int = 3) -> list[str]:
+        """closest registered names for an unrecognized geo_name."""
+        names = self._names.get(state)
+        if not names or not isinstance(geo_name, str):
+            return []
+
+        exact = self.lookup(state, geo_name)
+        if exact is not None:
+            return [exact]
+
+        by_normalized = {normalize_geo_name(name): name for name in names}
+        matches = difflib.get_close_matches(normalize_geo_name(geo_name), list(by_normalized), n = n, cutoff = 0.6)
+        return [by_normalized[match] for match in matches]
+
+    def as_dict(self) -> dict[str, list[str]]:
+        return {state: list(names) for state, names in self._names.items()}
+
+
+def snapshot_path_of(metadata_dir: Path = JURISDICTION_METADATA_DIR) -> Path | None:
+    """
+    the snapshot of metadata_dir: $USDT_GEOGRAPHY_SNAPSHOT or SNAPSHOT_PATH for the
+    default metadata directory (None if the variable is empty), None for others.
+    """
+    if Path(metadata_dir) != JURISDICTION_METADATA_DIR:
+        return None
+    path = os.environ.get(SNAPSHOT_ENV_VAR, SNAPSHOT_PATH)
+    return Path(path) if path else None
+
+
+def read_snapshot(path: Path) -> dict | None:
+    """the {"fingerprint", "jurisdictions"} snapshot at path, or None if missing or unreadable."""
+    try:
+        with open(path, "r", encoding = "utf-8") as f:
+            snapshot = json.load(f)
+        if isinstance(snapshot["fingerprint"], str) and isinstance(snapshot["jurisdictions"], dict):
+            return snapshot
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def build_snapshot(metadata_dir: Path = JURISDICTION_METADATA_DIR, snapshot_path: Path | None = None) -> Path | None:
+    """
+    write the snapshot of metadata_dir unless it is already current. returns its
+    path, or None if there is no snapshot or it could not be written (e.g. a
+    read-only cache directory), in which case load() parses the metadata instead.
+    """
+    if snapshot_path is None:
+        snapshot_path = snapshot_path_of(metadata_dir)
+    if not snapshot_path:
+        return None
+
+    snapshot_path = Path(snapshot_path)
+    fingerprint = metadata_fingerprint(metadata_dir)
+    snapshot = read_snapshot(snapshot_path)
+    if snapshot is not None and snapshot["fingerprint"] == fingerprint:
+        return snapshot_path
+
+    try:
+        GeographyRegistry.from_metadata_dir(metadata_dir).write_snapshot(snapshot_path, fingerprint)
+    except OSError:
+        return None
+    return snapshot_path
+
+
+def metadata_fingerprint(metadata_dir: Path = JURISDICTION_METADATA_DIR) -> str:
+    """sha256 of the names and contents of the metadata files in metadata_dir."""
+    digest = hashlib.sha256()
+    for path in sorted(Path(metadata_dir).glob(METADATA_FILE_PATTERN)):
+        digest.update(path.name.encode("utf-8") + b"\0")
+        digest.update(path.read_bytes() + b"\0")
+    return digest.hexdigest()
+
+
+def load_metadata_geographies(path: Path) -> tuple[str, list[str]]:
+    """
+    read (jurisdiction, sub-state geo_names) from a jurisdiction metadata file.
+    state-level units are skipped; geo_name may be a single name or a list.
+    """
+    import yaml
+
+    with open(path, "r", encoding = "utf-8") as f:
+        metadata = yaml.safe_load(f) or {}
+
+    state = metadata.get("jurisdiction")
+    if not isinstance(state, str):
+        raise ValueError(f"{path}: 'jurisdiction' must be a two-letter state abbreviation. got: {state!r}")
+
+    units = (metadata.get("geographic_units") or {}).get("units") or []
+    names = []
+    for unit in units:
+        if unit.get("geo_unit") == "state":
+            continue
+        geo_names = unit.get("geo_name")
+        if geo_names is None:
+            continue
+        if not isinstance(geo_names, list):
+            geo_names = [geo_names]
+        names.extend(str(name) for name in geo_names)
+
+    return state, names
@@ -0,0 +1,112 @@
+"""
+MMWR (epidemiological) week calendar, computed arithmetically.
+
+MMWR weeks run sunday to saturday. week 1 of an MMWR year is the first week with at
+least four days in the calendar year, i.e. the week containing january 4; a year has
+52 or 53 weeks. every lookup here is a few integer operations, so no table is needed
+to validate report periods. crosswalk CSVs in the format of
+MMWR_week_to_month_crosswalk.csv can be written for any year range (see
+scripts/generate_mmwr_crosswalk.py); a week is assigned to the month its wednesday
+falls in.
+"""
+import csv
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+CROSSWALK_COLUMNS = ("mmwr_week", "mmwr_year", "start", "end", "month")
+
+# month labels as published in the crosswalk.
+MONTH_LABELS = ("Jan", "Feb", "March", "April", "May", "June", "July", "August", "Sept", "Oct", "Nov", "Dec")
+
+WEEK = timedelta(days = 7)
+LAST_DAY = timedelta(days = 6)
+
+
+class MMWRWeek(NamedTuple):
+    year: int
+    week: int
+
+    @property
+    def start(self) -> date:
+        """the sunday the week starts on."""
+        return mmwr_year_start(self.year) + (self.week - 1) * WEEK
+
+    @property
+    def end(self) -> date:
+        """the saturday the week ends on."""
+        return self.start + LAST_DAY
+
+    @property
+    def month(self) -> str:
+        """crosswalk month label: the month of the week's wednesday."""
+        return MONTH_LABELS[(self.start + timedelta(days = 3)).month - 1]
+
+
+def is_sunday(d: date) -> bool:
+    # date.toordinal() is 1 for monday 0001-01-01, so sundays are multiples of 7.
+    return d.toordinal() % 7 == 0
+
+
+def mmwr_year_start(year: int) -> date:
+    """first day (a sunday) of MMWR week 1 of year: the sunday on or before january 4."""
+    jan4 = date(year, 1, 4)
+    return jan4 - timedelta(days = jan4.isoweekday() % 7)
+
+
+def weeks_in_year(year: int) -> int:
+    """52 or 53."""
+    return (mmwr_year_start(year + 1) - mmwr_year_start(year)).days // 7
+
+
+def mmwr_week_of(d: date) -> MMWRWeek:
+    """MMWR year and week that contain d."""
+    year = d.year
+    start = mmwr_year_start(year + 1)
+    if d >= start:
+        year += 1
+    else:
+        start = mmwr_year_start(year)
+        if d < start:
+            year -= 1
+            start = mmwr_year_start(year)
+
+    return MMWRWeek(year, (d - start).days // 7 + 1)
+
+
+def is_valid_mmwr_week(start: date, end: date) -> bool:
+    """True if start..end is exactly one MMWR week (a sunday through the following saturday)."""
+    return is_sunday(start) and end - start == LAST_DAY
+
+
+def mmwr_weeks(first_year: int, last_year: int) -> Iterator[MMWRWeek]:
+    """every MMWR week of the MMWR years first_year..last_year, in order."""
+    for year in range(first_year, last_year + 1):
+        for week in range(1, weeks_in_year(year) + 1):
+            yield MMWRWeek(year, week)
+
+
+def crosswalk_rows(first_year: int, last_year: int) -> Iterator[dict]:
+    """rows of the MMWR week to month crosswalk for first_year..last_year."""
+    for week in mmwr_weeks(first_year, last_year):
+        start = week.start
+        yield {
+            "mmwr_week": week.week,
+            "mmwr_year": week.year,
+            "start": start.isoformat(),
+            "end": (start + LAST_DAY).isoformat(),
+            "month": week.month,
+        }
+
+
+def write_crosswalk(path: Path, first_year: int, last_year: int) -> int:
+    """write the crosswalk CSV for first_year..last_year. returns the number of weeks written."""
+    n = 0
+    with open(path, "w", newline = "", encoding = "utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames = CROSSWALK_COLUMNS, lineterminator = "\n")
+        writer.writeheader()
+        for row in crosswalk_rows(first_year, last_year):
+            writer.writerow(row)
+            n += 1
+
+    return n
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Minimal asyncio HTTP/1.1 server and pooled client.
+
+The ingestion service and the pull connectors only need a small part of HTTP:
+requests with a Content-Length or chunked body, responses with a
+Content-Length or chunked body, and keep-alive connections. This module
+implements that part on asyncio streams, so the services run and can be tested
+with the standard library alone.
+
+- serve(handler, host, port) runs a server; handler is an async function
+  Request -> Response. Request bodies are read on demand (read() or
+  iter_body()), so a handler can stream an upload to disk instead of holding
+  it in memory; a body longer than max_body is answered with 413.
+- HTTPClient keeps a pool of keep-alive connections per (scheme, host, port),
+  bounded by max_connections_per_host. Response bodies are read on demand
+  (read() or iter_chunks()); a connection goes back to the pool once its
+  response body has been fully read.
+"""
+
+import asyncio
+import json
+import ssl
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+MAX_HEADER_LINES = 100
+DEFAULT_MAX_BODY = 256 * 1024 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+
+REASONS = {
+    200: 'OK', 201: 'Created', 204: 'No Content', 304: 'Not Modified', 400: 'Bad Request',
+    401: 'Unauthorized', 403: 'Forbidden', 404: 'Not Found', 405: 'Method Not Allowed',
+    411: 'Length Required', 413: 'Payload Too Large', 422: 'Unprocessable Entity',
+    500: 'Internal Server Error', 502: 'Bad Gateway', 503: 'Service Unavailable',
+}
+
+
+class HTTPError(Exception):
+    """Malformed HTTP message, or a connection closed mid-message."""
+
+
+class BodyTooLarge(HTTPError):
+    """A request body is longer than the server's max_body."""
+
+
+class Headers(dict):
+    """Header fields keyed by lower-cased name."""
+
+    def __init__(self, items=()):
+        super().__init__()
+        for name, value in (items.items() if isinstance(items, dict) else items):
+            self[name.lower()] = value
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Headers:
+    headers = Headers()
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if not line.endswith(b'\n'):
+            raise HTTPError("connection closed while reading headers")
+        line = line.rstrip(b'\r\n')
+        if not line:
+            return headers
+        name, sep, value = line.decode('latin-1').partition(':')
+        if not sep:
+            raise HTTPError(f"malformed header line: {line[:100]!r}")
+        headers[name.strip().lower()] = value.strip()
+    raise HTTPError("too many header lines")
+
+
+async def _limit_body(chunks: AsyncIterator[bytes], max_body: int) -> AsyncIterator[bytes]:
+    """chunks, raising BodyTooLarge once more than max_body bytes have been read."""
+    total = 0
+    async for chunk in chunks:
+        total += len(chunk)
+        if total > max_body:
+            raise BodyTooLarge(f"request body exceeds {max_body} bytes")
+        yield chunk
+
+
+async def _iter_body(reader: asyncio.StreamReader, headers: Headers) -> AsyncIterator[bytes]:
+    """The message body as chunks, framed by Content-Length or chunked transfer encoding."""
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        while True:
+            size_line = await reader.readline()
+            try:
+                size = int(size_line.split(b';')[0].strip(), 16)
+            except ValueError:
+                raise HTTPError(f"malformed chunk size: {size_line[:100]!r}")
+            if size == 0:
+                await _read_headers(reader)  # trailers
+                return
+            remaining = size
+            while remaining:
+                chunk = await reader.read(min(remaining, READ_CHUNK_SIZE))
+                if not chunk:
+                    raise HTTPError("connection closed mid-chunk")
+                remaining -= len(chunk)
+                yield chunk
+            await reader.readexactly(2)
+    elif 'content-length' in headers:
+        remaining = int(headers['content-length'])
+        while remaining:
+            chunk = await reader.read(min(remaining, READ_CHUNK_SIZE))
+            if not chunk:
+                raise HTTPError("connection closed before the end of the body")
+            remaining -= len(chunk)
+            yield chunk
+    else:
+        while True:
+            chunk = await reader.read(READ_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+class Request:
+    """A server request. The body is read on demand, at most once: read() or iter_body()."""
+
+    def __init__(self, method: str, target: str, headers: Headers, body: Optional[AsyncIterator[bytes]] = None, peer=None):
+        self.method = method
+        self.target = target
+        self.headers = headers
+        self.peer = peer
+        url = urlsplit(target)
+        self.path = url.path
+        self.query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        self._chunks = body
+        # True once the body has been read to its end (or there is none).
+        self.body_consumed = body is None
+
+    async def iter_body(self) -> AsyncIterator[bytes]:
+        """
+        The body as it arrives. Raises BodyTooLarge past the server's max_body
+        (the server then answers 413), HTTPError if the connection breaks.
+        """
+        if self._chunks is None:
+            return
+        chunks, self._chunks = self._chunks, None
+        async for chunk in chunks:
+            yield chunk
+        self.body_consumed = True
+
+    async def read(self) -> bytes:
+        """The whole body, buffered in memory; prefer iter_body() for uploads."""
+        return b''.join([chunk async for chunk in self.iter_body()])
+
+
+class Response:
+    """A server response (built by handlers) or a client response (body read on demand)."""
+
+    def __init__(self, status: int, body: bytes = b'', headers: Optional[Dict[str, str]] = None, content_type: str = None):
+        self.status = status
+        self.headers = Headers(headers or {})
+        if content_type is not None:
+            self.headers['content-type'] = content_type
+        self._body = body
+        self._chunks: Optional[AsyncIterator[bytes]] = None
+        self._release: Optional[Callable[[bool], None]] = None
+
+    @classmethod
+    def json(cls, status: int, value, headers: Optional[Dict[str, str]] = None) -> 'Response':
+        return cls(status, json.dumps(value, default=str).encode(), headers, content_type='application/json')
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        """The body as it arrives. The connection is returned to the pool at the end."""
+        if self._chunks is None:
+            if self._body:
+                yield self._body
+            return
+        chunks, self._chunks = self._chunks, None
+        reusable = False
+        try:
+            async for chunk in chunks:
+                yield chunk
+            reusable = True
+        finally:
+            self._finish(reusable)
+
+    async def read(self) -> bytes:
+        if self._chunks is not None:
+            self._body = b''.join([chunk async for chunk in self.iter_chunks()])
+        return self._body
+
+    async def text(self, encoding: str = 'utf-8') -> str:
+        return (await self.read()).decode(encoding)
+
+    def close(self) -> None:
+        """Discard an unread body; its connection is closed instead of reused."""
+        if self._chunks is not None:
+            self._chunks = None
+            self._finish(False)
+
+    def _finish(self, reusable: bool) -> None:
+        release, self._release = self._release, None
+        if release is not None:
+            release(reusable)
+
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+
+async def _write_response(writer: asyncio.StreamWriter, response: Response, keep_alive: bool, head: bool = False) -> None:
+    body = response._body
+    headers = Headers(response.headers)
+    headers['content-length'] = str(len(body))
+    headers['connection'] = 'keep-alive' if keep_alive else 'close'
+    lines = [f"HTTP/1.1 {response.status} {REASONS.get(response.status, 'Unknown')}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+    if body and not head:
+        writer.write(body)
+    await writer.drain()
+
+
+async def serve(
+    handler: Handler,
+    host: str = '127.0.0.1',
+    port: int = 0,
+    max_body: int = DEFAULT_MAX_BODY,
+) -> asyncio.AbstractServer:
+    """Start an HTTP server (port 0 picks a free port; see server.sockets[0].getsockname())."""
+
+    async def connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info('peername')
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                    headers = await _read_headers(reader)
+                except (ValueError, HTTPError):
+                    await _write_response(writer, Response(400, b'malformed request\n'), keep_alive=False)
+                    return
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                length = headers.get('content-length')
+                if method in ('POST', 'PUT') and length is None and 'transfer-encoding' not in headers:
+                    await _write_response(writer, Response(411, b'Content-Length required\n'), keep_alive=False)
+                    return
+                if length is not None and int(length) > max_body:
+                    await _write_response(writer, Response(413, b'request body too large\n'), keep_alive=False)
+                    return
+                has_body = (length is not None and int(length) > 0) or 'transfer-encoding' in headers
+                request = Request(method, target, headers, _limit_body(_iter_body(reader, headers), max_body) if has_body else None, peer)
+
+                try:
+                    response = await handler(request)
+                except BodyTooLarge:
+                    await _write_response(writer, Response(413, b'request body too large\n'), keep_alive=False)
+                    return
+                except HTTPError:
+                    # the connection broke while the handler read the body.
+                    return
+                except Exception as e:  # a handler bug must not take the server down
+                    response = Response(500, f"internal error: {type(e).__name__}\n".encode())
+                # a body the handler did not read is still on the connection, so it cannot be reused.
+                keep_alive = keep_alive and request.body_consumed
+                await _write_response(writer, response, keep_alive, head=method == 'HEAD')
+                if not keep_alive:
+                    return
+        except (ConnectionError, HTTPError, asyncio.IncompleteReadError):
+            return
+        except asyncio.CancelledError:
+            # server shutdown while a keep-alive connection was idle.
+            return
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(connection, host, port)
+
+
+def server_url(server: asyncio.AbstractServer) -> str:
+    host, port = server.sockets[0].getsockname()[:2]
+    return f"http://{host}:{port}"
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class HTTPClient:
+    """
+    HTTP client with a keep-alive connection pool per (scheme, host, port).
+
+    At most max_connections_per_host requests to one origin are in flight;
+    further requests wait for a connection to be released. Use as an async
+    context manager, or call close() when done.
+    """
+
+    def __init__(self, max_connections_per_host: int = 4, timeout: float = 30.0, ssl_context: ssl.SSLContext = None):
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self._idle: Dict[Tuple[str, str, int], List[_Connection]] = {}
+        self._limits: Dict[Tuple[str, str, int], asyncio.Semaphore] = {}
+        self.connections_opened = 0
+
+    async def __aenter__(self) -> 'HTTPClient':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for connections in self._idle.values():
+            for connection in connections:
+                connection.close()
+        self._idle.clear()
+
+    async def _connect(self, origin: Tuple[str, str, int]) -> _Connection:
+        scheme, host, port = origin
+        idle = self._idle.get(origin)
+        while idle:
+            connection = idle.pop()
+            if not connection.reader.at_eof() and not connection.writer.is_closing():
+                return connection
+            connection.close()
+        context = (self.ssl_context or ssl.create_default_context()) if scheme == 'https' else None
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port, ssl=context), self.timeout)
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        body: bytes = b'',
+    ) -> Response:
+        """
+        Send a request and return the response once its headers have arrived.
+        The body must then be consumed (read(), iter_chunks()) or close()d.
+        Raises OSError / asyncio.TimeoutError / HTTPError on connection problems.
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme or 'http'
+        origin = (scheme, parts.hostname, parts.port or (443 if scheme == 'https' else 80))
+        limit = self._limits.setdefault(origin, asyncio.Semaphore(self.max_connections_per_host))
+
+        await limit.acquire()
+        try:
+            connection = await self._connect(origin)
+        except BaseException:
+            limit.release()
+            raise
+
+        def release(reusable: bool) -> None:
+            if reusable and response.headers.get('connection', '').lower() != 'close':
+                self._idle.setdefault(origin, []).append(connection)
+            else:
+                connection.close()
+            limit.release()
+
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+        request_headers = Headers({'host': parts.netloc, 'connection': 'keep-alive', 'content-length': str(len(body))})
+        request_headers.update(Headers(headers or {}))
+        lines = [f"{method} {target} HTTP/1.1"] + [f"{name}: {value}" for name, value in request_headers.items()]
+        try:
+            connection.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+            await connection.writer.drain()
+            status_line = await asyncio.wait_for(connection.reader.readline(), self.timeout)
+            if not status_line:
+                raise HTTPError("connection closed before the response")
+            try:
+                status = int(status_line.split()[1])
+            except (IndexError, ValueError):
+                raise HTTPError(f"malformed status line: {status_line[:100]!r}")
+            response_headers = await asyncio.wait_for(_read_headers(connection.reader), self.timeout)
+        except BaseException:
+            connection.close()
+            limit.release()
+            raise
+
+        response = Response(status, headers=response_headers)
+        response._release = release
+        if method == 'HEAD' or status in (204, 304) or response_headers.get('content-length') == '0':
+            release(True)
+            response._release = None
+        else:
+            response._chunks = _iter_body(connection.reader, response_headers)
+        return response
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Response:
+        return await self.request('GET', url, headers)
+
+    async def post(self, url: str, body: bytes, headers: Optional[Dict[str, str]] = None) -> Response:
+        return await self.request('POST', url, headers, body)
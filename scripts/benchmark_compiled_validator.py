@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmarks of the compiled validator (data_reporting_validator.js).
+
+Generates the synthetic submissions of benchmark_validation.py's SCALES and
+validates them with the compiled validator under node, timed two ways:
+
+    compiled        reading and validating the files, timed inside node
+    compiled-process  the whole node process, startup included (what a
+                    portal worker that spawns it per upload pays)
+
+next to every phase of the Python engines (the compiled validator checks
+the same rules: the registry, MMWR week, dataset and count-totals rules
+included). Times are the best of --repeat runs. Every run is
+appended as one JSON line per (scale, engine) to a results file together with
+the git commit, like benchmark_validation.py.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from benchmark_validation import DEFAULT_SCALES, LAST_WEEK, PHASES, SCALES, append_results, git_commit, time_engine
+from check_compiled_validator import node_command
+from compile_schema_validator import VALIDATOR_PATH
+from synthetic_submissions import generate_submission, latest_weeks, write_submission
+
+REPO_DIR = Path(__file__).parent.parent
+DEFAULT_RESULTS = REPO_DIR / '.benchmarks' / 'compiled.jsonl'
+PYTHON_ENGINES = ('model', 'columnar')
+# the phases of benchmark_validation.py the compiled validator does the work of: all of them.
+COMPARED_PHASES = PHASES
+
+
+def time_compiled(node: str, files: Sequence[Path], repeat: int) -> Dict[str, float]:
+    """Best-of-repeat seconds of validating files with node: inside the process, and of the whole process."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [node, str(VALIDATOR_PATH), '--json', '--max-samples', '1'] + [str(path) for path in files],
+            capture_output=True, text=True
+        )
+        wall = time.perf_counter() - start
+        if completed.returncode not in (0, 1):
+            raise RuntimeError(completed.stderr.strip())
+        times = {
+            'compiled': sum(result['seconds'] for result in json.loads(completed.stdout)['files']),
+            'compiled-process': wall,
+        }
+        if best is None or times['compiled'] < best['compiled']:
+            best = times
+    return best
+
+
+def run_benchmarks(node: str, scales: Sequence[str], error_rate: float = 0.0, repeat: int = 3, seed: int = 0) -> List[dict]:
+    """Benchmark results, one dict per (scale, engine)."""
+    results = []
+    commit = git_commit()
+    timestamp = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    node_version = subprocess.run([node, '--version'], capture_output=True, text=True).stdout.strip()
+    for scale_name in scales:
+        scale = SCALES[scale_name]
+        weeks = latest_weeks(scale.weeks, LAST_WEEK)
+        with tempfile.TemporaryDirectory() as tmp:
+            files, n_rows, n_errors = [], 0, 0
+            for state in scale.states:
+                synthetic = generate_submission(state, weeks, seed, error_rate)
+                path = Path(tmp) / f"disease_tracking_report_{state}_synthetic.csv"
+                write_submission(path, synthetic.rows)
+                files.append(path)
+                n_rows += len(synthetic.rows)
+                n_errors += synthetic.errors
+
+            seconds = time_compiled(node, files, repeat)
+            for engine in PYTHON_ENGINES:
+                times = time_engine(engine, files, repeat)
+                seconds[engine] = sum(times[phase] for phase in COMPARED_PHASES)
+
+            for engine, t in seconds.items():
+                results.append({
+                    'commit': commit,
+                    'timestamp': timestamp,
+                    'python': platform.python_version(),
+                    'node': node_version,
+                    'scale': scale_name,
+                    'engine': engine,
+                    'error_rate': error_rate,
+                    'seed': seed,
+                    'files': len(files),
+                    'rows': n_rows,
+                    'error_rows': n_errors,
+                    'seconds': round(t, 6),
+                    'rows_per_second': round(n_rows / max(t, 1e-9)),
+                })
+
+    return results
+
+
+def format_results(results: List[dict]) -> str:
+    """A table of the results, with each engine's speedup over the model's phases."""
+    model = {result['scale']: result['seconds'] for result in results if result['engine'] == 'model'}
+    lines = [f"{'scale':<16} {'engine':<18} {'rows':>9} {'ms':>10} {'rows/s':>12} {'vs model':>9}"]
+    for result in results:
+        speedup = model[result['scale']] / max(result['seconds'], 1e-9)
+        lines.append(
+            f"{result['scale']:<16} {result['engine']:<18} {result['rows']:>9} {result['seconds'] * 1000:>10.1f} "
+            f"{result['rows_per_second']:>12,} {speedup:>8.1f}x"
+        )
+    return '\n'.join(lines)
+
+
+def main():
+    """Main function to run the compiled validator benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        '--scale', dest='scales', action='append', choices=SCALES,
+        help=f"scale to run, repeatable (default: {', '.join(DEFAULT_SCALES)})"
+    )
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of synthetic rows with a rule violation (default: 0)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement; the fastest is kept (default: 3)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--results', default=str(DEFAULT_RESULTS), help=f'results file (default: {DEFAULT_RESULTS.relative_to(REPO_DIR)})')
+    parser.add_argument('--no-save', action='store_true', help='do not append this run to the results file')
+    args = parser.parse_args()
+
+    node = node_command()
+    if node is None:
+        print("✗ node is required to run the compiled validator")
+        sys.exit(2)
+
+    results = run_benchmarks(node, args.scales or DEFAULT_SCALES, args.error_rate, args.repeat, args.seed)
+    print(format_results(results))
+
+    if not args.no_save:
+        append_results(Path(args.results), results)
+        print(f"\n✓ Appended {len(results)} result(s) to {args.results}")
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Import-time (cold start) benchmarks of the schema and the validation scripts.
+
+Every validation worker process, serverless function and scripts/ command
+starts by importing data_reporting_schema. Each scenario in SCENARIOS is run
+in a fresh Python process, --repeat times, and the median is reported: the
+time spent in the scenario's statement (imports, and for first-file the
+validation of the CA example) and the wall time of the whole process,
+interpreter start-up included.
+
+Scenarios run with the geography snapshot (see geography_registry.py), which
+is built first if missing, and then without it (unless --snapshot-only) to
+show what parsing the jurisdiction metadata costs. A scenario whose median exceeds its budget in
+STARTUP_BUDGETS_MS (or --budget) fails the run. Results are appended to
+.benchmarks/import.jsonl with the git commit, as benchmark_validation.py does.
+"""
+
+import argparse
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from benchmark_validation import append_results, git_commit
+
+REPO_DIR = Path(__file__).parent.parent
+SCHEMA_DIR = REPO_DIR / 'examples-and-templates'
+DEFAULT_RESULTS = REPO_DIR / '.benchmarks' / 'import.jsonl'
+EXAMPLE = SCHEMA_DIR / 'disease_tracking_report_CA-EXAMPLE_2026-02-09.csv'
+
+SCENARIOS: Dict[str, str] = {
+    # rule tables, check_* functions, CountTotals and the geography registry.
+    'schema': 'import data_reporting_schema',
+    # the pydantic models as well, built on first access.
+    'models': 'import data_reporting_schema; data_reporting_schema.DiseaseReportDataset',
+    'columnar': 'import columnar_validation',
+    # what a validate_submissions worker process imports.
+    'worker': 'import validate_submissions',
+    'first-file': f'from validate_submissions import validate_submission; validate_submission({str(EXAMPLE)!r})',
+}
+
+# median milliseconds of the scenario statement, with the snapshot.
+STARTUP_BUDGETS_MS: Dict[str, float] = {
+    'schema': 100,
+    'columnar': 250,
+    'worker': 250,
+}
+
+_TIMER = "import time as _time; _start = _time.perf_counter()\n{statement}\nprint(_time.perf_counter() - _start)"
+
+
+def _environment(snapshot: bool) -> Dict[str, str]:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([str(SCHEMA_DIR), str(Path(__file__).parent), env.get('PYTHONPATH', '')])
+    if not snapshot:
+        env['USDT_GEOGRAPHY_SNAPSHOT'] = ''
+    else:
+        env.pop('USDT_GEOGRAPHY_SNAPSHOT', None)
+    return env
+
+
+def time_scenario(statement: str, snapshot: bool = True, repeat: int = 5) -> Dict[str, float]:
+    """Median seconds of the statement and of the whole process, over repeat fresh processes."""
+    env = _environment(snapshot)
+    statement_times, process_times = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, '-c', _TIMER.format(statement=statement)],
+            env=env, capture_output=True, text=True, check=True,
+        )
+        process_times.append(time.perf_counter() - start)
+        statement_times.append(float(completed.stdout.split()[-1]))
+    return {'statement': statistics.median(statement_times), 'process': statistics.median(process_times)}
+
+
+def import_breakdown(statement: str, snapshot: bool = True, top: int = 15) -> List[tuple]:
+    """(cumulative microseconds, module) of the slowest imports of a statement, from python -X importtime."""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        env=_environment(snapshot), capture_output=True, text=True, check=True,
+    )
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.append((int(cumulative), name.strip()))
+    return sorted(modules, reverse=True)[:top]
+
+
+def build_snapshot() -> None:
+    """Write the geography snapshot if it is missing or stale."""
+    subprocess.run(
+        [sys.executable, '-c', 'import geography_registry, sys; sys.exit(geography_registry.build_snapshot() is None)'],
+        env=_environment(True), check=True,
+    )
+
+
+def run_benchmarks(scenarios: Sequence[str], repeat: int = 5, snapshot_only: bool = False) -> List[dict]:
+    """Benchmark results, one dict per (scenario, snapshot)."""
+    build_snapshot()
+    commit = git_commit()
+    timestamp = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    results = []
+    for snapshot in ([True] if snapshot_only else [True, False]):
+        for scenario in scenarios:
+            times = time_scenario(SCENARIOS[scenario], snapshot, repeat)
+            results.append({
+                'commit': commit,
+                'timestamp': timestamp,
+                'python': platform.python_version(),
+                'scenario': scenario,
+                'snapshot': snapshot,
+                'repeat': repeat,
+                'seconds': round(times['statement'], 6),
+                'process_seconds': round(times['process'], 6),
+            })
+    return results
+
+
+def over_budget(results: List[dict], budgets: Dict[str, float]) -> List[str]:
+    """Scenarios (with the snapshot) whose median exceeds their budget."""
+    return [
+        f"{result['scenario']} ({result['seconds'] * 1000:.0f} ms > {budgets[result['scenario']]:.0f} ms)"
+        for result in results
+        if result['snapshot'] and result['scenario'] in budgets and result['seconds'] * 1000 > budgets[result['scenario']]
+    ]
+
+
+def format_results(results: List[dict], budgets: Dict[str, float]) -> str:
+    lines = [f"{'scenario':<12} {'snapshot':<9} {'statement ms':>13} {'process ms':>11} {'budget ms':>10}"]
+    for result in results:
+        budget = budgets.get(result['scenario']) if result['snapshot'] else None
+        lines.append(
+            f"{result['scenario']:<12} {'yes' if result['snapshot'] else 'no':<9} "
+            f"{result['seconds'] * 1000:>13.1f} {result['process_seconds'] * 1000:>11.1f} "
+            f"{'-' if budget is None else f'{budget:.0f}':>10}"
+        )
+    return '\n'.join(lines)
+
+
+def _budget(value: str) -> tuple:
+    scenario, _, ms = value.partition('=')
+    if scenario not in SCENARIOS:
+        raise argparse.ArgumentTypeError(f"unknown scenario {scenario!r}")
+    try:
+        return scenario, float(ms)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"budget must be SCENARIO=MILLISECONDS. got: {value!r}")
+
+
+def main():
+    """Main function to run the import-time benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenario', dest='scenarios', action='append', choices=SCENARIOS,
+                        help='scenario to run, repeatable (default: all)')
+    parser.add_argument('--repeat', type=int, default=5, help='fresh processes per scenario; the median is kept (default: 5)')
+    parser.add_argument('--snapshot-only', action='store_true', help='do not run the scenarios without the geography snapshot')
+    parser.add_argument('--budget', action='append', type=_budget, default=[], metavar='SCENARIO=MS',
+                        help='override a startup budget, repeatable')
+    parser.add_argument('--breakdown', choices=SCENARIOS, default=None,
+                        help='list the slowest imports of a scenario (python -X importtime) instead')
+    parser.add_argument('--results', default=str(DEFAULT_RESULTS), help=f'results file (default: {DEFAULT_RESULTS.relative_to(REPO_DIR)})')
+    parser.add_argument('--no-save', action='store_true', help='do not append this run to the results file')
+    args = parser.parse_args()
+
+    if args.breakdown:
+        build_snapshot()
+        print(f"{'cumulative ms':>13}  module")
+        for cumulative, module in import_breakdown(SCENARIOS[args.breakdown]):
+            print(f"{cumulative / 1000:>13.1f}  {module}")
+        sys.exit(0)
+
+    budgets = {**STARTUP_BUDGETS_MS, **dict(args.budget)}
+    results = run_benchmarks(args.scenarios or list(SCENARIOS), args.repeat, args.snapshot_only)
+    print(format_results(results, budgets))
+
+    if not args.no_save:
+        results_path = Path(args.results)
+        append_results(results_path, results)
+        print(f"\n✓ Appended {len(results)} result(s) to {results_path}")
+
+    exceeded = over_budget(results, budgets)
+    if exceeded:
+        print(f"✗ Over the startup budget: {', '.join(exceeded)}")
+        sys.exit(1)
+
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Benchmarks of submission validation on synthetic data.
+
+Generates submissions with synthetic_submissions.py at the scales in SCALES and
+times each validation phase separately, for both the pydantic model
+(DiseaseReport / DiseaseReportDataset) and the columnar engine:
+
+    read           CSV file -> row dicts (model) or columns (columnar)
+    rows           row rules: field types, enums, cross-field and period rules
+    dataset        DiseaseReportDataset.validate_single_state
+    count_totals   count-totals reconciliation
+
+Times are the best of --repeat runs, summed over the files of a scale (one
+file per state). Peak memory is measured in a separate run under tracemalloc,
+which would otherwise distort the times. Every run is appended as one JSON
+line per (scale, engine) to a results file together with the git commit, so
+--compare can show how the current tree performs against an earlier commit.
+"""
+
+import argparse
+import csv
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import pydantic
+from pydantic import ValidationError
+
+from columnar_validation import ErrorCollector, read_csv_columns, single_state_error, validate_rows
+from data_reporting_schema import (
+    STATES,
+    CountTotals,
+    DiseaseReport,
+    DiseaseReportDataset,
+    RuleViolation,
+)
+from mmwr_calendar import MMWRWeek
+from synthetic_submissions import generate_submission, latest_weeks, write_submission
+
+REPO_DIR = Path(__file__).parent.parent
+DEFAULT_RESULTS = REPO_DIR / '.benchmarks' / 'validation.jsonl'
+LAST_WEEK = MMWRWeek(2026, 5)
+
+PHASES = ('read', 'rows', 'dataset', 'count_totals')
+ENGINES = ('model', 'columnar')
+
+
+class Scale(NamedTuple):
+    states: Tuple[str, ...]
+    weeks: int
+
+
+# MN has the largest set of registered sub-state geographies.
+SCALES: Dict[str, Scale] = {
+    'state-week': Scale(('MN',), 1),
+    'state-history': Scale(('MN',), 156),
+    'national-week': Scale(STATES, 1),
+    'national-history': Scale(STATES, 104),
+}
+DEFAULT_SCALES = ('state-week', 'state-history', 'national-week')
+
+# a phase that got this much slower than the compared commit is reported as a regression,
+# unless it takes less than MIN_REGRESSION_SECONDS, where timer noise dominates.
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+MIN_REGRESSION_SECONDS = 0.001
+
+
+def _validate_model(csv_path: Path, clock: Callable[[str], None]) -> None:
+    with open(csv_path, 'r', newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.DictReader(f))
+    clock('read')
+
+    reports, failed = [], False
+    for row in rows:
+        try:
+            reports.append(DiseaseReport.model_validate(row))
+        except ValidationError:
+            failed = True
+    clock('rows')
+    if failed:
+        return
+
+    # the dataset validators, called on an unvalidated dataset so each can be timed on its own.
+    dataset = DiseaseReportDataset.model_construct(reports)
+    try:
+        dataset.validate_single_state()
+    except RuleViolation:
+        return
+    clock('dataset')
+    try:
+        dataset.validate_count_totals()
+    except RuleViolation:
+        pass
+    clock('count_totals')
+
+
+def _validate_columnar(csv_path: Path, clock: Callable[[str], None]) -> None:
+    columns = read_csv_columns(csv_path)
+    clock('read')
+
+    collector = ErrorCollector()
+    typed = validate_rows(columns, collector)
+    clock('rows')
+    if collector.has_errors:
+        return
+
+    if single_state_error(typed['state']) is not None:
+        return
+    clock('dataset')
+    count_totals = CountTotals()
+    count_totals.add_columns(typed)
+    count_totals.mismatches()
+    clock('count_totals')
+
+
+VALIDATORS = {'model': _validate_model, 'columnar': _validate_columnar}
+
+
+class PhaseClock:
+    """Accumulates the time between successive clock(phase) calls under each phase."""
+
+    def __init__(self):
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self._last = None
+
+    def start(self) -> None:
+        self._last = time.perf_counter()
+
+    def __call__(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.times[phase] += now - self._last
+        self._last = now
+
+
+def time_engine(engine: str, files: Sequence[Path], repeat: int) -> Dict[str, float]:
+    """Best-of-repeat time of each phase, summed over files."""
+    best = None
+    for _ in range(repeat):
+        clock = PhaseClock()
+        for path in files:
+            clock.start()
+            VALIDATORS[engine](path, clock)
+        if best is None or sum(clock.times.values()) < sum(best.values()):
+            best = clock.times
+    return best
+
+
+def peak_memory(engine: str, files: Sequence[Path]) -> int:
+    """Largest tracemalloc peak, in bytes, of validating one of the files."""
+    peak = 0
+    tracemalloc.start()
+    try:
+        for path in files:
+            tracemalloc.reset_peak()
+            VALIDATORS[engine](path, lambda phase: None)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def git_commit() -> Optional[str]:
+    """HEAD commit of the repository, with a '+' suffix if the tree has uncommitted changes."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('+' if dirty else '')
+
+
+def run_benchmarks(
+    scales: Sequence[str],
+    engines: Sequence[str] = ENGINES,
+    error_rate: float = 0.0,
+    repeat: int = 3,
+    seed: int = 0,
+    memory: bool = True,
+) -> List[dict]:
+    """Benchmark results, one dict per (scale, engine)."""
+    results = []
+    commit = git_commit()
+    timestamp = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    for scale_name in scales:
+        scale = SCALES[scale_name]
+        weeks = latest_weeks(scale.weeks, LAST_WEEK)
+        with tempfile.TemporaryDirectory() as tmp:
+            files, n_rows, n_errors = [], 0, 0
+            for state in scale.states:
+                synthetic = generate_submission(state, weeks, seed, error_rate)
+                path = Path(tmp) / f"disease_tracking_report_{state}_synthetic.csv"
+                write_submission(path, synthetic.rows)
+                files.append(path)
+                n_rows += len(synthetic.rows)
+                n_errors += synthetic.errors
+
+            for engine in engines:
+                times = time_engine(engine, files, repeat)
+                results.append({
+                    'commit': commit,
+                    'timestamp': timestamp,
+                    'python': platform.python_version(),
+                    'pydantic': pydantic.VERSION,
+                    'scale': scale_name,
+                    'engine': engine,
+                    'error_rate': error_rate,
+                    'seed': seed,
+                    'files': len(files),
+                    'rows': n_rows,
+                    'error_rows': n_errors,
+                    'seconds': {phase: round(t, 6) for phase, t in times.items()},
+                    'rows_per_second': round(n_rows / max(sum(times.values()), 1e-9)),
+                    'peak_bytes': peak_memory(engine, files) if memory else None,
+                })
+
+    return results
+
+
+def append_results(path: Path, results: List[dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        for result in results:
+            f.write(json.dumps(result) + '\n')
+
+
+def load_results(path: Path) -> List[dict]:
+    if not path.exists():
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _key(result: dict) -> tuple:
+    return result['scale'], result['engine'], result['error_rate'], result['seed']
+
+
+def baseline_results(history: List[dict], results: List[dict], commit: Optional[str] = None) -> Dict[tuple, dict]:
+    """
+    The stored result to compare each new result with: the latest one of the
+    given commit, or by default of the latest commit other than the current one.
+    """
+    current = results[0]['commit'] if results else None
+    baseline = {}
+    for result in history:
+        if commit is not None and result['commit'] != commit:
+            continue
+        if commit is None and result['commit'] == current:
+            continue
+        baseline[_key(result)] = result
+    return baseline
+
+
+def regressions(result: dict, baseline: dict, threshold: float) -> List[str]:
+    """The phases of result that are more than threshold slower than baseline."""
+    slower = []
+    for phase in PHASES:
+        before, after = baseline['seconds'].get(phase, 0.0), result['seconds'][phase]
+        if after >= MIN_REGRESSION_SECONDS and after > before * (1 + threshold):
+            slower.append(phase)
+    return slower
+
+
+def format_results(results: List[dict], baseline: Dict[tuple, dict]) -> str:
+    lines = [
+        f"{'scale':<17} {'engine':<9} {'rows':>8} " + ' '.join(f"{phase:>12}" for phase in PHASES)
+        + f" {'rows/s':>9} {'peak MiB':>9}"
+    ]
+    for result in results:
+        peak = result['peak_bytes']
+        lines.append(
+            f"{result['scale']:<17} {result['engine']:<9} {result['rows']:>8} "
+            + ' '.join(f"{result['seconds'][phase]:>11.4f}s" for phase in PHASES)
+            + f" {result['rows_per_second']:>9} {'-' if peak is None else f'{peak / 2 ** 20:.1f}':>9}"
+        )
+        before = baseline.get(_key(result))
+        if before is not None:
+            changes = []
+            for phase in PHASES:
+                old = before['seconds'].get(phase, 0.0)
+                changes.append(f"{(result['seconds'][phase] / old - 1) * 100:>+11.1f}%" if old > 0 else f"{'-':>12}")
+            lines.append(f"{'  vs ' + str(before['commit']):<36} " + ' '.join(changes))
+
+    return '\n'.join(lines)
+
+
+def main():
+    """Main function to run the validation benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        '--scale', dest='scales', action='append', choices=SCALES,
+        help=f"scale to run, repeatable (default: {', '.join(DEFAULT_SCALES)})"
+    )
+    parser.add_argument('--engine', dest='engines', action='append', choices=ENGINES, help='engine to run, repeatable (default: both)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of synthetic rows with a rule violation (default: 0)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement; the fastest is kept (default: 3)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc peak memory run')
+    parser.add_argument('--results', default=str(DEFAULT_RESULTS), help=f'results file (default: {DEFAULT_RESULTS.relative_to(REPO_DIR)})')
+    parser.add_argument('--no-save', action='store_true', help='do not append this run to the results file')
+    parser.add_argument(
+        '--compare', nargs='?', const='', default=None, metavar='COMMIT',
+        help='compare with the stored results of COMMIT (default: the latest other commit)'
+    )
+    parser.add_argument(
+        '--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+        help=f'slowdown reported as a regression by --compare (default: {DEFAULT_REGRESSION_THRESHOLD})'
+    )
+    args = parser.parse_args()
+
+    results_path = Path(args.results)
+    history = load_results(results_path)
+    results = run_benchmarks(
+        args.scales or DEFAULT_SCALES, args.engines or ENGINES, args.error_rate, args.repeat, args.seed, not args.no_memory
+    )
+
+    baseline = {}
+    if args.compare is not None:
+        baseline = baseline_results(history, results, args.compare or None)
+        if not baseline:
+            print("No stored results to compare with", file=sys.stderr)
+    print(format_results(results, baseline))
+
+    if not args.no_save:
+        append_results(results_path, results)
+        print(f"\n✓ Appended {len(results)} result(s) to {results_path}")
+
+    regressed = []
+    for result in results:
+        before = baseline.get(_key(result))
+        if before is not None:
+            regressed.extend(f"{result['scale']}/{result['engine']}/{phase}" for phase in regressions(result, before, args.threshold))
+    if regressed:
+        print(f"✗ Slower than {args.threshold:.0%} threshold: {', '.join(regressed)}")
+        sys.exit(1)
+
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Parity check of the columnar and streaming engines against DiseaseReportDataset.
+
+Validates the same CSV files with DiseaseReportDataset.model_validate on the
+csv.DictReader rows, with columnar_validation.validate_csv and with
+stream_validation.validate_file (in small chunks, so that files span several
+of them), and checks that all three accept or reject each file, with the same errors: the same
+location (row index and field), rule and message, and the same number of
+them. Files that are resubmissions of an example are also validated with
+incremental_validation.validate_file_incremental against that example.
+
+The files are the example CSVs, as they are and with blank lines added
+(a trailing newline, blank lines between rows), copies of the examples with
+one row mutated (each mutation either breaks a row rule or a count-totals
+group), copies of the examples with two columns swapped and with only their
+header names swapped, the edge case rows of check_compiled_validator.py, synthetic
+submissions with rule violations, count mismatches and a second state, and
+files with ragged rows or missing and extra columns.
+"""
+
+import argparse
+import csv
+import random
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+from pydantic import ValidationError
+
+from check_compiled_validator import (
+    DEFAULT_RANDOM_CASES,
+    EXAMPLES,
+    edge_cases,
+    mismatched_rows,
+    synthetic_rows,
+    value_pools,
+    write_quoted_csv,
+)
+from columnar_validation import error_rule, validate_csv
+from data_reporting_schema import FIELD_NAMES, DiseaseReportDataset
+from incremental_validation import validate_file_incremental
+from mmwr_calendar import MMWRWeek
+from stream_validation import validate_file
+from synthetic_submissions import generate_submission, latest_weeks
+
+DEFAULT_MUTATIONS = 100
+# rows per chunk of the streaming engine.
+STREAM_CHUNK_SIZE = 97
+
+
+class Result(NamedTuple):
+    name: str
+    rows: int
+    # None when both engines agree, otherwise why they do not.
+    disagreement: Optional[str]
+    passed: bool
+
+
+def error_keys(e: Optional[ValidationError]) -> Counter:
+    """The errors of a validation as a multiset of (loc, rule, message); the input value is left out."""
+    if e is None:
+        return Counter()
+    return Counter((tuple(err['loc']), error_rule(err), err['msg']) for err in e.errors(include_url=False))
+
+
+def model_errors(path: Path) -> Tuple[int, Counter]:
+    """Validate a CSV file with DiseaseReportDataset on its csv.DictReader rows."""
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.DictReader(f))
+    try:
+        DiseaseReportDataset.model_validate(rows)
+    except ValidationError as e:
+        return len(rows), error_keys(e)
+    return len(rows), Counter()
+
+
+def columnar_errors(path: Path) -> Counter:
+    """Validate a CSV file with the columnar engine."""
+    try:
+        validate_csv(path)
+    except ValidationError as e:
+        return error_keys(e)
+    return Counter()
+
+
+def stream_errors(path: Path) -> Counter:
+    """Validate a CSV file with the streaming engine."""
+    try:
+        validate_file(path, chunk_size=STREAM_CHUNK_SIZE)
+    except ValidationError as e:
+        return error_keys(e)
+    return Counter()
+
+
+def incremental_errors(path: Path, previous: Path) -> Counter:
+    """Validate a CSV file incrementally against a previously accepted one."""
+    try:
+        # the previous files are examples, which this check validates against the model too.
+        validate_file_incremental(path, previous, trust_previous=True)
+    except ValidationError as e:
+        return error_keys(e)
+    return Counter()
+
+
+def compare(name: str, path: Path, previous: Optional[Path] = None) -> Result:
+    n_rows, model = model_errors(path)
+    disagreements = []
+    engines = [('columnar', columnar_errors(path)), ('streaming', stream_errors(path))]
+    if previous is not None:
+        engines.append(('incremental', incremental_errors(path, previous)))
+    for engine, errors in engines:
+        if bool(model) != bool(errors):
+            disagreements.append(f"model {'rejects' if model else 'accepts'} the file, {engine} engine {'rejects' if errors else 'accepts'} it")
+        elif model != errors:
+            only_model = sorted(model - errors)[:3]
+            only_engine = sorted(errors - model)[:3]
+            disagreements.append(f"{engine} errors differ: model only {only_model}, {engine} only {only_engine}")
+    return Result(name, n_rows, '; '.join(disagreements) or None, not model)
+
+
+# ---- the files ----
+
+def read_lines(path: Path) -> List[List[str]]:
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        return list(csv.reader(f))
+
+
+def write_csv(path: Path, header: List[str], rows: List[List[Any]]) -> None:
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def mutated_examples(rng: random.Random, n: int) -> List[Tuple[str, Path, List[str], List[List[str]]]]:
+    """Copies of the example files with one field of one row set to a value of check_compiled_validator's pools."""
+    pools = value_pools()
+    files = []
+    for path in EXAMPLES:
+        header, *rows = read_lines(path)
+        for k in range(n):
+            mutated = [list(row) for row in rows]
+            i = rng.randrange(len(mutated))
+            name = rng.choice(header)
+            value = rng.choice(pools[name]) if name in pools else 'x'
+            if name == 'count' and rng.random() < 0.5:
+                # a valid count that breaks the count totals of its group.
+                value = str(int(mutated[i][header.index('count')]) + rng.randint(1, 3))
+            mutated[i][header.index(name)] = value
+            files.append((f"{path.name} mutation {k} (line {i + 2} {name}={value!r})", path, header, mutated))
+    return files
+
+
+def swapped_columns(header: List[str], rows: List[List[str]], a: str, b: str, values: bool) -> Tuple[List[str], List[List[str]]]:
+    """Swap two header names, and with values=True the values of the two columns with them."""
+    i, j = header.index(a), header.index(b)
+    header = list(header)
+    header[i], header[j] = header[j], header[i]
+    if values:
+        rows = [list(row) for row in rows]
+        for row in rows:
+            row[i], row[j] = row[j], row[i]
+    return header, rows
+
+
+def write_files(tmp: Path, seed: int, random_cases: int, mutations: int) -> List[Tuple[str, Path, Optional[Path]]]:
+    """The files to check, as (name, path, previously accepted file or None)."""
+    rng = random.Random(seed)
+    files = [(path.name, path, None) for path in EXAMPLES]
+
+    def add(name: str, header: List[str], rows: List[List[Any]], previous: Optional[Path] = None) -> None:
+        path = tmp / f"case_{len(files)}.csv"
+        write_csv(path, header, rows)
+        files.append((name, path, previous))
+
+    def add_blank_lines(name: str, path: Path) -> None:
+        text = path.read_text(encoding='utf-8-sig')
+        trailing = tmp / f"trailing_{len(files)}.csv"
+        trailing.write_text(text + '\n\n', encoding='utf-8')
+        files.append((f"{name} with trailing blank lines", trailing, None))
+        lines = text.splitlines(keepends=True)
+        blank = tmp / f"blank_{len(files)}.csv"
+        blank.write_text(''.join(line + ('\n' if i % 50 == 1 else '') for i, line in enumerate(lines)), encoding='utf-8')
+        files.append((f"{name} with blank lines between rows", blank, None))
+
+    for path in EXAMPLES:
+        add_blank_lines(path.name, path)
+
+    for name, example, header, rows in mutated_examples(rng, mutations):
+        add(name, header, rows, previous=example)
+
+    # resubmissions of the examples with their columns in another order.
+    for path in EXAMPLES:
+        header, *rows = read_lines(path)
+        add(f"{path.name} with disease_subtype and age_group swapped", *swapped_columns(header, rows, 'disease_subtype', 'age_group', True), previous=path)
+        add(f"{path.name} with the disease_subtype and age_group names swapped", *swapped_columns(header, rows, 'disease_subtype', 'age_group', False), previous=path)
+
+    # edge case rows with the full set of fields, a few hundred per file so that some files pass.
+    rows = [[row[name] for name in FIELD_NAMES] for row in edge_cases(seed, random_cases) if tuple(row) == FIELD_NAMES]
+    for start in range(0, len(rows), 250):
+        add(f"edge cases {start}-{start + 249}", FIELD_NAMES, rows[start:start + 250])
+
+    quoted = tmp / 'disease_tracking_report_MN-SYNTHETIC_quoted.csv'
+    write_quoted_csv(quoted, synthetic_rows(seed))
+    files.append(('synthetic rows with rule violations', quoted, None))
+    add_blank_lines('synthetic rows with rule violations', quoted)
+    mismatched = mismatched_rows(seed)
+    add('synthetic rows with count mismatches', FIELD_NAMES, mismatched)
+    add('synthetic rows of two states', FIELD_NAMES, mismatched + generate_submission('TX', latest_weeks(1, MMWRWeek(2026, 5)), seed).rows)
+
+    valid = generate_submission('MN', latest_weeks(2, MMWRWeek(2026, 5)), seed).rows
+    add('ragged rows', FIELD_NAMES, [row[:-2] if i % 7 == 3 else row + ['x'] if i % 7 == 5 else row for i, row in enumerate(valid)])
+    add('missing count column', list(FIELD_NAMES[:-1]), [row[:-1] for row in valid])
+    add('extra column', [*FIELD_NAMES, 'comment'], [row + [''] for row in valid])
+
+    return files
+
+
+def run_checks(seed: int = 0, random_cases: int = DEFAULT_RANDOM_CASES, mutations: int = DEFAULT_MUTATIONS) -> List[Result]:
+    with tempfile.TemporaryDirectory() as tmp:
+        return [compare(name, path, previous) for name, path, previous in write_files(Path(tmp), seed, random_cases, mutations)]
+
+
+def main():
+    """Main function to run the parity check."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seed', type=int, default=0, help='seed of the mutations and synthetic rows (default: 0)')
+    parser.add_argument('--random-cases', type=int, default=DEFAULT_RANDOM_CASES,
+                        help=f'random multi-field edge cases (default: {DEFAULT_RANDOM_CASES})')
+    parser.add_argument('--mutations', type=int, default=DEFAULT_MUTATIONS,
+                        help=f'mutated copies of each example file (default: {DEFAULT_MUTATIONS})')
+    args = parser.parse_args()
+
+    results = run_checks(args.seed, args.random_cases, args.mutations)
+    failed = [result for result in results if result.disagreement]
+    for result in failed:
+        print(f"✗ {result.name}: {result.disagreement}")
+
+    if failed:
+        print(f"\n✗ {len(failed)} of {len(results)} file(s) disagree")
+        sys.exit(1)
+    n_passed = sum(result.passed for result in results)
+    print(f"✓ The columnar, streaming and incremental engines agree with DiseaseReportDataset on {len(results)} files "
+          f"({sum(result.rows for result in results)} rows, {n_passed} files accepted)")
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Conformance suite of the compiled validator (data_reporting_validator.js).
+
+Runs the compiled validator under node and DiseaseReportDataset on the same
+rows, and checks that they agree:
+
+- field errors (types, enums, missing and extra fields) are the same, by field
+  and pydantic error type;
+- on rows whose fields are all valid, the compiled validator reports exactly
+  the rules that DiseaseReport's rule tables, geography registry and
+  check_report_period say the row breaks, so it accepts every row the model
+  accepts;
+- every rule DiseaseReport reports is also reported by the compiled
+  validator (the model stops at the first failing validator; the compiled
+  validator reports every rule).
+
+Every row rule is compared, the registry, report period and MMWR week rules
+included. The dataset-level rules
+(single_state and the count-totals reconciliation) are compared on the files
+DiseaseReportDataset accepts row by row: the compiled validator must report
+the same mismatch groups, or the same states.
+
+The rows are the example CSVs, synthetic submissions with rule violations
+(written with quoted fields, CRLF line endings and a byte order mark, and
+streamed in small chunks to exercise the CSV parser) or with count mismatches
+and a second state, and generated edge
+cases: every field of a few valid rows replaced by each value of a pool of
+valid, invalid and leniently spelled values, the cross product of the
+fields the cross-field rules read, missing and extra fields, and random
+multi-field mutations.
+"""
+
+import argparse
+import csv
+import json
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from columnar_validation import error_rule
+from compile_schema_validator import SCHEMA_PATH, VALIDATOR_PATH, build_outputs
+from data_reporting_schema import (
+    CountTotalsError,
+    AGE_GROUPS,
+    CONFIRMATION_STATUSES,
+    DATE_TYPES,
+    DISEASE_NAMES,
+    EXCLUSIVE_MINIMUMS,
+    FIELD_NAMES,
+    GEO_UNITS,
+    MENINGOCOCCUS_SUBTYPES,
+    OUTCOMES,
+    ROW_RULES,
+    STATES,
+    TIME_UNITS,
+    DiseaseReportDataset,
+    check_report_period,
+    geography,
+    registry_rules,
+)
+from mmwr_calendar import MMWRWeek
+from synthetic_submissions import generate_submission, latest_weeks
+from validate_schema_specs import load_schema
+
+REPO_DIR = Path(__file__).parent.parent
+EXAMPLES = sorted((REPO_DIR / 'examples-and-templates').glob('disease_tracking_report_*-EXAMPLE_*.csv'))
+DEFAULT_RANDOM_CASES = 5000
+# bytes per chunk the CSV parser is fed when streaming the synthetic files.
+SMALL_CHUNK = 61
+
+# pydantic error types of the same failure, as the compiled validator names them.
+ERROR_TYPES = {
+    'int_type': 'int_parsing',
+    'int_from_float': 'int_parsing',
+    'date_parsing': 'date_from_datetime_parsing',
+    'date_from_datetime_inexact': 'date_from_datetime_parsing',
+    'date_type': 'date_from_datetime_parsing',
+}
+
+# a valid MMWR week, spelled the ways DiseaseReport accepts a date and some it does not.
+WEEK_START, WEEK_END = '2026-02-01', '2026-02-07'
+_MIDNIGHT = int(datetime(2026, 2, 1, tzinfo=timezone.utc).timestamp())
+DATE_SPELLINGS = [
+    '2026-02-01T00:00:00', '2026-02-01 00:00', '2026-02-01t00:00:00Z', '2026-02-01T00:00:00+05:00',
+    '2026-02-01T00:00:00.000', '2026-02-01T00:00:00.0000001', '2026-02-01_00:00', '2026-02-01T00:00+0000',
+    str(_MIDNIGHT), f"{_MIDNIGHT}.0", str(_MIDNIGHT * 1000),
+    '2026-02-01T00:00:01', '2026-02-01T00:00:00.000001', '2026-02-01T00', '2026-02-01T00:00:00+24:00',
+    str(_MIDNIGHT + 1), '02/01/2026', '2026-2-1', '2026-02-30', '2024-02-29', '0000-01-01', ' 2026-02-01',
+    '2026-02-01 ', '', 'NA', '2026-W05',
+]
+# report period bounds around WEEK_START: other sundays and saturdays, weeks across MMWR years, and days between.
+PERIOD_DATES = ['2026-01-31', '2026-02-08', '2026-02-14', '2026-02-04', '2025-12-28', '2026-01-03', '2021-01-02', '2020-12-27']
+COUNT_SPELLINGS = [
+    '1', '5', ' 5', '5 ', '+5', '05', '5.0', '5.00', '1_0', '1_0.0', '\t5', ' 5', '5\n', ' 5', '\u00855',
+    '0', '-1', '-0', '+0', '0.0', '00', '', 'n/a', 'NA', '5.5', '5.', '.5', '1e3', '1__0', '_1', '1_', '0x10',
+    '٣', '﻿5', '5 .0', '99999999999999999999', 5, 0, -3, 5.0, 5.5,
+]
+# near misses of the enum values: case, spacing, 'NA' and other fields' values.
+NEAR_MISSES = [
+    '', ' ', 'NA', 'na', 'N/A', 'Total', 'TOTAL', ' total', 'total ', 'Measles', 'measles ', 'Cases',
+    'International Resident', 'international resident ', 'County', 'b', 'Q', 'adults', 'Nowhere County', 'XX',
+]
+
+
+class Case(NamedTuple):
+    # where the row comes from: 'edge case 12', or a CSV file and line.
+    source: str
+    row: Dict[str, Any]
+
+
+def _week_row(**values) -> Dict[str, Any]:
+    row = {
+        'report_period_start': WEEK_START, 'report_period_end': WEEK_END, 'date_type': 'cccd', 'time_unit': 'week',
+        'disease_name': 'measles', 'reporting_jurisdiction': 'MN', 'state': 'MN', 'geo_unit': 'state', 'geo_name': 'MN',
+        'age_group': '1-4 y', 'disease_subtype': 'total', 'confirmation_status': 'confirmed', 'outcome': 'cases', 'count': '3',
+    }
+    row.update(values)
+    return row
+
+
+def base_rows() -> List[Dict[str, Any]]:
+    """Valid rows of each kind: state age and subtype breakdowns, sub-state and international resident."""
+    county = sorted(geography.names('MN'))[0]
+    return [
+        _week_row(),
+        _week_row(disease_name='pertussis', confirmation_status='confirmed and probable', age_group='>=65 y'),
+        _week_row(disease_name='meningococcus', confirmation_status='confirmed and probable', age_group='total', disease_subtype='B'),
+        _week_row(disease_name='meningococcus', confirmation_status='confirmed and probable', age_group='unknown'),
+        _week_row(geo_unit='county', geo_name=county, age_group='total'),
+        _week_row(geo_unit='NA', geo_name='international resident', age_group='total', outcome='deaths'),
+        _week_row(state='TX', reporting_jurisdiction='TX', geo_unit='planning area', geo_name='Region 7', age_group='total'),
+    ]
+
+
+def value_pools() -> Dict[str, List[Any]]:
+    """Values each field is set to: every enum value of every field, near misses and lenient spellings."""
+    enum_values = list(dict.fromkeys(
+        DISEASE_NAMES + DATE_TYPES + TIME_UNITS + GEO_UNITS + AGE_GROUPS + CONFIRMATION_STATUSES + OUTCOMES + MENINGOCOCCUS_SUBTYPES
+    ))
+    names = enum_values + NEAR_MISSES + ['MN', 'WA', 'TX', 'international resident', sorted(geography.names('MN'))[1]]
+    pools = {name: names for name in FIELD_NAMES}
+    pools['state'] = list(STATES) + NEAR_MISSES + ['mn', 'Minnesota']
+    pools['report_period_start'] = [WEEK_START, WEEK_END] + PERIOD_DATES + DATE_SPELLINGS
+    pools['report_period_end'] = (
+        [WEEK_END, WEEK_START] + PERIOD_DATES + [spelling.replace('2026-02-01', WEEK_END) for spelling in DATE_SPELLINGS[:8]] + DATE_SPELLINGS
+    )
+    pools['count'] = COUNT_SPELLINGS
+    return pools
+
+
+def edge_cases(seed: int = 0, random_cases: int = DEFAULT_RANDOM_CASES) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    bases = base_rows()
+    pools = value_pools()
+    rows = list(bases)
+
+    # one field replaced.
+    for base in bases:
+        for name in FIELD_NAMES:
+            rows.extend({**base, name: value} for value in pools[name])
+
+    # the cross product of the fields the cross-field rules read.
+    county = sorted(geography.names('MN'))[0]
+    for disease_name in DISEASE_NAMES:
+        for confirmation_status in CONFIRMATION_STATUSES:
+            for geo_unit in GEO_UNITS:
+                for geo_name in ('MN', 'WA', county, 'international resident'):
+                    for reporting_jurisdiction in ('MN', 'WA', geo_name):
+                        for age_group in ('total', '1-4 y', 'unknown'):
+                            for disease_subtype in ('total', 'B', 'unknown', 'Q'):
+                                rows.append(_week_row(
+                                    disease_name=disease_name, confirmation_status=confirmation_status, geo_unit=geo_unit,
+                                    geo_name=geo_name, reporting_jurisdiction=reporting_jurisdiction, age_group=age_group,
+                                    disease_subtype=disease_subtype,
+                                ))
+
+    # missing and extra fields.
+    for base in bases[:3]:
+        for name in FIELD_NAMES:
+            rows.append({key: value for key, value in base.items() if key != name})
+        rows.append({**base, 'comment': 'x'})
+        rows.append({**base, 'Count': '1'})
+
+    # random multi-field mutations.
+    for _ in range(random_cases):
+        row = dict(rng.choice(bases))
+        for name in rng.sample(FIELD_NAMES, rng.randint(2, 4)):
+            row[name] = rng.choice(pools[name])
+        rows.append(row)
+
+    return rows
+
+
+def synthetic_rows(seed: int = 0) -> List[List[str]]:
+    """A synthetic MN submission with row-level rule violations of every kind in synthetic_submissions.ERROR_KINDS."""
+    return generate_submission('MN', latest_weeks(4, MMWRWeek(2026, 5)), seed, error_rate=0.3).rows
+
+
+def mismatched_rows(seed: int = 0) -> List[List[str]]:
+    """A valid synthetic MN submission with some counts changed, so that count-totals groups do not reconcile."""
+    rng = random.Random(seed)
+    rows = generate_submission('MN', latest_weeks(4, MMWRWeek(2026, 5)), seed).rows
+    for row in rng.sample(rows, 6):
+        row[FIELD_NAMES.index('count')] = str(int(row[FIELD_NAMES.index('count')]) + rng.randint(1, 3))
+    return rows
+
+
+def write_quoted_csv(path: Path, rows: List[List[str]]) -> None:
+    """A submission with every field quoted, CRLF line endings and a byte order mark."""
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL, lineterminator='\r\n')
+        writer.writerow(FIELD_NAMES)
+        writer.writerows(rows)
+
+
+def read_csv_rows(path: Path) -> List[Dict[str, Any]]:
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f))
+
+
+# ---- the two validators ----
+
+def node_command() -> Optional[str]:
+    return shutil.which('node') or shutil.which('nodejs')
+
+
+def compiled_row_errors(node: str, rows: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """The compiled validator's errors of each row (validateRow, through --ndjson)."""
+    completed = subprocess.run(
+        [node, str(VALIDATOR_PATH), '--ndjson'],
+        input=''.join(json.dumps(row) + '\n' for row in rows), capture_output=True, text=True, check=True,
+    )
+    return [json.loads(line) for line in completed.stdout.splitlines()]
+
+
+def compiled_file_errors(
+    node: str, path: Path, n_rows: int, chunk_bytes: Optional[int] = None
+) -> Tuple[List[List[Dict[str, Any]]], Set[Tuple[str, str]]]:
+    """
+    The compiled validator's errors of each row of a CSV file, streamed through the
+    CSV parser, and its dataset-level errors as (rule, value) pairs.
+    """
+    command = [node, str(VALIDATOR_PATH), '--json', '--max-samples', str(n_rows + 1)]
+    if chunk_bytes:
+        command += ['--chunk-bytes', str(chunk_bytes)]
+    completed = subprocess.run(command + [str(path)], capture_output=True, text=True)
+    if completed.returncode not in (0, 1):
+        raise RuntimeError(completed.stderr.strip())
+    result = json.loads(completed.stdout)['files'][0]
+    if result['rows'] != n_rows:
+        raise RuntimeError(f"{path.name}: node read {result['rows']} rows, csv.DictReader {n_rows}")
+    errors = [[] for _ in range(n_rows)]
+    dataset = set()
+    for group in result['errors']:
+        for sample in group['samples']:
+            if sample['line'] is None:
+                dataset.add((group['rule'], sample['value']))
+            else:
+                errors[sample['line'] - 2].append({'rule': group['rule'], 'field': group['field']})
+    return errors, dataset
+
+
+def model_row_errors(rows: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """DiseaseReportDataset's errors of each row, as {'rule', 'field'}; dataset-level errors are dropped."""
+    errors = [[] for _ in rows]
+    try:
+        DiseaseReportDataset.model_validate(rows)
+    except ValidationError as e:
+        for err in e.errors(include_url=False):
+            loc = err['loc']
+            if loc and isinstance(loc[0], int):
+                errors[loc[0]].append({'rule': error_rule(err), 'field': loc[1] if len(loc) > 1 else None})
+    return errors
+
+
+def model_dataset_errors(rows: List[Dict[str, Any]]) -> Set[Tuple[str, str]]:
+    """
+    DiseaseReportDataset's dataset-level errors of rows it accepts one by one, as
+    (rule, value) pairs named like the compiled validator's samples.
+    """
+    try:
+        DiseaseReportDataset.model_validate(rows)
+    except ValidationError as e:
+        for err in e.errors(include_url=False):
+            error = err.get('ctx', {}).get('error')
+            if isinstance(error, CountTotalsError):
+                return {
+                    ('count_totals', f"{m.report_period_start} to {m.report_period_end} | {m.disease_name} | {m.outcome}")
+                    for m in error.mismatches
+                }
+            if error_rule(err) == 'single_state':
+                return {('single_state', ', '.join(sorted({row['state'] for row in rows})))}
+    return set()
+
+
+# ---- comparison ----
+
+PERIOD_FIELDS = {'time_unit', 'report_period_start', 'report_period_end'}
+# the fields each cross-field rule reads.
+RULE_FIELDS = {
+    **{rule.rule_id: {*rule.when, rule.field, *rule.equals} for rule in ROW_RULES + registry_rules()},
+    'report_period_order': PERIOD_FIELDS,
+    'mmwr_week': PERIOD_FIELDS,
+}
+DATE_ADAPTER = TypeAdapter(date)
+
+
+def expected_rules(row: Dict[str, Any]) -> Set[str]:
+    """The rules a row whose fields are all valid breaks, according to DiseaseReport's rule tables and checks."""
+    broken = {rule.rule_id for rule in ROW_RULES + registry_rules() if rule.violated_by(row)}
+    for field_name, (minimum, rule_id) in EXCLUSIVE_MINIMUMS.items():
+        value = row[field_name]
+        number = int(str(value).strip().replace('_', '').split('.')[0]) if not isinstance(value, int) else value
+        if not number > minimum:
+            broken.add(rule_id)
+    period_rule = check_report_period(
+        row['time_unit'], DATE_ADAPTER.validate_python(row['report_period_start']), DATE_ADAPTER.validate_python(row['report_period_end'])
+    )
+    if period_rule is not None:
+        broken.add(period_rule)
+    return broken
+
+
+def disagreement(row: Dict[str, Any], model: List[dict], compiled: List[dict], rule_ids: Set[str]) -> Optional[str]:
+    """Why the two validators disagree on a row, or None if they agree."""
+    model_fields = {(ERROR_TYPES.get(err['rule'], err['rule']), err['field']) for err in model if err['rule'] not in rule_ids}
+    compiled_fields = {(err['rule'], err['field']) for err in compiled if err['rule'] not in rule_ids}
+    if model_fields != compiled_fields:
+        return f"field errors differ: model {sorted(model_fields)}, compiled {sorted(compiled_fields)}"
+
+    # the model also reports a rule on a row missing one of the fields it reads, the compiled validator only the missing field.
+    model_rules = {err['rule'] for err in model if err['rule'] in rule_ids and RULE_FIELDS.get(err['rule'], set()) <= row.keys()}
+    compiled_rules = {err['rule'] for err in compiled if err['rule'] in rule_ids}
+    if not model_fields:
+        expected = expected_rules(row)
+        if compiled_rules != expected:
+            return f"rules differ: expected {sorted(expected)}, compiled {sorted(compiled_rules)}"
+    if not model_rules <= compiled_rules:
+        return f"model rules {sorted(model_rules)} not all reported: compiled {sorted(compiled_rules)}"
+    if not model and compiled:
+        return f"model accepts the row, compiled rejects it: {sorted(compiled_rules | compiled_fields)}"
+    return None
+
+
+class Result(NamedTuple):
+    name: str
+    rows: int
+    valid: int
+    disagreements: List[Tuple[str, str, Dict[str, Any]]]
+
+
+def compare(name: str, cases: List[Case], model: List[list], compiled: List[list], rule_ids: Set[str]) -> Result:
+    disagreements = []
+    for case, model_errors, compiled_errors in zip(cases, model, compiled):
+        reason = disagreement(case.row, model_errors, compiled_errors, rule_ids)
+        if reason is not None:
+            disagreements.append((case.source, reason, case.row))
+    return Result(name, len(cases), sum(1 for errors in model if not errors), disagreements)
+
+
+def run_suite(node: str, seed: int = 0, random_cases: int = DEFAULT_RANDOM_CASES) -> List[Result]:
+    """Compare the two validators on the edge cases, the example CSVs and the synthetic files."""
+    schema = load_schema(SCHEMA_PATH)
+    rule_ids = set(schema.get('x-rules', {}))
+    results = []
+
+    rows = edge_cases(seed, random_cases)
+    cases = [Case(f"edge case {i}", row) for i, row in enumerate(rows)]
+    results.append(compare('edge cases', cases, model_row_errors(rows), compiled_row_errors(node, rows), rule_ids))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        quoted = Path(tmp) / 'disease_tracking_report_MN-SYNTHETIC_quoted.csv'
+        write_quoted_csv(quoted, synthetic_rows(seed))
+        mismatched = Path(tmp) / 'disease_tracking_report_MN-SYNTHETIC_mismatched.csv'
+        write_quoted_csv(mismatched, mismatched_rows(seed))
+        two_states = Path(tmp) / 'disease_tracking_report_MN-SYNTHETIC_two_states.csv'
+        write_quoted_csv(two_states, mismatched_rows(seed) + generate_submission('TX', latest_weeks(1, MMWRWeek(2026, 5)), seed).rows)
+        files = [(path, None) for path in EXAMPLES] + [(quoted, SMALL_CHUNK), (mismatched, None), (two_states, None)]
+        for path, chunk_bytes in files:
+            rows = read_csv_rows(path)
+            cases = [Case(f"{path.name} line {i + 2}", row) for i, row in enumerate(rows)]
+            compiled, compiled_dataset = compiled_file_errors(node, path, len(rows), chunk_bytes)
+            model = model_row_errors(rows)
+            result = compare(path.name, cases, model, compiled, rule_ids)
+            if not any(model):
+                model_dataset = model_dataset_errors(rows)
+                # the model stops at single_state; the compiled validator also reconciles the counts.
+                if any(rule == 'single_state' for rule, _ in model_dataset):
+                    compiled_dataset = {error for error in compiled_dataset if error[0] == 'single_state'}
+                if model_dataset != compiled_dataset:
+                    result.disagreements.append((
+                        f"{path.name} dataset", f"dataset errors differ: model {sorted(model_dataset)}, compiled {sorted(compiled_dataset)}", {}
+                    ))
+            results.append(result)
+
+    return results
+
+
+def main():
+    """Main function to run the conformance suite."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random edge cases and synthetic rows (default: 0)')
+    parser.add_argument('--random-cases', type=int, default=DEFAULT_RANDOM_CASES,
+                        help=f'random multi-field edge cases (default: {DEFAULT_RANDOM_CASES})')
+    parser.add_argument('--show', type=int, default=5, help='disagreements shown per row source (default: 5)')
+    args = parser.parse_args()
+
+    node = node_command()
+    if node is None:
+        print("✗ node is required to run the compiled validator")
+        sys.exit(2)
+
+    stale = [path for path, text in build_outputs().items() if path == VALIDATOR_PATH and path.read_text(encoding='utf-8') != text]
+    if stale:
+        print(f"✗ {VALIDATOR_PATH.name} is out of date; run scripts/compile_schema_validator.py")
+        sys.exit(1)
+
+    results = run_suite(node, args.seed, args.random_cases)
+    for result in results:
+        mark = '✗' if result.disagreements else '✓'
+        print(f"{mark} {result.name}: {result.rows - len(result.disagreements)}/{result.rows} rows agree "
+              f"({result.valid} accepted by DiseaseReportDataset)")
+        for source, reason, row in result.disagreements[:args.show]:
+            print(f"    {source}: {reason}\n        {json.dumps(row)}")
+
+    failed = sum(len(result.disagreements) for result in results)
+    if failed:
+        print(f"\n✗ {failed} row(s) disagree")
+        sys.exit(1)
+    print(f"\n✓ The compiled validator agrees with DiseaseReportDataset on {sum(result.rows for result in results)} rows")
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Columnar validation of disease tracking report files.
+
+Instead of building one DiseaseReport object per CSV row, this module runs the
+same row rules over whole columns at once. Rows that pass every columnar check
+are accepted without constructing a pydantic model. Rows that fail are
+re-validated with DiseaseReport, so the reported errors (messages, error types
+and row indices) are exactly the ones DiseaseReportDataset would raise. The
+dataset-level checks (single state, count totals) then run over the typed
+columns.
+"""
+
+import csv
+import re
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from pydantic import ValidationError
+
+# Add the examples-and-templates directory to the path so we can import the schema
+sys.path.insert(0, str(Path(__file__).parent.parent / 'examples-and-templates'))
+
+import data_reporting_schema
+from data_reporting_schema import (
+    ENUM_CODES,
+    FIELD_NAMES,
+    CountTotals,
+    CountTotalsError,
+    RuleViolation,
+    check_report_period,
+    check_row,
+    rule_message,
+)
+
+
+# strict YYYY-MM-DD; anything else is left to pydantic to accept or reject.
+DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+# columns the cross-field rules depend on, in check_row argument order.
+RULE_FIELDS = (
+    'disease_name', 'disease_subtype', 'state', 'geo_unit', 'geo_name',
+    'reporting_jurisdiction', 'age_group', 'confirmation_status',
+)
+
+
+# allowed values of the Literal fields of DiseaseReport, which are built from the same vocabularies.
+LITERAL_FIELDS = {field_name: frozenset(codes) for field_name, codes in ENUM_CODES.items()}
+
+
+def columns_from_rows(header: List[str], rows: List[List[str]]) -> Dict[Any, List[Optional[str]]]:
+    """
+    Transpose parsed CSV rows into a mapping of column name -> list of values.
+
+    Empty rows (blank lines) are skipped and ragged rows are padded with None
+    (and extra trailing values are kept under the None key), mirroring what
+    csv.DictReader would produce for each row.
+    """
+    if not all(rows):
+        rows = [row for row in rows if row]
+    width = len(header)
+    extras = None
+    if set(map(len, rows)) - {width}:
+        rows = list(rows)
+        for i, row in enumerate(rows):
+            if len(row) != width:
+                if len(row) > width:
+                    if extras is None:
+                        extras = [None] * len(rows)
+                    extras[i] = row[width:]
+                rows[i] = (row + [None] * width)[:width]
+
+    columns = {name: list(values) for name, values in zip(header, zip(*rows))} if rows else {name: [] for name in header}
+    if extras is not None:
+        columns[None] = extras
+
+    return columns
+
+
+def read_csv_columns(csv_path: Path) -> Dict[Any, List[Optional[str]]]:
+    """Read a submission CSV into a mapping of column name -> list of values."""
+    with open(csv_path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        return columns_from_rows(header, [row for row in reader if row])
+
+
+def _row_dict(columns: Dict[Any, List[Optional[str]]], i: int) -> Dict[Any, Any]:
+    """Rebuild the csv.DictReader-style dict for row i."""
+    row = {name: values[i] for name, values in columns.items() if name is not None}
+    extra = columns.get(None)
+    if extra is not None and extra[i] is not None:
+        row[None] = extra[i]
+
+    return row
+
+
+def _parse_date(v) -> Optional[date]:
+    if v is None or not DATE_PATTERN.fullmatch(v):
+        return None
+    try:
+        return date.fromisoformat(v)
+    except ValueError:
+        return None
+
+
+def _parse_count(v) -> Optional[int]:
+    if v is None or not (v.isascii() and v.isdigit()):
+        return None
+    count = int(v)
+    return count if count > 0 else None
+
+
+def _parse_column(values: list, parse):
+    """Parse each distinct value once. Returns (parsed column, {value: parsed})."""
+    parsed = {v: parse(v) for v in set(values)}
+    return [parsed[v] for v in values], parsed
+
+
+def _passing_rows(columns: Dict[Any, List[Optional[str]]], n_rows: int):
+    """
+    Run the DiseaseReport row rules column-wise.
+
+    Returns (mask, typed, checks). mask[i] is True when row i is certainly
+    valid; a False entry only means the row must be re-checked by the pydantic
+    model. typed holds the parsed date and count columns. checks maps each
+    checked column to {value: passed} and 'rules' to {rule column values:
+    violated rule id} and 'report_period' to {(time_unit, start, end): violated
+    rule id}, so the failure signature of a row is a few lookups.
+    """
+    if set(columns) != set(FIELD_NAMES):
+        # missing or extra columns: every row fails, let pydantic report why.
+        return [False] * n_rows, {}, None
+
+    checks = {}
+    typed = {}
+    parsed_values = {}
+    mask = [True] * n_rows
+
+    # dates and counts repeat heavily, so each distinct value is parsed once.
+    for name, parse in (('report_period_start', _parse_date), ('report_period_end', _parse_date), ('count', _parse_count)):
+        typed[name], parsed = _parse_column(columns[name], parse)
+        parsed_values[name] = parsed
+        checks[name] = {v: p is not None for v, p in parsed.items()}
+        mask = [ok and p is not None for ok, p in zip(mask, typed[name])]
+
+    # report period rules (order, MMWR week alignment), once per distinct period.
+    periods = list(zip(columns['time_unit'], columns['report_period_start'], columns['report_period_end']))
+    starts, ends = parsed_values['report_period_start'], parsed_values['report_period_end']
+    checks['report_period'] = period_rules = {
+        period: check_report_period(period[0], starts[period[1]], ends[period[2]])
+        if starts[period[1]] is not None and ends[period[2]] is not None else None
+        for period in set(periods)
+    }
+    mask = [ok and period_rules[period] is None for ok, period in zip(mask, periods)]
+
+    # enum fields.
+    for name, allowed in LITERAL_FIELDS.items():
+        checks[name] = passed = {v: v in allowed for v in set(columns[name])}
+        mask = [ok and passed[v] for ok, v in zip(mask, columns[name])]
+
+    # cross-field rules. a submission only has a few hundred distinct combinations of
+    # these columns, so each one is checked once against the compiled rule table.
+    combos = list(zip(*(columns[name] for name in RULE_FIELDS)))
+    checks['rules'] = rules = {combo: check_row(*combo) for combo in set(combos)}
+    mask = [ok and rules[combo] is None for ok, combo in zip(mask, combos)]
+
+    return mask, typed, checks
+
+
+def _failure_signature(columns: Dict[Any, List[Optional[str]]], checks: Optional[dict], i: int) -> tuple:
+    """
+    Everything the pydantic errors of a failing row depend on: the columns that
+    failed their columnar check with their values, the values of the rule
+    columns, and the report period if it broke a period rule. Rows with the same
+    signature fail with the same rules and fields.
+    """
+    if checks is None:
+        return ('columns',)
+
+    failed = tuple(
+        (name, columns[name][i]) for name, passed in checks.items()
+        if name not in ('rules', 'report_period') and not passed[columns[name][i]]
+    )
+    period = (columns['time_unit'][i], columns['report_period_start'][i], columns['report_period_end'][i])
+    if checks['report_period'][period] is None:
+        period = None
+
+    return failed, tuple(columns[name][i] for name in RULE_FIELDS), period
+
+
+VALIDATION_MODES = ('collect_all', 'capped', 'fail_fast')
+DEFAULT_MAX_ERRORS_PER_RULE = 100
+# failure signatures remembered in 'capped' mode; rows with further signatures are re-validated.
+MAX_SIGNATURES = 10000
+
+
+def error_rule(err: Dict[str, Any]) -> str:
+    """Rule id of a pydantic error: the DiseaseReport rule id, or the pydantic error type."""
+    error = err.get('ctx', {}).get('error')
+    return getattr(error, 'rule_id', None) or err['type']
+
+
+def error_field(err: Dict[str, Any]) -> Optional[str]:
+    """Field of a dataset line error (loc is (row, field, ...)), or None for row/dataset-level errors."""
+    loc = err['loc']
+    return loc[1] if len(loc) > 1 else None
+
+
+class ErrorCollector:
+    """
+    Collects row and dataset errors according to a validation mode:
+
+    - 'collect_all': keep every error, as DiseaseReportDataset does.
+    - 'capped': keep at most max_errors_per_rule errors per (rule, field). Once
+      max_errors_per_rule rows with the same failure signature (the failing
+      values and the rule columns) have been re-validated with pydantic,
+      further rows with that signature are counted against the same rules
+      without being re-validated (see skipped_rows). At most MAX_SIGNATURES
+      signatures are remembered; rows with others are always re-validated.
+    - 'fail_fast': stop at the first failing row.
+
+    A count-totals error lists every mismatch in 'collect_all' mode, the first
+    max_errors_per_rule in 'capped' mode and the first one in 'fail_fast' mode
+    (see mismatch_limit).
+    """
+
+    def __init__(self, mode: str = 'collect_all', max_errors_per_rule: int = DEFAULT_MAX_ERRORS_PER_RULE):
+        if mode not in VALIDATION_MODES:
+            raise ValueError(f"mode must be one of {VALIDATION_MODES}. got: {mode!r}")
+        self.mode = mode
+        self.max_errors_per_rule = max_errors_per_rule
+        self.line_errors = []
+        self.counts = {}
+        self.samples = {}
+        self.stopped = False
+        self.skipped_rows = 0
+        # signature -> [rows re-validated, (rule, field) keys those rows produced]
+        self._signatures = {}
+        # row index -> physical CSV line (the header is line 1) of the rows with a kept
+        # error, when the reader records line numbers (see StreamingValidator.feed).
+        self.lines: Dict[int, int] = {}
+
+    @property
+    def has_errors(self) -> bool:
+        return bool(self.counts)
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def mismatch_limit(self) -> Optional[int]:
+        """Count mismatches listed in a count_totals error message, or None for all of them."""
+        if self.mode == 'collect_all':
+            return None
+        return 1 if self.mode == 'fail_fast' else self.max_errors_per_rule
+
+    def should_validate(self, signature: tuple) -> bool:
+        """False when a failing row with this signature can be counted without re-validating it."""
+        if self.mode != 'capped':
+            return True
+        seen = self._signatures.get(signature)
+        return seen is None or seen[0] < self.max_errors_per_rule
+
+    def skip_row(self, row_index: int, signature: tuple) -> None:
+        """Count a failing row that was not re-validated against its signature's rules."""
+        self.skipped_rows += 1
+        for key in self._signatures[signature][1]:
+            self.counts[key] += 1
+
+    def add(self, errors: List[Dict[str, Any]], row_index: int = None, signature: tuple = None) -> None:
+        """Record the pydantic errors of one failing row (or of a dataset-level check)."""
+        keys = []
+        for err in errors:
+            key = (error_rule(err), error_field(err))
+            keys.append(key)
+            count = self.counts.get(key, 0)
+            self.counts[key] = count + 1
+            if self.mode == 'collect_all' or count < self.max_errors_per_rule:
+                self.line_errors.append(err)
+                if row_index is not None:
+                    self.samples.setdefault(key, []).append(row_index)
+
+        if signature is not None:
+            seen = self._signatures.get(signature)
+            if seen is None and len(self._signatures) < MAX_SIGNATURES:
+                seen = self._signatures[signature] = [0, []]
+            if seen is not None:
+                seen[0] += 1
+                seen[1] = list(dict.fromkeys(seen[1] + keys))
+
+        if self.mode == 'fail_fast' and errors:
+            self.stopped = True
+
+    def add_dataset_error(self, error: ValueError, input_value: Any) -> None:
+        self.add([{'type': 'value_error', 'loc': (), 'input': input_value, 'ctx': {'error': error}}])
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Errors grouped by rule and field, most frequent first, with sample row indices."""
+        return [
+            {'rule': rule, 'field': field, 'count': count, 'sample_rows': self.samples.get((rule, field), [])}
+            for (rule, field), count in sorted(self.counts.items(), key=lambda item: -item[1])
+        ]
+
+    def validation_error(self) -> ValidationError:
+        """The collected errors as a pydantic ValidationError."""
+        return ValidationError.from_exception_data('DiseaseReportDataset', self.line_errors)
+
+
+def single_state_error(states) -> Optional[RuleViolation]:
+    """Columnar equivalent of DiseaseReportDataset.validate_single_state."""
+    distinct = set(states)
+    if len(distinct) > 1:
+        return RuleViolation("single_state", rule_message("single_state", states = sorted(distinct)))
+
+    return None
+
+
+def validate_rows(
+    columns: Dict[Any, List[Optional[str]]],
+    collector: ErrorCollector,
+    row_offset: int = 0,
+    row_indices: List[int] = None,
+) -> Dict[str, list]:
+    """
+    Run the row rules over a block of columns.
+
+    Returns the typed columns (dates as datetime.date, counts as int). The
+    pydantic errors of failing rows go to collector, with row indices shifted
+    by row_offset, or taken from row_indices when the block is a selection of
+    rows of a larger file. Entries of typed for failed rows are left as raw
+    values.
+    """
+    n_rows = max((len(values) for values in columns.values()), default=0)
+    mask, typed_dates_counts, checks = _passing_rows(columns, n_rows)
+
+    typed = {name: list(columns.get(name, [None] * n_rows)) for name in FIELD_NAMES}
+    typed.update(typed_dates_counts)
+
+    for i, ok in enumerate(mask):
+        if ok:
+            continue
+        if collector.stopped:
+            break
+        row_index = row_indices[i] if row_indices is not None else row_offset + i
+
+        signature = _failure_signature(columns, checks, i) if collector.mode == 'capped' else None
+        if signature is not None and not collector.should_validate(signature):
+            collector.skip_row(row_index, signature)
+            continue
+
+        # fall back to the pydantic model for rows the columnar checks could not accept.
+        # the model is only built once a row fails (see data_reporting_schema.__getattr__).
+        try:
+            report = data_reporting_schema.DiseaseReport.model_validate(_row_dict(columns, i))
+        except ValidationError as e:
+            line_errors = []
+            for err in e.errors():
+                line_error = {'type': err['type'], 'loc': (row_index, *err['loc']), 'input': err['input']}
+                if 'ctx' in err:
+                    line_error['ctx'] = err['ctx']
+                line_errors.append(line_error)
+            collector.add(line_errors, row_index=row_index, signature=signature)
+            continue
+        for name in FIELD_NAMES:
+            typed[name][i] = getattr(report, name)
+
+    return typed
+
+
+def validate_columns(
+    columns: Dict[Any, List[Optional[str]]],
+    mode: str = 'collect_all',
+    max_errors_per_rule: int = DEFAULT_MAX_ERRORS_PER_RULE,
+    collector: ErrorCollector = None,
+) -> Dict[str, list]:
+    """
+    Validate a submission given as columns of raw string values.
+
+    Returns the typed columns on success. On failure raises a pydantic
+    ValidationError; in 'collect_all' mode it has the same row indices and
+    messages as DiseaseReportDataset.model_validate would give for the
+    equivalent list of row dicts. Pass a collector to inspect its summary()
+    after a failure.
+    """
+    if collector is None:
+        collector = ErrorCollector(mode, max_errors_per_rule)
+
+    typed = validate_rows(columns, collector)
+    if collector.has_errors:
+        raise collector.validation_error()
+
+    # dataset-level checks only run once every row is valid, as in pydantic.
+    error = single_state_error(typed['state'])
+    if error is None:
+        count_totals = CountTotals()
+        count_totals.add_columns(typed)
+        try:
+            count_totals.check(limit=collector.mismatch_limit)
+        except CountTotalsError as e:
+            error = e
+    if error is not None:
+        collector.add_dataset_error(error, columns)
+        raise collector.validation_error()
+
+    return typed
+
+
+def validate_csv(csv_path: Path) -> Dict[str, list]:
+    """Read and validate a submission CSV using the columnar engine."""
+    return validate_columns(read_csv_columns(csv_path))
+
+
+def main():
+    """Validate the CSV files given on the command line."""
+    if len(sys.argv) < 2:
+        print("Usage: python3 scripts/columnar_validation.py FILE.csv [FILE.csv ...]")
+        sys.exit(2)
+
+    all_passed = True
+    for arg in sys.argv[1:]:
+        try:
+            typed = validate_csv(Path(arg))
+        except ValidationError as e:
+            print(f"✗ FAIL: {arg}")
+            print(e)
+            all_passed = False
+            continue
+        print(f"✓ PASS: {arg} ({len(typed['count'])} rows)")
+
+    sys.exit(0 if all_passed else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Compact, memory-mappable storage of validated disease tracking report rows.
+
+A pydantic DiseaseReport holds 14 attributes per row, most of them repeated
+strings, which costs hundreds of bytes per row. A compact dataset file stores
+one fixed-width column per field instead:
+
+    enum fields (DiseaseReport Literal fields)   uint8 codes from ENUM_CODES
+    disease_subtype, reporting_jurisdiction,     uint16/uint32 codes into a
+    geo_name                                     per-file dictionary
+    report_period_start, report_period_end       int32 days since 1970-01-01
+    count                                        int64
+
+about 30 bytes per row. The file is opened with mmap, so columns are read from
+the page cache on demand, and DiseaseReport objects are only built (without
+re-validation) for the rows a caller asks for.
+
+File layout (little-endian): 8-byte magic, uint32 length of a JSON header,
+the JSON header (row count, vocabularies, column offsets and formats), then
+each column, aligned to 8 bytes.
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from columnar_validation import FIELD_NAMES, LITERAL_FIELDS, read_csv_columns, validate_columns
+import data_reporting_schema
+from data_reporting_schema import ENUM_CODES
+
+MAGIC = b'USDTCDS1'
+MAX_COUNT = 2 ** 63 - 1
+EPOCH = date(1970, 1, 1).toordinal()
+
+DATE_FIELDS = ('report_period_start', 'report_period_end')
+ENUM_FIELDS = tuple(name for name in FIELD_NAMES if name in LITERAL_FIELDS)
+DICTIONARY_FIELDS = tuple(name for name in FIELD_NAMES if name not in LITERAL_FIELDS and name not in DATE_FIELDS and name != 'count')
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) // 8 * 8
+
+
+def _encode(typed: Dict[str, list]) -> tuple:
+    """Integer code columns and vocabularies of typed columns."""
+    vocabularies = {name: list(ENUM_CODES[name]) for name in ENUM_FIELDS}
+    codes = {}
+    for name in ENUM_FIELDS:
+        code_of = ENUM_CODES[name]
+        codes[name] = ('B', [code_of[v] for v in typed[name]])
+    for name in DICTIONARY_FIELDS:
+        code_of = {}
+        column = [code_of.setdefault(v, len(code_of)) for v in typed[name]]
+        vocabularies[name] = list(code_of)
+        codes[name] = ('H' if len(code_of) <= 0xFFFF else 'I', column)
+    for name in DATE_FIELDS:
+        days = {d: d.toordinal() - EPOCH for d in set(typed[name])}
+        codes[name] = ('i', [days[d] for d in typed[name]])
+    # int64: a count is only bounded below, and int32 would overflow on large aggregates.
+    largest = max(typed['count'], default=0)
+    if largest > MAX_COUNT:
+        raise ValueError(f"count {largest} does not fit the int64 count column (at most {MAX_COUNT})")
+    codes['count'] = ('q', typed['count'])
+
+    return codes, vocabularies
+
+
+class CompactDataset:
+    """
+    Read-only, memory-mapped view of a compact dataset file.
+
+    len(dataset), dataset[i] (a DiseaseReport, built on access) and iteration
+    work like a list of reports; codes(name) exposes a column's raw integer
+    codes as a memoryview and column(name) decodes a whole column.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._codes = {}
+        self._view = None
+        self._mmap = None
+        self._file = open(self.path, 'rb')
+        try:
+            self._open()
+        except (ValueError, TypeError, KeyError, struct.error) as e:
+            # an empty, truncated or corrupt file; release what was opened.
+            self.close()
+            raise ValueError(f"{self.path}: not a compact dataset file ({e})") from e
+        except BaseException:
+            self.close()
+            raise
+
+    def _open(self) -> None:
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError("wrong magic number")
+        (header_size,) = struct.unpack_from('<I', self._mmap, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self._mmap[start:start + header_size])
+
+        self.n_rows = header['rows']
+        self.vocabularies: Dict[str, List[str]] = header['vocabularies']
+        self._view = memoryview(self._mmap)
+        for name, (fmt, offset) in header['columns'].items():
+            size = struct.calcsize(fmt) * self.n_rows
+            column = self._view[offset:offset + size].cast(fmt)
+            self._codes[name] = column
+            if len(column) != self.n_rows:
+                raise ValueError(f"column {name} is truncated")
+            if sys.byteorder != 'little':
+                self._codes[name] = memoryview(_byteswapped(column, fmt))
+                column.release()
+
+    @staticmethod
+    def write(path: Path, typed: Dict[str, list]) -> int:
+        """Write validated typed columns (see validate_columns) as a compact dataset. Returns the row count."""
+        codes, vocabularies = _encode(typed)
+        n_rows = len(typed['count'])
+
+        columns = {}
+        header = {'rows': n_rows, 'vocabularies': vocabularies, 'columns': columns}
+        # column offsets depend on the header size, which depends on the offsets; offsets
+        # are padded to a fixed width so one pass suffices.
+        for name, (fmt, _) in codes.items():
+            columns[name] = [fmt, 0]
+        header_size = len(json.dumps(header).encode()) + len(codes) * 12
+        offset = _align(len(MAGIC) + 4 + header_size)
+        for name, (fmt, values) in codes.items():
+            columns[name] = [fmt, offset]
+            offset = _align(offset + struct.calcsize(fmt) * n_rows)
+        header_bytes = json.dumps(header).encode().ljust(header_size)
+
+        with open(path, 'wb') as f:
+            f.write(MAGIC + struct.pack('<I', header_size) + header_bytes)
+            for name, (fmt, values) in codes.items():
+                f.seek(columns[name][1])
+                column = array(fmt, values)
+                if sys.byteorder != 'little':
+                    column.byteswap()
+                f.write(memoryview(column))
+            f.truncate(offset)
+
+        return n_rows
+
+    @classmethod
+    def from_csv(cls, csv_path: Path, path: Path) -> 'CompactDataset':
+        """Validate a submission CSV, write it as a compact dataset, and open it."""
+        cls.write(path, validate_columns(read_csv_columns(csv_path)))
+        return cls(path)
+
+    def close(self) -> None:
+        # the mmap can only be closed once no memoryview of it is left.
+        for column in self._codes.values():
+            column.release()
+        self._codes = {}
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def codes(self, name: str) -> memoryview:
+        """Raw integer codes of a column: vocabulary indices, days since 1970-01-01, or counts."""
+        return self._codes[name]
+
+    def _decode(self, name: str, code: int) -> Any:
+        if name in DATE_FIELDS:
+            return date.fromordinal(code + EPOCH)
+        if name == 'count':
+            return code
+        return self.vocabularies[name][code]
+
+    def column(self, name: str) -> list:
+        """Decoded values of a whole column."""
+        codes = self._codes[name]
+        if name == 'count':
+            return codes.tolist()
+        if name in DATE_FIELDS:
+            return [date.fromordinal(code + EPOCH) for code in codes]
+        vocabulary = self.vocabularies[name]
+        return [vocabulary[code] for code in codes]
+
+    def row(self, i: int) -> Dict[str, Any]:
+        if not -self.n_rows <= i < self.n_rows:
+            raise IndexError(i)
+        return {name: self._decode(name, self._codes[name][i]) for name in FIELD_NAMES}
+
+    def __getitem__(self, i: int) -> 'data_reporting_schema.DiseaseReport':
+        # rows were validated before they were written, so the model is built without re-validation.
+        # the model itself is only built on first access (see data_reporting_schema.__getattr__).
+        return data_reporting_schema.DiseaseReport.model_construct(**self.row(i))
+
+    def __iter__(self) -> Iterator['data_reporting_schema.DiseaseReport']:
+        for i in range(self.n_rows):
+            yield self[i]
+
+    def select(self, **values) -> List[int]:
+        """Indices of the rows whose columns equal the given values, compared as codes."""
+        selected = range(self.n_rows)
+        for name, value in values.items():
+            if name in DATE_FIELDS:
+                code = value.toordinal() - EPOCH
+            elif name == 'count':
+                code = value
+            else:
+                try:
+                    code = self.vocabularies[name].index(value)
+                except ValueError:
+                    return []
+            codes = self._codes[name]
+            selected = [i for i in selected if codes[i] == code]
+
+        return list(selected)
+
+
+def _byteswapped(column: memoryview, fmt: str) -> array:
+    values = array(fmt, column.tobytes())
+    values.byteswap()
+    return values
+
+
+def main():
+    """Convert submission CSVs to compact dataset files (FILE.csv -> FILE.cds)."""
+    if len(sys.argv) < 2:
+        print("Usage: python3 scripts/compact_dataset.py FILE.csv [FILE.csv ...]")
+        sys.exit(2)
+
+    for arg in sys.argv[1:]:
+        csv_path = Path(arg)
+        path = csv_path.with_suffix('.cds')
+        with CompactDataset.from_csv(csv_path, path) as dataset:
+            print(f"✓ Wrote {path} ({len(dataset)} rows, {path.stat().st_size} bytes; CSV {csv_path.stat().st_size} bytes)")
+
+
+if __name__ == '__main__':
+    main()
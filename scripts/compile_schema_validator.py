@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Compile data_reporting_schema.yaml into a specialized JavaScript row validator.
+
+Interpreting the JSON Schema for every row of a submission (walking allOf,
+evaluating each if/then, comparing enum lists) is slow. This script does that
+work once, at build time:
+
+- every enum (and const) becomes a precompiled Set, shared by all the
+  keywords that list the same values;
+- the if/then conditionals are flattened into straight-line tests, grouped
+  by condition so rules that share one are tested under a single branch; an
+  anyOf of const-only branches (a field that must equal another) becomes one
+  lookup in a Set of joined values, and an anyOf of {"$data": "1/field"}
+  consts (ajv's relative JSON pointers) a comparison with those fields;
+- type, format and minimum keywords become direct checks of the CSV cell,
+  coerced the way DiseaseReport coerces it.
+
+The checks are written into schema_validator_template.js, which adds the CSV
+parser, error summaries and a node command line, giving
+examples-and-templates/data_reporting_validator.js. It runs in node (the
+portal edge) and in the browser, so the same code is also embedded in both
+copies of the data standards tool page. A keyword the compiler does not
+support fails the build instead of being skipped.
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import yaml
+
+SCRIPT_DIR = Path(__file__).parent
+REPO_DIR = SCRIPT_DIR.parent
+SCHEMA_PATH = REPO_DIR / 'examples-and-templates' / 'data_reporting_schema.yaml'
+TEMPLATE_PATH = SCRIPT_DIR / 'schema_validator_template.js'
+VALIDATOR_PATH = REPO_DIR / 'examples-and-templates' / 'data_reporting_validator.js'
+TOOL_PAGES = [
+    REPO_DIR / 'data_standards_tool' / 'data-standards-tool.html',
+    REPO_DIR / 'docs' / 'data-standards-tool.html',
+]
+
+# the <script> element of a tool page that holds the compiled validator.
+EMBED_PATTERN = re.compile(r'(<script id="data-reporting-validator">\n)(.*?)(\n\s*</script>)', re.DOTALL)
+
+# keywords the compiler understands, by schema location; 'description' and x-* annotations are ignored.
+SCHEMA_KEYWORDS = {'$schema', 'title', 'type', 'items'}
+ITEMS_KEYWORDS = {'type', 'properties', 'required', 'additionalProperties', 'allOf'}
+PROPERTY_KEYWORDS = {'type', 'format', 'enum', 'const', 'exclusiveMinimum', 'minimum', 'exclusiveMaximum', 'maximum'}
+CONDITIONAL_KEYWORDS = {'if', 'then', 'properties', 'anyOf'}
+FORMATS = {'date': 'parseDate'}
+TYPES = ('string', 'integer')
+
+# the pydantic error type DiseaseReport reports for the same failure, so the compiled
+# validator's errors group like those of error_report.py.
+KEYWORD_ERRORS = {
+    'required': 'missing',
+    'additionalProperties': 'extra_forbidden',
+    'string': 'string_type',
+    'integer': 'int_parsing',
+    'enum': 'literal_error',
+    'date': 'date_from_datetime_parsing',
+}
+# JavaScript comparison that must hold for each bound keyword.
+BOUNDS = {'exclusiveMinimum': '>', 'minimum': '>=', 'exclusiveMaximum': '<', 'maximum': '<='}
+
+
+class SchemaCompileError(ValueError):
+    """The schema uses a keyword, type or layout the compiler does not support."""
+
+
+class PropertyCheck(NamedTuple):
+    name: str
+    type: str
+    format: Optional[str]
+    # allowed values, or None.
+    values: Optional[Tuple[Any, ...]]
+    # (keyword, bound, rule id) of each numeric bound.
+    bounds: Tuple[Tuple[str, Any, str], ...]
+
+
+class Conditional(NamedTuple):
+    rule_id: str
+    # (field, allowed values) pairs that must all hold for the rule to apply.
+    when: Tuple[Tuple[str, Tuple[Any, ...]], ...]
+    # the fields the rule constrains.
+    fields: Tuple[str, ...]
+    # (field, allowed values) pairs required of a row the rule applies to (without anyOf).
+    then: Tuple[Tuple[str, Tuple[Any, ...]], ...] = ()
+    # with an anyOf, the allowed combinations of the values of fields instead.
+    combinations: Tuple[Tuple[Any, ...], ...] = ()
+    # with an anyOf of $data consts, the fields the (single) field must equal one of instead.
+    equals: Tuple[str, ...] = ()
+
+
+class CompiledSchema(NamedTuple):
+    sha256: str
+    properties: Tuple[PropertyCheck, ...]
+    required: Tuple[str, ...]
+    additional_properties: bool
+    conditionals: Tuple[Conditional, ...]
+    # rule id -> message template (x-rules).
+    messages: Dict[str, str]
+
+
+def _check_keywords(node: Dict[str, Any], allowed: set, where: str) -> None:
+    for keyword in node:
+        if keyword not in allowed and keyword != 'description' and not keyword.startswith('x-'):
+            raise SchemaCompileError(f"unsupported keyword {keyword!r} in {where}")
+
+
+def _allowed_values(node: Dict[str, Any], where: str) -> Tuple[Any, ...]:
+    """The values of a {const: ...} or {enum: [...]} subschema."""
+    _check_keywords(node, {'const', 'enum'}, where)
+    if 'const' in node:
+        return (node['const'],)
+    if 'enum' in node:
+        return tuple(node['enum'])
+    raise SchemaCompileError(f"{where} must be a const or an enum")
+
+
+def _data_reference(node: Dict[str, Any], where: str) -> Optional[Tuple[str, str]]:
+    """(field, other field) of a {properties: {field: {const: {$data: '1/other'}}}} subschema, None for other subschemas."""
+    properties = node.get('properties')
+    if not isinstance(properties, dict) or len(properties) != 1:
+        return None
+    (name, subschema), = properties.items()
+    const = subschema.get('const') if isinstance(subschema, dict) else None
+    if not isinstance(const, dict) or '$data' not in const:
+        return None
+    _check_keywords(node, {'properties'}, where)
+    _check_keywords(subschema, {'const'}, f"{where}/properties/{name}")
+    pointer = const['$data']
+    if list(const) != ['$data'] or not isinstance(pointer, str) or not re.fullmatch(r'1/[^/~]+', pointer):
+        raise SchemaCompileError(f"{where}/properties/{name}: only {{$data: '1/field'}} references to a sibling field are supported")
+    return name, pointer[2:]
+
+
+def _value_constraints(node: Dict[str, Any], where: str) -> Tuple[Tuple[str, Tuple[Any, ...]], ...]:
+    """(field, allowed values) pairs of a {properties: {field: const/enum}} subschema."""
+    _check_keywords(node, {'properties'}, where)
+    return tuple(
+        (name, _allowed_values(subschema, f"{where}/properties/{name}"))
+        for name, subschema in node.get('properties', {}).items()
+    )
+
+
+def compile_property(name: str, node: Dict[str, Any]) -> PropertyCheck:
+    where = f"items/properties/{name}"
+    _check_keywords(node, PROPERTY_KEYWORDS, where)
+    if node.get('type') not in TYPES:
+        raise SchemaCompileError(f"{where} has type {node.get('type')!r}; supported types: {', '.join(TYPES)}")
+    if node.get('format') is not None and node['format'] not in FORMATS:
+        raise SchemaCompileError(f"{where} has format {node['format']!r}; supported formats: {', '.join(FORMATS)}")
+
+    values = None
+    if 'enum' in node or 'const' in node:
+        values = _allowed_values({key: node[key] for key in ('enum', 'const') if key in node}, where)
+    bounds = tuple(
+        (keyword, node[keyword], node.get('x-rule', keyword))
+        for keyword in BOUNDS if keyword in node
+    )
+    return PropertyCheck(name, node['type'], node.get('format'), values, bounds)
+
+
+def compile_conditional(i: int, node: Dict[str, Any]) -> Conditional:
+    rule_id = node.get('x-rule', f"allOf/{i}")
+    where = f"items/allOf/{i} ({rule_id})"
+    _check_keywords(node, CONDITIONAL_KEYWORDS, where)
+    if ('if' in node) != ('then' in node):
+        raise SchemaCompileError(f"{where} must have both if and then")
+
+    when = _value_constraints(node['if'], f"{where}/if") if 'if' in node else ()
+    then = node.get('then', {key: node[key] for key in ('properties', 'anyOf') if key in node})
+    _check_keywords(then, {'properties', 'anyOf'}, f"{where}/then")
+    if 'anyOf' not in then:
+        constraints = _value_constraints(then, f"{where}/then")
+        return Conditional(rule_id, when, tuple(name for name, _ in constraints), then=constraints)
+
+    if 'properties' in then:
+        raise SchemaCompileError(f"{where}/then must have either properties or anyOf")
+    references = [_data_reference(branch, f"{where}/then/anyOf/{k}") for k, branch in enumerate(then['anyOf'])]
+    if any(references):
+        if not all(references) or len({name for name, _ in references}) != 1:
+            raise SchemaCompileError(f"{where}/then/anyOf: every branch must be a $data const of the same field")
+        return Conditional(rule_id, when, (references[0][0],), equals=tuple(other for _, other in references))
+    branches = [_value_constraints(branch, f"{where}/then/anyOf/{k}") for k, branch in enumerate(then['anyOf'])]
+    fields = tuple(name for name, _ in branches[0])
+    combinations = []
+    for k, branch in enumerate(branches):
+        if tuple(sorted(name for name, _ in branch)) != tuple(sorted(fields)):
+            raise SchemaCompileError(f"{where}/then/anyOf/{k} must constrain the same fields as the first branch")
+        allowed = dict(branch)
+        combinations.extend(itertools.product(*(allowed[name] for name in fields)))
+    return Conditional(rule_id, when, fields, combinations=tuple(dict.fromkeys(combinations)))
+
+
+def compile_schema(schema: Dict[str, Any], sha256: str = '') -> CompiledSchema:
+    """Check that the schema only uses supported keywords and flatten it into checks."""
+    _check_keywords(schema, SCHEMA_KEYWORDS, 'the schema')
+    items = schema.get('items')
+    if schema.get('type') != 'array' or not isinstance(items, dict) or items.get('type') != 'object':
+        raise SchemaCompileError("the schema must be an array of objects")
+    _check_keywords(items, ITEMS_KEYWORDS, 'items')
+
+    properties = tuple(compile_property(name, node) for name, node in items.get('properties', {}).items())
+    names = {check.name for check in properties}
+    required = tuple(items.get('required', []))
+    conditionals = tuple(compile_conditional(i, node) for i, node in enumerate(items.get('allOf', [])))
+    for conditional in conditionals:
+        unknown = [name for name, _ in conditional.when + conditional.then if name not in names]
+        unknown += [name for name in conditional.fields + conditional.equals if name not in names]
+        if unknown:
+            raise SchemaCompileError(f"{conditional.rule_id} constrains unknown field(s): {', '.join(unknown)}")
+    unknown = [name for name in required if name not in names]
+    if unknown:
+        raise SchemaCompileError(f"required field(s) without a property: {', '.join(unknown)}")
+
+    messages = {rule_id: rule['message'] for rule_id, rule in schema.get('x-rules', {}).items()}
+    return CompiledSchema(sha256, properties, required, items.get('additionalProperties', True) is not False, conditionals, messages)
+
+
+def load_compiled(schema_path: Path = SCHEMA_PATH) -> CompiledSchema:
+    text = Path(schema_path).read_bytes()
+    schema = yaml.load(text, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+    return compile_schema(schema, hashlib.sha256(text).hexdigest())
+
+
+class _Constants:
+    """Value Sets (and anyOf branches) of the generated code, one per distinct list of values."""
+
+    def __init__(self):
+        self.sets: Dict[Tuple[Any, ...], str] = {}
+        self.lines: List[str] = []
+
+    def value_set(self, values: Tuple[Any, ...]) -> str:
+        key = tuple(sorted(set(map(json.dumps, values))))
+        if key not in self.sets:
+            name = self.sets[key] = f"V{len(self.sets)}"
+            self.lines.append(f"const {name} = new Set([{', '.join(json.dumps(value) for value in values)}]);")
+        return self.sets[key]
+
+    def combinations(self, rule_id: str, combinations: Tuple[Tuple[Any, ...], ...], k: int) -> Tuple[str, str]:
+        joined = ', '.join(json.dumps('\u001f'.join(map(str, combination))) for combination in combinations)
+        branches = ', '.join(json.dumps(list(combination)) for combination in combinations)
+        self.lines.append(f"// {rule_id}: the allowed combinations, joined with SEP, and as branches.")
+        self.lines.append(f"const T{k} = new Set([{joined}]);")
+        self.lines.append(f"const B{k} = [{branches}];")
+        return f"T{k}", f"B{k}"
+
+
+def _membership(variable: str, values: Tuple[Any, ...], constants: _Constants) -> str:
+    """JavaScript test that a value is absent (so unconstrained, as in JSON Schema) or one of values."""
+    if len(values) == 1:
+        return f"{variable} === undefined || {variable} === {json.dumps(values[0])}"
+    return f"{variable} === undefined || {constants.value_set(values)}.has({variable})"
+
+
+def _all(tests: List[str]) -> str:
+    return tests[0] if len(tests) == 1 else ' && '.join(f"({test})" for test in tests)
+
+
+def _property_lines(check: PropertyCheck, variable: str, required: bool, constants: _Constants) -> List[str]:
+    field = json.dumps(check.name)
+
+    def fail(rule_id: str) -> str:
+        return f"fail(errors, line, {json.dumps(rule_id)}, {field}, {variable});"
+
+    if check.values is not None:
+        invalid, error = f"!{constants.value_set(check.values)}.has({variable})", KEYWORD_ERRORS['enum']
+    elif check.format is not None:
+        invalid, error = f"{FORMATS[check.format]}({variable}) === null", KEYWORD_ERRORS[check.format]
+    elif check.type == 'string':
+        invalid, error = f"typeof {variable} !== 'string'", KEYWORD_ERRORS['string']
+    else:
+        invalid = error = None
+
+    # an absent field is missing if required, and otherwise not checked.
+    lines = [f"if ({variable} === undefined) {fail(KEYWORD_ERRORS['required'])}"] if required else []
+    if invalid is not None:
+        condition = f"else if ({invalid})" if required else f"if ({variable} !== undefined && {invalid})"
+        lines.append(f"{condition} {fail(error)}")
+        return lines
+
+    number = f"{variable}_number"
+    lines.append("else {" if required else f"if ({variable} !== undefined) {{")
+    lines.append(f"    const {number} = parseInteger({variable});")
+    lines.append(f"    if ({number} === null) {fail(KEYWORD_ERRORS['integer'])}")
+    for keyword, bound, rule_id in check.bounds:
+        lines.append(f"    else if (!({number} {BOUNDS[keyword]} {json.dumps(bound)})) {fail(rule_id)}")
+    lines.append("}")
+    return lines
+
+
+def render_checks(compiled: CompiledSchema) -> str:
+    """The generated constants and checkRow(row, c, errors, line) function."""
+    constants = _Constants()
+    variables = {}
+    for i, check in enumerate(compiled.properties):
+        variable = re.sub(r'\W', '_', check.name)
+        variables[check.name] = variable if variable.isidentifier() and variable not in variables.values() else f"v{i}"
+
+    body = [f"const {variables[check.name]} = row[c[{i}]];" for i, check in enumerate(compiled.properties)]
+    body.append("")
+    body.append("// properties: type, enum, format and bounds.")
+    for check in compiled.properties:
+        body.extend(_property_lines(check, variables[check.name], check.name in compiled.required, constants))
+
+    # conditionals with the same condition are tested under one branch, in schema order.
+    groups: Dict[tuple, List[Conditional]] = {}
+    for conditional in compiled.conditionals:
+        groups.setdefault(conditional.when, []).append(conditional)
+    body.append("")
+    body.append("// conditionals (allOf), grouped by condition.")
+    tuples = 0
+    for when, conditionals in groups.items():
+        tests = []
+        for conditional in conditionals:
+            field = json.dumps(', '.join(conditional.fields))
+            if conditional.combinations:
+                values = [variables[name] for name in conditional.fields]
+                strings = all(isinstance(value, str) for combination in conditional.combinations for value in combination)
+                key_set, branches = constants.combinations(conditional.rule_id, conditional.combinations, tuples)
+                tuples += 1
+                fast = ' && '.join(f"typeof {value} === 'string'" if strings else f"{value} !== undefined" for value in values)
+                test = f"{fast} ? {key_set}.has({' + SEP + '.join(values)}) : matchesBranch({branches}, [{', '.join(values)}])"
+                value = f"[{', '.join(values)}].join(', ')"
+            elif conditional.equals:
+                # an absent field, or an absent field it refers to, leaves the rule unchecked (as in ajv).
+                variable = variables[conditional.fields[0]]
+                test = ' || '.join(
+                    [f"{variable} === undefined"]
+                    + [f"{variables[other]} === undefined || {variable} === {variables[other]}" for other in conditional.equals]
+                )
+                value = variable
+            else:
+                test = _all([_membership(variables[name], allowed, constants) for name, allowed in conditional.then])
+                value = variables[conditional.fields[0]] if len(conditional.fields) == 1 else f"[{', '.join(variables[name] for name in conditional.fields)}].join(', ')"
+            tests.append(f"if (!({test})) fail(errors, line, {json.dumps(conditional.rule_id)}, {field}, {value});")
+
+        if not when:
+            body.extend(tests)
+            continue
+        condition = _all([_membership(variables[name], allowed, constants) for name, allowed in when])
+        body.append(f"if ({condition}) {{")
+        body.extend("    " + test for test in tests)
+        body.append("}")
+
+    expected = {
+        check.name: (', '.join(f"'{value}'" for value in check.values[:-1]) + f" or '{check.values[-1]}'")
+        if len(check.values) > 1 else f"'{check.values[0]}'"
+        for check in compiled.properties if check.values is not None
+    }
+
+    lines = [
+        f"const SCHEMA_SHA256 = {json.dumps(compiled.sha256)};",
+        "// the schema properties: a row's values are read in this order (see checkRow).",
+        f"const FIELDS = {json.dumps([check.name for check in compiled.properties])};",
+        f"const ADDITIONAL_PROPERTIES = {'true' if compiled.additional_properties else 'false'};",
+        "// x-rules: the message of each rule, with {field} placeholders.",
+        f"const RULE_MESSAGES = {json.dumps(compiled.messages, indent=4, ensure_ascii=False)};",
+        "// the allowed values of each enum field, as literal_error messages list them.",
+        f"const EXPECTED = {json.dumps(expected, indent=4, ensure_ascii=False)};",
+        "",
+        "// precompiled value sets, one per distinct list of values.",
+    ]
+    check_row = [
+        "",
+        "/**",
+        " * Append the errors of one row to errors. row is an array of cells and c the column",
+        " * of each schema property in it, in FIELDS order (-1 or beyond the row: absent).",
+        " */",
+        "function checkRow(row, c, errors, line) {",
+        *("    " + line if line else "" for line in body),
+        "}",
+    ]
+    return '\n'.join(lines + constants.lines + check_row)
+
+
+def render_validator(compiled: CompiledSchema, template: str) -> str:
+    """The complete data_reporting_validator.js: the template with the compiled checks."""
+    checks = '\n'.join(("    " + line) if line else "" for line in render_checks(compiled).split('\n'))
+    if '/* @compiled */' not in template:
+        raise SchemaCompileError(f"{TEMPLATE_PATH.name} has no /* @compiled */ placeholder")
+    return template.replace('    /* @compiled */', checks).replace('@schema_sha256', compiled.sha256[:12])
+
+
+def embed_validator(html: str, validator: str) -> str:
+    """A tool page with its <script id="data-reporting-validator"> element replaced by validator."""
+    if '</script' in validator:
+        raise SchemaCompileError("the validator cannot be embedded: it contains '</script'")
+    if not EMBED_PATTERN.search(html):
+        raise SchemaCompileError('the page has no <script id="data-reporting-validator"> element')
+    indented = '\n'.join(("        " + line) if line else "" for line in validator.rstrip('\n').split('\n'))
+    return EMBED_PATTERN.sub(lambda match: match.group(1) + indented + match.group(3), html, count=1)
+
+
+def build_outputs(schema_path: Path = SCHEMA_PATH) -> Dict[Path, str]:
+    """The text of every output file: the validator module and the tool pages that embed it."""
+    validator = render_validator(load_compiled(schema_path), TEMPLATE_PATH.read_text(encoding='utf-8'))
+    outputs = {VALIDATOR_PATH: validator}
+    for page in TOOL_PAGES:
+        outputs[page] = embed_validator(page.read_text(encoding='utf-8'), validator)
+    return outputs
+
+
+def main():
+    """Main function to compile the schema validator."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--schema', default=str(SCHEMA_PATH), help='schema to compile (default: %(default)s)')
+    parser.add_argument('--check', action='store_true', help='do not write anything; exit 1 if an output is out of date')
+    args = parser.parse_args()
+
+    try:
+        outputs = build_outputs(Path(args.schema))
+    except SchemaCompileError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+    stale = []
+    for path, text in outputs.items():
+        current = path.read_text(encoding='utf-8') if path.exists() else None
+        if current == text:
+            print(f"✓ {path.relative_to(REPO_DIR)}: up to date")
+        elif args.check:
+            stale.append(path)
+            print(f"✗ {path.relative_to(REPO_DIR)}: out of date")
+        else:
+            path.write_text(text, encoding='utf-8')
+            print(f"✓ Wrote {path.relative_to(REPO_DIR)}")
+
+    if stale:
+        print("\nRun scripts/compile_schema_validator.py to update them")
+        sys.exit(1)
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
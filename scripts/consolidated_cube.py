@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Consolidated multi-jurisdiction cube of accepted submissions.
+
+Merges the latest accepted file of every jurisdiction into one cube of counts
+indexed by MMWR week, disease, state, geography, age group, disease subtype and
+outcome. The full cube is not stored densely: the geography dimension is
+unbounded (every county and sub-state region of every state) and almost all
+of its week x disease x age x subtype x outcome combinations are empty, so a
+dense array would be mostly zeros. Its cells are kept sparse instead, as one
+dict per jurisdiction keyed by int codes. Only the rollups a dashboard needs,
+whose dimensions are all small and fixed, are dense flat integer arrays, so
+each query is an index computation:
+
+    state totals          [week, disease, state, outcome]
+    national totals       [week, disease, outcome]
+    age distributions     [week, disease, state, age_group, outcome]
+    serogroup mixes       [week, state, meningococcus subtype, outcome]
+
+Totals come from the state-level age breakdown rows (geo_unit == 'state',
+disease_subtype == 'total'), which the count-totals rule reconciles with the
+sub-state rows; serogroup mixes come from the state-level meningococcus
+subtype breakdown (age_group == 'total'). International resident rows are kept
+in the cells but, as in the count-totals rule, are not part of the totals.
+
+Contributions are tracked per jurisdiction, so when one jurisdiction resubmits
+only its old cells are subtracted and its new ones added (update()).
+"""
+
+import argparse
+import json
+import sys
+from array import array
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from columnar_validation import read_csv_columns, validate_columns
+from data_reporting_schema import (
+    AGE_GROUPS,
+    DISEASE_NAMES,
+    ENUM_CODES,
+    MENINGOCOCCUS_SUBTYPES,
+    OUTCOMES,
+    STATES,
+)
+from incremental_validation import SUBMISSION_NAME
+from mmwr_calendar import MMWRWeek, mmwr_week_of
+
+SUBTYPE_CODES = {subtype: code for code, subtype in enumerate(MENINGOCOCCUS_SUBTYPES)}
+MENINGOCOCCUS = ENUM_CODES['disease_name']['meningococcus']
+
+# cell key: (week index, disease, geo id, age group, subtype, outcome), all int codes.
+Cell = Tuple[int, int, int, int, int, int]
+
+
+def week_number(week: MMWRWeek) -> int:
+    """Dense, sortable week index: the ordinal of the week's sunday divided by 7."""
+    return week.start.toordinal() // 7
+
+
+class Rollup:
+    """A dense n-dimensional integer array stored flat in an array('q')."""
+
+    def __init__(self, shape: Tuple[int, ...]):
+        self.shape = shape
+        self.strides = tuple(_product(shape[i + 1:]) for i in range(len(shape)))
+        self.values = array('q', bytes(8 * _product(shape)))
+
+    def index(self, *coords: int) -> int:
+        return sum(c * s for c, s in zip(coords, self.strides))
+
+    def add(self, coords: Tuple[int, ...], count: int) -> None:
+        self.values[self.index(*coords)] += count
+
+    def get(self, *coords: int) -> int:
+        return self.values[self.index(*coords)]
+
+
+def _product(values: Iterable[int]) -> int:
+    result = 1
+    for v in values:
+        result *= v
+    return result
+
+
+class ConsolidatedCube:
+    """
+    Counts of every jurisdiction's latest accepted submission, with rollups.
+
+    The week axis of the rollups spans the weeks seen so far (first_week to
+    first_week + n_weeks - 1); it is re-laid out when a submission extends it.
+    """
+
+    def __init__(self):
+        self.geographies: List[Tuple[str, str, str]] = []   # geo id -> (state, geo_unit, geo_name)
+        self._geo_ids: Dict[Tuple[str, str, str], int] = {}
+        self.jurisdictions: Dict[str, Dict[Cell, int]] = {}  # jurisdiction -> cell -> count
+        self.first_week = None
+        self.n_weeks = 0
+        self._allocate()
+
+    def _allocate(self) -> None:
+        n_weeks, n_diseases, n_states, n_outcomes = self.n_weeks, len(DISEASE_NAMES), len(STATES), len(OUTCOMES)
+        self.state_totals = Rollup((n_weeks, n_diseases, n_states, n_outcomes))
+        self.national_totals = Rollup((n_weeks, n_diseases, n_outcomes))
+        self.age_distributions = Rollup((n_weeks, n_diseases, n_states, len(AGE_GROUPS), n_outcomes))
+        self.serogroup_mixes = Rollup((n_weeks, n_states, len(MENINGOCOCCUS_SUBTYPES), n_outcomes))
+
+    def _geo_id(self, state: str, geo_unit: str, geo_name: str) -> int:
+        key = (state, geo_unit, geo_name)
+        geo_id = self._geo_ids.get(key)
+        if geo_id is None:
+            geo_id = self._geo_ids[key] = len(self.geographies)
+            self.geographies.append(key)
+        return geo_id
+
+    def _apply(self, cells: Dict[Cell, int], sign: int) -> None:
+        """Add (sign=1) or subtract (sign=-1) cells to the rollups."""
+        state_level = ENUM_CODES['geo_unit']['state']
+        total_subtype = SUBTYPE_CODES['total']
+        total_age = ENUM_CODES['age_group']['total']
+        state_code = ENUM_CODES['state']
+        geo_unit_code = ENUM_CODES['geo_unit']
+        for (week, disease, geo_id, age, subtype, outcome), count in cells.items():
+            state, geo_unit, _ = self.geographies[geo_id]
+            if geo_unit_code[geo_unit] != state_level:
+                continue
+            w = week - self.first_week
+            s = state_code[state]
+            count *= sign
+            if subtype == total_subtype:
+                self.state_totals.add((w, disease, s, outcome), count)
+                self.national_totals.add((w, disease, outcome), count)
+                self.age_distributions.add((w, disease, s, age, outcome), count)
+            elif disease == MENINGOCOCCUS and age == total_age:
+                self.serogroup_mixes.add((w, s, subtype, outcome), count)
+
+    def _cells(self, typed: Dict[str, list]) -> Dict[Cell, int]:
+        """Cells of one validated submission (typed columns)."""
+        disease_code = ENUM_CODES['disease_name']
+        age_code = ENUM_CODES['age_group']
+        outcome_code = ENUM_CODES['outcome']
+        weeks = {start: week_number(mmwr_week_of(start)) for start in set(typed['report_period_start'])}
+
+        cells = {}
+        for start, disease, state, geo_unit, geo_name, age, subtype, outcome, count in zip(
+            typed['report_period_start'], typed['disease_name'], typed['state'], typed['geo_unit'], typed['geo_name'],
+            typed['age_group'], typed['disease_subtype'], typed['outcome'], typed['count'],
+        ):
+            cell = (
+                weeks[start], disease_code[disease], self._geo_id(state, geo_unit, geo_name),
+                age_code[age], SUBTYPE_CODES[subtype], outcome_code[outcome],
+            )
+            cells[cell] = cells.get(cell, 0) + count
+
+        return cells
+
+    def _cover_weeks(self, weeks: Iterable[int]) -> None:
+        """Re-lay out the rollups if weeks fall outside the current week axis."""
+        weeks = list(weeks)
+        if not weeks:
+            return
+        first, last = min(weeks), max(weeks)
+        if self.first_week is not None and first >= self.first_week and last < self.first_week + self.n_weeks:
+            return
+        if self.first_week is not None:
+            first = min(first, self.first_week)
+            last = max(last, self.first_week + self.n_weeks - 1)
+        self.first_week, self.n_weeks = first, last - first + 1
+        self._allocate()
+        for cells in self.jurisdictions.values():
+            self._apply(cells, 1)
+
+    def update(self, jurisdiction: str, typed: Dict[str, list]) -> None:
+        """Replace a jurisdiction's contribution with a newly accepted submission (typed columns)."""
+        cells = self._cells(typed)
+        old = self.jurisdictions.pop(jurisdiction, None)
+        if old is not None:
+            self._apply(old, -1)
+        self._cover_weeks(week for week, *_ in cells)
+        self._apply(cells, 1)
+        self.jurisdictions[jurisdiction] = cells
+
+    def remove(self, jurisdiction: str) -> None:
+        old = self.jurisdictions.pop(jurisdiction, None)
+        if old is not None:
+            self._apply(old, -1)
+
+    def _week_index(self, week: MMWRWeek) -> Optional[int]:
+        if self.first_week is None:
+            return None
+        w = week_number(MMWRWeek(*week)) - self.first_week
+        return w if 0 <= w < self.n_weeks else None
+
+    def state_total(self, week: MMWRWeek, disease_name: str, state: str, outcome: str = 'cases') -> int:
+        w = self._week_index(week)
+        if w is None:
+            return 0
+        return self.state_totals.get(
+            w, ENUM_CODES['disease_name'][disease_name], ENUM_CODES['state'][state], ENUM_CODES['outcome'][outcome]
+        )
+
+    def national_total(self, week: MMWRWeek, disease_name: str, outcome: str = 'cases') -> int:
+        w = self._week_index(week)
+        if w is None:
+            return 0
+        return self.national_totals.get(w, ENUM_CODES['disease_name'][disease_name], ENUM_CODES['outcome'][outcome])
+
+    def age_distribution(self, week: MMWRWeek, disease_name: str, state: str, outcome: str = 'cases') -> Dict[str, int]:
+        w = self._week_index(week)
+        if w is None:
+            return dict.fromkeys(AGE_GROUPS, 0)
+        disease, s, o = ENUM_CODES['disease_name'][disease_name], ENUM_CODES['state'][state], ENUM_CODES['outcome'][outcome]
+        return {age: self.age_distributions.get(w, disease, s, a, o) for a, age in enumerate(AGE_GROUPS)}
+
+    def serogroup_mix(self, week: MMWRWeek, state: str, outcome: str = 'cases') -> Dict[str, int]:
+        w = self._week_index(week)
+        if w is None:
+            return dict.fromkeys(MENINGOCOCCUS_SUBTYPES, 0)
+        s, o = ENUM_CODES['state'][state], ENUM_CODES['outcome'][outcome]
+        return {subtype: self.serogroup_mixes.get(w, s, code, o) for code, subtype in enumerate(MENINGOCOCCUS_SUBTYPES)}
+
+    def weeks(self) -> List[MMWRWeek]:
+        if self.first_week is None:
+            return []
+        return [mmwr_week_of(date.fromordinal(7 * (self.first_week + w))) for w in range(self.n_weeks)]
+
+
+def latest_submissions(paths: Iterable[Path]) -> Dict[str, Path]:
+    """Latest submission file (by report date in the file name) per jurisdiction."""
+    latest = {}
+    for path in paths:
+        match = SUBMISSION_NAME.fullmatch(path.name)
+        if match is None or '{jurisdiction}' in path.name:
+            continue
+        current = latest.get(match['jurisdiction'])
+        if current is None or match['report_date'] >= current[0]:
+            latest[match['jurisdiction']] = (match['report_date'], path)
+
+    return {jurisdiction: path for jurisdiction, (_, path) in latest.items()}
+
+
+def build_cube(files: Dict[str, Path]) -> ConsolidatedCube:
+    """Consolidate {jurisdiction: accepted submission CSV}. Files are validated as they are loaded."""
+    cube = ConsolidatedCube()
+    for jurisdiction, path in sorted(files.items()):
+        cube.update(jurisdiction, validate_columns(read_csv_columns(path)))
+    return cube
+
+
+def main():
+    """Main function to consolidate accepted submissions and print the national rollups."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='+', help='accepted submission CSV files or directories containing them')
+    parser.add_argument('--outcome', choices=OUTCOMES, default='cases')
+    args = parser.parse_args()
+
+    paths = []
+    for arg in args.paths:
+        path = Path(arg)
+        paths.extend(sorted(path.glob('disease_tracking_report_*.csv')) if path.is_dir() else [path])
+    files = latest_submissions(paths)
+    if not files:
+        print("Error: no submission files found", file=sys.stderr)
+        sys.exit(2)
+
+    cube = build_cube(files)
+    national = [
+        {
+            'mmwr_year': week.year,
+            'mmwr_week': week.week,
+            **{disease: cube.national_total(week, disease, args.outcome) for disease in DISEASE_NAMES},
+        }
+        for week in cube.weeks()
+    ]
+    json.dump({'jurisdictions': sorted(files), 'outcome': args.outcome, 'national_totals': national}, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Structured error reports for rejected disease tracking report files.
+
+A pydantic ValidationError for a large rejected file is one enormous string
+(every failing row, and every count mismatch joined into one message). An
+ErrorReport groups the errors by (rule, field) instead, with the exact number
+of errors in each group and a bounded sample of offending CSV lines, values
+and messages. It is written as JSON, CSV or HTML, one group at a time.
+
+build_report() validates a file in 'capped' mode with the streaming
+validator: every row is checked and counted, but only max_samples errors per
+(rule, field) are kept (see columnar_validation.ErrorCollector), so memory is
+bounded by the samples and by the capped number of failure signatures rather
+than by the number of failing rows. Only the sampled errors get a message, and
+each sample has the physical line of its row as recorded by the reader, so
+blank lines and quoted line breaks do not shift it.
+"""
+
+import argparse
+import csv
+import html
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+
+from pydantic import ValidationError
+
+from columnar_validation import ErrorCollector, error_field, error_rule
+from data_reporting_schema import CountTotalsError
+from stream_validation import DEFAULT_CHUNK_SIZE, validate_file
+from submission_ingest import check_header, read_header
+
+DEFAULT_MAX_SAMPLES = 10
+# longer values and messages are cut short in the report.
+MAX_TEXT_LENGTH = 200
+REPORT_FORMATS = ('json', 'csv', 'html')
+CSV_COLUMNS = ('rule', 'field', 'count', 'line', 'value', 'message')
+
+
+def _message(err: Dict[str, Any]) -> str:
+    """The pydantic message of an error, rendered on its own."""
+    if 'msg' in err:
+        return err['msg']
+    return ValidationError.from_exception_data('DiseaseReportDataset', [err]).errors(include_url=False)[0]['msg']
+
+
+def _compact(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    text = value if isinstance(value, str) else str(value)
+    return text if len(text) <= MAX_TEXT_LENGTH else text[:MAX_TEXT_LENGTH - 1] + '…'
+
+
+class ErrorGroup:
+    """The errors of one (rule, field): their count and the first max_samples of them."""
+
+    __slots__ = ('rule', 'field', 'count', 'samples')
+
+    def __init__(self, rule: str, field: Optional[str]):
+        self.rule = rule
+        self.field = field
+        self.count = 0
+        # {'line': physical CSV line (the header is line 1) or None, 'value': ..., 'message': ...}
+        self.samples: List[Dict[str, Any]] = []
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'rule': self.rule, 'field': self.field, 'count': self.count, 'samples': self.samples}
+
+
+class ErrorReport:
+    """
+    Errors grouped by rule and field, most frequent first. add_collector()
+    takes the errors an ErrorCollector kept; messages are only rendered for
+    the sampled errors, and a count-totals error contributes one error per
+    mismatched group, so the report never needs its message.
+    """
+
+    def __init__(self, source: Optional[str] = None, max_samples: int = DEFAULT_MAX_SAMPLES):
+        self.source = source
+        self.max_samples = max_samples
+        self.rows: Optional[int] = None
+        self.groups: Dict[tuple, ErrorGroup] = {}
+
+    @property
+    def status(self) -> str:
+        return 'fail' if self.groups else 'pass'
+
+    @property
+    def error_count(self) -> int:
+        return sum(group.count for group in self.groups.values())
+
+    def _group(self, rule: str, field: Optional[str]) -> ErrorGroup:
+        group = self.groups.get((rule, field))
+        if group is None:
+            group = self.groups[(rule, field)] = ErrorGroup(rule, field)
+        return group
+
+    def add(self, err: Dict[str, Any], line: Optional[int] = None) -> None:
+        """
+        Add one error: a line error of an ErrorCollector (type, loc, input and
+        ctx) or a dict of ValidationError.errors(). line is the physical CSV
+        line of its row, if known. The message is only rendered for samples.
+        """
+        rule, field = error_rule(err), error_field(err)
+        group = self._group(rule, field)
+        error = err.get('ctx', {}).get('error')
+        if isinstance(error, CountTotalsError):
+            # the structured table, not the error's message, which is never built.
+            for m in error.mismatches[:max(self.max_samples - len(group.samples), 0)]:
+                group.samples.append({
+                    'line': None,
+                    'value': f"{m.report_period_start} to {m.report_period_end} | {m.disease_name} | {m.outcome}",
+                    'message': _compact(m.message()),
+                })
+            group.count += len(error.mismatches)
+            return
+
+        group.count += 1
+        if len(group.samples) < self.max_samples:
+            # row-level rules get the whole row as input; their message names the offending values.
+            value = err.get('input') if field is not None else None
+            group.samples.append({'line': line, 'value': _compact(value), 'message': _compact(_message(err))})
+
+    def add_collector(self, collector: ErrorCollector) -> None:
+        """
+        Add the errors an ErrorCollector kept, with the CSV lines it recorded.
+        Its (rule, field) counts replace the number of errors kept where more
+        were found.
+        """
+        for err in collector.line_errors:
+            loc = err['loc']
+            self.add(err, collector.lines.get(loc[0]) if loc and isinstance(loc[0], int) else None)
+        for key, count in collector.counts.items():
+            group = self.groups.get(key)
+            if group is not None and count > group.count:
+                group.count = count
+
+    def sorted_groups(self) -> List[ErrorGroup]:
+        return sorted(self.groups.values(), key=lambda group: -group.count)
+
+    # rendering
+
+    def write_json(self, f: TextIO) -> None:
+        # the top-level object is left open and the groups are written into it one by one.
+        f.write(json.dumps({
+            'source': self.source, 'status': self.status, 'rows': self.rows, 'error_count': self.error_count,
+        }, default=str)[:-1] + ', "groups": [')
+        for i, group in enumerate(self.sorted_groups()):
+            f.write((',\n' if i else '\n') + json.dumps(group.as_dict(), default=str))
+        f.write('\n]}\n')
+
+    def write_csv(self, f: TextIO) -> None:
+        """One line per sample; a group without samples (e.g. header) gets one line."""
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS)
+        for group in self.sorted_groups():
+            for sample in group.samples or [{'line': None, 'value': None, 'message': None}]:
+                writer.writerow([group.rule, group.field, group.count, sample['line'], sample['value'], sample['message']])
+
+    def write_html(self, f: TextIO) -> None:
+        def cell(value) -> str:
+            return '' if value is None else html.escape(str(value)).replace('\n', '<br>')
+
+        title = f"Validation errors: {self.source}" if self.source else "Validation errors"
+        f.write(
+            "<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+            f"<title>{cell(title)}</title>\n"
+            "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;margin-bottom:1.5em}"
+            "th,td{border:1px solid #ccc;padding:4px 8px;text-align:left;vertical-align:top}"
+            "th{background:#f0f0f0}td.count{text-align:right}</style>\n</head>\n<body>\n"
+            f"<h1>{cell(title)}</h1>\n"
+            f"<p>Status: <strong>{self.status}</strong>. {self.error_count} error(s) in {len(self.groups)} group(s)"
+            + (f", {self.rows} rows." if self.rows is not None else ".") + "</p>\n"
+        )
+        groups = self.sorted_groups()
+        if groups:
+            f.write("<table>\n<tr><th>Rule</th><th>Field</th><th>Errors</th></tr>\n")
+            for group in groups:
+                f.write(f"<tr><td>{cell(group.rule)}</td><td>{cell(group.field)}</td><td class=\"count\">{group.count}</td></tr>\n")
+            f.write("</table>\n")
+        for group in groups:
+            shown = f"first {len(group.samples)} of {group.count}" if group.count > len(group.samples) else f"{group.count}"
+            f.write(f"<h2>{cell(group.rule)}" + (f" ({cell(group.field)})" if group.field else "") + f": {shown}</h2>\n")
+            f.write("<table>\n<tr><th>Line</th><th>Value</th><th>Message</th></tr>\n")
+            for sample in group.samples:
+                f.write(f"<tr><td>{cell(sample['line'])}</td><td>{cell(sample['value'])}</td><td>{cell(sample['message'])}</td></tr>\n")
+            f.write("</table>\n")
+        f.write("</body>\n</html>\n")
+
+    def write(self, path: Path, report_format: Optional[str] = None) -> None:
+        """Write the report to path, in report_format or the format of its suffix."""
+        report_format = report_format or Path(path).suffix.lstrip('.').lower()
+        if report_format not in REPORT_FORMATS:
+            raise ValueError(f"report format must be one of {REPORT_FORMATS}. got: {report_format!r}")
+        with open(path, 'w', newline='' if report_format == 'csv' else None, encoding='utf-8') as f:
+            getattr(self, f"write_{report_format}")(f)
+
+
+def build_report(
+    csv_path: Path,
+    max_samples: int = DEFAULT_MAX_SAMPLES,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ErrorReport:
+    """
+    Validate a submission CSV and return its error report. An invalid header
+    is reported as a single 'header' error, without reading the data rows.
+    """
+    report = ErrorReport(str(csv_path), max_samples)
+    collector = ErrorCollector('capped', max_samples)
+    try:
+        header = read_header(csv_path)
+        error = check_header(header)
+        if error is not None:
+            collector.add_dataset_error(error, header)
+            raise collector.validation_error()
+        report.rows = validate_file(Path(csv_path), chunk_size=chunk_size, collector=collector)
+    except ValidationError:
+        # the ValidationError is never rendered; the collector holds its errors.
+        report.add_collector(collector)
+
+    return report
+
+
+def write_reports(report: ErrorReport, output_dir: Path, formats: Iterable[str]) -> List[Path]:
+    """Write a report in each format as {file stem}.errors.{format} in output_dir. Returns the paths."""
+    stem = Path(report.source).stem if report.source else 'report'
+    paths = []
+    for report_format in formats:
+        path = Path(output_dir) / f"{stem}.errors.{report_format}"
+        report.write(path, report_format)
+        paths.append(path)
+    return paths
+
+
+def main():
+    """Main function to write error reports for submission files."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('csv_files', nargs='+', help='submission CSV files')
+    parser.add_argument('--format', action='append', choices=REPORT_FORMATS, dest='formats',
+                        help='report format (repeatable; default: html and json)')
+    parser.add_argument('--output-dir', default='.', help='directory for the reports (default: current directory)')
+    parser.add_argument('--max-samples', type=int, default=DEFAULT_MAX_SAMPLES,
+                        help=f'offending lines kept per rule and field (default: {DEFAULT_MAX_SAMPLES})')
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    failed = False
+    for csv_file in args.csv_files:
+        try:
+            report = build_report(Path(csv_file), args.max_samples)
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            print(f"✗ {csv_file}: {type(e).__name__}: {e}")
+            failed = True
+            continue
+        if report.status == 'pass':
+            print(f"✓ {csv_file}: {report.rows} rows passed")
+            continue
+        failed = True
+        paths = write_reports(report, output_dir, args.formats or ['html', 'json'])
+        print(f"✗ {csv_file}: {report.error_count} error(s) in {len(report.groups)} group(s)")
+        for group in report.sorted_groups():
+            print(f"    {group.count:>8}  {group.rule}" + (f" ({group.field})" if group.field else ""))
+        for path in paths:
+            print(f"    report: {path}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
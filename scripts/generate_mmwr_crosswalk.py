@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Generate an MMWR week to month crosswalk CSV for a range of MMWR years.
+
+Weeks are computed by mmwr_calendar.py (examples-and-templates) and each week is
+assigned to the month its Wednesday falls in. The output has the same columns as
+examples-and-templates/MMWR_week_to_month_crosswalk.csv.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the examples-and-templates directory to the path so we can import the calendar
+sys.path.insert(0, str(Path(__file__).parent.parent / 'examples-and-templates'))
+
+from mmwr_calendar import write_crosswalk
+
+
+def main():
+    """Main function to write the crosswalk CSV."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('first_year', type=int, help='first MMWR year')
+    parser.add_argument('last_year', type=int, nargs='?', default=None, help='last MMWR year (default: first_year)')
+    parser.add_argument('--output', '-o', required=True, help='CSV file to write')
+    args = parser.parse_args()
+
+    last_year = args.last_year if args.last_year is not None else args.first_year
+    if last_year < args.first_year:
+        print("Error: last_year must not be before first_year", file=sys.stderr)
+        sys.exit(2)
+
+    n_weeks = write_crosswalk(Path(args.output), args.first_year, last_year)
+    print(f"✓ Generated {args.output}")
+    print(f"  {n_weeks} MMWR weeks ({args.first_year}-{last_year})")
+
+
+if __name__ == '__main__':
+    main()
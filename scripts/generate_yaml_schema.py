@@ -3,213 +3,104 @@
 Generate data_reporting_schema.yaml from data_reporting_schema.py.
 
 This script reads the Pydantic model definitions in data_reporting_schema.py
-and converts them to a YAML Schema format.
+and converts them to a YAML Schema format. The properties (types, enums and
+descriptions) come from the DiseaseReport JSON schema, and the conditional
+validations from the declarative rule tables the model's validators use
+(ROW_RULES, the geography registry and EXCLUSIVE_MINIMUMS), so a JSON Schema
+validator enforces the same rules. Each conditional and minimum is tagged with
+its rule id (x-rule); x-rules lists the message of every rule, and whether the
+schema expresses it. A row rule the schema cannot express fails the generation.
+
+A field that must equal a field without an enum (reporting_jurisdiction and
+geo_name) is written as a const $data reference, the relative JSON pointer
+extension of ajv: {"const": {"$data": "1/geo_name"}}.
 """
 
 import sys
 from pathlib import Path
+from typing import Any, Dict, Optional
 from pydantic_core import PydanticUndefined
 import yaml
 
 # Add the examples-and-templates directory to the path so we can import the schema
 sys.path.insert(0, str(Path(__file__).parent.parent / 'examples-and-templates'))
 
-from data_reporting_schema import DiseaseReport
+from data_reporting_schema import (
+    ENUM_CODES, EXCLUSIVE_MINIMUMS, FIELD_NAMES, RULE_MESSAGES, ROW_RULES, DiseaseReport, ValueRule, registry_rules,
+)
+
+# property keywords kept from the pydantic JSON schema, in output order.
+PROPERTY_KEYWORDS = ('type', 'format', 'enum')
+
+
+def values_schema(values) -> Dict[str, Any]:
+    """const for a single value, enum otherwise."""
+    values = list(values)
+    return {"const": values[0]} if len(values) == 1 else {"enum": values}
+
+
+class InexpressibleRuleError(ValueError):
+    """A row rule has no JSON Schema conditional: the schema would not enforce it."""
+
+
+def rule_condition(rule: ValueRule) -> Dict[str, Any]:
+    """The JSON Schema conditional of a row rule."""
+    unknown = [name for name in (*rule.when, rule.field, *rule.equals) if name not in FIELD_NAMES]
+    if unknown:
+        raise InexpressibleRuleError(f"{rule.rule_id} reads unknown field(s): {', '.join(unknown)}")
+    if bool(rule.equals) == bool(rule.values):
+        raise InexpressibleRuleError(f"{rule.rule_id} must have either values or equals")
+
+    if len(rule.equals) == 1 and rule.equals[0] in ENUM_CODES:
+        # field == other field, spelled out over the values of the other (enum) field.
+        other = rule.equals[0]
+        then = {"anyOf": [
+            {"properties": {other: {"const": value}, rule.field: {"const": value}}}
+            for value in ENUM_CODES[other]
+        ]}
+    elif rule.equals:
+        # field == one of the other fields, which have no enum to spell it out over.
+        then = {"anyOf": [
+            {"properties": {rule.field: {"const": {"$data": f"1/{other}"}}}}
+            for other in rule.equals
+        ]}
+    else:
+        then = {"properties": {rule.field: values_schema(rule.values)}}
+
+    if not rule.when:
+        return {"x-rule": rule.rule_id, **then}
+    return {
+        "x-rule": rule.rule_id,
+        "if": {"properties": {name: values_schema(allowed) for name, allowed in rule.when.items()}},
+        "then": then,
+    }
 
 
 def generate_schema():
-    """Generate Schema from the Pydantic DiseaseReport model."""
+    """Generate Schema from the Pydantic DiseaseReport model and its rule tables."""
     
     # Extract field information from the Pydantic model
     fields = DiseaseReport.model_fields
+    model_properties = DiseaseReport.model_json_schema()["properties"]
     
     # Build the properties dictionary
     properties = {}
-    
-    # Helper function to get enum values from Literal types
-    def get_enum_values(field):
-        """Extract enum values from a field's annotation."""
-        annotation = field.annotation
-        # Handle Literal types
-        if hasattr(annotation, '__args__'):
-            return list(annotation.__args__)
-        return None
-    
-    # Map fields to JSON Schema properties
-    # report_period_start and report_period_end - date fields
-    properties["report_period_start"] = {
-        "type": "string",
-        "format": "date",
-        "description": "Date of report period start (YYYY-MM-DD)"
-    }
-    
-    properties["report_period_end"] = {
-        "type": "string",
-        "format": "date",
-        "description": "Date of report period end (YYYY-MM-DD)"
-    }
-    
-    # date_type
-    properties["date_type"] = {
-        "type": "string",
-        "enum": get_enum_values(fields["date_type"]),
-        "description": "Calculated Case Counting Date (cccd) or jurisdiction-defined date hierarchy. Details of jurisdiction date hierarchy should be provided in metadata."
-    }
-    
-    # time_unit
-    properties["time_unit"] = {
-        "type": "string",
-        "enum": get_enum_values(fields["time_unit"]),
-        "description": "Time aggregation unit"
-    }
-    
-    # disease_name
-    properties["disease_name"] = {
-        "type": "string",
-        "enum": get_enum_values(fields["disease_name"]),
-        "description": "Name of the disease"
-    }
-    
-    # disease_subtype
-    properties["disease_subtype"] = {
-        "type": "string",
-        "description": "Disease subtype (meningococcal serogroup). Use 'total' for non-subtype-stratified aggregations or diseases without subtype reporting (measles, pertussis). Use 'unknown' when subtyping was not performed. Use 'unspecified' when subtype is known but suppressed."
-    }
-    
-    # reporting_jurisdiction
-    properties["reporting_jurisdiction"] = {
-        "type": "string",
-        "description": "Abbreviation for the reporting state, city, or territory"
-    }
-    
-    # state
-    properties["state"] = {
-        "type": "string",
-        "enum": get_enum_values(fields["state"]),
-        "description": "2-letter abbreviation for the state of the jurisdiction"
-    }
-    
-    # geo_name
-    properties["geo_name"] = {
-        "type": "string",
-        "description": "Name of the geographic unit"
-    }
-    
-    # geo_unit
-    properties["geo_unit"] = {
-        "type": "string",
-        "enum": get_enum_values(fields["geo_unit"]),
-        "description": "Geographic unit"
-    }
-    
-    # age_group
-    properties["age_group"] = {
-        "type": "string",
-        "enum": get_enum_values(fields["age_group"]),
-        "description": "Standardized age group"
-    }
-    
-    # confirmation_status
-    properties["confirmation_status"] = {
-        "type": "string",
-        "enum": get_enum_values(fields["confirmation_status"]),
-        "description": "Case classification status"
-    }
-    
-    # outcome
-    properties["outcome"] = {
-        "type": "string",
-        "enum": get_enum_values(fields["outcome"]),
-        "description": "Reported outcome type"
-    }
-    
-    # count
-    properties["count"] = {
-        "type": "integer",
-        "minimum": 0,
-        "description": "Count of specified outcome for the specified group for this time period"
-    }
-    
-    # Build the allOf section with conditional validations
+    for field_name, model_property in model_properties.items():
+        prop = {key: model_property[key] for key in PROPERTY_KEYWORDS if key in model_property}
+        if "const" in model_property:
+            # a Literal of a single value.
+            prop["enum"] = [model_property["const"]]
+        if field_name in EXCLUSIVE_MINIMUMS:
+            prop["exclusiveMinimum"], prop["x-rule"] = EXCLUSIVE_MINIMUMS[field_name]
+        prop["description"] = model_property["description"]
+        properties[field_name] = prop
+    
+    # Build the allOf section with one conditional validation per row rule, and per registered state
     all_of = []
-    
-    # Validation 1: disease_name and time_unit constraints
-    all_of.append({
-        "oneOf": [
-            {
-                "properties": {
-                    "disease_name": {"const": "measles"},
-                    "time_unit": {"const": "week"}
-                }
-            },
-            {
-                "properties": {
-                    "disease_name": {"const": "pertussis"},
-                    "time_unit": {"const": "week"}
-                }
-            },
-            {
-                "properties": {
-                    "disease_name": {"const": "meningococcus"},
-                    "time_unit": {"const": "week"}
-                }
-            }
-        ]
-    })
-    
-    # Validation 2: time_unit = week description
-    all_of.append({
-        "if": {"properties": {"time_unit": {"const": "week"}}},
-        "then": {
-            "properties": {
-                "report_period_start": {
-                    "description": "When time_unit='week', report_period_start must be a Sunday (MMWR week start). JSON Schema cannot natively validate weekday; must be enforced in ETL or via custom validator."
-                },
-                "report_period_end": {
-                    "description": "When time_unit='week', report_period_end must be a Saturday (MMWR week end). JSON Schema cannot natively validate weekday; must be enforced in ETL or via custom validator."
-                }
-            }
-        }
-    })
-    
-    # Validation 3: disease_name and disease_subtype constraints
-    # These values are extracted from the validate_disease_subtype validator in the Pydantic model
-    all_of.append({
-        "oneOf": [
-            {
-                "properties": {
-                    "disease_name": {"const": "meningococcus"},
-                    "disease_subtype": {"enum": ["A", "B", "C", "W", "X", "Y", "Z", "unknown", "unspecified", "total"]}
-                }
-            },
-            {
-                "properties": {
-                    "disease_name": {"const": "measles"},
-                    "disease_subtype": {"enum": ["total"]}
-                }
-            },
-            {
-                "properties": {
-                    "disease_name": {"const": "pertussis"},
-                    "disease_subtype": {"enum": ["total"]}
-                }
-            }
-        ]
-    })
-    
-    # Validation 4: state-level stratification
-    # When geo_unit='state', at least one of age_group or disease_subtype must not be 'total'
-    all_of.append({
-        "if": {"properties": {"geo_unit": {"const": "state"}}},
-        "then": {
-            "not": {
-                "allOf": [
-                    {"properties": {"age_group": {"const": "total"}}},
-                    {"properties": {"disease_subtype": {"const": "total"}}}
-                ]
-            }
-        }
-    })
+    in_schema = {rule_id for _, rule_id in EXCLUSIVE_MINIMUMS.values()}
+    for rule in ROW_RULES + registry_rules():
+        all_of.append(rule_condition(rule))
+        in_schema.add(rule.rule_id)
     
     # Get required fields from the model
     required_fields = [
@@ -228,12 +119,38 @@ def generate_schema():
             "required": required_fields,
             "additionalProperties": False,
             "allOf": all_of
-        }
+        },
+        # every rule of the DiseaseReport validators: the rules not in the schema (the
+        # report period, the header and dataset-level rules) need a custom validator.
+        "x-rules": {
+            rule_id: {"message": message, "in_schema": rule_id in in_schema}
+            for rule_id, message in RULE_MESSAGES.items()
+        },
     }
     
     return schema
 
 
+class SchemaDumper(yaml.SafeDumper):
+    """Writes {const: value} mappings, and mappings of one or two of them, on one line."""
+
+
+def _represent_dict(dumper, data):
+    def is_const(value) -> bool:
+        return isinstance(value, dict) and list(value) == ['const']
+
+    flow = is_const(data) or (0 < len(data) <= 2 and all(is_const(value) for value in data.values()))
+    return dumper.represent_mapping('tag:yaml.org,2002:map', data, flow_style=True if flow else None)
+
+
+SchemaDumper.add_representer(dict, _represent_dict)
+
+
+def schema_yaml(schema) -> str:
+    """Render a generated schema as the text of data_reporting_schema.yaml."""
+    return yaml.dump(schema, Dumper=SchemaDumper, default_flow_style=False, sort_keys=False, allow_unicode=True)
+
+
 def main():
     """Main function to generate and write the YAML schema."""
     # Define paths
@@ -242,11 +159,15 @@ def main():
     yaml_output_path = repo_root / 'examples-and-templates' / 'data_reporting_schema.yaml'
     
     # Generate the schema
-    schema = generate_schema()
+    try:
+        schema = generate_schema()
+    except InexpressibleRuleError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
     
     # Write YAML schema
     with open(yaml_output_path, 'w') as f:
-        yaml.dump(schema, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+        f.write(schema_yaml(schema))
     
     print(f"✓ Generated {yaml_output_path}")
     print(f"  Schema contains {len(schema['items']['properties'])} properties")
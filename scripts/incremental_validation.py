@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Incremental validation of resubmitted disease tracking report files.
+
+Jurisdictions back-populate and resubmit their full history every week, so a new
+disease_tracking_report_{jurisdiction}_{report_date}.csv is mostly identical to
+the previously accepted one. This module diffs the new file against the
+accepted one line by line, i.e. on all columns (the natural key of every
+non-count column, plus count), and only validates rows that are new or changed.
+Lines are matched on their values, so a file whose columns are in another order
+than the previous one is compared value by value rather than as text. The
+count-totals check is recomputed only for the (report_period_start,
+report_period_end, disease_name, outcome) groups that gained or lost rows;
+every other group holds exactly the rows that already reconciled.
+
+The result is the same as validating the whole file, provided the previous file
+was accepted under the current schema. Accepting a file records the schema
+version it passed under next to it (see validation_cache.LOADED_SCHEMA_VERSION); a
+previous file without that record, or accepted under another schema version, is
+not trusted and the new file is validated in full.
+"""
+
+import argparse
+import csv
+import re
+import shutil
+import sys
+from collections import Counter
+from datetime import date
+from functools import lru_cache
+from operator import itemgetter
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from pydantic import TypeAdapter, ValidationError
+
+from columnar_validation import (
+    DEFAULT_MAX_ERRORS_PER_RULE,
+    FIELD_NAMES,
+    VALIDATION_MODES,
+    ErrorCollector,
+    _parse_count,
+    _parse_date,
+    read_csv_columns,
+    single_state_error,
+    validate_columns,
+    validate_rows,
+)
+from data_reporting_schema import CountTotals, CountTotalsError
+from validation_cache import LOADED_SCHEMA_VERSION
+
+
+SUBMISSION_NAME = re.compile(r'disease_tracking_report_(?P<jurisdiction>.+)_(?P<report_date>\d{4}-\d{2}-\d{2})\.csv')
+
+# suffix of the file next to an accepted submission that records the schema version it passed under.
+SCHEMA_VERSION_SUFFIX = '.schema-version'
+
+# positions of the count-totals inputs in a row tuple (FIELD_NAMES order).
+_GROUP = tuple(FIELD_NAMES.index(name) for name in ('report_period_start', 'report_period_end', 'disease_name', 'outcome'))
+_BREAKDOWN = tuple(FIELD_NAMES.index(name) for name in ('geo_unit', 'geo_name', 'age_group', 'disease_subtype'))
+_STATE = FIELD_NAMES.index('state')
+_COUNT = FIELD_NAMES.index('count')
+
+# accepted rows were validated by pydantic, which may have coerced values the strict
+# columnar parsers leave alone.
+_DATE = TypeAdapter(date)
+_INT = TypeAdapter(int)
+
+
+class SubmissionDiff(NamedTuple):
+    """Data lines of a new submission compared with the previously accepted one."""
+    changed: List[int]
+    removed: List[str]
+
+
+class IncrementalStats(NamedTuple):
+    rows: int
+    validated_rows: int
+    unchanged_rows: int
+    removed_rows: int
+    groups_rechecked: Optional[int]
+
+
+class SubmissionLines:
+    """
+    The data lines of a submission CSV, kept as text.
+
+    Lines of files with the same header are compared as strings, so only new,
+    changed and removed lines are ever split into values. read() returns None
+    for files this cannot handle exactly (a header that is not the DiseaseReport
+    fields, blank lines, quoted values spanning lines); those are validated in
+    full.
+    """
+
+    def __init__(self, header: List[str], lines: List[str], quoted: bool):
+        self.header = header
+        self.lines = lines
+        self.quoted = quoted
+        if tuple(header) == FIELD_NAMES:
+            self._reorder = tuple
+        else:
+            self._reorder = itemgetter(*(header.index(name) for name in FIELD_NAMES))
+        self._start = header.index('report_period_start')
+
+    @classmethod
+    def read(cls, csv_path: Path) -> Optional['SubmissionLines']:
+        with open(csv_path, 'r', newline='', encoding='utf-8-sig') as f:
+            lines = f.read().splitlines()
+
+        quoted = any('"' in line for line in lines)
+        if quoted and any(line.count('"') % 2 for line in lines):
+            return None
+        if not lines or '' in lines:
+            return None
+
+        header = next(csv.reader(lines[:1]))
+        if len(header) != len(FIELD_NAMES) or set(header) != set(FIELD_NAMES):
+            return None
+
+        return cls(header, lines[1:], quoted)
+
+    def split(self, line: str) -> List[str]:
+        # without quote characters a plain split on commas is exact CSV parsing.
+        return next(csv.reader([line])) if self.quoted else line.split(',')
+
+    def values(self, line: str) -> Optional[tuple]:
+        """Raw values of a line in FIELD_NAMES order, or None if it has the wrong number of values."""
+        values = self.split(line)
+        return self._reorder(values) if len(values) == len(self.header) else None
+
+    def start_date(self, line: str) -> str:
+        """Raw report_period_start of a line, without splitting the rest of it."""
+        if self.quoted:
+            return self.split(line)[self._start]
+        return line.split(',', self._start + 1)[self._start]
+
+
+def diff_submissions(previous: SubmissionLines, new: SubmissionLines) -> SubmissionDiff:
+    """
+    Match the data lines of the new file against the previous file as a multiset.
+
+    A line is unchanged if the previous file had a line with the same values in
+    every column. With the same header the lines are compared as text; a file
+    whose columns are in another order is compared on the values() tuples.
+    changed lists the indices of the other lines: new natural keys (all
+    non-count columns) and revised counts. removed lists the previous lines
+    that were not matched, including the old version of every revised row.
+    """
+    if previous.header == new.header:
+        previous_key = new_key = str
+    else:
+        previous_key = previous.values
+
+        def new_key(line: str):
+            # a line with the wrong number of values is keyed by its text, which matches no tuple.
+            return new.values(line) or line
+
+    remaining = Counter(map(previous_key, previous.lines))
+    changed = []
+    for i, line in enumerate(new.lines):
+        key = new_key(line)
+        if remaining[key] > 0:
+            remaining[key] -= 1
+        else:
+            changed.append(i)
+
+    removed = []
+    for line in previous.lines:
+        key = previous_key(line)
+        if remaining[key] > 0:
+            remaining[key] -= 1
+            removed.append(line)
+
+    return SubmissionDiff(changed, removed)
+
+
+@lru_cache(maxsize=None)
+def _typed_date(v: str) -> date:
+    return _parse_date(v) or _DATE.validate_python(v)
+
+
+def _typed_count(v: str) -> int:
+    count = _parse_count(v)
+    return count if count is not None else _INT.validate_python(v)
+
+
+def _group_key(values: tuple) -> tuple:
+    start, end, disease_name, outcome = (values[i] for i in _GROUP)
+    return _typed_date(start), _typed_date(end), disease_name, outcome
+
+
+def affected_count_totals(new: SubmissionLines, previous: SubmissionLines, diff: SubmissionDiff) -> CountTotals:
+    """Count sums of the groups that gained or lost rows, over all rows of the new file."""
+    affected = {_group_key(new.values(new.lines[i])) for i in diff.changed}
+    affected.update(_group_key(previous.values(line)) for line in diff.removed)
+    starts = {key[0] for key in affected}
+
+    # only lines starting in an affected period are split.
+    totals = CountTotals()
+    for line in new.lines:
+        if _typed_date(new.start_date(line)) not in starts:
+            continue
+        values = new.values(line)
+        key = _group_key(values)
+        if key in affected:
+            totals.add(*key, *(values[i] for i in _BREAKDOWN), _typed_count(values[_COUNT]))
+
+    return totals
+
+
+def validate_incremental(
+    new: SubmissionLines,
+    previous: SubmissionLines,
+    collector: ErrorCollector = None,
+    input_value=None,
+) -> Optional[IncrementalStats]:
+    """
+    Validate a submission against the previously accepted submission. Raises
+    pydantic.ValidationError with the errors a full validation of the
+    submission reports. Returns None, without validating anything, if a new or
+    changed line has the wrong number of values (see validate_file_incremental).
+    """
+    if collector is None:
+        collector = ErrorCollector()
+
+    diff = diff_submissions(previous, new)
+    changed_rows = [new.values(new.lines[i]) for i in diff.changed]
+    if None in changed_rows:
+        return None
+
+    changed_columns = dict(zip(FIELD_NAMES, map(list, zip(*changed_rows)))) if changed_rows else {name: [] for name in FIELD_NAMES}
+    validate_rows(changed_columns, collector, row_indices=diff.changed)
+    if collector.has_errors:
+        raise collector.validation_error()
+
+    groups_rechecked = 0
+    # unchanged lines come from the single-state previous file, which contributes its one state.
+    states = set(changed_columns['state'])
+    if len(diff.changed) < len(new.lines):
+        states.add(previous.values(previous.lines[0])[_STATE])
+    error = single_state_error(states)
+    if error is None:
+        totals = affected_count_totals(new, previous, diff)
+        groups_rechecked = len(totals.groups)
+        try:
+            totals.check(limit=collector.mismatch_limit)
+        except CountTotalsError as e:
+            error = e
+    if error is not None:
+        collector.add_dataset_error(error, input_value)
+        raise collector.validation_error()
+
+    return IncrementalStats(
+        rows=len(new.lines),
+        validated_rows=len(diff.changed),
+        unchanged_rows=len(new.lines) - len(diff.changed),
+        removed_rows=len(diff.removed),
+        groups_rechecked=groups_rechecked,
+    )
+
+
+def _schema_version_path(csv_path: Path) -> Path:
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.name + SCHEMA_VERSION_SUFFIX)
+
+
+def accepted_schema_version(csv_path: Path) -> Optional[str]:
+    """The schema version an accepted submission passed under, or None if it was not recorded."""
+    try:
+        return _schema_version_path(csv_path).read_text(encoding='utf-8').strip() or None
+    except OSError:
+        return None
+
+
+def accept_submission(csv_path: Path, accepted_dir: Path) -> Path:
+    """Copy a submission that passed into accepted_dir and record the current schema version next to it."""
+    accepted = Path(accepted_dir) / Path(csv_path).name
+    shutil.copy2(csv_path, accepted)
+    _schema_version_path(accepted).write_text(LOADED_SCHEMA_VERSION + '\n', encoding='utf-8')
+    return accepted
+
+
+def validate_file_incremental(
+    csv_path: Path,
+    previous_path: Optional[Path],
+    collector: ErrorCollector = None,
+    trust_previous: bool = False,
+) -> IncrementalStats:
+    """
+    Validate a submission CSV against the previously accepted CSV. Falls back
+    to a full validation (groups_rechecked is then None) when previous_path is
+    None, was not accepted under the current schema version, or either file
+    cannot be compared line by line. trust_previous skips the schema version
+    check, for a previous file known to pass the current schema.
+    """
+    if collector is None:
+        collector = ErrorCollector()
+
+    if previous_path is not None and not trust_previous and accepted_schema_version(previous_path) != LOADED_SCHEMA_VERSION:
+        previous_path = None
+
+    new = SubmissionLines.read(csv_path)
+    previous = SubmissionLines.read(previous_path) if previous_path is not None and new is not None else None
+    if previous is not None:
+        stats = validate_incremental(new, previous, collector, input_value=str(csv_path))
+        if stats is not None:
+            return stats
+
+    n_rows = len(validate_columns(read_csv_columns(csv_path), collector=collector)['count'])
+    return IncrementalStats(n_rows, n_rows, 0, 0, None)
+
+
+def find_previous_submission(csv_path: Path, accepted_dir: Path) -> Optional[Path]:
+    """
+    The latest accepted submission of the same jurisdiction in accepted_dir
+    whose report_date is not after csv_path's, or None.
+    """
+    match = SUBMISSION_NAME.fullmatch(Path(csv_path).name)
+    if match is None:
+        return None
+
+    candidates = []
+    for path in Path(accepted_dir).glob(f"disease_tracking_report_{match['jurisdiction']}_*.csv"):
+        other = SUBMISSION_NAME.fullmatch(path.name)
+        if other is None or other['jurisdiction'] != match['jurisdiction'] or other['report_date'] > match['report_date']:
+            continue
+        if path.resolve() == Path(csv_path).resolve():
+            continue
+        candidates.append((other['report_date'], path))
+
+    return max(candidates)[1] if candidates else None
+
+
+def main():
+    """Main function to incrementally validate a resubmission."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('path', help='new submission CSV')
+    previous = parser.add_mutually_exclusive_group(required=True)
+    previous.add_argument('--previous', default=None, help='previously accepted CSV of the same jurisdiction')
+    previous.add_argument(
+        '--accepted-dir', default=None,
+        help='directory of accepted submissions; the latest one of the same jurisdiction is used'
+    )
+    parser.add_argument('--accept', action='store_true', help='copy the file into --accepted-dir if it passes')
+    parser.add_argument('--mode', choices=VALIDATION_MODES, default='collect_all', help='error collection mode (default: collect_all)')
+    parser.add_argument(
+        '--max-errors-per-rule', type=int, default=DEFAULT_MAX_ERRORS_PER_RULE,
+        help=f'errors kept per rule and field in capped mode (default: {DEFAULT_MAX_ERRORS_PER_RULE})'
+    )
+    args = parser.parse_args()
+
+    if args.accept and args.accepted_dir is None:
+        parser.error('--accept requires --accepted-dir')
+
+    csv_path = Path(args.path)
+    if args.previous is not None:
+        previous_path = Path(args.previous)
+    else:
+        previous_path = find_previous_submission(csv_path, Path(args.accepted_dir))
+        if previous_path is None:
+            print(f"No accepted submission found in {args.accepted_dir}, validating the whole file")
+
+    if previous_path is not None and accepted_schema_version(previous_path) != LOADED_SCHEMA_VERSION:
+        print(f"{previous_path} was not accepted under the current schema version, validating the whole file")
+        previous_path = None
+
+    collector = ErrorCollector(args.mode, args.max_errors_per_rule)
+    try:
+        stats = validate_file_incremental(csv_path, previous_path, collector)
+    except ValidationError as e:
+        print(f"✗ FAIL: {csv_path}")
+        if args.mode == 'collect_all':
+            print(e)
+        else:
+            for entry in collector.summary():
+                print(f"  {entry['count']} x {entry['rule']} ({entry['field'] or 'row'}), e.g. rows {entry['sample_rows'][:5]}")
+        sys.exit(1)
+
+    print(f"✓ PASS: {csv_path} ({stats.rows} rows)")
+    if previous_path is not None and stats.groups_rechecked is not None:
+        print(f"  compared with {previous_path}: {stats.unchanged_rows} unchanged, {stats.validated_rows} new or changed, "
+              f"{stats.removed_rows} removed; {stats.groups_rechecked} count group(s) rechecked")
+
+    if args.accept:
+        accept_submission(csv_path, Path(args.accepted_dir))
+        print(f"  accepted into {args.accepted_dir}")
+
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""
+Asyncio ingestion service for disease tracking report submissions.
+
+Implements the transfer methods of the data transfer guide
+(guides/data-transfer-guide.md), each following the same
+validate -> store -> log -> notify flow:
+
+- web portal upload and scheduled push: POST /submissions/{file name} with the
+  CSV as the request body (X-Transfer-Method: push for scripted pushes),
+  streamed to the staging directory as it arrives;
+- scheduled pull: every configured pull source is fetched concurrently over
+  pooled keep-alive connections, retrying connection failures and 5xx/429
+  responses with exponential backoff.
+
+Validation runs in a process pool, so the event loop keeps serving requests
+while large files are checked; it reports the same errors as
+DiseaseReportDataset (see validate_submissions.validate_submission). Files
+that pass are stored under accepted/ (by their own name, the latest copy) and
+archive/ (every version, with the receipt time prepended and a counter added
+when two arrive in the same second); files that fail are not stored. A file
+that passes but whose reporting_jurisdiction is not the jurisdiction it was
+submitted for (the one in its file name, without an -EXAMPLE suffix) is
+rejected. If validation itself fails, e.g. because a worker process died, the
+attempt is logged as an internal_error and the monitor address is notified. Every attempt is appended to log.jsonl and every email the guide
+calls for is appended to notifications.jsonl, for a mailer to send.
+
+The service validates with the schema it imported when it started. GET
+/health answers 503 "restart required" once the schema files on disk have
+changed (see validation_cache.schema_is_current).
+
+Configuration (JSON):
+
+    {
+      "monitor_email": "usdt-monitor@example.org",
+      "jurisdictions": {"CA": {"email": "epi@example.gov", "token": "..."}},
+      "pull_sources": [{"jurisdiction": "CA", "url": "https://...", "interval_seconds": 604800}]
+    }
+
+Only configured jurisdictions can upload, and each must send its token as
+"Authorization: Bearer {token}"; a jurisdiction without a token cannot upload.
+An operator can opt out with "allow_unauthenticated": true, which accepts
+uploads from unconfigured jurisdictions and from jurisdictions without a
+token (a configured token is still required).
+"""
+
+import argparse
+import asyncio
+import csv
+import hashlib
+import hmac
+import itertools
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from async_http import HTTPClient, HTTPError, Request, Response, serve, server_url
+from incremental_validation import SUBMISSION_NAME
+from validate_submissions import validate_submission
+from validation_cache import LOADED_SCHEMA_VERSION, schema_is_current
+
+TRANSFER_METHODS = ('upload', 'push', 'pull')
+DEFAULT_PULL_INTERVAL = 7 * 24 * 3600
+# error records included in a log entry or notification; the counts cover all of them.
+MAX_REPORTED_ERRORS = 20
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+class PullSource(NamedTuple):
+    jurisdiction: str
+    url: str
+    interval_seconds: float = DEFAULT_PULL_INTERVAL
+    headers: Dict[str, str] = {}
+
+
+class ServiceConfig(NamedTuple):
+    monitor_email: Optional[str] = None
+    jurisdictions: Dict[str, Dict[str, Any]] = {}
+    pull_sources: List[PullSource] = []
+    # accept uploads without a token (from unconfigured jurisdictions too); off unless the operator opts in.
+    allow_unauthenticated: bool = False
+
+
+def load_config(path: Optional[Path]) -> ServiceConfig:
+    if path is None:
+        return ServiceConfig()
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    return ServiceConfig(
+        monitor_email=config.get('monitor_email'),
+        jurisdictions=config.get('jurisdictions', {}),
+        pull_sources=[PullSource(**source) for source in config.get('pull_sources', [])],
+        allow_unauthenticated=config.get('allow_unauthenticated', False) is True,
+    )
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+class ConnectionFailure(Exception):
+    """A pull source could not be fetched after all retries; attempts holds one line per try."""
+
+    def __init__(self, attempts: List[str]):
+        self.attempts = attempts
+        super().__init__(attempts[-1] if attempts else 'no attempt made')
+
+
+class IngestionService:
+    """
+    The validate -> store -> log -> notify pipeline, its HTTP handler, and the
+    pull scheduler. data_dir holds accepted/, archive/, log.jsonl and
+    notifications.jsonl.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        config: ServiceConfig = ServiceConfig(),
+        executor: Executor = None,
+        client: HTTPClient = None,
+        max_retries: int = 4,
+        backoff_seconds: float = 1.0,
+    ):
+        self.data_dir = Path(data_dir)
+        self.config = config
+        self.executor = executor if executor is not None else ProcessPoolExecutor()
+        self.client = client if client is not None else HTTPClient()
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.accepted_dir = self.data_dir / 'accepted'
+        self.archive_dir = self.data_dir / 'archive'
+        self.incoming_dir = self.data_dir / 'incoming'
+        self.log_path = self.data_dir / 'log.jsonl'
+        self.notifications_path = self.data_dir / 'notifications.jsonl'
+        for directory in (self.accepted_dir, self.archive_dir, self.incoming_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+
+    # records
+
+    def _append(self, path: Path, record: Dict[str, Any]) -> None:
+        # one short line per write; the loop is not held up measurably.
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, default=str) + '\n')
+
+    def log(self, entry: Dict[str, Any]) -> None:
+        self._append(self.log_path, entry)
+
+    def notify(self, to: Optional[str], subject: str, body: str, **fields) -> None:
+        """Queue an email as a notification record (sent to the monitor address if to is unknown)."""
+        if to is None:
+            to = self.config.monitor_email
+            body = "(no registered email address for this jurisdiction)\n\n" + body
+        self._append(self.notifications_path, {'time': _now(), 'to': to, 'subject': subject, 'body': body, **fields})
+
+    def jurisdiction_email(self, jurisdiction: str) -> Optional[str]:
+        return self.config.jurisdictions.get(jurisdiction, {}).get('email')
+
+    # pipeline
+
+    async def ingest_file(self, jurisdiction: str, file_name: str, staged: Path, method: str) -> Dict[str, Any]:
+        """Validate a staged file in the worker pool, then store, log and notify. Returns the log entry."""
+        loop = asyncio.get_running_loop()
+        received = _now()
+        try:
+            try:
+                result = await loop.run_in_executor(self.executor, validate_submission, str(staged))
+            except Exception as e:
+                entry = {
+                    'time': received, 'method': method, 'jurisdiction': jurisdiction, 'file': file_name,
+                    'status': 'internal_error', 'errors': [{'loc': [], 'type': type(e).__name__, 'msg': str(e)}],
+                    'stored_as': None,
+                }
+                self.log(entry)
+                # not the jurisdiction's fault, so the monitored JHU address is told instead.
+                self.notify(
+                    self.config.monitor_email, f"USDT validation failed: {file_name}",
+                    f"{file_name} from {jurisdiction} was received by {method} on {received} but could not be "
+                    f"validated:\n\n{type(e).__name__}: {e}",
+                    jurisdiction=jurisdiction, file=file_name, status='internal_error',
+                )
+                return entry
+            return await self.record_result(jurisdiction, file_name, staged, method, result, received)
+        finally:
+            staged.unlink(missing_ok=True)
+
+    async def record_result(
+        self,
+        jurisdiction: str,
+        file_name: str,
+        staged: Path,
+        method: str,
+        result: Dict[str, Any],
+        received: str,
+        **fields,
+    ) -> Dict[str, Any]:
+        """
+        Store, log and notify for a staged file already validated (result as
+        returned by validate_submission). A passing file is rejected if its
+        reporting_jurisdiction is not jurisdiction. fields are added to the
+        log entry. Returns the log entry.
+        """
+        if result['status'] == 'pass':
+            result = await asyncio.to_thread(_check_jurisdiction, staged, jurisdiction, result)
+        entry = {
+            'time': received,
+            'method': method,
+            'jurisdiction': jurisdiction,
+            'file': file_name,
+            'status': result['status'],
+            'rows': result['rows'],
+            'error_count': result['error_count'],
+            'errors': result['errors'][:MAX_REPORTED_ERRORS],
+            'error_summary': result['error_summary'],
+            'validation_seconds': result['seconds'],
+            'sha256': fields.pop('sha256', None) or await asyncio.to_thread(_sha256, staged),
+            'stored_as': None,
+            **fields,
+        }
+        try:
+            if result['status'] == 'pass':
+                archived = await asyncio.to_thread(
+                    _copy_exclusive, staged, self.archive_dir, f"{received.replace(':', '')}_{file_name}"
+                )
+                await asyncio.to_thread(os.replace, staged, self.accepted_dir / file_name)
+                entry['stored_as'] = str(archived.relative_to(self.data_dir))
+        finally:
+            staged.unlink(missing_ok=True)
+
+        self.log(entry)
+        email = self.jurisdiction_email(jurisdiction)
+        if entry['status'] == 'pass':
+            self.notify(
+                email, f"USDT submission accepted: {file_name}",
+                f"{file_name} ({entry['rows']} rows) was received by {method} and stored on {received}.",
+                jurisdiction=jurisdiction, file=file_name, status='pass',
+            )
+        else:
+            lines = [f"- {'.'.join(map(str, err['loc']))}: {err['msg']}" for err in entry['errors']]
+            if entry['error_count'] > len(lines):
+                lines.append(f"... and {entry['error_count'] - len(lines)} more")
+            self.notify(
+                email, f"USDT submission rejected: {file_name}",
+                f"{file_name} was received by {method} on {received} but failed validation and was not stored.\n\n"
+                + '\n'.join(lines) + "\n\nPlease correct the errors and resubmit.",
+                jurisdiction=jurisdiction, file=file_name, status=entry['status'],
+            )
+
+        return entry
+
+    async def ingest_bytes(self, jurisdiction: str, file_name: str, content: bytes, method: str) -> Dict[str, Any]:
+        staged = await asyncio.to_thread(self._stage, content)
+        return await self.ingest_file(jurisdiction, file_name, staged, method)
+
+    def _stage(self, content: bytes) -> Path:
+        fd, path = tempfile.mkstemp(dir=self.incoming_dir, suffix='.csv')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        return Path(path)
+
+    async def _stage_request(self, request: Request) -> Path:
+        """Write a request body to a staging file as it arrives; the file is removed if the body breaks off."""
+        fd, path = tempfile.mkstemp(dir=self.incoming_dir, suffix='.csv')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                async for chunk in request.iter_body():
+                    f.write(chunk)
+        except BaseException:
+            Path(path).unlink(missing_ok=True)
+            raise
+        return Path(path)
+
+    # HTTP (upload and push)
+
+    def _registered(self, jurisdiction: str) -> bool:
+        return jurisdiction in self.config.jurisdictions or self.config.allow_unauthenticated
+
+    def _authorized(self, request: Request, jurisdiction: str) -> bool:
+        token = self.config.jurisdictions.get(jurisdiction, {}).get('token')
+        if token is None:
+            return self.config.allow_unauthenticated
+        return hmac.compare_digest(request.headers.get('authorization', '').encode(), f"Bearer {token}".encode())
+
+    async def handle(self, request: Request) -> Response:
+        if request.path == '/health':
+            # the workers validate with the schema the service imported at startup.
+            if not schema_is_current():
+                return Response.json(503, {'status': 'restart required', 'schema_version': LOADED_SCHEMA_VERSION})
+            return Response.json(200, {'status': 'ok', 'schema_version': LOADED_SCHEMA_VERSION})
+        if not request.path.startswith('/submissions/'):
+            return Response.json(404, {'error': 'not found'})
+        if request.method != 'POST':
+            return Response.json(405, {'error': 'use POST /submissions/{file name}'})
+
+        file_name = request.path[len('/submissions/'):]
+        match = SUBMISSION_NAME.fullmatch(file_name)
+        if match is None or '/' in file_name or '\\' in file_name:
+            return Response.json(400, {'error': 'file name must be disease_tracking_report_{jurisdiction}_{report_date}.csv'})
+        jurisdiction = match['jurisdiction']
+        if not self._registered(jurisdiction):
+            return Response.json(403, {'error': f'{jurisdiction} is not a registered jurisdiction'})
+        if not self._authorized(request, jurisdiction):
+            return Response.json(401, {'error': f'missing or invalid token for {jurisdiction}'})
+        method = request.headers.get('x-transfer-method', 'upload')
+        if method not in ('upload', 'push'):
+            return Response.json(400, {'error': 'X-Transfer-Method must be upload or push'})
+
+        staged = await self._stage_request(request)
+        entry = await self.ingest_file(jurisdiction, file_name, staged, method)
+        if entry['status'] == 'internal_error':
+            return Response.json(500, entry)
+        return Response.json(201 if entry['status'] == 'pass' else 422, entry)
+
+    # pull
+
+    async def fetch(self, source: PullSource, staged: Path) -> None:
+        """
+        Download a pull source into staged, retrying connection failures and
+        retryable statuses with exponential backoff (with jitter). Raises
+        ConnectionFailure when every attempt failed.
+        """
+        attempts = []
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                delay = self.backoff_seconds * 2 ** (attempt - 1)
+                await asyncio.sleep(delay * (1 + random.random() / 2))
+            try:
+                response = await self.client.get(source.url, source.headers)
+                if response.status == 200:
+                    with open(staged, 'wb') as f:
+                        async for chunk in response.iter_chunks():
+                            f.write(chunk)
+                    return
+                response.close()
+                attempts.append(f"{_now()} attempt {attempt + 1}: HTTP {response.status}")
+                if response.status not in RETRY_STATUSES:
+                    break
+            except (OSError, HTTPError, asyncio.TimeoutError) as e:
+                attempts.append(f"{_now()} attempt {attempt + 1}: {type(e).__name__}: {e}")
+
+        raise ConnectionFailure(attempts)
+
+    async def pull(self, source: PullSource) -> Dict[str, Any]:
+        """Fetch one pull source and ingest it. Returns the log entry."""
+        file_name = f"disease_tracking_report_{source.jurisdiction}_{date.today().isoformat()}.csv"
+        fd, staged = tempfile.mkstemp(dir=self.incoming_dir, suffix='.csv')
+        os.close(fd)
+        staged = Path(staged)
+        start = time.perf_counter()
+        try:
+            await self.fetch(source, staged)
+        except ConnectionFailure as e:
+            staged.unlink(missing_ok=True)
+            entry = {
+                'time': _now(), 'method': 'pull', 'jurisdiction': source.jurisdiction, 'file': file_name,
+                'status': 'connection_error', 'url': source.url, 'attempts': e.attempts,
+                'fetch_seconds': round(time.perf_counter() - start, 6),
+            }
+            self.log(entry)
+            # connection failures go to the monitored JHU address, with the log contents.
+            self.notify(
+                self.config.monitor_email, f"USDT pull failed: {source.jurisdiction}",
+                f"Could not retrieve {source.url} for {source.jurisdiction}:\n\n" + '\n'.join(e.attempts),
+                jurisdiction=source.jurisdiction, file=file_name, status='connection_error',
+            )
+            return entry
+
+        fetch_seconds = round(time.perf_counter() - start, 6)
+        entry = await self.ingest_file(source.jurisdiction, file_name, staged, 'pull')
+        entry['fetch_seconds'] = fetch_seconds
+        return entry
+
+    async def pull_all(self) -> List[Dict[str, Any]]:
+        """Pull every configured source concurrently."""
+        return list(await asyncio.gather(*(self.pull(source) for source in self.config.pull_sources)))
+
+    async def run_pulls(self) -> None:
+        """Pull each source every interval_seconds, forever."""
+
+        async def loop(source: PullSource) -> None:
+            while True:
+                await self.pull(source)
+                await asyncio.sleep(source.interval_seconds)
+
+        await asyncio.gather(*(loop(source) for source in self.config.pull_sources))
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> asyncio.AbstractServer:
+        return await serve(self.handle, host, port)
+
+    def close(self) -> None:
+        self.client.close()
+        self.executor.shutdown()
+
+
+def _sha256(path: Path) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def _copy_exclusive(source: Path, directory: Path, name: str) -> Path:
+    """Copy source to directory/name, or to name with .1, .2, ... before its suffix if that exists already."""
+    stem, suffix = os.path.splitext(name)
+    for n in itertools.count():
+        target = directory / (name if n == 0 else f"{stem}.{n}{suffix}")
+        try:
+            dst = open(target, 'xb')
+        except FileExistsError:
+            continue
+        with dst, open(source, 'rb') as src:
+            shutil.copyfileobj(src, dst)
+        return target
+
+
+def _check_jurisdiction(path: Path, jurisdiction: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    result, or a failing result if the reporting_jurisdiction of the rows of a
+    passing file is not jurisdiction (without an -EXAMPLE suffix).
+    """
+    expected = jurisdiction.removesuffix('-EXAMPLE')
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        found = {row.get('reporting_jurisdiction') for row in csv.DictReader(f)}
+    if found <= {expected}:
+        return result
+
+    msg = (f"the file was submitted for {expected} but has reporting_jurisdiction "
+           f"{', '.join(repr(value) for value in sorted(found - {expected}, key=str))}")
+    return {
+        **result,
+        'status': 'fail',
+        'error_count': 1,
+        'errors': [{'loc': ['reporting_jurisdiction'], 'type': 'submitted_jurisdiction', 'msg': msg}],
+        'error_summary': [{'rule': 'submitted_jurisdiction', 'field': 'reporting_jurisdiction', 'count': 1, 'sample_rows': []}],
+    }
+
+
+async def demo(data_dir: Path) -> Dict[str, Any]:
+    """
+    Run every transfer method once against local stand-in servers: an upload and a
+    push to the service, an upload of another jurisdiction's file, a pull from a mock portal that fails once before
+    answering, and a pull from a portal path that does not exist.
+    """
+    from mock_portal import start_portal
+
+    examples = Path(__file__).parent.parent / 'examples-and-templates'
+    example = examples / 'disease_tracking_report_CA-EXAMPLE_2026-02-09.csv'
+
+    portal_server, _, portal_url = await start_portal(examples, fail_first=1)
+    config = ServiceConfig(
+        monitor_email='usdt-monitor@example.org',
+        jurisdictions={'CA-EXAMPLE': {'email': 'ca-epi@example.gov', 'token': 'ca-token'}},
+        pull_sources=[
+            PullSource('WA-EXAMPLE', f"{portal_url}/disease_tracking_report_WA-EXAMPLE_2026-02-09.csv"),
+            PullSource('XX', f"{portal_url}/missing.csv"),
+        ],
+    )
+    service = IngestionService(data_dir, config, backoff_seconds=0.05, max_retries=2)
+    server = await service.start()
+    url = server_url(server)
+    results = {}
+    try:
+        async with HTTPClient() as client:
+            auth = {'Authorization': 'Bearer ca-token'}
+            response = await client.post(f"{url}/submissions/{example.name}", example.read_bytes(), auth)
+            results['upload'] = (response.status, json.loads(await response.read())['status'])
+
+            bad = example.read_bytes().replace(b',measles,', b',mumps,', 1)
+            response = await client.post(
+                f"{url}/submissions/{example.name}", bad, {**auth, 'X-Transfer-Method': 'push'}
+            )
+            results['push'] = (response.status, json.loads(await response.read())['status'])
+
+            other = examples / 'disease_tracking_report_WA-EXAMPLE_2026-02-09.csv'
+            response = await client.post(f"{url}/submissions/{example.name}", other.read_bytes(), auth)
+            results['upload of another jurisdiction'] = (response.status, json.loads(await response.read())['status'])
+
+        results['pull'] = [(entry['jurisdiction'], entry['status']) for entry in await service.pull_all()]
+    finally:
+        server.close()
+        portal_server.close()
+        service.close()
+
+    return results
+
+
+def main():
+    """Main function to run the ingestion service."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for name, help_text in (
+        ('serve', 'accept uploads and pushes over HTTP and run the scheduled pulls'),
+        ('pull', 'pull every configured source once and exit'),
+        ('demo', 'run every transfer method once against local stand-in servers'),
+    ):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument('--data-dir', required=name != 'demo', default=None, help='directory for accepted files, logs and notifications')
+        if name != 'demo':
+            sub.add_argument('--config', default=None, help='service configuration (JSON)')
+            sub.add_argument('--workers', type=int, default=None, help='validation worker processes (default: number of CPUs)')
+    serve_parser = subparsers.choices['serve']
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8080)
+    serve_parser.add_argument('--no-pull', action='store_true', help='do not run the scheduled pulls')
+    args = parser.parse_args()
+
+    if args.command == 'demo':
+        data_dir = Path(args.data_dir) if args.data_dir else Path(tempfile.mkdtemp(prefix='usdt-ingestion-'))
+        results = asyncio.run(demo(data_dir))
+        print(json.dumps(results, indent=2))
+        print(f"✓ Log and notifications written to {data_dir}")
+        sys.exit(0)
+
+    config = load_config(Path(args.config) if args.config else None)
+
+    async def run():
+        service = IngestionService(Path(args.data_dir), config, ProcessPoolExecutor(args.workers))
+        try:
+            if args.command == 'pull':
+                for entry in await service.pull_all():
+                    print(json.dumps(entry))
+                return
+            server = await service.start(args.host, args.port)
+            print(f"Listening on {server_url(server)}")
+            async with server:
+                tasks = [server.serve_forever()]
+                if not args.no_pull:
+                    tasks.append(service.run_pulls())
+                await asyncio.gather(*tasks)
+        finally:
+            service.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
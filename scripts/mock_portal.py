@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a jurisdiction data portal.
+
+Serves the files of a directory over HTTP on localhost, so the ingestion
+service's scheduled pulls and the pull connectors can be exercised without
+network access:
+
+    GET /{file name}                   the file, with ETag and Last-Modified
+    GET /resource/{dataset}.csv        {dataset}.csv, as a Socrata portal serves it
+    GET /api/views/{dataset}.json      Socrata-style metadata: rowsUpdatedAt
+
+Conditional requests (If-None-Match, If-Modified-Since) get 304 Not Modified
+when the file has not changed; validators=False turns the ETag and
+Last-Modified headers off, as on portals that do not send them. Failures can
+be injected: the first fail_first requests for each path get a 503 response,
+and latency delays every response.
+"""
+
+import argparse
+import asyncio
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from async_http import Request, Response, serve, server_url
+
+
+class MockPortal:
+    """Request handler serving a directory, with conditional responses, injected failures and latency."""
+
+    def __init__(self, directory: Path, fail_first: int = 0, latency: float = 0.0, validators: bool = True):
+        self.directory = Path(directory)
+        self.fail_first = fail_first
+        self.latency = latency
+        self.validators = validators
+        self.requests: Dict[str, int] = {}
+        self.not_modified = 0
+        self.bytes_sent = 0
+
+    def _file(self, path: str) -> Optional[Path]:
+        if path.startswith('/resource/'):
+            name = path[len('/resource/'):]
+        elif path.startswith('/api/views/') and path.endswith('.json'):
+            name = path[len('/api/views/'):-len('.json')] + '.csv'
+        else:
+            name = path.lstrip('/')
+        file = self.directory / name
+        if not name or '/' in name or not file.is_file():
+            return None
+        return file
+
+    async def __call__(self, request: Request) -> Response:
+        path = request.path
+        self.requests[path] = self.requests.get(path, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if request.method not in ('GET', 'HEAD'):
+            return Response(405, b'method not allowed\n')
+        if self.requests[path] <= self.fail_first:
+            return Response(503, b'portal temporarily unavailable\n')
+
+        file = self._file(path)
+        if file is None:
+            return Response(404, b'not found\n')
+        mtime = int(file.stat().st_mtime)
+        if path.startswith('/api/views/'):
+            return Response.json(200, {'id': file.stem, 'name': file.stem, 'rowsUpdatedAt': mtime})
+
+        content = file.read_bytes()
+        headers = {}
+        if self.validators:
+            etag = '"' + hashlib.sha256(content).hexdigest()[:32] + '"'
+            headers = {'etag': etag, 'last-modified': formatdate(mtime, usegmt=True)}
+            if _not_modified(request, etag, mtime):
+                self.not_modified += 1
+                return Response(304, headers=headers)
+        self.bytes_sent += len(content)
+        return Response(200, content, headers, content_type='text/csv')
+
+
+def _not_modified(request: Request, etag: str, mtime: int) -> bool:
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since is not None:
+        try:
+            return mtime <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+async def start_portal(directory: Path, host: str = '127.0.0.1', port: int = 0, **options):
+    """Start a mock portal. Returns (server, portal, base URL)."""
+    portal = MockPortal(directory, **options)
+    server = await serve(portal, host, port)
+    return server, portal, server_url(server)
+
+
+def main():
+    """Main function to serve a directory as a mock jurisdiction data portal."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('directory', help='directory of files to serve')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--fail-first', type=int, default=0, help='answer the first N requests for each path with 503')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds to wait before each response')
+    parser.add_argument('--no-validators', action='store_true', help='send no ETag / Last-Modified headers')
+    args = parser.parse_args()
+
+    async def run():
+        server, _, url = await start_portal(
+            Path(args.directory), args.host, args.port,
+            fail_first=args.fail_first, latency=args.latency, validators=not args.no_validators,
+        )
+        print(f"Serving {args.directory} at {url}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
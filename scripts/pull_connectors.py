@@ -0,0 +1,626 @@
+#!/usr/bin/env python3
+"""
+Scheduled pull connectors with conditional fetching.
+
+A connector knows how to fetch one jurisdiction's dataset from its portal.
+Connectors run concurrently (at most max_concurrency at a time, over the
+pooled connections of async_http.HTTPClient) and skip datasets that have not
+changed since the last pull, in order of cost:
+
+1. a version probe, for portals that publish one (the Socrata connector reads
+   rowsUpdatedAt from /api/views/{dataset}.json): an equal version means no
+   download at all;
+2. a conditional GET with the ETag / Last-Modified validators of the last
+   pull (If-None-Match / If-Modified-Since): a 304 response has no body;
+3. the SHA-256 of the content, for portals that send neither: the file is
+   downloaded, but an identical copy is neither stored nor notified again.
+
+A changed dataset is validated while it downloads: the response body is
+decoded, cut into batches at record boundaries and fed to a
+StreamingValidator in a worker thread while the next batch arrives, so
+validation finishes shortly after the last byte. It reports the same errors
+as DiseaseReportDataset. Results go through IngestionService.record_result
+(accepted/, archive/, log.jsonl, notifications.jsonl), and each connector's
+latency (probe, first byte, download, validation, total) is recorded in its
+log entry. Validators and content hashes are kept in pull_state.json.
+
+Configuration (JSON; the ingestion service configuration plus connectors):
+
+    {
+      "monitor_email": "usdt-monitor@example.org",
+      "max_concurrency": 8,
+      "connectors": [
+        {"type": "http", "jurisdiction": "CA", "url": "https://.../ca.csv"},
+        {"type": "socrata", "jurisdiction": "WA", "domain": "https://data.wa.gov",
+         "dataset": "abcd-1234", "app_token": "..."}
+      ]
+    }
+
+New connector types subclass Connector and are registered with
+@register_connector('type name').
+"""
+
+import argparse
+import asyncio
+import codecs
+import csv
+import hashlib
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from columnar_validation import DEFAULT_MAX_ERRORS_PER_RULE, ErrorCollector
+from async_http import HTTPClient, HTTPError, Response
+from ingestion_service import (
+    DEFAULT_PULL_INTERVAL,
+    RETRY_STATUSES,
+    IngestionService,
+    ServiceConfig,
+    _now,
+    load_config,
+)
+from stream_validation import DEFAULT_CHUNK_SIZE, StreamingValidator
+from validate_submissions import error_records
+
+DEFAULT_MAX_CONCURRENCY = 8
+# the per-connector latencies recorded in each log entry, in pipeline order.
+LATENCY_FIELDS = ('probe_seconds', 'first_byte_seconds', 'download_seconds', 'validation_seconds', 'total_seconds')
+
+CONNECTOR_TYPES: Dict[str, type] = {}
+
+
+def register_connector(kind: str):
+    """Class decorator registering a Connector subclass under a configuration type name."""
+
+    def register(cls):
+        cls.kind = kind
+        CONNECTOR_TYPES[kind] = cls
+        return cls
+
+    return register
+
+
+class Connector:
+    """
+    How to pull one jurisdiction's dataset. Subclasses implement url() and may
+    add request headers or a version probe.
+    """
+
+    kind = None
+    # True for connectors that override version().
+    probes_version = False
+
+    def __init__(self, jurisdiction: str, name: Optional[str] = None, interval_seconds: float = DEFAULT_PULL_INTERVAL):
+        self.jurisdiction = jurisdiction
+        self.name = name or f"{self.kind}:{jurisdiction}"
+        self.interval_seconds = interval_seconds
+
+    def url(self) -> str:
+        raise NotImplementedError
+
+    def headers(self) -> Dict[str, str]:
+        return {}
+
+    def request(self, state: Dict[str, Any]) -> Tuple[str, Dict[str, str]]:
+        """The URL and headers to GET, made conditional on the validators of the last pull."""
+        headers = dict(self.headers())
+        if state.get('etag'):
+            headers['If-None-Match'] = state['etag']
+        if state.get('last_modified'):
+            headers['If-Modified-Since'] = state['last_modified']
+        return self.url(), headers
+
+    async def version(self, client: HTTPClient) -> Optional[str]:
+        """
+        A cheap identifier of the current dataset version, or None if the portal has
+        none. Raises ValueError or KeyError if the portal's answer cannot be read.
+        """
+        return None
+
+
+@register_connector('http')
+class HTTPConnector(Connector):
+    """A CSV file at a fixed URL."""
+
+    def __init__(self, jurisdiction: str, url: str, headers: Optional[Dict[str, str]] = None, **options):
+        self._url = url
+        self._headers = headers or {}
+        super().__init__(jurisdiction, **options)
+
+    def url(self) -> str:
+        return self._url
+
+    def headers(self) -> Dict[str, str]:
+        return self._headers
+
+
+@register_connector('socrata')
+class SocrataConnector(Connector):
+    """A Socrata open data portal dataset, exported as CSV; rowsUpdatedAt is the version."""
+
+    probes_version = True
+
+    def __init__(self, jurisdiction: str, domain: str, dataset: str, app_token: Optional[str] = None, **options):
+        self.domain = domain.rstrip('/')
+        self.dataset = dataset
+        self.app_token = app_token
+        super().__init__(jurisdiction, **options)
+
+    def url(self) -> str:
+        return f"{self.domain}/resource/{self.dataset}.csv"
+
+    def headers(self) -> Dict[str, str]:
+        return {'X-App-Token': self.app_token} if self.app_token else {}
+
+    async def version(self, client: HTTPClient) -> Optional[str]:
+        response = await client.get(f"{self.domain}/api/views/{self.dataset}.json", self.headers())
+        if response.status != 200:
+            response.close()
+            raise StatusError(response.status)
+        metadata = json.loads(await response.read())
+        if not isinstance(metadata, dict):
+            raise ValueError(f"expected a JSON object, got {type(metadata).__name__}")
+        updated = metadata.get('rowsUpdatedAt')
+        return None if updated is None else str(updated)
+
+
+def connector_from_config(config: Dict[str, Any]) -> Connector:
+    """Build a connector from its configuration entry ("type" defaults to http)."""
+    options = dict(config)
+    kind = options.pop('type', 'http')
+    if kind not in CONNECTOR_TYPES:
+        raise ValueError(f"unknown connector type {kind!r} (known: {', '.join(sorted(CONNECTOR_TYPES))})")
+    return CONNECTOR_TYPES[kind](**options)
+
+
+def load_connectors(path: Path) -> Tuple[ServiceConfig, List[Connector], int]:
+    """The service configuration, the connectors (pull_sources become http connectors) and max_concurrency."""
+    config = load_config(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+    connectors = [connector_from_config(entry) for entry in raw.get('connectors', [])]
+    connectors += [
+        HTTPConnector(source.jurisdiction, source.url, source.headers, interval_seconds=source.interval_seconds)
+        for source in config.pull_sources
+    ]
+    return config, connectors, raw.get('max_concurrency', DEFAULT_MAX_CONCURRENCY)
+
+
+class StatusError(Exception):
+    """A portal answered with an unexpected HTTP status."""
+
+    def __init__(self, status: int):
+        self.status = status
+        super().__init__(f"HTTP {status}")
+
+
+class ProbeError(Exception):
+    """A portal answered the version probe with a body that is not a version (e.g. a maintenance page)."""
+
+
+class PullState:
+    """Per-connector validators and content hashes of the last pull, kept in a JSON file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.connectors: Dict[str, Dict[str, Any]] = json.load(f)
+        except FileNotFoundError:
+            self.connectors = {}
+
+    def get(self, name: str) -> Dict[str, Any]:
+        return self.connectors.get(name, {})
+
+    def update(self, name: str, **fields) -> None:
+        self.connectors.setdefault(name, {}).update(fields)
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.connectors, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+async def stream_validate(
+    response: Response,
+    staged: Path,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    mode: str = 'collect_all',
+    max_errors_per_rule: int = DEFAULT_MAX_ERRORS_PER_RULE,
+) -> Dict[str, Any]:
+    """
+    Write a response body to staged while validating it, batch by batch, in a
+    worker thread. Returns a record like validate_submission's, plus the
+    body's sha256 and size and complete (False if fail-fast mode stopped the
+    download early).
+    """
+    collector = ErrorCollector(mode, max_errors_per_rule)
+    validator: Optional[StreamingValidator] = None
+    validation_seconds = 0.0
+
+    def validate_batch(text: str) -> None:
+        nonlocal validator, validation_seconds
+        start = time.perf_counter()
+        reader = csv.reader(io.StringIO(text, newline=''))
+        if validator is None:
+            validator = StreamingValidator(next(reader, []), collector)
+        rows = list(reader)
+        if rows:
+            validator.feed(rows)
+        validation_seconds += time.perf_counter() - start
+
+    record = {'file': str(staged), 'status': 'pass', 'rows': None, 'error_count': 0, 'errors': [], 'error_summary': []}
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    digest = hashlib.sha256()
+    size = 0
+    pending = ''  # decoded text not yet handed to the validator
+    batch: List[str] = []
+    batch_lines = 0
+    running: Optional[asyncio.Future] = None
+    complete = True
+
+    async def dispatch() -> None:
+        # one batch validates while the next one downloads; batches stay in order.
+        nonlocal running, batch, batch_lines
+        if running is not None:
+            await running
+        running = asyncio.ensure_future(asyncio.to_thread(validate_batch, ''.join(batch)))
+        batch, batch_lines = [], 0
+
+    try:
+        with open(staged, 'wb') as f:
+            async for chunk in response.iter_chunks():
+                f.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+                pending += decoder.decode(chunk)
+                # cut after the last line break that ends a record: in RFC 4180 CSV
+                # a line break is outside quotes when the quote count before it is even.
+                cut = pending.rfind('\n') + 1
+                if cut and pending.count('"', 0, cut) % 2 == 0:
+                    batch.append(pending[:cut])
+                    batch_lines += pending.count('\n', 0, cut)
+                    pending = pending[cut:]
+                if batch_lines >= chunk_size:
+                    await dispatch()
+                    if validator is not None and validator.done:
+                        response.close()
+                        complete = False
+                        break
+            if complete:
+                batch.append(pending + decoder.decode(b'', final=True))
+                await dispatch()
+            await running
+        record['rows'] = validator.finish(str(staged))
+    except ValidationError as e:
+        record['status'] = 'fail'
+        record['errors'] = error_records(e)
+        record['error_count'] = collector.error_count
+        record['error_summary'] = collector.summary()
+    except (UnicodeDecodeError, csv.Error) as e:
+        response.close()
+        complete = False
+        record['status'] = 'error'
+        record['errors'] = [{'loc': [], 'type': type(e).__name__, 'msg': str(e)}]
+        record['error_count'] = 1
+    finally:
+        if running is not None and not running.done():
+            await asyncio.wait([running])
+
+    record.update(
+        sha256=digest.hexdigest(), bytes=size, complete=complete,
+        seconds=round(validation_seconds, 6),
+    )
+    return record
+
+
+class PullRunner:
+    """
+    Runs pull connectors concurrently through an IngestionService, skipping
+    unchanged datasets. The state file defaults to pull_state.json in the
+    service's data directory.
+    """
+
+    def __init__(
+        self,
+        service: IngestionService,
+        connectors: List[Connector],
+        state_path: Optional[Path] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        mode: str = 'collect_all',
+    ):
+        self.service = service
+        self.connectors = connectors
+        self.state = PullState(state_path or service.data_dir / 'pull_state.json')
+        self.limit = asyncio.Semaphore(max_concurrency)
+        self.chunk_size = chunk_size
+        self.mode = mode
+
+    async def _attempt(self, connector: Connector, staged: Path, latency: Dict[str, float]) -> Dict[str, Any]:
+        """One try at pulling a connector: an 'unchanged' marker or a validation record."""
+        state = self.state.get(connector.name)
+        client = self.service.client
+        start = time.perf_counter()
+
+        version = None
+        if connector.probes_version:
+            try:
+                version = await connector.version(client)
+            except (ValueError, KeyError) as e:
+                raise ProbeError(f"unreadable version probe response: {type(e).__name__}: {e}") from e
+            latency['probe_seconds'] = round(time.perf_counter() - start, 6)
+        if version is not None and version == state.get('version'):
+            return {'status': 'unchanged', 'unchanged_by': 'version', 'version': version}
+
+        url, headers = connector.request(state)
+        response = await client.get(url, headers)
+        first_byte = time.perf_counter()
+        latency['first_byte_seconds'] = round(first_byte - start, 6)
+        if response.status == 304:
+            return {'status': 'unchanged', 'unchanged_by': 'not_modified', 'version': version}
+        if response.status != 200:
+            response.close()
+            raise StatusError(response.status)
+
+        result = await stream_validate(response, staged, self.chunk_size, self.mode)
+        latency['download_seconds'] = round(time.perf_counter() - first_byte, 6)
+        result['validators'] = {
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified'),
+            'version': version,
+        }
+        return result
+
+    async def pull(self, connector: Connector) -> Dict[str, Any]:
+        """
+        Pull one connector, retrying connection failures, unreadable version
+        probes and retryable statuses with exponential backoff, then record the
+        result. Returns the log entry. An unexpected error is logged as an
+        internal_error entry rather than raised, so one connector cannot stop
+        the others; the staged file is always removed.
+        """
+        service = self.service
+        file_name = f"disease_tracking_report_{connector.jurisdiction}_{date.today().isoformat()}.csv"
+        fd, staged = tempfile.mkstemp(dir=service.incoming_dir, suffix='.csv')
+        os.close(fd)
+        staged = Path(staged)
+        received = _now()
+        try:
+            return await self._pull(connector, file_name, staged, received)
+        except Exception as e:
+            entry = {
+                'time': received, 'method': 'pull', 'jurisdiction': connector.jurisdiction, 'file': file_name,
+                'status': 'internal_error', 'connector': connector.name, 'url': connector.url(),
+                'errors': [{'loc': [], 'type': type(e).__name__, 'msg': str(e)}],
+            }
+            service.log(entry)
+            service.notify(
+                service.config.monitor_email, f"USDT pull failed: {connector.jurisdiction}",
+                f"Pulling {connector.url()} for {connector.jurisdiction} failed:\n\n{type(e).__name__}: {e}",
+                jurisdiction=connector.jurisdiction, file=file_name, status='internal_error',
+            )
+            return entry
+        finally:
+            staged.unlink(missing_ok=True)
+
+    async def _pull(self, connector: Connector, file_name: str, staged: Path, received: str) -> Dict[str, Any]:
+        service = self.service
+        fields = {'connector': connector.name, 'url': connector.url()}
+        latency: Dict[str, float] = {}
+        start = time.perf_counter()
+
+        async with self.limit:
+            attempts = []
+            result = None
+            for attempt in range(service.max_retries + 1):
+                if attempt:
+                    delay = service.backoff_seconds * 2 ** (attempt - 1)
+                    await asyncio.sleep(delay * (1 + random.random() / 2))
+                try:
+                    result = await self._attempt(connector, staged, latency)
+                    break
+                except StatusError as e:
+                    attempts.append(f"{_now()} attempt {attempt + 1}: {e}")
+                    if e.status not in RETRY_STATUSES:
+                        break
+                except (OSError, HTTPError, asyncio.TimeoutError, ProbeError) as e:
+                    attempts.append(f"{_now()} attempt {attempt + 1}: {type(e).__name__}: {e}")
+        latency['total_seconds'] = round(time.perf_counter() - start, 6)
+
+        state = self.state.get(connector.name)
+        if result is None:
+            staged.unlink(missing_ok=True)
+            entry = {
+                'time': received, 'method': 'pull', 'jurisdiction': connector.jurisdiction, 'file': file_name,
+                'status': 'connection_error', 'attempts': attempts, **fields, **latency,
+            }
+            service.log(entry)
+            # connection failures go to the monitored JHU address, with the log contents.
+            service.notify(
+                service.config.monitor_email, f"USDT pull failed: {connector.jurisdiction}",
+                f"Could not retrieve {connector.url()} for {connector.jurisdiction}:\n\n" + '\n'.join(attempts),
+                jurisdiction=connector.jurisdiction, file=file_name, status='connection_error',
+            )
+            return entry
+
+        if result['status'] != 'unchanged':
+            validators = result.pop('validators')
+            checked = result['complete'] and result['status'] != 'error'
+            if checked and result['sha256'] == state.get('sha256'):
+                # the same bytes as last time: nothing new to store or notify.
+                result = {'status': 'unchanged', 'unchanged_by': 'content', **validators}
+            else:
+                latency['validation_seconds'] = result['seconds']
+                entry = await service.record_result(
+                    connector.jurisdiction, file_name, staged, 'pull', result, received,
+                    sha256=result['sha256'], bytes=result['bytes'], **fields, **latency,
+                )
+                # a partial download (fail-fast, unreadable) is fetched in full next time.
+                if not checked:
+                    validators = {'etag': None, 'last_modified': None, 'version': None}
+                self.state.update(
+                    connector.name, checked_at=received, last_status=entry['status'],
+                    sha256=result['sha256'] if checked else None, **validators,
+                )
+                return entry
+
+        staged.unlink(missing_ok=True)
+        updates = {name: result[name] for name in ('etag', 'last_modified', 'version') if result.get(name)}
+        self.state.update(connector.name, checked_at=received, **updates)
+        entry = {
+            'time': received, 'method': 'pull', 'jurisdiction': connector.jurisdiction, 'file': file_name,
+            'status': 'unchanged', 'unchanged_by': result['unchanged_by'], 'last_status': state.get('last_status'),
+            **fields, **latency,
+        }
+        service.log(entry)
+        return entry
+
+    async def pull_all(self) -> List[Dict[str, Any]]:
+        """Pull every connector concurrently; a connector that fails does not cancel the others."""
+        return list(await asyncio.gather(*(self.pull(connector) for connector in self.connectors)))
+
+    async def run(self) -> None:
+        """Pull each connector every interval_seconds, forever."""
+
+        async def loop(connector: Connector) -> None:
+            while True:
+                await self.pull(connector)
+                await asyncio.sleep(connector.interval_seconds)
+
+        await asyncio.gather(*(loop(connector) for connector in self.connectors))
+
+
+def format_results(entries: List[Dict[str, Any]]) -> str:
+    """A table of pull results, one line per connector, latencies in milliseconds."""
+    columns = ['probe', 'first byte', 'download', 'validation', 'total']
+    lines = [f"{'connector':<34} {'status':<24} {'rows':>7} " + ' '.join(f"{c:>10}" for c in columns)]
+    for entry in entries:
+        status = entry['status'] + (f" ({entry['unchanged_by']})" if entry['status'] == 'unchanged' else '')
+        rows = entry.get('rows')
+        latencies = [
+            f"{entry[field] * 1000:>10.1f}" if entry.get(field) is not None else f"{'-':>10}"
+            for field in LATENCY_FIELDS
+        ]
+        lines.append(f"{entry['connector']:<34} {status:<24} {'-' if rows is None else rows:>7} " + ' '.join(latencies))
+    return '\n'.join(lines)
+
+
+async def demo(data_dir: Path, latency: float = 0.05) -> List[List[Dict[str, Any]]]:
+    """
+    Pull three connectors from two local mock portals, three times: first run
+    downloads and validates everything; the second finds nothing changed (by
+    version probe, 304 and content hash); the third sees one changed dataset.
+    """
+    from mock_portal import start_portal
+
+    examples = Path(__file__).parent.parent / 'examples-and-templates'
+    portal_dir = data_dir / 'portal'
+    plain_dir = data_dir / 'portal-plain'
+    for directory in (portal_dir, plain_dir):
+        directory.mkdir(parents=True, exist_ok=True)
+    ca = examples / 'disease_tracking_report_CA-EXAMPLE_2026-02-09.csv'
+    wa = examples / 'disease_tracking_report_WA-EXAMPLE_2026-02-09.csv'
+    shutil.copyfile(ca, portal_dir / ca.name)
+    shutil.copyfile(wa, portal_dir / 'wa-example.csv')
+    shutil.copyfile(ca, plain_dir / 'ca-plain.csv')
+
+    portal_server, _, portal_url = await start_portal(portal_dir, latency=latency)
+    plain_server, _, plain_url = await start_portal(plain_dir, latency=latency, validators=False)
+    service = IngestionService(data_dir / 'service', ServiceConfig(monitor_email='usdt-monitor@example.org'))
+    runner = PullRunner(service, [
+        HTTPConnector('CA-EXAMPLE', f"{portal_url}/{ca.name}"),
+        SocrataConnector('WA-EXAMPLE', portal_url, 'wa-example'),
+        HTTPConnector('CA-EXAMPLE', f"{plain_url}/ca-plain.csv", name='http:CA-EXAMPLE (no validators)'),
+    ])
+    runs = []
+    try:
+        runs.append(await runner.pull_all())
+        runs.append(await runner.pull_all())
+        # a week later the WA portal has a new export (one bad row) and a later modification time.
+        changed = portal_dir / 'wa-example.csv'
+        changed.write_bytes(wa.read_bytes().replace(b',measles,', b',mumps,', 1))
+        mtime = changed.stat().st_mtime + 7 * 24 * 3600
+        os.utime(changed, (mtime, mtime))
+        runs.append(await runner.pull_all())
+    finally:
+        portal_server.close()
+        plain_server.close()
+        service.close()
+
+    return runs
+
+
+def main():
+    """Main function to run the pull connectors."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for name, help_text in (
+        ('pull', 'pull every connector once and exit'),
+        ('run', 'pull every connector on its interval, forever'),
+        ('demo', 'pull from local mock portals three times, showing skipped unchanged datasets'),
+    ):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument('--data-dir', required=name != 'demo', default=None, help='directory for accepted files, logs and pull state')
+        if name != 'demo':
+            sub.add_argument('--config', required=True, help='service and connector configuration (JSON)')
+            sub.add_argument('--state', default=None, help='pull state file (default: {data dir}/pull_state.json)')
+            sub.add_argument('--mode', choices=['collect_all', 'capped', 'fail_fast'], default='collect_all')
+            sub.add_argument('--json', action='store_true', help='print the log entries as JSON lines')
+    args = parser.parse_args()
+
+    if args.command == 'demo':
+        data_dir = Path(args.data_dir) if args.data_dir else Path(tempfile.mkdtemp(prefix='usdt-pull-'))
+        for number, entries in enumerate(asyncio.run(demo(data_dir)), 1):
+            print(f"Run {number}:")
+            print(format_results(entries))
+            print()
+        print(f"✓ Log, notifications and pull state written to {data_dir / 'service'}")
+        sys.exit(0)
+
+    try:
+        config, connectors, max_concurrency = load_connectors(Path(args.config))
+    except (OSError, ValueError, TypeError) as e:
+        print(f"✗ Invalid configuration {args.config}: {e}")
+        sys.exit(2)
+
+    async def run():
+        service = IngestionService(Path(args.data_dir), config)
+        runner = PullRunner(
+            service, connectors, Path(args.state) if args.state else None,
+            max_concurrency=max_concurrency, mode=args.mode,
+        )
+        try:
+            if args.command == 'run':
+                await runner.run()
+                return []
+            return await runner.pull_all()
+        finally:
+            service.close()
+
+    try:
+        entries = asyncio.run(run())
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+    failed = [entry for entry in entries if entry['status'] not in ('pass', 'unchanged')]
+    if args.json:
+        for entry in entries:
+            print(json.dumps(entry, default=str))
+    else:
+        print(format_results(entries))
+        print(f"{'✗' if failed else '✓'} {len(entries) - len(failed)} of {len(entries)} connectors passed or unchanged")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
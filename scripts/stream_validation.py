@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Streaming validation of disease tracking report files.
+
+Reads a disease_tracking_report_{jurisdiction}_{report_date}.csv file in
+fixed-size chunks and validates each chunk with the columnar engine as it is
+read. Only the states seen and the running per-group sums needed for the
+count-totals check are kept between chunks, so memory is bounded by the
+number of (report_period_start, report_period_end, disease_name, outcome)
+groups rather than by the number of rows.
+"""
+
+import csv
+import sys
+from pathlib import Path
+from typing import Iterable, List
+
+from pydantic import ValidationError
+
+# Add the examples-and-templates directory to the path so we can import the schema
+sys.path.insert(0, str(Path(__file__).parent.parent / 'examples-and-templates'))
+
+from columnar_validation import (
+    DEFAULT_MAX_ERRORS_PER_RULE,
+    ErrorCollector,
+    columns_from_rows,
+    single_state_error,
+    validate_rows,
+)
+from data_reporting_schema import CountTotals, CountTotalsError
+
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+class StreamingValidator:
+    """
+    Incremental equivalent of DiseaseReportDataset validation.
+
+    Call feed() with successive blocks of parsed CSV rows until done is True or
+    the input is exhausted, then finish(). Errors are collected by an
+    ErrorCollector according to its mode ('collect_all', 'capped' or
+    'fail_fast'); in 'collect_all' mode the ValidationError raised by finish()
+    carries the same errors, row indices and messages as
+    DiseaseReportDataset.model_validate on the whole file.
+    """
+
+    def __init__(self, header: List[str], collector: ErrorCollector = None):
+        self.header = header
+        self.errors = collector if collector is not None else ErrorCollector()
+        self.n_rows = 0
+        self.states = set()
+        self.count_totals = CountTotals()
+
+    @property
+    def done(self) -> bool:
+        """True once the collector has stopped (fail-fast mode); remaining rows need not be read."""
+        return self.errors.stopped
+
+    def feed(self, rows: List[List[str]], line_numbers: List[int] = None) -> None:
+        """
+        Validate one chunk of rows and fold it into the running aggregates.
+        line_numbers, the physical CSV line each row starts on, are recorded
+        in the collector's lines for the rows whose errors it keeps.
+        """
+        kept = len(self.errors.line_errors)
+        typed = validate_rows(columns_from_rows(self.header, rows), self.errors, row_offset=self.n_rows)
+        if line_numbers is not None:
+            for err in self.errors.line_errors[kept:]:
+                row_index = err['loc'][0]
+                self.errors.lines[row_index] = line_numbers[row_index - self.n_rows]
+        self.n_rows += len(rows)
+
+        if self.errors.has_errors:
+            # dataset-level checks will not run, so there is nothing to aggregate.
+            return
+
+        self.states.update(typed['state'])
+        self.count_totals.add_columns(typed)
+
+    def finish(self, input_value=None) -> int:
+        """
+        Run the dataset-level checks and return the number of rows validated.
+        Raises pydantic.ValidationError if any row or dataset check failed.
+        """
+        if self.errors.has_errors:
+            raise self.errors.validation_error()
+
+        error = single_state_error(self.states)
+        if error is None:
+            try:
+                self.count_totals.check(limit=self.errors.mismatch_limit)
+            except CountTotalsError as e:
+                error = e
+        if error is not None:
+            self.errors.add_dataset_error(error, input_value)
+            raise self.errors.validation_error()
+
+        return self.n_rows
+
+
+def validate_stream(
+    lines: Iterable[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    input_value=None,
+    collector: ErrorCollector = None,
+) -> int:
+    """
+    Validate a submission from an iterable of CSV text lines (an open file,
+    a decoded HTTP response, ...). Returns the number of rows validated.
+    Pass a collector to choose the validation mode and to read its summary()
+    after a failure.
+    """
+    reader = csv.reader(lines)
+    validator = StreamingValidator(next(reader, []), collector)
+
+    chunk = []
+    # the physical line each row starts on; blank lines and quoted line breaks shift it from the row index.
+    line_numbers = []
+    end = reader.line_num
+    for row in reader:
+        start, end = end + 1, reader.line_num
+        if not row:
+            # blank lines are not rows, as in csv.DictReader.
+            continue
+        chunk.append(row)
+        line_numbers.append(start)
+        if len(chunk) >= chunk_size:
+            validator.feed(chunk, line_numbers)
+            chunk = []
+            line_numbers = []
+            if validator.done:
+                break
+    if chunk and not validator.done:
+        validator.feed(chunk, line_numbers)
+
+    return validator.finish(input_value)
+
+
+def validate_file(csv_path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE, collector: ErrorCollector = None) -> int:
+    """Stream-validate a submission CSV. Returns the number of rows validated."""
+    with open(csv_path, 'r', newline='', encoding='utf-8-sig') as f:
+        return validate_stream(f, chunk_size=chunk_size, input_value=str(csv_path), collector=collector)
+
+
+def main():
+    """Stream-validate the CSV files given on the command line."""
+    args = sys.argv[1:]
+    options = {'--chunk-size': DEFAULT_CHUNK_SIZE, '--mode': 'collect_all', '--max-errors-per-rule': DEFAULT_MAX_ERRORS_PER_RULE}
+    for option, default in options.items():
+        if option in args:
+            i = args.index(option)
+            options[option] = type(default)(args[i + 1])
+            del args[i:i + 2]
+
+    if not args:
+        print(
+            "Usage: python3 scripts/stream_validation.py [--chunk-size N] "
+            "[--mode collect_all|capped|fail_fast] [--max-errors-per-rule N] FILE.csv [FILE.csv ...]"
+        )
+        sys.exit(2)
+
+    all_passed = True
+    for arg in args:
+        collector = ErrorCollector(options['--mode'], options['--max-errors-per-rule'])
+        try:
+            n_rows = validate_file(Path(arg), chunk_size=options['--chunk-size'], collector=collector)
+        except ValidationError as e:
+            print(f"✗ FAIL: {arg}")
+            if options['--mode'] == 'collect_all':
+                print(e)
+            else:
+                for entry in collector.summary():
+                    print(f"  {entry['count']} x {entry['rule']} ({entry['field'] or 'row'}), e.g. rows {entry['sample_rows'][:5]}")
+            all_passed = False
+            continue
+        print(f"✓ PASS: {arg} ({n_rows} rows)")
+
+    sys.exit(0 if all_passed else 1)
+
+
+if __name__ == '__main__':
+    main()
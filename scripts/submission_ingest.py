@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Typed ingest of disease tracking report files.
+
+read_submission() loads a disease_tracking_report_{jurisdiction}_{report_date}.csv
+file into validated, typed columns in three steps:
+
+1. The header is checked against FIELD_NAMES, the DiseaseReport fields in
+   model order, before any data row is read. Columns may come in any order (the template starts with
+   report_period_start, the example files with disease_name); a missing,
+   unexpected or repeated column is reported once, as a file-level 'header'
+   error, instead of once for every row.
+2. The data rows are read into one list of raw values per column, with
+   pyarrow's multithreaded CSV reader when it is installed and the csv module
+   otherwise. Both skip blank lines, as csv.DictReader does.
+3. The columns go straight to the columnar engine, which parses each distinct
+   date, count and enum value once and returns dates as datetime.date and
+   counts as int. Valid rows never become a dict or a DiseaseReport.
+"""
+
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from pydantic import ValidationError
+
+from columnar_validation import (
+    DEFAULT_MAX_ERRORS_PER_RULE,
+    FIELD_NAMES,
+    VALIDATION_MODES,
+    ErrorCollector,
+    columns_from_rows,
+    validate_columns,
+)
+from data_reporting_schema import RuleViolation, rule_message
+
+CSV_BACKENDS = ('auto', 'pyarrow', 'stdlib')
+
+
+def available_backend() -> str:
+    """The CSV backend 'auto' resolves to: 'pyarrow' if it can be imported, else 'stdlib'."""
+    try:
+        import pyarrow.csv  # noqa: F401
+    except ImportError:
+        return 'stdlib'
+    return 'pyarrow'
+
+
+def check_header(header: List[str]) -> Optional[RuleViolation]:
+    """
+    Compare a CSV header with the DiseaseReport fields, ignoring column order.
+    Returns a 'header' RuleViolation listing the missing, unexpected and
+    repeated columns, or None if the header is valid.
+    """
+    missing = [name for name in FIELD_NAMES if name not in header]
+    unexpected = [name for name in dict.fromkeys(header) if name not in FIELD_NAMES]
+    repeated = [name for name in dict.fromkeys(header) if header.count(name) > 1]
+    if not (missing or unexpected or repeated):
+        return None
+
+    details = ""
+    if missing:
+        details += "\nmissing: " + ", ".join(f"'{name}'" for name in missing)
+    if unexpected:
+        # a stray space or capital letter is the usual reason a column is not recognized.
+        normalized = {name.lower(): name for name in missing}
+        details += "\nunexpected: " + ", ".join(
+            f"'{name}'" + (f" (did you mean '{normalized[name.strip().lower()]}'?)" if name.strip().lower() in normalized else "")
+            for name in unexpected
+        )
+    if repeated:
+        details += "\nrepeated: " + ", ".join(f"'{name}'" for name in repeated)
+
+    return RuleViolation("header", rule_message("header", details = details))
+
+
+def read_header(csv_path: Path) -> List[str]:
+    with open(csv_path, 'r', newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f), [])
+
+
+def _read_stdlib(csv_path: Path) -> Dict[Any, List[Optional[str]]]:
+    with open(csv_path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        return columns_from_rows(header, [row for row in reader if row])
+
+
+def _read_pyarrow(csv_path: Path, header: List[str]) -> Optional[Dict[Any, List[Optional[str]]]]:
+    """Columns read with pyarrow, or None for input it parses differently from the csv module."""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    # every column is read as text, so values reach the validator exactly as written.
+    convert_options = pa_csv.ConvertOptions(
+        column_types={name: pa.string() for name in header},
+        strings_can_be_null=False,
+        quoted_strings_can_be_null=False,
+    )
+    try:
+        table = pa_csv.read_csv(csv_path, convert_options=convert_options)
+    except pa.ArrowInvalid:
+        # ragged rows and quoted line breaks; the csv module reports those row by row.
+        return None
+
+    return {name: table.column(name).to_pylist() for name in table.column_names}
+
+
+def read_columns(csv_path: Path, backend: str = 'auto') -> Dict[Any, List[Optional[str]]]:
+    """Read a submission CSV into a mapping of column name -> list of raw values."""
+    if backend not in CSV_BACKENDS:
+        raise ValueError(f"backend must be one of {CSV_BACKENDS}. got: {backend!r}")
+    if backend == 'auto':
+        backend = available_backend()
+
+    if backend == 'pyarrow':
+        columns = _read_pyarrow(csv_path, read_header(csv_path))
+        if columns is not None:
+            return columns
+
+    return _read_stdlib(csv_path)
+
+
+def read_submission(
+    csv_path: Path,
+    backend: str = 'auto',
+    mode: str = 'collect_all',
+    max_errors_per_rule: int = DEFAULT_MAX_ERRORS_PER_RULE,
+    collector: ErrorCollector = None,
+) -> Dict[str, list]:
+    """
+    Read and validate a submission CSV. Returns its typed columns, in
+    FIELD_NAMES order, whatever the column order of the file. Raises a
+    pydantic ValidationError with a single 'header' error if the header is
+    invalid (no data row is read), and otherwise with the errors
+    DiseaseReportDataset would report.
+    """
+    if collector is None:
+        collector = ErrorCollector(mode, max_errors_per_rule)
+
+    header = read_header(csv_path)
+    error = check_header(header)
+    if error is not None:
+        collector.add_dataset_error(error, header)
+        raise collector.validation_error()
+
+    return validate_columns(read_columns(csv_path, backend), collector=collector)
+
+
+def main():
+    """Main function to ingest submission CSVs and report their row counts and read times."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='+', help='submission CSV files')
+    parser.add_argument('--backend', choices=CSV_BACKENDS, default='auto', help='CSV reader (default: auto)')
+    parser.add_argument('--mode', choices=VALIDATION_MODES, default='collect_all', help='error collection mode (default: collect_all)')
+    args = parser.parse_args()
+
+    backend = available_backend() if args.backend == 'auto' else args.backend
+    all_passed = True
+    for arg in args.paths:
+        start = time.perf_counter()
+        try:
+            typed = read_submission(Path(arg), backend, args.mode)
+        except ValidationError as e:
+            print(f"✗ FAIL: {arg}")
+            print(e)
+            all_passed = False
+            continue
+        print(f"✓ PASS: {arg} ({len(typed['count'])} rows, {time.perf_counter() - start:.2f}s with {backend})")
+
+    sys.exit(0 if all_passed else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Versioned store of accepted disease tracking report submissions.
+
+Every accepted disease_tracking_report_{jurisdiction}_{report_date}.csv is kept
+as a version, with the submission metadata (jurisdiction, report date, time
+received, submitting user, original file name, content hash). Rows are
+deduplicated across versions: each distinct row is stored once, column by
+column in gzip-compressed segments, and a version is the compressed list of the
+ids of its rows. Because jurisdictions resubmit their full history every week,
+a new version usually adds only a few new rows to the store.
+
+Layout of a store directory:
+
+    rows/segment-{first_row_id}.json.gz      columns of the rows first seen in one submission
+    submissions/{jurisdiction}/{version}.json  submission metadata, with the segments its rows are in
+    submissions/{jurisdiction}/{version}.ids   zlib-compressed uint32 row ids, in file order
+
+The store answers "what did jurisdiction X report for MMWR week W as of date D"
+and "what changed between two submissions" from these files alone, without
+reading the original CSVs again. Segments are indexed by jurisdiction and
+version: a query only loads the segments of the versions it reads, and
+storing a submission only loads the segments of its jurisdiction to
+deduplicate rows against. It assumes a single writer.
+"""
+
+import argparse
+import bisect
+import csv
+import gzip
+import hashlib
+import json
+import sys
+import zlib
+from array import array
+from collections import Counter
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from pydantic import ValidationError
+
+from columnar_validation import FIELD_NAMES, read_csv_columns
+import data_reporting_schema
+from incremental_validation import SUBMISSION_NAME
+from mmwr_calendar import MMWRWeek, mmwr_week_of
+from stream_validation import validate_file
+
+NATURAL_KEY_FIELDS = tuple(name for name in FIELD_NAMES if name != 'count')
+
+
+class SubmissionVersion(NamedTuple):
+    """Metadata of one stored submission."""
+    version: str
+    jurisdiction: str
+    report_date: str
+    submitted_at: str
+    file_name: str
+    sha256: str
+    rows: int
+    user: Optional[str] = None
+    # first row ids of the segments holding the rows; None in metadata written before segments were indexed.
+    segments: Optional[List[int]] = None
+
+
+class SubmissionChanges(NamedTuple):
+    """
+    Row-level differences between two submissions. revised pairs the old and
+    new version of rows whose natural key (every non-count column) is in both
+    submissions but whose count changed; added and removed hold the other rows.
+    """
+    added: List[Dict[str, str]]
+    removed: List[Dict[str, str]]
+    revised: List[tuple]
+
+
+def _ids_to_bytes(ids: array) -> bytes:
+    if sys.byteorder != 'little':
+        ids = array('I', ids)
+        ids.byteswap()
+    return zlib.compress(ids.tobytes())
+
+
+def _ids_from_bytes(data: bytes) -> array:
+    ids = array('I')
+    ids.frombytes(zlib.decompress(data))
+    if sys.byteorder != 'little':
+        ids.byteswap()
+    return ids
+
+
+class SubmissionStore:
+    """A directory of deduplicated, versioned submissions (see module docstring)."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        # first row id -> columns of a loaded segment.
+        self._segments: Dict[int, Dict[str, List[str]]] = {}
+        self._starts = None
+        # jurisdiction -> {row: row id} of the rows in its segments.
+        self._indexes: Dict[str, Dict[tuple, int]] = {}
+
+    def _segment_path(self, first_row_id: int) -> Path:
+        return self.root / 'rows' / f'segment-{first_row_id:010d}.json.gz'
+
+    def _segment_starts(self) -> List[int]:
+        """First row ids of the stored segments, in order, read from their file names."""
+        if self._starts is None:
+            self._starts = sorted(
+                int(path.name[len('segment-'):-len('.json.gz')]) for path in (self.root / 'rows').glob('segment-*.json.gz')
+            )
+        return self._starts
+
+    def _segment(self, first_row_id: int) -> Dict[str, List[str]]:
+        """Columns of the segment starting at first_row_id, loaded on first use."""
+        columns = self._segments.get(first_row_id)
+        if columns is None:
+            path = self._segment_path(first_row_id)
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                segment = json.load(f)
+            if segment['first_row_id'] != first_row_id:
+                raise ValueError(f"{path}: expected first row id {first_row_id}, got {segment['first_row_id']}")
+            columns = self._segments[first_row_id] = segment['columns']
+        return columns
+
+    def _segment_of(self, row_id: int) -> int:
+        """First row id of the segment holding row_id."""
+        starts = self._segment_starts()
+        i = bisect.bisect_right(starts, row_id) - 1
+        if i < 0:
+            raise KeyError(f"no stored row {row_id}")
+        return starts[i]
+
+    def _segments_of(self, version: SubmissionVersion) -> List[int]:
+        """Segments holding the rows of a version: from its metadata, or looked up from its row ids."""
+        if version.segments is not None:
+            return version.segments
+        return sorted({self._segment_of(row_id) for row_id in set(self.row_ids(version))})
+
+    def _columns(self, segments: List[int]) -> Dict[str, Dict[int, str]]:
+        """{column: {row id: value}} of the rows in the given segments."""
+        columns = {name: {} for name in FIELD_NAMES}
+        for first_row_id in segments:
+            segment = self._segment(first_row_id)
+            for name in FIELD_NAMES:
+                columns[name].update(enumerate(segment[name], first_row_id))
+        return columns
+
+    def _next_row_id(self) -> int:
+        starts = self._segment_starts()
+        if not starts:
+            return 0
+        return starts[-1] + len(self._segment(starts[-1])[FIELD_NAMES[0]])
+
+    def _row_index(self, jurisdiction: str) -> Dict[tuple, int]:
+        """{row: row id} of the rows stored by a jurisdiction's submissions."""
+        index = self._indexes.get(jurisdiction)
+        if index is None:
+            segments = sorted({first for version in self.versions(jurisdiction) for first in self._segments_of(version)})
+            index = self._indexes[jurisdiction] = {}
+            for first_row_id in segments:
+                segment = self._segment(first_row_id)
+                index.update((row, i) for i, row in enumerate(zip(*(segment[name] for name in FIELD_NAMES)), first_row_id))
+        return index
+
+    def row(self, row_id: int) -> Dict[str, str]:
+        first_row_id = self._segment_of(row_id)
+        segment = self._segment(first_row_id)
+        return {name: segment[name][row_id - first_row_id] for name in FIELD_NAMES}
+
+    def _store_rows(self, rows: List[tuple], jurisdiction: str) -> tuple:
+        """
+        (row ids, segments) of rows (tuples in FIELD_NAMES order): rows already
+        stored for the jurisdiction are reused, the others appended as a new segment.
+        """
+        index = self._row_index(jurisdiction)
+        first_row_id = self._next_row_id()
+        new_rows = {}
+        ids = array('I')
+        for row in rows:
+            row_id = index.get(row)
+            if row_id is None:
+                row_id = new_rows.get(row)
+                if row_id is None:
+                    row_id = new_rows[row] = first_row_id + len(new_rows)
+            ids.append(row_id)
+
+        if new_rows:
+            segment_columns = {name: list(values) for name, values in zip(FIELD_NAMES, zip(*new_rows))}
+            path = self._segment_path(first_row_id)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(path, 'wt', encoding='utf-8') as f:
+                json.dump({'first_row_id': first_row_id, 'columns': segment_columns}, f)
+            self._segments[first_row_id] = segment_columns
+            self._segment_starts().append(first_row_id)
+            index.update(new_rows)
+
+        return ids, sorted({self._segment_of(row_id) for row_id in set(ids)})
+
+    def add(
+        self,
+        csv_path: Path,
+        submitted_at: datetime = None,
+        user: str = None,
+        jurisdiction: str = None,
+        report_date: str = None,
+    ) -> SubmissionVersion:
+        """
+        Store an accepted submission file. jurisdiction and report_date default
+        to the ones in the file name; submitted_at defaults to now (UTC).
+        """
+        csv_path = Path(csv_path)
+        match = SUBMISSION_NAME.fullmatch(csv_path.name)
+        if jurisdiction is None or report_date is None:
+            if match is None:
+                raise ValueError(
+                    f"{csv_path.name}: expected disease_tracking_report_{{jurisdiction}}_{{report_date}}.csv, "
+                    "or pass jurisdiction and report_date"
+                )
+            jurisdiction = jurisdiction or match['jurisdiction']
+            report_date = report_date or match['report_date']
+
+        columns = read_csv_columns(csv_path)
+        if set(columns) != set(FIELD_NAMES):
+            raise ValueError(f"{csv_path}: columns must be exactly {', '.join(FIELD_NAMES)}")
+        rows = list(zip(*(columns[name] for name in FIELD_NAMES)))
+
+        ids, segments = self._store_rows(rows, jurisdiction)
+        submitted_at = (submitted_at or datetime.now(timezone.utc)).astimezone(timezone.utc)
+        version = SubmissionVersion(
+            version=f"{report_date}_{submitted_at:%Y%m%dT%H%M%S%fZ}",
+            jurisdiction=jurisdiction,
+            report_date=report_date,
+            submitted_at=submitted_at.isoformat(),
+            file_name=csv_path.name,
+            sha256=hashlib.sha256(csv_path.read_bytes()).hexdigest(),
+            rows=len(rows),
+            user=user,
+            segments=segments,
+        )
+
+        directory = self.root / 'submissions' / jurisdiction
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f'{version.version}.ids').write_bytes(_ids_to_bytes(ids))
+        with open(directory / f'{version.version}.json', 'w', encoding='utf-8') as f:
+            json.dump(version._asdict(), f, indent=2)
+
+        return version
+
+    def jurisdictions(self) -> List[str]:
+        return sorted(path.name for path in (self.root / 'submissions').glob('*') if path.is_dir())
+
+    def versions(self, jurisdiction: str) -> List[SubmissionVersion]:
+        """Stored submissions of a jurisdiction, oldest first (by report date, then time received)."""
+        versions = []
+        for path in (self.root / 'submissions' / jurisdiction).glob('*.json'):
+            with open(path, 'r', encoding='utf-8') as f:
+                versions.append(SubmissionVersion(**json.load(f)))
+
+        return sorted(versions, key=lambda v: (v.report_date, v.submitted_at))
+
+    def version(self, jurisdiction: str, version: str) -> SubmissionVersion:
+        """Look up a version by id, or by report date (the latest version of that date)."""
+        matches = [v for v in self.versions(jurisdiction) if version in (v.version, v.report_date)]
+        if not matches:
+            raise KeyError(f"no submission {version!r} for {jurisdiction}")
+        return matches[-1]
+
+    def as_of(self, jurisdiction: str, as_of: date) -> Optional[SubmissionVersion]:
+        """The latest submission of a jurisdiction with a report date on or before as_of."""
+        versions = [v for v in self.versions(jurisdiction) if v.report_date <= as_of.isoformat()]
+        return versions[-1] if versions else None
+
+    def row_ids(self, version: SubmissionVersion) -> array:
+        path = self.root / 'submissions' / version.jurisdiction / f'{version.version}.ids'
+        return _ids_from_bytes(path.read_bytes())
+
+    def rows(self, version: SubmissionVersion, week: MMWRWeek = None, **filters) -> List[Dict[str, str]]:
+        """
+        Rows of a submission as raw values, in file order. week restricts them to
+        one MMWR week; other keyword arguments filter on column values
+        (e.g. disease_name='measles').
+        """
+        ids = self.row_ids(version)
+        columns = self._columns(self._segments_of(version))
+        if week is not None:
+            start = MMWRWeek(*week).start
+            starts = columns['report_period_start']
+            in_week = {}
+            for v in {starts[i] for i in ids}:
+                try:
+                    in_week[v] = date.fromisoformat(v) == start
+                except ValueError:
+                    in_week[v] = False
+            ids = [i for i in ids if in_week[starts[i]]]
+        for name, value in filters.items():
+            values = columns[name]
+            ids = [i for i in ids if values[i] == value]
+
+        return [{name: columns[name][i] for name in FIELD_NAMES} for i in ids]
+
+    def reported(self, jurisdiction: str, week: MMWRWeek, as_of: date, **filters) -> List['data_reporting_schema.DiseaseReport']:
+        """What a jurisdiction had reported for an MMWR week as of a date."""
+        version = self.as_of(jurisdiction, as_of)
+        if version is None:
+            return []
+        # the model is only built on first use (see data_reporting_schema.__getattr__).
+        return [data_reporting_schema.DiseaseReport.model_validate(row) for row in self.rows(version, week=week, **filters)]
+
+    def diff(self, old: SubmissionVersion, new: SubmissionVersion) -> SubmissionChanges:
+        """Row-level changes from old to new, computed on row ids."""
+        remaining = Counter(self.row_ids(old))
+        added = []
+        for row_id in self.row_ids(new):
+            if remaining[row_id] > 0:
+                remaining[row_id] -= 1
+            else:
+                added.append(row_id)
+        removed = list((+remaining).elements())
+
+        removed_by_key = {}
+        for row in map(self.row, removed):
+            removed_by_key.setdefault(_natural_key(row), []).append(row)
+
+        revised = []
+        added_rows = []
+        for row in map(self.row, added):
+            candidates = removed_by_key.get(_natural_key(row))
+            if candidates:
+                revised.append((candidates.pop(0), row))
+            else:
+                added_rows.append(row)
+
+        return SubmissionChanges(
+            added=added_rows,
+            removed=[row for rows in removed_by_key.values() for row in rows],
+            revised=revised,
+        )
+
+
+def _natural_key(row: Dict[str, str]) -> tuple:
+    return tuple(row[name] for name in NATURAL_KEY_FIELDS)
+
+
+def _parse_week(value: str) -> MMWRWeek:
+    """YYYY-WW (MMWR year and week) or any date inside the week (YYYY-MM-DD)."""
+    try:
+        return mmwr_week_of(date.fromisoformat(value))
+    except ValueError:
+        year, week = value.split('-')
+        return MMWRWeek(int(year), int(week))
+
+
+def _describe(row: Dict[str, str]) -> str:
+    return ', '.join(row[name] for name in ('report_period_start', 'disease_name', 'geo_name', 'age_group', 'disease_subtype', 'outcome'))
+
+
+def _write_rows(rows: List[Dict[str, Any]], out) -> None:
+    writer = csv.DictWriter(out, fieldnames=FIELD_NAMES, lineterminator='\n')
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def main():
+    """Main function for the submission store command line."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('store', help='store directory')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help='store accepted submission files')
+    add.add_argument('paths', nargs='+')
+    add.add_argument('--user', default=None, help='submitting user, recorded in the metadata')
+    add.add_argument('--no-validate', action='store_true', help='store files without validating them first')
+
+    versions = commands.add_parser('versions', help='list stored submissions')
+    versions.add_argument('jurisdiction', nargs='?', default=None)
+
+    as_of = commands.add_parser('as-of', help='rows a jurisdiction had reported as of a date (CSV on stdout)')
+    as_of.add_argument('jurisdiction')
+    as_of.add_argument('date', type=date.fromisoformat)
+    as_of.add_argument('--week', type=_parse_week, default=None, help='MMWR week as YYYY-WW, or a date in the week')
+    as_of.add_argument('--disease', default=None, help='disease_name to select')
+
+    diff = commands.add_parser('diff', help='row-level changes between two submissions')
+    diff.add_argument('jurisdiction')
+    diff.add_argument('old', help='version id or report date')
+    diff.add_argument('new', help='version id or report date')
+
+    args = parser.parse_args()
+    store = SubmissionStore(Path(args.store))
+
+    if args.command == 'add':
+        failed = False
+        for arg in args.paths:
+            if not args.no_validate:
+                try:
+                    validate_file(Path(arg))
+                except ValidationError as e:
+                    print(f"✗ FAIL: {arg} was not stored ({e.error_count()} validation errors)", file=sys.stderr)
+                    failed = True
+                    continue
+            version = store.add(Path(arg), user=args.user)
+            print(f"✓ Stored {arg} as {version.jurisdiction}/{version.version} ({version.rows} rows)")
+        sys.exit(1 if failed else 0)
+
+    if args.command == 'versions':
+        for jurisdiction in ([args.jurisdiction] if args.jurisdiction else store.jurisdictions()):
+            for v in store.versions(jurisdiction):
+                print(f"{v.jurisdiction}\t{v.version}\t{v.rows} rows\t{v.file_name}\t{v.sha256[:12]}")
+        return
+
+    if args.command == 'as-of':
+        version = store.as_of(args.jurisdiction, args.date)
+        if version is None:
+            print(f"No submission from {args.jurisdiction} on or before {args.date}", file=sys.stderr)
+            sys.exit(1)
+        filters = {'disease_name': args.disease} if args.disease else {}
+        print(f"# {args.jurisdiction} as of {args.date}: {version.version} ({version.file_name})", file=sys.stderr)
+        _write_rows(store.rows(version, week=args.week, **filters), sys.stdout)
+        return
+
+    if args.command == 'diff':
+        changes = store.diff(store.version(args.jurisdiction, args.old), store.version(args.jurisdiction, args.new))
+        print(f"{len(changes.added)} added, {len(changes.removed)} removed, {len(changes.revised)} revised")
+        for old_row, new_row in changes.revised:
+            print(f"  revised  {_describe(old_row)}: {old_row['count']} -> {new_row['count']}")
+        for label, rows in (('added', changes.added), ('removed', changes.removed)):
+            for row in rows:
+                print(f"  {label:8} {_describe(row)}: {row['count']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Synthetic disease tracking report submissions.
+
+Generates disease_tracking_report_{jurisdiction}_{report_date}.csv rows that
+pass every DiseaseReport and DiseaseReportDataset rule, for benchmarking and
+load testing. For each MMWR week, disease and outcome the generator draws a
+state-level age breakdown (and, for meningococcus, a disease subtype breakdown
+with the same total), then spreads that total over a random subset of the
+state's sub-state geographies, so the count-totals rule always reconciles. A
+few international resident rows are added on top.
+
+States with a jurisdiction-metadata file use their registered geographies; the
+others get synthetic county names, which the schema does not check.
+
+error_rate corrupts that fraction of rows, each with one row-level rule
+violation picked from ERROR_KINDS, so error paths can be benchmarked too.
+"""
+
+import argparse
+import csv
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Sequence
+
+from columnar_validation import FIELD_NAMES
+from data_reporting_schema import AGE_GROUPS, DISEASE_NAMES, MENINGOCOCCUS_SUBTYPES, STATES, geography
+from mmwr_calendar import LAST_DAY, MMWRWeek, mmwr_weeks
+
+BREAKDOWN_AGE_GROUPS = tuple(age for age in AGE_GROUPS if age != 'total')
+BREAKDOWN_SUBTYPES = tuple(subtype for subtype in MENINGOCOCCUS_SUBTYPES if subtype != 'total')
+CONFIRMATION_STATUS = {'measles': 'confirmed', 'pertussis': 'confirmed and probable', 'meningococcus': 'confirmed and probable'}
+
+# probability that a (week, disease) group has rows for each outcome.
+OUTCOME_RATES = {'cases': 1.0, 'hospitalizations': 0.5, 'deaths': 0.15}
+INTERNATIONAL_RESIDENT_RATE = 0.05
+SYNTHETIC_COUNTIES = 12
+
+_INDEX = {name: i for i, name in enumerate(FIELD_NAMES)}
+
+
+def _set(row: list, **values) -> None:
+    for name, value in values.items():
+        row[_INDEX[name]] = value
+
+
+def _later_sunday(row: list) -> str:
+    start = date.fromisoformat(row[_INDEX['report_period_start']])
+    return (start + timedelta(days=7)).isoformat()
+
+
+# one row-level rule violation each, keyed by the rule or field it breaks.
+ERROR_KINDS: Dict[str, Callable[[list], None]] = {
+    'count_positive': lambda row: _set(row, count='0'),
+    'int_parsing': lambda row: _set(row, count='n/a'),
+    'literal_error': lambda row: _set(row, age_group='adults'),
+    'date_from_datetime_parsing': lambda row: _set(row, report_period_end='02/30/2026'),
+    'mmwr_week': lambda row: _set(row, report_period_end=_later_sunday(row)),
+    'disease_subtype': lambda row: _set(row, disease_subtype='Q'),
+    'state_geo_name': lambda row: _set(row, geo_unit='state', geo_name='Nowhere County'),
+    'reporting_jurisdiction': lambda row: _set(row, reporting_jurisdiction='XX'),
+}
+
+
+class Synthetic(NamedTuple):
+    rows: List[list]
+    errors: int
+
+
+def sub_state_geographies(state: str) -> Sequence[str]:
+    """The registered geographies of state, or synthetic county names for unregistered states."""
+    names = geography.names(state)
+    if names:
+        return [name for name in names if name != 'unspecified']
+    return [f"{state} County {i}" for i in range(1, SYNTHETIC_COUNTIES + 1)]
+
+
+def latest_weeks(n: int, last: MMWRWeek) -> List[MMWRWeek]:
+    """The n MMWR weeks ending with last, in order."""
+    weeks = [week for week in mmwr_weeks(last.year - n // 52 - 1, last.year) if week <= last]
+    return weeks[-n:]
+
+
+def _split(total: int, parts: int, rng: random.Random) -> List[int]:
+    """parts positive integers summing to total (parts <= total)."""
+    cuts = sorted(rng.sample(range(1, total), parts - 1))
+    return [b - a for a, b in zip([0] + cuts, cuts + [total])]
+
+
+def generate_submission(
+    state: str,
+    weeks: Sequence[MMWRWeek],
+    seed: int = 0,
+    error_rate: float = 0.0,
+) -> Synthetic:
+    """
+    Rows (lists of strings in FIELD_NAMES order) of one state's submission
+    covering weeks. The same state, weeks and seed always give the same rows.
+    """
+    rng = random.Random(f"{seed}:{state}")
+    geos = sub_state_geographies(state)
+    rows = []
+
+    for week in weeks:
+        start, end = week.start.isoformat(), (week.start + LAST_DAY).isoformat()
+        for disease_name in DISEASE_NAMES:
+            confirmation_status = CONFIRMATION_STATUS[disease_name]
+            for outcome, rate in OUTCOME_RATES.items():
+                if rng.random() >= rate:
+                    continue
+
+                def add(geo_unit: str, geo_name: str, age_group: str, disease_subtype: str, count: int) -> None:
+                    rows.append([
+                        disease_name, start, end, 'cccd', 'week', disease_subtype, state, state,
+                        geo_unit, geo_name, age_group, confirmation_status, outcome, str(count),
+                    ])
+
+                ages = rng.sample(BREAKDOWN_AGE_GROUPS, rng.randint(1, 4))
+                age_counts = [rng.randint(1, 6) for _ in ages]
+                total = sum(age_counts)
+                for age_group, count in zip(ages, age_counts):
+                    add('state', state, age_group, 'total', count)
+                if disease_name == 'meningococcus':
+                    subtypes = rng.sample(BREAKDOWN_SUBTYPES, rng.randint(1, min(total, 3)))
+                    for subtype, count in zip(subtypes, _split(total, len(subtypes), rng)):
+                        add('state', state, 'total', subtype, count)
+                places = rng.sample(geos, rng.randint(1, min(total, len(geos))))
+                for geo_name, count in zip(places, _split(total, len(places), rng)):
+                    add('county', geo_name, 'total', 'total', count)
+                if rng.random() < INTERNATIONAL_RESIDENT_RATE:
+                    add('NA', 'international resident', 'total', 'total', rng.randint(1, 2))
+
+    errors = 0
+    if error_rate > 0:
+        corruptions = list(ERROR_KINDS.values())
+        for row in rows:
+            if rng.random() < error_rate:
+                rng.choice(corruptions)(row)
+                errors += 1
+
+    return Synthetic(rows, errors)
+
+
+def write_submission(path: Path, rows: List[list]) -> None:
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(FIELD_NAMES)
+        writer.writerows(rows)
+
+
+def main():
+    """Main function to write synthetic submission files."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('states', nargs='*', default=['MN'], help="state codes, or 'all' (default: MN)")
+    parser.add_argument('--weeks', type=int, default=1, help='number of MMWR weeks, ending with --last-week (default: 1)')
+    parser.add_argument('--last-week', default='2026-5', help='last MMWR week as YEAR-WEEK (default: 2026-5)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of rows with a rule violation (default: 0)')
+    parser.add_argument('--output', default='.', help='output directory (default: current directory)')
+    args = parser.parse_args()
+
+    states = STATES if args.states == ['all'] else args.states
+    unknown = [state for state in states if state not in STATES]
+    if unknown:
+        parser.error(f"unknown state code(s): {', '.join(unknown)}")
+    year, week = map(int, args.last_week.split('-'))
+    weeks = latest_weeks(args.weeks, MMWRWeek(year, week))
+    # file names carry the monday after the last reported week as the report date.
+    report_date = (weeks[-1].start + timedelta(days=8)).isoformat()
+
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    for state in states:
+        synthetic = generate_submission(state, weeks, args.seed, args.error_rate)
+        path = output / f"disease_tracking_report_{state}_{report_date}.csv"
+        write_submission(path, synthetic.rows)
+        print(f"✓ Wrote {path} ({len(synthetic.rows)} rows, {synthetic.errors} with errors)")
+
+
+if __name__ == '__main__':
+    main()
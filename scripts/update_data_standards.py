@@ -2,84 +2,290 @@
 """
 Update data standards tool and documentation from validation schema.
 
-This script orchestrates the complete update process:
-1. Generates YAML schema from Pydantic model (data_reporting_schema.py)
-2. Updates data dictionary CSV from YAML schema
-3. Updates markdown documentation from YAML schema
-4. Validates consistency across all files
-
-This ensures that the data standards tool (data_dictionary.csv) and
-documentation always reflect the current validation schema.
+The data standards artifacts form a small dependency graph:
+
+1. YAML schema (data_reporting_schema.yaml), generated from the Pydantic
+   model (data_reporting_schema.py, the modules it imports and the
+   jurisdiction metadata of the geography registry)
+2. Data dictionary CSV, updated from the YAML schema
+3. Markdown documentation (guides/data-technical-specs.md), updated from
+   the YAML schema
+4. Compiled validator (data_reporting_validator.js), compiled from the YAML
+   schema by compile_schema_validator.py
+5. Data standards tool pages, which embed the compiled validator
+
+Each target is built in this process, in that order, and only when the
+content hash of one of its inputs or of the target itself has changed since
+the last successful build (the hashes are kept in STATE_PATH). When nothing
+changed, nothing is imported or parsed. A rebuilt target is validated for
+consistency with the schema before its hashes are recorded. --check writes
+nothing, the state file included.
+
+Outside --check, the geography registry snapshot (see geography_registry.py)
+is then rebuilt if the jurisdiction metadata changed, so that validators
+importing the schema do not have to parse it.
+
+This ensures that the data standards tool (data_dictionary.csv and the
+validator the tool pages run) and documentation always reflect the current
+validation schema.
 """
 
+import argparse
+import hashlib
+import json
+import os
 import sys
-import subprocess
+import time
 from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+SCRIPT_DIR = Path(__file__).parent
+REPO_DIR = SCRIPT_DIR.parent
+SCHEMA_DIR = REPO_DIR / 'examples-and-templates'
+YAML_PATH = SCHEMA_DIR / 'data_reporting_schema.yaml'
+DICT_PATH = SCHEMA_DIR / 'disease_tracking_data_dictionary.csv'
+MD_PATH = REPO_DIR / 'guides' / 'data-technical-specs.md'
+VALIDATOR_PATH = SCHEMA_DIR / 'data_reporting_validator.js'
+TOOL_PAGES = [
+    REPO_DIR / 'data_standards_tool' / 'data-standards-tool.html',
+    REPO_DIR / 'docs' / 'data-standards-tool.html',
+]
+
+# content hashes of every input and target at the last successful build (ignored by git).
+STATE_PATH = REPO_DIR / '.data_standards_build.json'
+STATE_VERSION = 1
+
+# target statuses; STALE is only reported with --check, SKIPPED when an input target is not up to date.
+UP_TO_DATE = 'up to date'
+CONSISTENT = 'consistent'
+UPDATED = 'updated'
+STALE = 'out of date'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+OK_STATUSES = (UP_TO_DATE, CONSISTENT, UPDATED)
+
+
+class Target(NamedTuple):
+    name: str
+    path: Path
+    # files the target is built from, the code that builds it included.
+    inputs: List[Path]
+    # build(check) -> UPDATED or CONSISTENT (STALE instead of writing, with check).
+    build: Callable[[bool], str]
+
+
+def _rebuild_yaml(check: bool) -> str:
+    from generate_yaml_schema import generate_schema, schema_yaml
+
+    text = schema_yaml(generate_schema())
+    if YAML_PATH.exists() and YAML_PATH.read_text(encoding='utf-8') == text:
+        return CONSISTENT
+    if check:
+        return STALE
+    YAML_PATH.write_text(text, encoding='utf-8')
+    return UPDATED
+
+
+def _failed_checks(specs, document: str) -> List[str]:
+    from validate_schema_specs import run_rules
+
+    return [f"{result['name']}: {result['message']}" for result in run_rules(specs, [document]) if not result['passed']]
+
+
+def _rebuild_data_dictionary(check: bool) -> str:
+    from validate_schema_specs import DataDictionary, Specs, load_data_dictionary, load_specs, update_data_dictionary_from_schema
+
+    specs = load_specs(YAML_PATH, dict_path=DICT_PATH)
+    if not _failed_checks(specs, 'data_dict'):
+        return CONSISTENT
+    if check:
+        return STALE
+    update_data_dictionary_from_schema(specs.schema, DICT_PATH)
+    failed = _failed_checks(Specs(specs.schema, data_dict=DataDictionary(load_data_dictionary(DICT_PATH))), 'data_dict')
+    if failed:
+        raise RuntimeError("still inconsistent after the update: " + "; ".join(failed))
+    return UPDATED
+
+
+def _rebuild_markdown(check: bool) -> str:
+    from validate_schema_specs import SpecDocument, Specs, load_specs, update_markdown_from_schema
+
+    specs = load_specs(YAML_PATH, md_path=MD_PATH)
+    if not _failed_checks(specs, 'markdown'):
+        return CONSISTENT
+    if check:
+        return STALE
+    markdown = update_markdown_from_schema(specs.schema, specs.markdown.text, YAML_PATH)
+    with open(MD_PATH, 'w') as f:
+        f.write(markdown)
+    failed = _failed_checks(Specs(specs.schema, markdown=SpecDocument(markdown)), 'markdown')
+    if failed:
+        raise RuntimeError("still inconsistent after the update: " + "; ".join(failed))
+    return UPDATED
+
+
+def _rebuild_compiled(path: Path) -> Callable[[bool], str]:
+    """build function of one output of compile_schema_validator.py."""
+    def rebuild(check: bool) -> str:
+        from compile_schema_validator import build_outputs
+
+        text = build_outputs(YAML_PATH)[path]
+        if path.exists() and path.read_text(encoding='utf-8') == text:
+            return CONSISTENT
+        if check:
+            return STALE
+        path.write_text(text, encoding='utf-8')
+        return UPDATED
+
+    return rebuild
 
 
-def run_command(cmd: list, description: str) -> bool:
-    """Run a command and return success status."""
-    print(f"\n{'='*60}")
-    print(f"{description}")
-    print(f"{'='*60}")
-    
+# in build order: a target's inputs are built before it.
+TARGETS = [
+    Target('yaml schema', YAML_PATH, [
+        SCHEMA_DIR / 'data_reporting_schema.py',
+        SCHEMA_DIR / 'geography_registry.py',
+        SCHEMA_DIR / 'mmwr_calendar.py',
+        # the sub_state_geo_name conditionals list the registered names.
+        *sorted((SCHEMA_DIR / 'jurisdiction-metadata').glob('disease-tracking-metadata-*.yaml')),
+        SCRIPT_DIR / 'generate_yaml_schema.py',
+    ], _rebuild_yaml),
+    Target('data dictionary', DICT_PATH, [YAML_PATH, SCRIPT_DIR / 'validate_schema_specs.py'], _rebuild_data_dictionary),
+    Target('markdown', MD_PATH, [YAML_PATH, SCRIPT_DIR / 'validate_schema_specs.py'], _rebuild_markdown),
+    Target('compiled validator', VALIDATOR_PATH, [
+        YAML_PATH,
+        SCRIPT_DIR / 'compile_schema_validator.py',
+        SCRIPT_DIR / 'schema_validator_template.js',
+    ], _rebuild_compiled(VALIDATOR_PATH)),
+] + [
+    Target(f"tool page {page.relative_to(REPO_DIR).as_posix()}", page, [
+        VALIDATOR_PATH,
+        SCRIPT_DIR / 'compile_schema_validator.py',
+    ], _rebuild_compiled(page))
+    for page in TOOL_PAGES
+]
+
+
+def file_hash(path: Path) -> Optional[str]:
+    """sha256 of a file's content, None if it does not exist."""
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def _key(path: Path) -> str:
+    return Path(path).relative_to(REPO_DIR).as_posix()
+
+
+def load_state(path: Path) -> Dict[str, Dict[str, Optional[str]]]:
+    """{target name: {file: sha256}} of the last successful build; empty if missing or unreadable."""
     try:
-        subprocess.run(cmd, capture_output=False, check=True)
-        print(f"✓ {description} - SUCCESS")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"✗ {description} - FAILED (exit code: {e.returncode})")
-        return False
-    except OSError as e:
-        print(f"✗ {description} - FAILED to start command: {e}")
-        return False
+        state = json.loads(Path(path).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(state, dict) or state.get('version') != STATE_VERSION:
+        return {}
+    return state.get('targets', {})
+
+
+def save_state(path: Path, targets: Dict[str, Dict[str, Optional[str]]]) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + '.tmp')
+    temporary.write_text(json.dumps({'version': STATE_VERSION, 'targets': targets}, indent=2, sort_keys=True), encoding='utf-8')
+    os.replace(temporary, path)
+
+
+def build(check: bool = False, force: bool = False, state_path: Path = STATE_PATH) -> List[dict]:
+    """
+    Bring every target up to date (with check, only report the out of date
+    ones, and leave the state file as it is). Returns one result per target: name, status, changed (the files
+    whose hash changed since the last build), seconds and error.
+    """
+    state = {} if force else load_state(state_path)
+    hashes: Dict[Path, Optional[str]] = {}
+
+    def current(path: Path) -> Optional[str]:
+        if path not in hashes:
+            hashes[path] = file_hash(path)
+        return hashes[path]
+
+    results = []
+    broken = set()
+    for target in TARGETS:
+        start = time.perf_counter()
+        files = target.inputs + [target.path]
+        previous = state.get(target.name, {})
+        changed = [_key(path) for path in files if previous.get(_key(path)) != current(path)]
+        result = {'target': target.name, 'status': UP_TO_DATE, 'changed': changed, 'seconds': 0.0, 'error': None}
+        if any(path in broken for path in target.inputs):
+            result['status'] = SKIPPED
+        elif changed:
+            try:
+                result['status'] = target.build(check)
+            except Exception as e:
+                result['status'], result['error'] = FAILED, f"{type(e).__name__}: {e}"
+            # the target (and the targets built from it) must be hashed again.
+            hashes.pop(target.path, None)
+            if result['status'] in (CONSISTENT, UPDATED):
+                state[target.name] = {_key(path): current(path) for path in files}
+            else:
+                state.pop(target.name, None)
+        if result['status'] not in OK_STATUSES:
+            broken.add(target.path)
+        result['seconds'] = time.perf_counter() - start
+        results.append(result)
+
+    if not check:
+        save_state(state_path, state)
+    return results
+
+
+def build_geography_snapshot() -> Optional[Path]:
+    """Rebuild the geography registry snapshot if it is stale; None if it could not be written."""
+    if str(SCHEMA_DIR) not in sys.path:
+        sys.path.insert(0, str(SCHEMA_DIR))
+    from geography_registry import build_snapshot
+
+    return build_snapshot()
 
 
 def main():
     """Main function to update data standards."""
-    script_dir = Path(__file__).parent
-    
-    print("="*60)
-    print("Data Standards Update Process")
-    print("="*60)
-    print("\nThis script will:")
-    print("  1. Generate YAML schema from Pydantic model")
-    print("  2. Update data dictionary CSV from YAML schema")
-    print("  3. Update markdown documentation from YAML schema")
-    print("  4. Validate consistency across all files")
-    
-    # Step 1: Generate YAML schema from Pydantic model
-    if not run_command(
-        [sys.executable, str(script_dir / "generate_yaml_schema.py")],
-        "Step 1: Generate YAML schema from Pydantic model"
-    ):
-        print("\n✗ Failed to generate YAML schema")
-        sys.exit(1)
-    
-    # Step 2: Update data dictionary and markdown from YAML schema
-    if not run_command(
-        [sys.executable, str(script_dir / "validate_schema_specs.py"), "--update"],
-        "Step 2: Update data dictionary and markdown from YAML schema"
-    ):
-        print("\n✗ Failed to update data dictionary and markdown")
-        sys.exit(1)
-    
-    # Step 3: Validate final consistency
-    if not run_command(
-        [sys.executable, str(script_dir / "validate_schema_specs.py")],
-        "Step 3: Validate final consistency"
-    ):
-        print("\n✗ Final validation failed")
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--check', action='store_true',
+                        help='do not write any artifact; exit 1 if one is out of date')
+    parser.add_argument('--force', action='store_true', help='rebuild every target, ignoring the recorded hashes')
+    parser.add_argument('--state', default=str(STATE_PATH), help='build state file (default: %(default)s)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = build(args.check, args.force, Path(args.state))
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        line = f"{'✓' if result['status'] in OK_STATUSES else '✗'} {result['target']}: {result['status']}"
+        if result['status'] not in (UP_TO_DATE, SKIPPED):
+            line += f" ({result['seconds'] * 1000:.0f} ms; changed: {', '.join(result['changed'])})"
+        print(line)
+        if result['error']:
+            print(f"    {result['error']}")
+
+    if not args.check:
+        snapshot = build_geography_snapshot()
+        # not fatal: without a snapshot the schema parses the jurisdiction metadata at import.
+        print(f"✓ geography snapshot: {snapshot}" if snapshot else "! geography snapshot not written; the schema will parse the jurisdiction metadata at import")
+
+    updated = [result['target'] for result in results if result['status'] == UPDATED]
+    failed = [result['target'] for result in results if result['status'] not in OK_STATUSES]
+    if failed:
+        hint = "; run scripts/update_data_standards.py to update them" if args.check else ""
+        print(f"\n✗ {len(failed)} target(s) not up to date in {elapsed * 1000:.0f} ms{hint}")
         sys.exit(1)
-    
-    print("\n" + "="*60)
-    print("✓ Data standards update completed successfully!")
-    print("="*60)
-    print("\nUpdated files:")
-    print("  - examples-and-templates/data_reporting_schema.yaml")
-    print("  - examples-and-templates/disease_tracking_data_dictionary.csv")
-    print("  - guides/data-technical-specs.md")
-    print("\nThe data standards tool now reflects the current validation schema.")
+
+    print(f"\n✓ Data standards up to date in {elapsed * 1000:.0f} ms" + (f" (updated: {', '.join(updated)})" if updated else ""))
+    sys.exit(0)
 
 
 if __name__ == '__main__':
@@ -3,20 +3,27 @@
 Validate that data-technical-specs.md and data dictionary match data_reporting_schema.yaml.
 The YAML schema is the source of truth. Can optionally update markdown and data dictionary
 from the schema.
+
+Each document is loaded and parsed once (SchemaIndex, SpecDocument, DataDictionary)
+and the checks registered in RULES run against the parsed documents. --json prints
+the result of every check for other tooling.
 """
 
+import argparse
 import csv
+import json
 import re
 import sys
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Tuple, Any, Set
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
 import yaml
 
 
 def load_schema(schema_path: Path) -> Dict[str, Any]:
     """Load the YAML schema file."""
     with open(schema_path, 'r') as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
 
 
 def load_markdown(md_path: Path) -> str:
@@ -110,253 +117,217 @@ def extract_field_summary_table(markdown: str) -> Dict[str, Dict[str, str]]:
     return fields
 
 
-def check_age_groups(schema: Dict, markdown: str) -> Tuple[bool, str]:
-    """Check if age group values match."""
-    schema_age_groups = extract_enum_from_schema(schema, 'age_group')
-    
-    # Extract age groups from markdown
+def extract_disease_subtypes(schema: Dict) -> Set[str]:
+    """
+    Extract disease subtype values from the conditional rules of the schema: the
+    oneOf options, or the then branch of if/then rules, that list disease_subtype values.
+    """
+    schema_subtypes = set()
+    for condition in schema.get('items', {}).get('allOf', []):
+        for option in condition.get('oneOf', []) + [condition.get('then', {})]:
+            subtype = option.get('properties', {}).get('disease_subtype', {})
+            schema_subtypes.update(subtype.get('enum', []))
+            if 'const' in subtype:
+                schema_subtypes.add(subtype['const'])
+    return schema_subtypes
+
+
+def extract_age_groups_table(markdown: str) -> Optional[List[str]]:
+    """Extract the values of the Valid Age Groups table from markdown, None if it is missing."""
     md_pattern = r'\*\*Valid Age Groups:\*\*.*?\n\n\| Value \| Description \|\n\|[-\s|]+\n((?:\|[^\n]+\n)+)'
     match = re.search(md_pattern, markdown, re.DOTALL)
-    
+
     if not match:
-        return False, "Could not find age groups table in markdown"
-    
+        return None
+
     md_age_groups = []
     for row in match.group(1).strip().split('\n'):
         parts = [p.strip() for p in row.split('|')]
         if len(parts) >= 2 and parts[1].startswith('`'):
-            age_val = parts[1].strip('`').strip()
-            md_age_groups.append(age_val)
-    
-    schema_set = set(schema_age_groups)
-    md_set = set(md_age_groups)
-    
-    if schema_set != md_set:
-        missing_in_md = schema_set - md_set
-        missing_in_schema = md_set - schema_set
-        msg = "Age groups mismatch:\n"
-        if missing_in_md:
-            msg += f"  In schema but not in markdown: {sorted(missing_in_md)}\n"
-        if missing_in_schema:
-            msg += f"  In markdown but not in schema: {sorted(missing_in_schema)}\n"
-        return False, msg
-    
-    return True, "Age groups match"
+            md_age_groups.append(parts[1].strip('`').strip())
+    return md_age_groups
+
+
+class SchemaIndex:
+    """The YAML schema, with the values the checks and updates compare against extracted once."""
+
+    def __init__(self, schema: Dict[str, Any]):
+        self.schema = schema
+        items = schema.get('items', {})
+        self.properties: Dict[str, Dict] = items.get('properties', {})
+        self.required: Set[str] = set(items.get('required', []))
+        self.disease_subtypes: Set[str] = extract_disease_subtypes(schema)
+
+    def enum(self, field_name: str) -> List[str]:
+        """Enum values of a field, in schema order (empty if it has none)."""
+        return self.properties.get(field_name, {}).get('enum', [])
+
+
+class SpecDocument:
+    """data-technical-specs.md, with the field summary and age groups tables parsed once."""
+
+    def __init__(self, markdown: str):
+        self.text = markdown
+        self.field_summary = extract_field_summary_table(markdown)
+        self.age_groups = extract_age_groups_table(markdown)
+
+    def valid_values(self, field_name: str) -> Set[str]:
+        """The `quoted` values in a field's Valid Values cell of the field summary table."""
+        return set(re.findall(r'`([^`]+)`', self.field_summary.get(field_name, {}).get('valid_values', '')))
+
+    def required_fields(self) -> Set[str]:
+        return {field_name for field_name, info in self.field_summary.items() if info.get('required', '').lower() == 'yes'}
+
 
+class DataDictionary:
+    """The data dictionary CSV, with the Values/Format cell of each field parsed once."""
 
-def check_disease_subtype(schema: Dict, markdown: str) -> Tuple[bool, str]:
+    def __init__(self, entries: Dict[str, Dict[str, str]]):
+        self.entries = entries
+        self._values: Dict[str, Set[str]] = {}
+
+    def values(self, field_name: str) -> Set[str]:
+        if field_name not in self._values:
+            self._values[field_name] = parse_csv_values(self.entries.get(field_name, {}).get('values', ''))
+        return self._values[field_name]
+
+
+class Specs(NamedTuple):
+    """The schema and the documents checked against it; a document not loaded is None."""
+    schema: SchemaIndex
+    markdown: Optional[SpecDocument] = None
+    data_dict: Optional[DataDictionary] = None
+
+
+def load_specs(schema_path: Path, md_path: Optional[Path] = None, dict_path: Optional[Path] = None) -> Specs:
+    """Load and parse the schema and (when a path is given) the markdown and data dictionary."""
+    return Specs(
+        SchemaIndex(load_schema(schema_path)),
+        SpecDocument(load_markdown(md_path)) if md_path is not None else None,
+        DataDictionary(load_data_dictionary(dict_path)) if dict_path is not None else None,
+    )
+
+
+def compare_values(title: str, schema_values: Set[str], other_values: Set[str], other: str, prefix: str = 'In') -> Tuple[bool, str]:
+    """Compare a set of values from the schema with the values documented in other."""
+    if schema_values == other_values:
+        return True, f"{title} match"
+    missing_in_other = schema_values - other_values
+    missing_in_schema = other_values - schema_values
+    msg = f"{title} mismatch:\n"
+    if missing_in_other:
+        msg += f"  {prefix} schema but not in {other}: {sorted(missing_in_other)}\n"
+    if missing_in_schema:
+        msg += f"  {prefix} {other} but not in schema: {sorted(missing_in_schema)}\n"
+    return False, msg
+
+
+def check_age_groups(schema: SchemaIndex, markdown: SpecDocument) -> Tuple[bool, str]:
+    """Check if age group values match."""
+    if markdown.age_groups is None:
+        return False, "Could not find age groups table in markdown"
+    return compare_values("Age groups", set(schema.enum('age_group')), set(markdown.age_groups), 'markdown')
+
+
+def check_disease_subtype(schema: SchemaIndex, markdown: SpecDocument) -> Tuple[bool, str]:
     """Check disease subtype values."""
-    # Extract from schema - need to check the conditional logic
-    allOf = schema.get('items', {}).get('allOf', [])
-    schema_subtypes = set()
-    
-    for condition in allOf:
-        if 'oneOf' in condition:
-            for option in condition['oneOf']:
-                props = option.get('properties', {})
-                if 'disease_subtype' in props:
-                    subtype_enum = props['disease_subtype'].get('enum', [])
-                    schema_subtypes.update(subtype_enum)
-    
-    # Extract from markdown field summary table
-    field_summary = extract_field_summary_table(markdown)
-    disease_subtype_info = field_summary.get('disease_subtype', {})
-    valid_values = disease_subtype_info.get('valid_values', '')
-    
-    # Parse the valid values from markdown (e.g., `A`, `B`, `C`, etc.)
-    md_subtypes = set()
-    for match in re.findall(r'`([^`]+)`', valid_values):
-        md_subtypes.add(match)
-    
-    if schema_subtypes != md_subtypes:
-        missing_in_md = schema_subtypes - md_subtypes
-        missing_in_schema = md_subtypes - schema_subtypes
-        msg = "Disease subtype values mismatch:\n"
-        if missing_in_md:
-            msg += f"  In schema but not in markdown: {sorted(missing_in_md)}\n"
-        if missing_in_schema:
-            msg += f"  In markdown but not in schema: {sorted(missing_in_schema)}\n"
-        return False, msg
-    
-    return True, "Disease subtype values match"
-
-
-def check_geo_unit(schema: Dict, markdown: str) -> Tuple[bool, str]:
+    return compare_values("Disease subtype values", schema.disease_subtypes, markdown.valid_values('disease_subtype'), 'markdown')
+
+
+def check_geo_unit(schema: SchemaIndex, markdown: SpecDocument) -> Tuple[bool, str]:
     """Check geo_unit values."""
-    schema_geo_units = set(extract_enum_from_schema(schema, 'geo_unit'))
-    
-    # Extract from markdown field summary table
-    field_summary = extract_field_summary_table(markdown)
-    geo_unit_info = field_summary.get('geo_unit', {})
-    valid_values = geo_unit_info.get('valid_values', '')
-    
-    md_geo_units = set()
-    for match in re.findall(r'`([^`]+)`', valid_values):
-        md_geo_units.add(match)
-    
-    if schema_geo_units != md_geo_units:
-        missing_in_md = schema_geo_units - md_geo_units
-        missing_in_schema = md_geo_units - schema_geo_units
-        msg = "Geo unit values mismatch:\n"
-        if missing_in_md:
-            msg += f"  In schema but not in markdown: {sorted(missing_in_md)}\n"
-        if missing_in_schema:
-            msg += f"  In markdown but not in schema: {sorted(missing_in_schema)}\n"
-        return False, msg
-    
-    return True, "Geo unit values match"
+    return compare_values("Geo unit values", set(schema.enum('geo_unit')), markdown.valid_values('geo_unit'), 'markdown')
 
 
-def check_required_fields(schema: Dict, markdown: str) -> Tuple[bool, str]:
+def check_required_fields(schema: SchemaIndex, markdown: SpecDocument) -> Tuple[bool, str]:
     """Check that required fields in schema match markdown."""
-    schema_required = set(schema.get('items', {}).get('required', []))
-    
-    # Extract from field summary table
-    field_summary = extract_field_summary_table(markdown)
-    md_required = set()
-    for field_name, info in field_summary.items():
-        if info.get('required', '').lower() == 'yes':
-            md_required.add(field_name)
-    
-    if schema_required != md_required:
-        missing_in_md = schema_required - md_required
-        missing_in_schema = md_required - schema_required
-        msg = "Required fields mismatch:\n"
-        if missing_in_md:
-            msg += f"  Required in schema but not in markdown: {sorted(missing_in_md)}\n"
-        if missing_in_schema:
-            msg += f"  Required in markdown but not in schema: {sorted(missing_in_schema)}\n"
-        return False, msg
-    
-    return True, "Required fields match"
+    return compare_values("Required fields", schema.required, markdown.required_fields(), 'markdown', prefix='Required in')
 
 
-def check_data_dict_age_groups(schema: Dict, data_dict: Dict) -> Tuple[bool, str]:
+def check_enum_field(schema: SchemaIndex, markdown: SpecDocument, field_name: str) -> Tuple[bool, str]:
+    """Check if enum values for a field match between schema and markdown."""
+    return compare_values(f"{field_name} values", set(schema.enum(field_name)), markdown.valid_values(field_name), 'markdown')
+
+
+def check_data_dict_age_groups(schema: SchemaIndex, data_dict: DataDictionary) -> Tuple[bool, str]:
     """Check if age group values in data dictionary match schema."""
-    schema_age_groups = set(extract_enum_from_schema(schema, 'age_group'))
-    
-    age_group_entry = data_dict.get('age_group', {})
-    dict_values_str = age_group_entry.get('values', '')
-    dict_age_groups = parse_csv_values(dict_values_str)
-    
-    if schema_age_groups != dict_age_groups:
-        missing_in_dict = schema_age_groups - dict_age_groups
-        missing_in_schema = dict_age_groups - schema_age_groups
-        msg = "Data dictionary age groups mismatch:\n"
-        if missing_in_dict:
-            msg += f"  In schema but not in data dictionary: {sorted(missing_in_dict)}\n"
-        if missing_in_schema:
-            msg += f"  In data dictionary but not in schema: {sorted(missing_in_schema)}\n"
-        return False, msg
-    
-    return True, "Data dictionary age groups match"
+    return compare_values("Data dictionary age groups", set(schema.enum('age_group')), data_dict.values('age_group'), 'data dictionary')
 
 
-def check_data_dict_disease_subtype(schema: Dict, data_dict: Dict) -> Tuple[bool, str]:
+def check_data_dict_disease_subtype(schema: SchemaIndex, data_dict: DataDictionary) -> Tuple[bool, str]:
     """Check disease subtype values in data dictionary."""
-    allOf = schema.get('items', {}).get('allOf', [])
-    schema_subtypes = set()
-    
-    for condition in allOf:
-        if 'oneOf' in condition:
-            for option in condition['oneOf']:
-                props = option.get('properties', {})
-                if 'disease_subtype' in props:
-                    subtype_enum = props['disease_subtype'].get('enum', [])
-                    schema_subtypes.update(subtype_enum)
-    
-    disease_subtype_entry = data_dict.get('disease_subtype', {})
-    dict_values_str = disease_subtype_entry.get('values', '')
-    dict_subtypes = parse_csv_values(dict_values_str)
-    
-    if schema_subtypes != dict_subtypes:
-        missing_in_dict = schema_subtypes - dict_subtypes
-        missing_in_schema = dict_subtypes - schema_subtypes
-        msg = "Data dictionary disease subtype values mismatch:\n"
-        if missing_in_dict:
-            msg += f"  In schema but not in data dictionary: {sorted(missing_in_dict)}\n"
-        if missing_in_schema:
-            msg += f"  In data dictionary but not in schema: {sorted(missing_in_schema)}\n"
-        return False, msg
-    
-    return True, "Data dictionary disease subtype values match"
+    return compare_values("Data dictionary disease subtype values", schema.disease_subtypes, data_dict.values('disease_subtype'), 'data dictionary')
 
 
-def check_data_dict_geo_unit(schema: Dict, data_dict: Dict) -> Tuple[bool, str]:
+def check_data_dict_geo_unit(schema: SchemaIndex, data_dict: DataDictionary) -> Tuple[bool, str]:
     """Check geo_unit values in data dictionary."""
-    schema_geo_units = set(extract_enum_from_schema(schema, 'geo_unit'))
-    
-    geo_unit_entry = data_dict.get('geo_unit', {})
-    dict_values_str = geo_unit_entry.get('values', '')
-    dict_geo_units = parse_csv_values(dict_values_str)
-    
-    if schema_geo_units != dict_geo_units:
-        missing_in_dict = schema_geo_units - dict_geo_units
-        missing_in_schema = dict_geo_units - schema_geo_units
-        msg = "Data dictionary geo_unit values mismatch:\n"
-        if missing_in_dict:
-            msg += f"  In schema but not in data dictionary: {sorted(missing_in_dict)}\n"
-        if missing_in_schema:
-            msg += f"  In data dictionary but not in schema: {sorted(missing_in_schema)}\n"
-        return False, msg
-    
-    return True, "Data dictionary geo_unit values match"
-
-
-def check_enum_field(schema: Dict, markdown: str, field_name: str) -> Tuple[bool, str]:
-    """Check if enum values for a field match between schema and markdown."""
-    schema_values = set(extract_enum_from_schema(schema, field_name))
-    
-    # Extract from markdown field summary table
-    field_summary = extract_field_summary_table(markdown)
-    field_info = field_summary.get(field_name, {})
-    valid_values = field_info.get('valid_values', '')
-    
-    # Parse the valid values from markdown (e.g., `value1`, `value2`, etc.)
-    md_values = set()
-    for match in re.findall(r'`([^`]+)`', valid_values):
-        md_values.add(match)
-    
-    if schema_values != md_values:
-        missing_in_md = schema_values - md_values
-        missing_in_schema = md_values - schema_values
-        msg = f"{field_name} values mismatch:\n"
-        if missing_in_md:
-            msg += f"  In schema but not in markdown: {sorted(missing_in_md)}\n"
-        if missing_in_schema:
-            msg += f"  In markdown but not in schema: {sorted(missing_in_schema)}\n"
-        return False, msg
-    
-    return True, f"{field_name} values match"
+    return compare_values("Data dictionary geo_unit values", set(schema.enum('geo_unit')), data_dict.values('geo_unit'), 'data dictionary')
 
 
-def check_data_dict_enum_field(schema: Dict, data_dict: Dict, field_name: str) -> Tuple[bool, str]:
+def check_data_dict_enum_field(schema: SchemaIndex, data_dict: DataDictionary, field_name: str) -> Tuple[bool, str]:
     """Check if enum values for a field match between schema and data dictionary."""
-    schema_values = set(extract_enum_from_schema(schema, field_name))
-    
-    field_entry = data_dict.get(field_name, {})
-    dict_values_str = field_entry.get('values', '')
-    dict_values = parse_csv_values(dict_values_str)
-    
-    if schema_values != dict_values:
-        missing_in_dict = schema_values - dict_values
-        missing_in_schema = dict_values - schema_values
-        msg = f"Data dictionary {field_name} values mismatch:\n"
-        if missing_in_dict:
-            msg += f"  In schema but not in data dictionary: {sorted(missing_in_dict)}\n"
-        if missing_in_schema:
-            msg += f"  In data dictionary but not in schema: {sorted(missing_in_schema)}\n"
-        return False, msg
-    
-    return True, f"Data dictionary {field_name} values match"
+    return compare_values(f"Data dictionary {field_name} values", set(schema.enum(field_name)), data_dict.values(field_name), 'data dictionary')
+
+
+class Rule(NamedTuple):
+    name: str
+    # the Specs document the rule checks: 'markdown' or 'data_dict'.
+    document: str
+    # check(schema, document) -> (passed, message)
+    check: Callable[[SchemaIndex, Any], Tuple[bool, str]]
+
+
+# the checks, in the order they run and are reported.
+RULES: List[Rule] = []
+DOCUMENTS = ('markdown', 'data_dict')
+
+
+def register_rule(name: str, document: str, check: Callable[[SchemaIndex, Any], Tuple[bool, str]]) -> Rule:
+    """Add a check of one document (see DOCUMENTS) to RULES."""
+    if document not in DOCUMENTS:
+        raise ValueError(f"document must be one of {DOCUMENTS}. got: {document!r}")
+    rule = Rule(name, document, check)
+    RULES.append(rule)
+    return rule
+
+
+register_rule("Markdown: Age groups", 'markdown', check_age_groups)
+register_rule("Markdown: Disease subtype values", 'markdown', check_disease_subtype)
+register_rule("Markdown: Geo unit values", 'markdown', check_geo_unit)
+register_rule("Markdown: Required fields", 'markdown', check_required_fields)
+for _field_name in ('outcome', 'date_type', 'time_unit', 'disease_name', 'confirmation_status'):
+    register_rule(f"Markdown: {_field_name} values", 'markdown', partial(check_enum_field, field_name=_field_name))
+# Note: 'state' field is not validated in markdown as it's documented generically
+# as "Two-letter state/territory code" for readability rather than listing all 56 codes.
+# The data dictionary contains the full enumeration and is validated below.
+
+register_rule("Data Dictionary: Age groups", 'data_dict', check_data_dict_age_groups)
+register_rule("Data Dictionary: Disease subtype values", 'data_dict', check_data_dict_disease_subtype)
+register_rule("Data Dictionary: Geo unit values", 'data_dict', check_data_dict_geo_unit)
+for _field_name in ('outcome', 'date_type', 'time_unit', 'disease_name', 'confirmation_status', 'state'):
+    register_rule(f"Data Dictionary: {_field_name} values", 'data_dict', partial(check_data_dict_enum_field, field_name=_field_name))
+
+
+def run_rules(specs: Specs, documents: Sequence[str] = DOCUMENTS) -> List[Dict[str, Any]]:
+    """
+    Run the registered rules of the given documents against the parsed specs.
+    Returns one result per rule: name, document, passed and message.
+    """
+    results = []
+    for rule in RULES:
+        if rule.document not in documents:
+            continue
+        passed, message = rule.check(specs.schema, getattr(specs, rule.document))
+        results.append({'name': rule.name, 'document': rule.document, 'passed': passed, 'message': message})
+    return results
 
 
-def update_markdown_from_schema(schema: Dict, markdown: str, schema_path: Path) -> str:
+def update_markdown_from_schema(schema: SchemaIndex, markdown: str, schema_path: Path) -> str:
     """Update markdown to match schema."""
     updated = markdown
     
     # Update age groups table
-    schema_age_groups = extract_enum_from_schema(schema, 'age_group')
+    schema_age_groups = schema.enum('age_group')
     
     # Build age groups table with descriptions
     age_descriptions = {
@@ -383,38 +354,28 @@ def update_markdown_from_schema(schema: Dict, markdown: str, schema_path: Path)
     updated = re.sub(pattern, r'\1' + age_table, updated, flags=re.DOTALL)
     
     # Update field summary table for disease_subtype
-    allOf = schema.get('items', {}).get('allOf', [])
-    schema_subtypes = set()
-    for condition in allOf:
-        if 'oneOf' in condition:
-            for option in condition['oneOf']:
-                props = option.get('properties', {})
-                if 'disease_subtype' in props:
-                    subtype_enum = props['disease_subtype'].get('enum', [])
-                    schema_subtypes.update(subtype_enum)
-    
-    subtype_values = ', '.join([f'`{v}`' for v in sorted(schema_subtypes)])
+    subtype_values = ', '.join([f'`{v}`' for v in sorted(schema.disease_subtypes)])
     
     # Update geo_unit in field summary table
-    schema_geo_units = extract_enum_from_schema(schema, 'geo_unit')
+    schema_geo_units = schema.enum('geo_unit')
     geo_unit_values = ', '.join([f'`{v}`' for v in schema_geo_units])
     
     # Update outcome in field summary table
-    schema_outcomes = extract_enum_from_schema(schema, 'outcome')
+    schema_outcomes = schema.enum('outcome')
     outcome_values = ', '.join([f'`{v}`' for v in schema_outcomes])
     
     # Update disease_name in field summary table
-    schema_disease_names = extract_enum_from_schema(schema, 'disease_name')
+    schema_disease_names = schema.enum('disease_name')
     disease_name_values = ', '.join([f'`{v}`' for v in schema_disease_names])
     
     # Update other enum fields
-    schema_time_units = extract_enum_from_schema(schema, 'time_unit')
+    schema_time_units = schema.enum('time_unit')
     time_unit_values = ', '.join([f'`{v}`' for v in schema_time_units])
     
-    schema_date_types = extract_enum_from_schema(schema, 'date_type')
+    schema_date_types = schema.enum('date_type')
     date_type_values = ', '.join([f'`{v}`' for v in schema_date_types])
     
-    schema_confirmation_statuses = extract_enum_from_schema(schema, 'confirmation_status')
+    schema_confirmation_statuses = schema.enum('confirmation_status')
     confirmation_status_values = ', '.join([f'`{v}`' for v in schema_confirmation_statuses])
     
     # Update the field summary table
@@ -429,7 +390,7 @@ def update_markdown_from_schema(schema: Dict, markdown: str, schema_path: Path)
         # Match the table row for the field and update the Required column
         required_val = 'Yes' if is_required else 'No'
         # First, locate the full table row for this field to validate its structure.
-        row_pattern = r'^\\|\\s*' + re.escape(field_name) + r'\\s*\\|.*$'
+        row_pattern = r'^\|\s*' + re.escape(field_name) + r'\s*\|.*$'
         row_match = re.search(row_pattern, updated, flags=re.MULTILINE)
         if not row_match:
             # If the field row does not exist in the table, do nothing.
@@ -445,8 +406,8 @@ def update_markdown_from_schema(schema: Dict, markdown: str, schema_path: Path)
                 "Update 'replace_field_required' to handle the new layout."
             )
         # Perform the substitution on the Required column, ensuring it succeeds.
-        pattern = r'(\\|\\s*' + re.escape(field_name) + r'\\s*\\| [^|]+ \\| [^|]+ \\| [^|]+ \\| )[^|]+(\\s*\\|)'
-        updated_new, count = re.subn(pattern, r'\\1' + required_val + r'\\2', updated)
+        pattern = r'(\|\s*' + re.escape(field_name) + r'\s*\| [^|]+ \| [^|]+ \| [^|]+ \| )[^|]+?(\s*\|)'
+        updated_new, count = re.subn(pattern, r'\1' + required_val + r'\2', updated)
         if count == 0:
             raise ValueError(
                 f"Failed to update 'Required' column for field '{field_name}'. "
@@ -463,8 +424,8 @@ def update_markdown_from_schema(schema: Dict, markdown: str, schema_path: Path)
     replace_field_value('confirmation_status', confirmation_status_values)
     
     # Update required status for all fields in the field summary table
-    schema_required = set(schema.get('items', {}).get('required', []))
-    all_fields = schema.get('items', {}).get('properties', {}).keys()
+    schema_required = schema.required
+    all_fields = schema.properties.keys()
     for field_name in all_fields:
         # Check if field exists in the markdown table before updating
         field_pattern = r'^\|\s*' + re.escape(field_name) + r'\s*\|.*$'
@@ -493,7 +454,7 @@ def format_csv_values(values: List[str]) -> str:
     return ', '.join([f'"{v}"' if v != 'NA' else v for v in values])
 
 
-def update_data_dictionary_from_schema(schema: Dict, dict_path: Path) -> None:
+def update_data_dictionary_from_schema(schema: SchemaIndex, dict_path: Path) -> None:
     """Update data dictionary CSV file to match schema."""
     # Read the CSV file with proper encoding
     rows = []
@@ -515,25 +476,14 @@ def update_data_dictionary_from_schema(schema: Dict, dict_path: Path) -> None:
         return
     
     # Get schema values
-    schema_age_groups = extract_enum_from_schema(schema, 'age_group')
-    schema_geo_units = extract_enum_from_schema(schema, 'geo_unit')
-    schema_disease_names = extract_enum_from_schema(schema, 'disease_name')
-    schema_time_units = extract_enum_from_schema(schema, 'time_unit')
-    schema_date_types = extract_enum_from_schema(schema, 'date_type')
-    schema_outcomes = extract_enum_from_schema(schema, 'outcome')
-    schema_confirmation_statuses = extract_enum_from_schema(schema, 'confirmation_status')
-    schema_states = extract_enum_from_schema(schema, 'state')
-    
-    # Get disease subtypes from schema
-    allOf = schema.get('items', {}).get('allOf', [])
-    schema_subtypes = set()
-    for condition in allOf:
-        if 'oneOf' in condition:
-            for option in condition['oneOf']:
-                props = option.get('properties', {})
-                if 'disease_subtype' in props:
-                    subtype_enum = props['disease_subtype'].get('enum', [])
-                    schema_subtypes.update(subtype_enum)
+    schema_age_groups = schema.enum('age_group')
+    schema_geo_units = schema.enum('geo_unit')
+    schema_disease_names = schema.enum('disease_name')
+    schema_time_units = schema.enum('time_unit')
+    schema_date_types = schema.enum('date_type')
+    schema_outcomes = schema.enum('outcome')
+    schema_confirmation_statuses = schema.enum('confirmation_status')
+    schema_states = schema.enum('state')
     
     # Update rows
     for row in rows:
@@ -546,7 +496,7 @@ def update_data_dictionary_from_schema(schema: Dict, dict_path: Path) -> None:
             row['Values/Format'] = format_csv_values(schema_geo_units)
         
         elif field_name == 'disease_subtype':
-            row['Values/Format'] = format_csv_values(sorted(schema_subtypes))
+            row['Values/Format'] = format_csv_values(sorted(schema.disease_subtypes))
         
         elif field_name == 'disease_name':
             row['Values/Format'] = format_csv_values(schema_disease_names)
@@ -576,97 +526,61 @@ def update_data_dictionary_from_schema(schema: Dict, dict_path: Path) -> None:
 
 def main():
     """Main validation function."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--update', action='store_true',
+                        help='update markdown and data dictionary from schema if a check fails')
+    parser.add_argument('--json', action='store_true', help='print the check results as JSON')
+    args = parser.parse_args()
+
     repo_root = Path(__file__).parent.parent
     schema_path = repo_root / 'examples-and-templates' / 'data_reporting_schema.yaml'
     md_path = repo_root / 'guides' / 'data-technical-specs.md'
     dict_path = repo_root / 'examples-and-templates' / 'disease_tracking_data_dictionary.csv'
-    
-    if not schema_path.exists():
-        print(f"Error: Schema file not found at {schema_path}")
-        sys.exit(1)
-    
-    if not md_path.exists():
-        print(f"Error: Markdown file not found at {md_path}")
-        sys.exit(1)
-    
-    if not dict_path.exists():
-        print(f"Error: Data dictionary file not found at {dict_path}")
-        sys.exit(1)
-    
-    schema = load_schema(schema_path)
-    markdown = load_markdown(md_path)
-    data_dict = load_data_dictionary(dict_path)
-    
+
+    for label, path in (("Schema", schema_path), ("Markdown", md_path), ("Data dictionary", dict_path)):
+        if not path.exists():
+            if args.json:
+                print(json.dumps({'passed': False, 'error': f"{label} file not found at {path}", 'checks': []}))
+            else:
+                print(f"Error: {label} file not found at {path}")
+            sys.exit(1)
+
+    specs = load_specs(schema_path, md_path, dict_path)
+    results = run_rules(specs)
+    failed_checks = [result['name'] for result in results if not result['passed']]
+    updated = []
+    if failed_checks and args.update:
+        updated_markdown = update_markdown_from_schema(specs.schema, specs.markdown.text, schema_path)
+        with open(md_path, 'w') as f:
+            f.write(updated_markdown)
+        update_data_dictionary_from_schema(specs.schema, dict_path)
+        updated = [str(md_path), str(dict_path)]
+
+    if args.json:
+        print(json.dumps({'passed': not failed_checks, 'failed': len(failed_checks), 'checks': results, 'updated': updated}, indent=2))
+        sys.exit(0 if not failed_checks or updated else 1)
+
     print("Validating that markdown and data dictionary match schema (schema is source of truth)...\n")
-    
-    markdown_checks = [
-        ("Markdown: Age groups", lambda s, m: check_age_groups(s, m)),
-        ("Markdown: Disease subtype values", lambda s, m: check_disease_subtype(s, m)),
-        ("Markdown: Geo unit values", lambda s, m: check_geo_unit(s, m)),
-        ("Markdown: Required fields", lambda s, m: check_required_fields(s, m)),
-        ("Markdown: outcome values", lambda s, m: check_enum_field(s, m, 'outcome')),
-        ("Markdown: date_type values", lambda s, m: check_enum_field(s, m, 'date_type')),
-        ("Markdown: time_unit values", lambda s, m: check_enum_field(s, m, 'time_unit')),
-        ("Markdown: disease_name values", lambda s, m: check_enum_field(s, m, 'disease_name')),
-        ("Markdown: confirmation_status values", lambda s, m: check_enum_field(s, m, 'confirmation_status')),
-        # Note: 'state' field is not validated in markdown as it's documented generically
-        # as "Two-letter state/territory code" for readability rather than listing all 56 codes.
-        # The data dictionary contains the full enumeration and is validated below.
-    ]
-    
-    data_dict_checks = [
-        ("Data Dictionary: Age groups", lambda s, d: check_data_dict_age_groups(s, d)),
-        ("Data Dictionary: Disease subtype values", lambda s, d: check_data_dict_disease_subtype(s, d)),
-        ("Data Dictionary: Geo unit values", lambda s, d: check_data_dict_geo_unit(s, d)),
-        ("Data Dictionary: outcome values", lambda s, d: check_data_dict_enum_field(s, d, 'outcome')),
-        ("Data Dictionary: date_type values", lambda s, d: check_data_dict_enum_field(s, d, 'date_type')),
-        ("Data Dictionary: time_unit values", lambda s, d: check_data_dict_enum_field(s, d, 'time_unit')),
-        ("Data Dictionary: disease_name values", lambda s, d: check_data_dict_enum_field(s, d, 'disease_name')),
-        ("Data Dictionary: confirmation_status values", lambda s, d: check_data_dict_enum_field(s, d, 'confirmation_status')),
-        ("Data Dictionary: state values", lambda s, d: check_data_dict_enum_field(s, d, 'state')),
-    ]
-    
-    all_passed = True
-    failed_checks = []
-    
-    for check_name, check_func in markdown_checks:
-        passed, message = check_func(schema, markdown)
-        status = "✓ PASS" if passed else "✗ FAIL"
-        print(f"{status}: {check_name}")
-        if not passed:
-            print(f"  {message}")
-            all_passed = False
-            failed_checks.append(check_name)
-    
-    for check_name, check_func in data_dict_checks:
-        passed, message = check_func(schema, data_dict)
-        status = "✓ PASS" if passed else "✗ FAIL"
-        print(f"{status}: {check_name}")
-        if not passed:
-            print(f"  {message}")
-            all_passed = False
-            failed_checks.append(check_name)
-    
-    if all_passed:
+
+    for result in results:
+        status = "✓ PASS" if result['passed'] else "✗ FAIL"
+        print(f"{status}: {result['name']}")
+        if not result['passed']:
+            print(f"  {result['message']}")
+
+    if not failed_checks:
         print("\n✓ All checks passed!")
         sys.exit(0)
-    else:
-        print(f"\n✗ {len(failed_checks)} check(s) failed")
-        
-        # Check if we should update the markdown and data dictionary
-        if '--update' in sys.argv:
-            print("\nUpdating markdown and data dictionary from schema...")
-            updated_markdown = update_markdown_from_schema(schema, markdown, schema_path)
-            with open(md_path, 'w') as f:
-                f.write(updated_markdown)
-            print(f"✓ Updated {md_path}")
-            
-            update_data_dictionary_from_schema(schema, dict_path)
-            print(f"✓ Updated {dict_path}")
-            sys.exit(0)
-        else:
-            print("\nRun with --update flag to automatically update markdown and data dictionary from schema")
-            sys.exit(1)
+
+    print(f"\n✗ {len(failed_checks)} check(s) failed")
+    if updated:
+        print("\nUpdating markdown and data dictionary from schema...")
+        for path in updated:
+            print(f"✓ Updated {path}")
+        sys.exit(0)
+
+    print("\nRun with --update flag to automatically update markdown and data dictionary from schema")
+    sys.exit(1)
 
 
 if __name__ == '__main__':
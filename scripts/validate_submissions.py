@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Validate many disease tracking report submissions in parallel.
+
+Accepts any number of CSV files and/or directories (searched for
+disease_tracking_report_*.csv files) and validates each file in its own worker
+process. Files are independent because every submission must contain a single
+state, so a weekly batch finishes in roughly the time of its largest file.
+A machine-readable report with per-file timings is written as NDJSON (one
+line per file, as soon as it finishes) or as a single JSON document.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from pydantic import ValidationError
+
+from columnar_validation import DEFAULT_MAX_ERRORS_PER_RULE, VALIDATION_MODES, ErrorCollector
+from stream_validation import DEFAULT_CHUNK_SIZE, validate_file
+from validation_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, StaleSchemaError, ValidationCache, cache_key
+
+
+SUBMISSION_PATTERN = 'disease_tracking_report_*.csv'
+
+# record fields that are determined by the file content and options, and so can be cached.
+CACHED_FIELDS = ('status', 'rows', 'error_count', 'errors', 'error_summary')
+
+
+def find_submissions(paths: Iterable[str]) -> List[Path]:
+    """Expand directories into their submission files, skipping the blank template."""
+    files = []
+    for arg in paths:
+        path = Path(arg)
+        if path.is_dir():
+            files.extend(
+                p for p in sorted(path.glob(SUBMISSION_PATTERN))
+                if '{jurisdiction}' not in p.name
+            )
+        else:
+            files.append(path)
+
+    return files
+
+
+def error_records(e: ValidationError) -> List[Dict[str, Any]]:
+    """JSON-serializable form of a pydantic ValidationError."""
+    return [
+        {'loc': list(err['loc']), 'type': err['type'], 'msg': err['msg']}
+        for err in e.errors(include_url=False, include_context=False, include_input=False)
+    ]
+
+
+def validate_submission(
+    csv_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    mode: str = 'collect_all',
+    max_errors_per_rule: int = DEFAULT_MAX_ERRORS_PER_RULE,
+    cache: ValidationCache = None,
+) -> Dict[str, Any]:
+    """
+    Validate one file and return its report entry. Runs inside a worker process.
+
+    errors holds the errors kept by the collector (all of them in 'collect_all'
+    mode); error_count and error_summary count every error found. With a
+    cache, a file already validated under the same schema version and options
+    is not validated again (cached is True).
+    """
+    start = time.perf_counter()
+    key = None
+    if cache is not None:
+        try:
+            key = cache_key(Path(csv_path), mode=mode, max_errors_per_rule=max_errors_per_rule)
+        except (OSError, StaleSchemaError):
+            pass
+    outcome = cache.get(key) if key is not None else None
+
+    if outcome is not None:
+        record = {'file': csv_path, **outcome, 'cached': True}
+    else:
+        record = _validate(csv_path, chunk_size, mode, max_errors_per_rule)
+        record['cached'] = False
+        if key is not None and record['status'] != 'error':
+            cache.put(key, {field: record[field] for field in CACHED_FIELDS})
+    record['seconds'] = round(time.perf_counter() - start, 6)
+    record['worker_pid'] = os.getpid()
+
+    return record
+
+
+def _validate(csv_path: str, chunk_size: int, mode: str, max_errors_per_rule: int) -> Dict[str, Any]:
+    record = {'file': csv_path, 'status': 'pass', 'rows': None, 'error_count': 0, 'errors': [], 'error_summary': []}
+    collector = ErrorCollector(mode, max_errors_per_rule)
+    try:
+        record['rows'] = validate_file(Path(csv_path), chunk_size=chunk_size, collector=collector)
+    except ValidationError as e:
+        record['status'] = 'fail'
+        record['errors'] = error_records(e)
+        record['error_count'] = collector.error_count
+        record['error_summary'] = collector.summary()
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        record['status'] = 'error'
+        record['errors'] = [{'loc': [], 'type': type(e).__name__, 'msg': str(e)}]
+        record['error_count'] = 1
+
+    return record
+
+
+def validate_submissions(
+    files: List[Path],
+    workers: int = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    mode: str = 'collect_all',
+    max_errors_per_rule: int = DEFAULT_MAX_ERRORS_PER_RULE,
+    cache: ValidationCache = None,
+):
+    """Yield one report entry per file, in completion order."""
+    if not files:
+        return
+
+    options = (chunk_size, mode, max_errors_per_rule, cache)
+    workers = min(workers or os.cpu_count() or 1, len(files))
+    if workers == 1:
+        for path in files:
+            yield validate_submission(str(path), *options)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(validate_submission, str(path), *options) for path in files]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main():
+    """Main function to validate a batch of submissions."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='+', help='submission CSV files or directories containing them')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: number of CPUs)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='rows validated per chunk')
+    parser.add_argument(
+        '--mode', choices=VALIDATION_MODES, default='collect_all',
+        help='collect_all: every error; capped: at most --max-errors-per-rule errors kept per rule and field; '
+             'fail_fast: stop at the first failing row (default: collect_all)'
+    )
+    parser.add_argument(
+        '--max-errors-per-rule', type=int, default=DEFAULT_MAX_ERRORS_PER_RULE,
+        help=f'errors kept per rule and field in capped mode (default: {DEFAULT_MAX_ERRORS_PER_RULE})'
+    )
+    parser.add_argument(
+        '--cache', nargs='?', const=str(DEFAULT_CACHE_DIR), default=None, metavar='DIR',
+        help=f'reuse the outcome of files already validated under the same schema version (default DIR: {DEFAULT_CACHE_DIR})'
+    )
+    parser.add_argument(
+        '--cache-max-mb', type=float, default=DEFAULT_MAX_BYTES / 2**20,
+        help=f'size limit of the cache; least recently used entries are evicted (default: {DEFAULT_MAX_BYTES // 2**20})'
+    )
+    parser.add_argument('--format', choices=['ndjson', 'json'], default='ndjson', help='report format (default: ndjson)')
+    parser.add_argument('--output', '-o', default=None, help='write the report to this file instead of stdout')
+    args = parser.parse_args()
+
+    files = find_submissions(args.paths)
+    if not files:
+        print("Error: no submission files found", file=sys.stderr)
+        sys.exit(2)
+
+    cache = ValidationCache(Path(args.cache), int(args.cache_max_mb * 2**20)) if args.cache else None
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    start = time.perf_counter()
+    records = []
+    try:
+        for record in validate_submissions(
+            files,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            mode=args.mode,
+            max_errors_per_rule=args.max_errors_per_rule,
+            cache=cache,
+        ):
+            records.append(record)
+            if args.format == 'ndjson':
+                out.write(json.dumps(record) + '\n')
+                out.flush()
+
+        summary = {
+            'files': len(records),
+            'passed': sum(r['status'] == 'pass' for r in records),
+            'failed': sum(r['status'] != 'pass' for r in records),
+            'rows': sum(r['rows'] or 0 for r in records),
+            'cached': sum(r['cached'] for r in records),
+            'wall_seconds': round(time.perf_counter() - start, 6),
+            'cpu_seconds': round(sum(r['seconds'] for r in records), 6),
+        }
+        if args.format == 'json':
+            json.dump({'summary': summary, 'files': records}, out, indent=2)
+            out.write('\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(
+        f"{'✓' if summary['failed'] == 0 else '✗'} {summary['passed']}/{summary['files']} file(s) passed "
+        f"in {summary['wall_seconds']:.2f}s",
+        file=sys.stderr
+    )
+    sys.exit(0 if summary['failed'] == 0 else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of validation outcomes.
+
+Jurisdictions often re-upload byte-identical files (retries of a scheduled
+push, manual re-uploads). A validation outcome is fully determined by the file
+content, the schema version and the validation options, so it is stored on disk
+under the SHA-256 of all three and returned directly when the same file comes
+back. The schema version hashes every file the row and dataset rules are built
+from and the validation code that applies them, so editing the schema (or a
+jurisdiction's registered geographies) or the validators invalidates all
+earlier entries. The cache is bounded in size and evicts the
+least recently used entries first.
+
+A running process keeps validating with the schema it imported, so the
+version is checked against the files on every lookup (a stat of each file;
+they are only hashed again when one changed). Once they differ from what the
+process loaded, cache_key raises StaleSchemaError and the process has to be
+restarted to pick up the new schema.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+SCRIPT_DIR = Path(__file__).parent
+SCHEMA_DIR = SCRIPT_DIR.parent / 'examples-and-templates'
+
+# files whose content defines what a valid submission is.
+SCHEMA_FILES = (
+    'data_reporting_schema.py',
+    'data_reporting_schema.yaml',
+    'geography_registry.py',
+    'mmwr_calendar.py',
+    'jurisdiction-metadata/*.yaml',
+)
+
+# scripts whose code decides which errors a submission gets and how they are reported.
+VALIDATOR_FILES = (
+    'columnar_validation.py',
+    'stream_validation.py',
+    'validate_submissions.py',
+)
+
+DEFAULT_CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'usdiseasetracker-validation'
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class StaleSchemaError(RuntimeError):
+    """The schema files changed since this process imported the schema."""
+
+
+# (schema_dir, script_dir) -> (size and modification time of every file, version).
+_versions: Dict[Tuple[Path, Path], Tuple[tuple, str]] = {}
+
+
+def _versioned_files(schema_dir: Path, script_dir: Path) -> List[Tuple[str, Path]]:
+    files = []
+    for directory, patterns in ((Path(schema_dir), SCHEMA_FILES), (Path(script_dir), VALIDATOR_FILES)):
+        for pattern in patterns:
+            for path in sorted(directory.glob(pattern)):
+                files.append((f"{directory.name}/{path.relative_to(directory).as_posix()}", path))
+    return files
+
+
+def schema_version(schema_dir: Path = SCHEMA_DIR, script_dir: Path = SCRIPT_DIR) -> str:
+    """
+    SHA-256 over the names and contents of the schema files and the validator
+    scripts, as they are on disk. The files are only read again when one was
+    added, removed, resized or modified since the last call.
+    """
+    files = _versioned_files(schema_dir, script_dir)
+    stamp = []
+    for name, path in files:
+        stat = path.stat()
+        stamp.append((name, stat.st_size, stat.st_mtime_ns))
+    stamp = tuple(stamp)
+
+    dirs = (Path(schema_dir), Path(script_dir))
+    cached = _versions.get(dirs)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    for name, path in files:
+        digest.update(name.encode() + b'\0')
+        digest.update(path.read_bytes() + b'\0')
+    _versions[dirs] = (stamp, digest.hexdigest())
+
+    return _versions[dirs][1]
+
+
+# the version this process validates with, taken when the validators first import this module.
+LOADED_SCHEMA_VERSION = schema_version()
+
+
+def schema_is_current() -> bool:
+    """Whether the schema files on disk are still the ones this process loaded."""
+    return schema_version() == LOADED_SCHEMA_VERSION
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file's content, read in blocks."""
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def cache_key(path: Path, **options) -> str:
+    """
+    Key of a validation outcome: file content + schema version + validation
+    options. Raises StaleSchemaError if the schema changed since this process
+    loaded it, as its outcomes no longer belong to the current version.
+    """
+    if not schema_is_current():
+        raise StaleSchemaError("the schema files changed since this process started; restart it to validate with the new schema")
+    key = {'file': file_digest(path), 'schema': LOADED_SCHEMA_VERSION, 'options': options}
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+class ValidationCache:
+    """
+    On-disk store of validation outcomes, one JSON file per key.
+
+    An entry's modification time is its last use, so eviction removes the
+    oldest entries until the total size is at most max_bytes. Writes go
+    through a temporary file and an atomic rename, so concurrent worker
+    processes can share a cache directory.
+    """
+
+    def __init__(self, directory: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f'{key}.json'
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """The cached outcome for key, or None. A hit marks the entry as recently used."""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                outcome = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        return outcome
+
+    def put(self, key: str, outcome: Dict[str, Any]) -> None:
+        """Store an outcome, then evict least recently used entries beyond max_bytes."""
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(outcome, f)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            return
+
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        for path in self.directory.glob('*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        for path in self.directory.glob('*.json'):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def main():
+    """Print the current schema version, or clear a cache directory."""
+    args = sys.argv[1:]
+    if args[:1] == ['--clear']:
+        cache = ValidationCache(Path(args[1]) if len(args) > 1 else DEFAULT_CACHE_DIR)
+        cache.clear()
+        print(f"✓ Cleared {cache.directory}")
+    elif not args:
+        print(schema_version())
+    else:
+        print("Usage: python3 scripts/validation_cache.py [--clear [CACHE_DIR]]")
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Per-validator profiling of DiseaseReport and DiseaseReportDataset validation.
+
+profile_validation() yields a profile with profiled subclasses of
+DiseaseReport and DiseaseReportDataset (profile.DiseaseReport,
+profile.DiseaseReportDataset). Each subclass overrides every field and model
+validator of its model, through pydantic's public field_validator and
+model_validator decorators, with a wrapper that calls the original and records
+its calls, cumulative time and failures, attributing failures to the
+RuleViolation rule id they raise. Each subclass additionally gets an outermost
+wrap validator, so the time pydantic-core spends parsing and type-checking
+fields (a DiseaseReport's total time minus its validators) is reported too.
+
+The original models are never modified, so validation with them costs nothing
+extra, in this thread or any other; only validation through the profile's
+models is profiled.
+
+The report is available as a dict (report()), as Prometheus text exposition
+format (prometheus()), or as OpenTelemetry spans (export_spans(), requires the
+opentelemetry-sdk package).
+"""
+
+import argparse
+import csv
+import inspect
+import json
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pydantic
+from pydantic import ValidationError, create_model, field_validator, model_validator
+
+import columnar_validation  # noqa: F401  (puts examples-and-templates on sys.path)
+from data_reporting_schema import DiseaseReport, DiseaseReportDataset, RuleViolation
+
+# name of the outermost timing wrapper of each model in the report.
+TOTAL = '<total>'
+
+
+class ValidatorStats:
+    __slots__ = ('calls', 'seconds', 'failures')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.failures = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'calls': self.calls, 'seconds': self.seconds, 'failures': self.failures}
+
+
+class ValidationProfile:
+    """Call counts, cumulative time and failures per (model, validator), and failures per rule."""
+
+    def __init__(self):
+        self.validators: Dict[Tuple[str, str], ValidatorStats] = {}
+        self.rule_failures: Counter = Counter()   # (model, validator, rule id) -> failures
+        self.core_errors: Counter = Counter()     # pydantic error type -> errors raised outside the validators
+        self.started = None
+        self.elapsed = 0.0
+
+    def stats(self, model: str, validator: str) -> ValidatorStats:
+        key = (model, validator)
+        stats = self.validators.get(key)
+        if stats is None:
+            stats = self.validators[key] = ValidatorStats()
+        return stats
+
+    def core_seconds(self, model: str = 'DiseaseReport') -> float:
+        """
+        Time spent in a model's validation outside its own validators: pydantic-core
+        field parsing for DiseaseReport, row validation for DiseaseReportDataset.
+        """
+        total = self.validators.get((model, TOTAL))
+        if total is None:
+            return 0.0
+        own = sum(stats.seconds for (m, name), stats in self.validators.items() if m == model and name != TOTAL)
+        return max(total.seconds - own, 0.0)
+
+    def report(self) -> Dict[str, Any]:
+        """The profile as a JSON-serializable dict, validators sorted by cumulative time."""
+        models = dict.fromkeys(model for model, _ in self.validators)
+        return {
+            'elapsed_seconds': self.elapsed,
+            'models': {
+                model: {
+                    'total': self.validators[(model, TOTAL)].as_dict() if (model, TOTAL) in self.validators else None,
+                    'core_seconds': self.core_seconds(model),
+                    'validators': {
+                        name: stats.as_dict()
+                        for (m, name), stats in sorted(self.validators.items(), key=lambda item: -item[1].seconds)
+                        if m == model and name != TOTAL
+                    },
+                }
+                for model in models
+            },
+            'rules': [
+                {'rule': rule, 'model': model, 'validator': validator, 'failures': failures}
+                for (model, validator, rule), failures in self.rule_failures.most_common()
+            ],
+            'core_errors': dict(self.core_errors.most_common()),
+        }
+
+    def prometheus(self, prefix: str = 'usdt_validation') -> str:
+        """The profile in Prometheus text exposition format."""
+        metrics = (
+            ('validator_calls_total', 'counter', 'Validator calls.', 'calls'),
+            ('validator_seconds_total', 'counter', 'Cumulative validator time in seconds.', 'seconds'),
+            ('validator_failures_total', 'counter', 'Validator calls that raised.', 'failures'),
+        )
+        lines = []
+        for name, kind, help_text, attr in metrics:
+            lines += [f"# HELP {prefix}_{name} {help_text}", f"# TYPE {prefix}_{name} {kind}"]
+            for (model, validator), stats in self.validators.items():
+                lines.append(f'{prefix}_{name}{{model="{model}",validator="{_escape(validator)}"}} {getattr(stats, attr)}')
+        lines += [f"# HELP {prefix}_rule_failures_total Rule violations.", f"# TYPE {prefix}_rule_failures_total counter"]
+        for (model, validator, rule), failures in self.rule_failures.items():
+            lines.append(f'{prefix}_rule_failures_total{{model="{model}",validator="{validator}",rule="{rule}"}} {failures}')
+        lines += [f"# HELP {prefix}_core_errors_total Errors raised by pydantic-core.", f"# TYPE {prefix}_core_errors_total counter"]
+        for error_type, count in self.core_errors.items():
+            lines.append(f'{prefix}_core_errors_total{{type="{error_type}"}} {count}')
+        lines += [f"# HELP {prefix}_core_seconds_total Time in pydantic-core field parsing.", f"# TYPE {prefix}_core_seconds_total counter"]
+        for model in dict.fromkeys(model for model, _ in self.validators):
+            lines.append(f'{prefix}_core_seconds_total{{model="{model}"}} {self.core_seconds(model)}')
+
+        return '\n'.join(lines) + '\n'
+
+    def export_spans(self, tracer, name: str = 'validation') -> None:
+        """
+        Emit the profile as OpenTelemetry spans with the given tracer: one span for
+        the profiled block and one child span per validator, laid end to end, whose
+        duration is the validator's cumulative time and whose attributes hold its
+        call and failure counts.
+        """
+        from opentelemetry import trace
+
+        start_ns = int(self.started * 1e9)
+        root = tracer.start_span(name, start_time=start_ns, attributes={'elapsed_seconds': self.elapsed})
+        context = trace.set_span_in_context(root)
+        offset = start_ns
+        for (model, validator), stats in self.validators.items():
+            span = tracer.start_span(
+                f"{model}.{validator}", context=context, start_time=offset,
+                attributes={'model': model, 'validator': validator, 'calls': stats.calls, 'failures': stats.failures},
+            )
+            offset += int(stats.seconds * 1e9)
+            span.end(end_time=offset)
+        root.end(end_time=start_ns + int(self.elapsed * 1e9))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _timed(func, stats: ValidatorStats, profile: ValidationProfile, model: str, validator: str):
+    def timed(*args):
+        stats.calls += 1
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        except RuleViolation as e:
+            stats.failures += 1
+            profile.rule_failures[(model, validator, e.rule_id)] += 1
+            raise
+        except Exception:
+            stats.failures += 1
+            raise
+        finally:
+            stats.seconds += time.perf_counter() - start
+
+    return timed
+
+
+def _total_wrapper(stats: ValidatorStats, profile: ValidationProfile, count_core_errors: bool):
+    def total(cls, value, handler):
+        stats.calls += 1
+        start = time.perf_counter()
+        try:
+            return handler(value)
+        except ValidationError as e:
+            stats.failures += 1
+            if count_core_errors:
+                profile.core_errors.update(err['type'] for err in e.errors() if err['type'] != 'value_error')
+            raise
+        finally:
+            stats.seconds += time.perf_counter() - start
+
+    return total
+
+
+def _field_wrapper(timed, original) -> classmethod:
+    """A field validator calling timed like original: a bound classmethod taking (value) or (value, info)."""
+    if len(inspect.signature(original).parameters) > 1:
+        def validate(cls, v, info):
+            return timed(v, info)
+    else:
+        def validate(cls, v):
+            return timed(v)
+
+    return classmethod(validate)
+
+
+def _model_wrapper(timed):
+    def validate(self):
+        return timed(self)
+
+    return validate
+
+
+def _validators(model) -> Tuple[Dict[str, tuple], Dict[str, str]]:
+    """({name: validated fields} of the field validators, {name: mode} of the model validators) of a model."""
+    try:
+        decorators = model.__pydantic_decorators__
+        field_validators = {name: tuple(d.info.fields) for name, d in decorators.field_validators.items() if d.info.mode == 'after'}
+        model_validators = {name: d.info.mode for name, d in decorators.model_validators.items()}
+        unsupported = [name for name, d in decorators.field_validators.items() if d.info.mode != 'after']
+    except AttributeError as e:
+        raise RuntimeError(f"cannot list the validators of {model.__name__} with pydantic {pydantic.VERSION}: {e}") from e
+    unsupported += [name for name, mode in model_validators.items() if mode != 'after']
+    if unsupported:
+        raise RuntimeError(f"{model.__name__}: only 'after' validators can be profiled, not {', '.join(unsupported)}")
+
+    return field_validators, model_validators
+
+
+def _profiled_validators(model, profile: ValidationProfile, count_core_errors: bool) -> Dict[str, Any]:
+    """Validators of a subclass of model: each one wrapping the model's own, and an outermost timing wrapper."""
+    name = model.__name__
+    field_validators, model_validators = _validators(model)
+    validators = {}
+    for validator, fields in field_validators.items():
+        original = getattr(model, validator)
+        timed = _timed(original, profile.stats(name, validator), profile, name, validator)
+        validators[validator] = field_validator(*fields)(_field_wrapper(timed, original))
+    for validator in model_validators:
+        timed = _timed(getattr(model, validator), profile.stats(name, validator), profile, name, validator)
+        validators[validator] = model_validator(mode='after')(_model_wrapper(timed))
+    # the last wrap validator wraps everything before it: field parsing and all validators.
+    validators['profile_total'] = model_validator(mode='wrap')(classmethod(
+        _total_wrapper(profile.stats(name, TOTAL), profile, count_core_errors)
+    ))
+
+    return validators
+
+
+@contextmanager
+def profile_validation() -> Iterator[ValidationProfile]:
+    """
+    Profile the validation done with the profile's models in the block:
+
+        with profile_validation() as profile:
+            profile.DiseaseReportDataset.model_validate(rows)
+        print(profile.report())
+
+    profile.DiseaseReport and profile.DiseaseReportDataset validate exactly like
+    DiseaseReport and DiseaseReportDataset (the subclasses keep their names, so
+    errors read the same).
+    """
+    profile = ValidationProfile()
+    profile.DiseaseReport = create_model(
+        'DiseaseReport', __base__=DiseaseReport, __module__=DiseaseReport.__module__,
+        __validators__=_profiled_validators(DiseaseReport, profile, count_core_errors=True),
+    )
+    profile.DiseaseReportDataset = create_model(
+        'DiseaseReportDataset', __base__=DiseaseReportDataset, __module__=DiseaseReportDataset.__module__,
+        __validators__=_profiled_validators(DiseaseReportDataset, profile, count_core_errors=False),
+        root=(List[profile.DiseaseReport], ...),
+    )
+    profile.started = time.time()
+    start = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.elapsed = time.perf_counter() - start
+
+
+def _otel_tracer(endpoint: Optional[str]):
+    """A tracer exporting to an OTLP/HTTP collector (or the console when endpoint is None)."""
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter, SimpleSpanProcessor
+    except ImportError:
+        print("Error: --otel requires the opentelemetry-sdk package (and opentelemetry-exporter-otlp for an endpoint)", file=sys.stderr)
+        sys.exit(2)
+
+    if endpoint is None:
+        exporter = ConsoleSpanExporter()
+    else:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter(endpoint=endpoint)
+    provider = TracerProvider(resource=Resource.create({'service.name': 'usdiseasetracker-validation'}))
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    return provider, provider.get_tracer(__name__)
+
+
+def main():
+    """Main function to validate CSV files with the pydantic model and print a per-validator profile."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='+', help='submission CSV files')
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--json', action='store_true', help='print the report as JSON')
+    output.add_argument('--prometheus', action='store_true', help='print the report in Prometheus text format')
+    parser.add_argument(
+        '--otel', nargs='?', const='', default=None, metavar='ENDPOINT',
+        help='also export OpenTelemetry spans to an OTLP/HTTP endpoint (e.g. http://localhost:4318/v1/traces), or to the console'
+    )
+    args = parser.parse_args()
+
+    datasets = []
+    for arg in args.paths:
+        with open(arg, 'r', newline='', encoding='utf-8-sig') as f:
+            datasets.append((arg, list(csv.DictReader(f))))
+
+    failed = []
+    with profile_validation() as profile:
+        for arg, rows in datasets:
+            try:
+                profile.DiseaseReportDataset.model_validate(rows)
+            except ValidationError:
+                failed.append(arg)
+
+    if args.otel is not None:
+        provider, tracer = _otel_tracer(args.otel or None)
+        profile.export_spans(tracer)
+        provider.shutdown()
+
+    if args.json:
+        json.dump(profile.report(), sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    elif args.prometheus:
+        sys.stdout.write(profile.prometheus())
+    else:
+        report = profile.report()
+        print(f"{sum(len(rows) for _, rows in datasets)} rows in {report['elapsed_seconds']:.3f}s; failed files: {len(failed)}")
+        for model, entry in report['models'].items():
+            total = entry['total']
+            print(f"\n{model}: {total['calls']} calls, {total['seconds']:.4f}s, {total['failures']} failed")
+            print(f"  {'(outside validators)':<36} {'':>8} {entry['core_seconds']:>9.4f}s")
+            for validator, stats in entry['validators'].items():
+                print(f"  {validator:<36} {stats['calls']:>8} {stats['seconds']:>9.4f}s {stats['failures']:>6} failed")
+        if report['rules'] or report['core_errors']:
+            print("\nfailures by rule:")
+            for entry in report['rules']:
+                print(f"  {entry['rule']:<46} {entry['failures']:>6}  ({entry['validator']})")
+            for error_type, count in report['core_errors'].items():
+                print(f"  {error_type:<46} {count:>6}  (pydantic-core)")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()